@@ -46,6 +46,9 @@ class BaseActivityReportSerializer(serializers.ModelSerializer):
         }
 
     def get_children_data(self, obj):
+        # Village reports list their users through ActivityReportMembersView, page by page
+        if not self.Meta.children_field:
+            return {}
         data = getattr(obj, self.Meta.children_field, {})
         return {
             k: {
@@ -72,19 +75,21 @@ class BaseActivityReportSerializer(serializers.ModelSerializer):
 class DailyVillageActivityReportSerializer(BaseActivityReportSerializer):
     class Meta:
         model = DailyVillageActivityReport
-        fields = '__all__'
+        exclude = ('member_ids', 'user_data')
         entity_field = 'village'
         entity_type = 'village'
         level = 'village'
-        children_field = 'user_data'
+        children_field = None
 
 class WeeklyVillageActivityReportSerializer(BaseActivityReportSerializer):
     class Meta(DailyVillageActivityReportSerializer.Meta):
         model = WeeklyVillageActivityReport
+        exclude = ('member_ids', 'member_active_days', 'user_data')
 
 class MonthlyVillageActivityReportSerializer(BaseActivityReportSerializer):
     class Meta(DailyVillageActivityReportSerializer.Meta):
         model = MonthlyVillageActivityReport
+        exclude = ('member_ids', 'member_active_days', 'user_data')
 
 # Subdistrict Serializers
 class DailySubdistrictActivityReportSerializer(BaseActivityReportSerializer):
@@ -12,6 +12,7 @@ from ..models import (
 )
 from .serializers import *
 from geographies.models.geos import Country
+from reports.reportview.views import ReportMembersView
 import uuid
 
 class ActivityReportDetailView(APIView):
@@ -83,15 +84,20 @@ class ActivityReportDetailView(APIView):
         return Response(serializer.data)
     
     def get_report_by_id(self, report_type, level, report_id):
-        model = self.MODEL_MAPPING[report_type][level]
         try:
             # Try to parse as UUID
-            return model.objects.get(id=uuid.UUID(report_id))
+            return self.get_queryset(report_type, level).get(id=uuid.UUID(report_id))
         except (ValueError, TypeError):
             # Handle invalid UUID format
             raise NotFound("Invalid report ID format")
+
+    def get_queryset(self, report_type, level):
+        # Membership arrays are not serialized; leave them in the database
+        excluded = getattr(self.SERIALIZER_MAPPING[report_type][level].Meta, 'exclude', ())
+        return self.MODEL_MAPPING[report_type][level].objects.defer(*excluded)
+
     def get_report_by_params(self, report_type, level, params):
-        model = self.MODEL_MAPPING[report_type][level]
+        queryset = self.get_queryset(report_type, level)
         filters = {}
         
         # Time filters
@@ -135,7 +141,25 @@ class ActivityReportDetailView(APIView):
             filters[entity_field] = entity_id
         
         try:
-            return model.objects.get(**filters)
-        except model.MultipleObjectsReturned:
+            return queryset.get(**filters)
+        except queryset.model.MultipleObjectsReturned:
             # Handle case where multiple reports exist (shouldn't happen but safe guard)
-            return model.objects.filter(**filters).latest('date' if report_type == 'daily' else 'year')
\ No newline at end of file
+            return queryset.filter(**filters).latest('date' if report_type == 'daily' else 'year')
+
+
+class ActivityReportMembersView(ReportMembersView):
+    """
+    Active users of a village activity report, one page at a time, with
+    their active days in the period for weekly and monthly reports.
+    """
+    MODEL_MAPPING = {
+        report_type: models['village'] for report_type, models in ActivityReportDetailView.MODEL_MAPPING.items()
+    }
+    ALIGNED_FIELDS = {
+        'weekly': ('member_active_days',),
+        'monthly': ('member_active_days',),
+    }
+
+    # Activity reports are not cached
+    def get(self, request, *args, **kwargs):
+        return self.members_response(request)
\ No newline at end of file
@@ -3,7 +3,8 @@ import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from datetime import date
-from activity_reports.models import DailyActivitySummary
+from asgiref.sync import sync_to_async
+from activity_reports.services.activity_store import activity_store
 from users.models import Petitioner
 
 logger = logging.getLogger(__name__)
@@ -67,13 +68,10 @@ class ActivityConsumer(AsyncWebsocketConsumer):
         petitioners_count = 0
         
         try:
-            summary = await DailyActivitySummary.objects.aget(date=today)
-            active_count = len(summary.active_users)
+            active_count = await sync_to_async(activity_store.count)(today)
             logger.info(f"Initial active users count: {active_count}")
-        except DailyActivitySummary.DoesNotExist:
-            logger.warning("No daily activity summary found for today")
         except Exception as e:
-            logger.error(f"Error fetching daily summary: {str(e)}")
+            logger.error(f"Error fetching daily activity count: {str(e)}")
         
         try:
             petitioners_count = await Petitioner.objects.acount()
@@ -1,10 +1,12 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta, date
-from ..models import UserMonthlyActivity, DailyActivitySummary
+from ..models import UserMonthlyActivity
+from ..services.activity_calendar import activity_calendar
+from ..services.activity_store import activity_store
+from ..services.circle_activity import circle_activity
 from users.models import Petitioner, AdditionalInfo
 from .serializers import UserStreakStatusSerializer, MarkActiveSerializer, ActivityHistorySerializer
 from django.db import transaction
@@ -36,7 +38,6 @@ class CheckActivityView(APIView):
             today = timezone.localdate()
 
         yesterday = today - timedelta(days=1)
-        start_date = today - timedelta(days=self.MAX_STREAK_DAYS)
 
         try:
             user = Petitioner.objects.get(id=user_id)
@@ -54,44 +55,13 @@ class CheckActivityView(APIView):
         except Petitioner.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Build date range
-        date_range = [today - timedelta(days=i) for i in range(self.MAX_STREAK_DAYS + 1)]
+        user_calendar = activity_calendar.calendar(
+            user.id, today - timedelta(days=self.MAX_STREAK_DAYS), today
+        )
 
-        # Identify relevant months
-        months_set = {(d.year, d.month) for d in date_range}
-
-        # Build query
-        queries = Q()
-        for year, month in months_set:
-            queries |= Q(year=year, month=month)
-
-        monthly_activities = UserMonthlyActivity.objects.filter(user=user).filter(queries)
-
-        # Lookup dictionary
-        activity_dict = {
-            (activity.year, activity.month): set(activity.active_days)
-            for activity in monthly_activities
-        }
-
-        # Activity checker
-        def is_active(target_date):
-            key = (target_date.year, target_date.month)
-            return key in activity_dict and target_date.day in activity_dict[key]
-
-        is_active_today = is_active(today)
-        was_active_yesterday = is_active(yesterday)
-
-        # Streak logic
-        streak_count = 0
-        if is_active_today:
-            streak_count = 1
-            current_date = yesterday
-            while streak_count < self.MAX_STREAK_DAYS and current_date >= start_date:
-                if is_active(current_date):
-                    streak_count += 1
-                    current_date -= timedelta(days=1)
-                else:
-                    break
+        is_active_today = user_calendar.is_active(today)
+        was_active_yesterday = user_calendar.is_active(yesterday)
+        streak_count = user_calendar.streak(today, limit=self.MAX_STREAK_DAYS)
 
         serializer = UserStreakStatusSerializer(data={
             'is_active_today': is_active_today,
@@ -129,41 +99,7 @@ class ActivityHistoryView(APIView):
 
         end_date = timezone.localdate()
         start_date = end_date - timedelta(days=self.HISTORY_DAYS - 1)
-        
-        # Get all months in the date range
-        months_set = set()
-        current_date = start_date
-        while current_date <= end_date:
-            months_set.add((current_date.year, current_date.month))
-            current_date += timedelta(days=1)
-        
-        # Build query for these months
-        queries = Q()
-        for year, month in months_set:
-            queries |= Q(year=year, month=month)
-        
-        monthly_activities = UserMonthlyActivity.objects.filter(user=user).filter(queries)
-        
-        # Create a dictionary of active dates
-        active_dates = set()
-        for activity in monthly_activities:
-            for day in activity.active_days:
-                try:
-                    active_date = date(activity.year, activity.month, day)
-                    if start_date <= active_date <= end_date:
-                        active_dates.add(active_date)
-                except ValueError:
-                    continue  # Skip invalid dates
-        
-        # Build history data
-        history_data = []
-        current_date = start_date
-        while current_date <= end_date:
-            history_data.append({
-                'date': current_date,
-                'active': current_date in active_dates
-            })
-            current_date += timedelta(days=1)
+        history_data = activity_calendar.calendar(user.id, start_date, end_date).history(end_date, self.HISTORY_DAYS)
         
         # Return as object with history property
         return Response({'history': history_data})
@@ -213,15 +149,11 @@ class MarkActiveView(APIView):
                 monthly.active_days.append(date_obj.day)
                 monthly.save()
             
-            # Update daily summary
-            daily, created = DailyActivitySummary.objects.get_or_create(
-                date=date_obj,
-                defaults={'active_users': [user.id]}
-            )
-            
-            if not created and user.id not in daily.active_users:
-                daily.active_users.append(user.id)
-                daily.save()
+            # Record daily activity (own row, no lock on the day's summary);
+            # the Redis day set is only updated once this commits
+            newly_active = activity_store.record_ids([user.id], date_obj)
+            # Push the new streak to the user's online circle once it is stored
+            transaction.on_commit(lambda: circle_activity.publish(newly_active, date_obj))
             
             # Update AdditionalInfo active days and check milestones
             was_updated = additional_info.update_active_days(date_obj)
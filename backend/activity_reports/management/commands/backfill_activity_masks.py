@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from activity_reports.models import UserMonthlyActivity
+
+
+class Command(BaseCommand):
+    help = ('Recomputes UserMonthlyActivity.active_mask from the active_days arrays. '
+            'Run once after adding the column, or to repair it.')
+
+    def handle(self, *args, **options):
+        table = connection.ops.quote_name(UserMonthlyActivity._meta.db_table)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} a
+                SET active_mask = m.mask
+                FROM (
+                    SELECT u.id, COALESCE(bit_or(1 << (d - 1)) FILTER (WHERE d BETWEEN 1 AND 31), 0) AS mask
+                    FROM {table} u
+                    LEFT JOIN LATERAL unnest(u.active_days) AS d ON true
+                    GROUP BY u.id
+                ) m
+                WHERE m.id = a.id AND a.active_mask <> m.mask
+                """
+            )
+            self.stdout.write(f"UserMonthlyActivity: active_mask corrected on {cursor.rowcount} rows")
+
+        self.stdout.write(self.style.SUCCESS('Activity masks backfilled successfully!'))
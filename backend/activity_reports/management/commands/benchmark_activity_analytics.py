@@ -0,0 +1,108 @@
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from activity_reports.services.activity_matrix import GEO_LEVELS, ActivityMatrix
+
+
+class Command(BaseCommand):
+    help = ('Benchmark of the activity report statistics for synthetic users: the per-user dict '
+            'aggregation of the report commands against ActivityMatrix. Runs in memory, no database needed.')
+
+    # Users per geographic unit, from village up to country
+    FAN_OUT = [50, 100, 20, 30, 50]
+    ACTIVITY_BUCKETS = [1, 5, 10, 15, 20, 25, 30]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000, help='Synthetic users')
+        parser.add_argument('--days', type=int, default=30, help='Days in the period')
+        # Same activity model as populate_activity_data
+        parser.add_argument('--probability', type=float, default=0.4,
+                            help='Probability of a user being active on any given day (default: 0.4)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--skip-legacy', action='store_true', help='Only time ActivityMatrix')
+
+    def handle(self, *args, **options):
+        users, days = options['users'], options['days']
+        rng = np.random.default_rng(options['seed'])
+        start_date = date.today().replace(day=1) - timedelta(days=days)
+
+        self.stdout.write(f"Generating {users} synthetic users over {days} days (p={options['probability']})...")
+        active = rng.random((users, days)) < options['probability']
+        user_rows, day_index = np.nonzero(active)
+        user_ids = user_rows.astype(np.int64) + 1
+        geography = self.synthetic_geography(np.arange(1, users + 1))
+        summaries = {
+            start_date + timedelta(days=day): user_ids[day_index == day].tolist()
+            for day in range(days)
+        }
+        self.stdout.write(f"   {len(user_ids)} (user, day) activity pairs")
+
+        started = time.perf_counter()
+        matrix = ActivityMatrix.from_pairs(start_date, days, user_ids, day_index)
+        matrix.geography = {level: geography[level][matrix.user_ids - 1] for level in GEO_LEVELS}
+        load_seconds = time.perf_counter() - started
+        vectorised = {}
+        started = time.perf_counter()
+        daily_counts = matrix.daily_counts()
+        for level in GEO_LEVELS:
+            vectorised[level] = matrix.report_info(level, self.ACTIVITY_BUCKETS)
+        matrix_seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"ActivityMatrix:  build {load_seconds:.2f}s, statistics of {len(GEO_LEVELS)} levels {matrix_seconds:.2f}s "
+            f"({sum(daily_counts.values())} daily actives, {len(vectorised['village_id'])} villages)"
+        )
+
+        if not options['skip_legacy']:
+            started = time.perf_counter()
+            legacy = self.legacy_distributions(summaries, geography)
+            legacy_seconds = time.perf_counter() - started
+            self.stdout.write(
+                f"Per-user dicts:  activity distributions of {len(GEO_LEVELS)} levels {legacy_seconds:.2f}s "
+                f"({legacy_seconds / max(load_seconds + matrix_seconds, 1e-9):.1f}x the matrix)"
+            )
+            for level in GEO_LEVELS:
+                mismatched = sum(
+                    1 for geo_id, distribution in legacy[level].items()
+                    if vectorised[level][geo_id]['activity_distribution'] != distribution
+                )
+                if mismatched:
+                    self.stdout.write(self.style.ERROR(f"   {level}: {mismatched} distributions differ"))
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished"))
+
+    def synthetic_geography(self, user_ids):
+        """Nested synthetic geography: FAN_OUT users per village, villages per subdistrict, ..."""
+        geography = {}
+        units = user_ids - 1
+        for level, fan_out in zip(GEO_LEVELS, self.FAN_OUT):
+            units = units // fan_out
+            geography[level] = units + 1
+        return geography
+
+    def legacy_distributions(self, summaries, geography):
+        """What the report commands did: count per user in a dict, then group and bucket per level"""
+        user_activity = defaultdict(int)
+        for active_users in summaries.values():
+            for uid in active_users:
+                user_activity[uid] += 1
+
+        result = {}
+        for level in GEO_LEVELS:
+            geo_of = geography[level]
+            level_users = defaultdict(lambda: defaultdict(int))
+            for user_id, freq in user_activity.items():
+                level_users[int(geo_of[user_id - 1])][user_id] = freq
+            distributions = {}
+            for geo_id, frequencies in level_users.items():
+                distribution = {str(bucket): 0 for bucket in self.ACTIVITY_BUCKETS}
+                for freq in frequencies.values():
+                    for bucket in self.ACTIVITY_BUCKETS:
+                        if freq >= bucket:
+                            distribution[str(bucket)] += 1
+                distributions[geo_id] = distribution
+            result[level] = distributions
+        return result
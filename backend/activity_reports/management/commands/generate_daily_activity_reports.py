@@ -14,6 +14,9 @@ from activity_reports.models import (
     DailyActivitySummary
 )
 from users.models import Petitioner
+from reports.services.report_writer import ReportWriter, link_parents
+from reports.services.report_members import report_members
+from activity_reports.services.activity_store import activity_store
 from collections import defaultdict
 from django.db.models import Prefetch
 
@@ -70,6 +73,9 @@ class Command(BaseCommand):
 
             day_start_time = time.time()
             
+            # Fold any per-user activity rows not yet compacted into the summary
+            activity_store.compact(current_date)
+
             try:
                 daily_summary = DailyActivitySummary.objects.get(date=current_date)
             except DailyActivitySummary.DoesNotExist:
@@ -91,7 +97,7 @@ class Command(BaseCommand):
                     'village__subdistrict__district__state',
                     'village__subdistrict__district__state__country'
                 ).only(
-                    'id', 'first_name', 'last_name', 'gender', 'age',
+                    'id',
                     'village_id', 'village__subdistrict_id',
                     'village__subdistrict__district_id',
                     'village__subdistrict__district__state_id',
@@ -214,41 +220,24 @@ class Command(BaseCommand):
 
         # Create reports with bulk operations
         report_start = time.time()
-        reports_to_create = []
-        village_reports = {}
+        writer = ReportWriter(
+            DailyVillageActivityReport, 'village_id', {'date': report_date}, batch_size=self.batch_size
+        )
 
         for village_id, users in village_users.items():
-            user_data = {}
-            for user in users:
-                user_data[str(user.id)] = {
-                    "id": str(user.id),
-                    "name": f"{user.first_name} {user.last_name}",
-                    "gender": user.get_gender_display(),
-                    "age": user.age
-                }
-
-            report = DailyVillageActivityReport(
-                village_id=village_id,
+            writer.add(
+                village_id,
                 active_users=len(users),
-                user_data=user_data,
-                date=report_date
+                member_ids=report_members.pack(user.id for user in users)
             )
-            reports_to_create.append(report)
-            village_reports[village_id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = DailyVillageActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            # Update the dictionary with actual objects (with IDs)
-            for report in created_reports:
-                village_reports[report.village_id] = report
+        # Bulk upsert
+        village_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} village reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(village_reports)} village reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed village level in {total_time:.2f}s")
 
         # Store the subdistrict mapping for parent ID updates
@@ -278,7 +267,10 @@ class Command(BaseCommand):
         ).prefetch_related(
             Prefetch('village_set', 
                     queryset=Village.objects.filter(id__in=village_ids).only('id', 'name'),
-                    to_attr='active_villages')
+                    to_attr='active_villages'),
+            Prefetch('village_set',
+                    queryset=Village.objects.only('id', 'name', 'subdistrict_id'),
+                    to_attr='all_villages')
         ).only('id', 'name', 'district_id')
         
         subdistrict_name_map = {s.id: s.name for s in subdistricts}
@@ -289,17 +281,16 @@ class Command(BaseCommand):
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        subdistrict_reports = {}
+        writer = ReportWriter(
+            DailySubdistrictActivityReport, 'subdistrict_id', {'date': report_date}, batch_size=self.batch_size
+        )
 
         for subdistrict in subdistricts:
             village_data = {}
             total_active_users = 0
             
             # Include ALL villages in this subdistrict (active and inactive)
-            all_villages = Village.objects.filter(
-                subdistrict_id=subdistrict.id
-            ).only('id', 'name')
+            all_villages = subdistrict.all_villages
             
             for village in all_villages:
                 village_report = village_reports.get(village.id)
@@ -313,27 +304,19 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                report = DailySubdistrictActivityReport(
-                    subdistrict_id=subdistrict.id,
+                writer.add(
+                    subdistrict.id,
                     active_users=total_active_users,
-                    village_data=village_data,
-                    date=report_date
+                    village_data=village_data
                 )
-                reports_to_create.append(report)
-                subdistrict_reports[subdistrict.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = DailySubdistrictActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                subdistrict_reports[report.subdistrict_id] = report
+        # Bulk upsert
+        subdistrict_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} subdistrict reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(subdistrict_reports)} subdistrict reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed subdistrict level in {total_time:.2f}s")
 
         # Store district mapping for parent ID updates
@@ -374,8 +357,9 @@ class Command(BaseCommand):
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        district_reports = {}
+        writer = ReportWriter(
+            DailyDistrictActivityReport, 'district_id', {'date': report_date}, batch_size=self.batch_size
+        )
 
         for district in districts:
             subdistrict_data = {}
@@ -393,27 +377,19 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                report = DailyDistrictActivityReport(
-                    district_id=district.id,
+                writer.add(
+                    district.id,
                     active_users=total_active_users,
-                    subdistrict_data=subdistrict_data,
-                    date=report_date
+                    subdistrict_data=subdistrict_data
                 )
-                reports_to_create.append(report)
-                district_reports[district.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = DailyDistrictActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                district_reports[report.district_id] = report
+        # Bulk upsert
+        district_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} district reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(district_reports)} district reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed district level in {total_time:.2f}s")
 
         # Store state mapping for parent ID updates
@@ -454,8 +430,9 @@ class Command(BaseCommand):
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        state_reports = {}
+        writer = ReportWriter(
+            DailyStateActivityReport, 'state_id', {'date': report_date}, batch_size=self.batch_size
+        )
 
         for state in states:
             district_data = {}
@@ -473,27 +450,19 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                report = DailyStateActivityReport(
-                    state_id=state.id,
+                writer.add(
+                    state.id,
                     active_users=total_active_users,
-                    district_data=district_data,
-                    date=report_date
+                    district_data=district_data
                 )
-                reports_to_create.append(report)
-                state_reports[state.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = DailyStateActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                state_reports[report.state_id] = report
+        # Bulk upsert
+        state_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} state reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(state_reports)} state reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed state level in {total_time:.2f}s")
 
         # Store country mapping for parent ID updates
@@ -531,8 +500,9 @@ class Command(BaseCommand):
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        country_reports = {}
+        writer = ReportWriter(
+            DailyCountryActivityReport, 'country_id', {'date': report_date}, batch_size=self.batch_size
+        )
 
         for country in countries:
             state_data = {}
@@ -550,27 +520,19 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                report = DailyCountryActivityReport(
-                    country_id=country.id,
+                writer.add(
+                    country.id,
                     active_users=total_active_users,
-                    state_data=state_data,
-                    date=report_date
+                    state_data=state_data
                 )
-                reports_to_create.append(report)
-                country_reports[country.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = DailyCountryActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                country_reports[report.country_id] = report
+        # Bulk upsert
+        country_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} country reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(country_reports)} country reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed country level in {total_time:.2f}s")
         
         return country_reports
@@ -581,61 +543,15 @@ class Command(BaseCommand):
         start_time = time.time()
         total_updated = 0
 
-        # Update village -> subdistrict parent IDs
-        villages_to_update = []
-        for village_id, report in village_reports.items():
-            subdistrict_id = self.village_subdistrict_map.get(village_id)
-            if subdistrict_id and subdistrict_id in subdistrict_reports:
-                report.parent_id = subdistrict_reports[subdistrict_id].id
-                villages_to_update.append(report)
-                total_updated += 1
-        
-        if villages_to_update:
-            DailyVillageActivityReport.objects.bulk_update(
-                villages_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update subdistrict -> district parent IDs
-        subdistricts_to_update = []
-        for subdistrict_id, report in subdistrict_reports.items():
-            district_id = self.subdistrict_district_map.get(subdistrict_id)
-            if district_id and district_id in district_reports:
-                report.parent_id = district_reports[district_id].id
-                subdistricts_to_update.append(report)
-                total_updated += 1
-        
-        if subdistricts_to_update:
-            DailySubdistrictActivityReport.objects.bulk_update(
-                subdistricts_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update district -> state parent IDs
-        districts_to_update = []
-        for district_id, report in district_reports.items():
-            state_id = self.district_state_map.get(district_id)
-            if state_id and state_id in state_reports:
-                report.parent_id = state_reports[state_id].id
-                districts_to_update.append(report)
-                total_updated += 1
-        
-        if districts_to_update:
-            DailyDistrictActivityReport.objects.bulk_update(
-                districts_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update state -> country parent IDs
-        states_to_update = []
-        for state_id, report in state_reports.items():
-            country_id = self.state_country_map.get(state_id)
-            if country_id and country_id in country_reports:
-                report.parent_id = country_reports[country_id].id
-                states_to_update.append(report)
-                total_updated += 1
-        
-        if states_to_update:
-            DailyStateActivityReport.objects.bulk_update(
-                states_to_update, ['parent_id'], batch_size=self.batch_size
-            )
+        # One UPDATE per level: child -> parent report
+        levels = [
+            (DailyVillageActivityReport, village_reports, subdistrict_reports, self.village_subdistrict_map),
+            (DailySubdistrictActivityReport, subdistrict_reports, district_reports, self.subdistrict_district_map),
+            (DailyDistrictActivityReport, district_reports, state_reports, self.district_state_map),
+            (DailyStateActivityReport, state_reports, country_reports, self.state_country_map),
+        ]
+        for model, child_reports, parent_reports, parent_of in levels:
+            total_updated += link_parents(model, child_reports, parent_reports, parent_of)
 
         total_time = time.time() - start_time
         self.stdout.write(f"   ✅ Updated {total_updated} parent IDs in {total_time:.2f}s")
\ No newline at end of file
@@ -14,6 +14,9 @@ from activity_reports.models import (
     MonthlyCountryActivityReport
 )
 from users.models import Petitioner
+from reports.services.report_writer import ReportWriter, link_parents
+from reports.services.report_members import report_members
+from activity_reports.services.activity_matrix import ActivityMatrix
 from django.db.models import Prefetch
 
 
@@ -90,7 +93,7 @@ class Command(BaseCommand):
 
                 # Get active users for the month
                 active_users_start = time.time()
-                active_user_ids = list(monthly_activity.keys())
+                active_user_ids = monthly_activity.user_ids.tolist()
                 active_users = Petitioner.objects.filter(
                     id__in=active_user_ids
                 ).select_related(
@@ -99,7 +102,7 @@ class Command(BaseCommand):
                     'village__subdistrict__district__state',
                     'village__subdistrict__district__state__country'
                 ).only(
-                    'id', 'first_name', 'last_name', 'gender', 'age',
+                    'id',
                     'village_id', 'village__subdistrict_id',
                     'village__subdistrict__district_id',
                     'village__subdistrict__district__state_id',
@@ -217,32 +220,17 @@ class Command(BaseCommand):
         self.stdout.write("   📊 Aggregating monthly activity...")
         start_time = time.time()
         
-        daily_summaries = DailyActivitySummary.objects.filter(
-            date__gte=month_start,
-            date__lte=month_end
-        )
-        
-        if not daily_summaries.exists():
+        # Users x days matrix of the period; every level's statistics are computed on it
+        user_activity = ActivityMatrix.from_summaries(month_start, month_end)
+        if user_activity is None:
             return None
-            
-        user_activity = defaultdict(int)
-        for summary in daily_summaries:
-            for uid in summary.active_users:
-                user_activity[uid] += 1
+        user_activity.load_geography()
 
         aggregation_time = time.time() - start_time
         self.stdout.write(f"   📈 Aggregated {len(user_activity)} user activities in {aggregation_time:.2f}s")
         
         return user_activity
 
-    def calculate_activity_distribution(self, frequencies):
-        distribution = {str(bucket): 0 for bucket in self.ACTIVITY_BUCKETS}
-        for freq in frequencies:
-            for bucket in self.ACTIVITY_BUCKETS:
-                if freq >= bucket:
-                    distribution[str(bucket)] += 1
-        return distribution
-
     def create_village_reports(self, month_start, month_end, month, year, monthly_activity, active_users):
         self.stdout.write(f"\n🏠 Processing VILLAGE monthly activity reports...")
         start_time = time.time()
@@ -251,10 +239,12 @@ class Command(BaseCommand):
         grouping_start = time.time()
         village_users = defaultdict(dict)
         village_ids = set()
+        frequencies = monthly_activity.frequencies()
+        village_info = monthly_activity.report_info('village_id', self.ACTIVITY_BUCKETS)
         
         for user in active_users:
             if user.village_id:
-                activity_freq = monthly_activity.get(str(user.id), 0)
+                activity_freq = frequencies.get(user.id, 0)
                 village_users[user.village_id][user.id] = activity_freq
                 village_ids.add(user.village_id)
         
@@ -278,49 +268,30 @@ class Command(BaseCommand):
 
         # Create reports with bulk operations
         report_start = time.time()
-        reports_to_create = []
-        village_reports = {}
+        writer = ReportWriter(
+            MonthlyVillageActivityReport, 'village_id', {'month': month, 'year': year}, batch_size=self.batch_size
+        )
 
         for village_id, users in village_users.items():
-            # Calculate activity distribution
-            distribution = self.calculate_activity_distribution(users.values())
-
-            # Prepare user data
-            user_data = {}
-            for user_id, freq in users.items():
-                user = next((u for u in active_users if u.id == user_id), None)
-                if user:
-                    user_data[str(user_id)] = {
-                        "id": str(user_id),
-                        "name": f"{user.first_name} {user.last_name}",
-                        "active_days": freq
-                    }
-
-            report = MonthlyVillageActivityReport(
-                village_id=village_id,
+            # Members and their active days as aligned arrays
+            member_ids = report_members.pack(users)
+
+            writer.add(
+                village_id,
                 active_users=len(users),
-                month=month,
-                year=year,
                 last_date=month_end,
-                user_data=user_data,
-                additional_info={"activity_distribution": distribution}
+                member_ids=member_ids,
+                member_active_days=[users[user_id] for user_id in member_ids],
+                additional_info=village_info.get(village_id) or monthly_activity.empty_info(self.ACTIVITY_BUCKETS)
             )
-            reports_to_create.append(report)
-            village_reports[village_id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = MonthlyVillageActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            # Update the dictionary with actual objects (with IDs)
-            for report in created_reports:
-                village_reports[report.village_id] = report
+        # Bulk upsert
+        village_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} village reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(village_reports)} village reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed village level in {total_time:.2f}s")
 
         # Store the subdistrict mapping for parent ID updates
@@ -350,7 +321,10 @@ class Command(BaseCommand):
         ).prefetch_related(
             Prefetch('village_set', 
                     queryset=Village.objects.filter(id__in=village_ids).only('id', 'name'),
-                    to_attr='active_villages')
+                    to_attr='active_villages'),
+            Prefetch('village_set',
+                    queryset=Village.objects.only('id', 'name', 'subdistrict_id'),
+                    to_attr='all_villages')
         ).only('id', 'name', 'district_id')
         
         subdistrict_name_map = {s.id: s.name for s in subdistricts}
@@ -361,26 +335,21 @@ class Command(BaseCommand):
 
         # Calculate subdistrict user activity
         subdistrict_users_start = time.time()
-        subdistrict_users = defaultdict(lambda: defaultdict(int))
-        for user_id, freq in monthly_activity.items():
-            user_obj = Petitioner.objects.filter(id=user_id).only('subdistrict_id').first()
-            if user_obj and user_obj.subdistrict_id:
-                subdistrict_users[user_obj.subdistrict_id][user_id] = freq
+        subdistrict_info = monthly_activity.report_info('subdistrict_id', self.ACTIVITY_BUCKETS)
         subdistrict_users_time = time.time() - subdistrict_users_start
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        subdistrict_reports = {}
+        writer = ReportWriter(
+            MonthlySubdistrictActivityReport, 'subdistrict_id', {'month': month, 'year': year}, batch_size=self.batch_size
+        )
 
         for subdistrict in subdistricts:
             village_data = {}
             total_active_users = 0
             
             # Include ALL villages in this subdistrict (active and inactive)
-            all_villages = Village.objects.filter(
-                subdistrict_id=subdistrict.id
-            ).only('id', 'name')
+            all_villages = subdistrict.all_villages
             
             for village in all_villages:
                 village_report = village_reports.get(village.id)
@@ -394,35 +363,21 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                # Calculate activity distribution for this subdistrict
-                distribution = self.calculate_activity_distribution(
-                    subdistrict_users.get(subdistrict.id, {}).values()
-                )
-
-                report = MonthlySubdistrictActivityReport(
-                    subdistrict_id=subdistrict.id,
+                writer.add(
+                    subdistrict.id,
                     active_users=total_active_users,
-                    month=month,
-                    year=year,
                     last_date=month_end,
                     village_data=village_data,
-                    additional_info={"activity_distribution": distribution}
+                    additional_info=subdistrict_info.get(subdistrict.id) or monthly_activity.empty_info(self.ACTIVITY_BUCKETS)
                 )
-                reports_to_create.append(report)
-                subdistrict_reports[subdistrict.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = MonthlySubdistrictActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                subdistrict_reports[report.subdistrict_id] = report
+        # Bulk upsert
+        subdistrict_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} subdistrict reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(subdistrict_reports)} subdistrict reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed subdistrict level in {total_time:.2f}s")
 
         # Store district mapping for parent ID updates
@@ -463,17 +418,14 @@ class Command(BaseCommand):
 
         # Calculate district user activity
         district_users_start = time.time()
-        district_users = defaultdict(lambda: defaultdict(int))
-        for user_id, freq in monthly_activity.items():
-            user_obj = Petitioner.objects.filter(id=user_id).only('district_id').first()
-            if user_obj and user_obj.district_id:
-                district_users[user_obj.district_id][user_id] = freq
+        district_info = monthly_activity.report_info('district_id', self.ACTIVITY_BUCKETS)
         district_users_time = time.time() - district_users_start
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        district_reports = {}
+        writer = ReportWriter(
+            MonthlyDistrictActivityReport, 'district_id', {'month': month, 'year': year}, batch_size=self.batch_size
+        )
 
         for district in districts:
             subdistrict_data = {}
@@ -491,35 +443,21 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                # Calculate activity distribution for this district
-                distribution = self.calculate_activity_distribution(
-                    district_users.get(district.id, {}).values()
-                )
-
-                report = MonthlyDistrictActivityReport(
-                    district_id=district.id,
+                writer.add(
+                    district.id,
                     active_users=total_active_users,
-                    month=month,
-                    year=year,
                     last_date=month_end,
                     subdistrict_data=subdistrict_data,
-                    additional_info={"activity_distribution": distribution}
+                    additional_info=district_info.get(district.id) or monthly_activity.empty_info(self.ACTIVITY_BUCKETS)
                 )
-                reports_to_create.append(report)
-                district_reports[district.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = MonthlyDistrictActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                district_reports[report.district_id] = report
+        # Bulk upsert
+        district_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} district reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(district_reports)} district reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed district level in {total_time:.2f}s")
 
         # Store state mapping for parent ID updates
@@ -560,17 +498,14 @@ class Command(BaseCommand):
 
         # Calculate state user activity
         state_users_start = time.time()
-        state_users = defaultdict(lambda: defaultdict(int))
-        for user_id, freq in monthly_activity.items():
-            user_obj = Petitioner.objects.filter(id=user_id).only('state_id').first()
-            if user_obj and user_obj.state_id:
-                state_users[user_obj.state_id][user_id] = freq
+        state_info = monthly_activity.report_info('state_id', self.ACTIVITY_BUCKETS)
         state_users_time = time.time() - state_users_start
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        state_reports = {}
+        writer = ReportWriter(
+            MonthlyStateActivityReport, 'state_id', {'month': month, 'year': year}, batch_size=self.batch_size
+        )
 
         for state in states:
             district_data = {}
@@ -588,35 +523,21 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                # Calculate activity distribution for this state
-                distribution = self.calculate_activity_distribution(
-                    state_users.get(state.id, {}).values()
-                )
-
-                report = MonthlyStateActivityReport(
-                    state_id=state.id,
+                writer.add(
+                    state.id,
                     active_users=total_active_users,
-                    month=month,
-                    year=year,
                     last_date=month_end,
                     district_data=district_data,
-                    additional_info={"activity_distribution": distribution}
+                    additional_info=state_info.get(state.id) or monthly_activity.empty_info(self.ACTIVITY_BUCKETS)
                 )
-                reports_to_create.append(report)
-                state_reports[state.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = MonthlyStateActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                state_reports[report.state_id] = report
+        # Bulk upsert
+        state_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} state reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(state_reports)} state reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed state level in {total_time:.2f}s")
 
         # Store country mapping for parent ID updates
@@ -654,17 +575,14 @@ class Command(BaseCommand):
 
         # Calculate country user activity
         country_users_start = time.time()
-        country_users = defaultdict(lambda: defaultdict(int))
-        for user_id, freq in monthly_activity.items():
-            user_obj = Petitioner.objects.filter(id=user_id).only('country_id').first()
-            if user_obj and user_obj.country_id:
-                country_users[user_obj.country_id][user_id] = freq
+        country_info = monthly_activity.report_info('country_id', self.ACTIVITY_BUCKETS)
         country_users_time = time.time() - country_users_start
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        country_reports = {}
+        writer = ReportWriter(
+            MonthlyCountryActivityReport, 'country_id', {'month': month, 'year': year}, batch_size=self.batch_size
+        )
 
         for country in countries:
             state_data = {}
@@ -682,35 +600,21 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                # Calculate activity distribution for this country
-                distribution = self.calculate_activity_distribution(
-                    country_users.get(country.id, {}).values()
-                )
-
-                report = MonthlyCountryActivityReport(
-                    country_id=country.id,
+                writer.add(
+                    country.id,
                     active_users=total_active_users,
-                    month=month,
-                    year=year,
                     last_date=month_end,
                     state_data=state_data,
-                    additional_info={"activity_distribution": distribution}
+                    additional_info=country_info.get(country.id) or monthly_activity.empty_info(self.ACTIVITY_BUCKETS)
                 )
-                reports_to_create.append(report)
-                country_reports[country.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = MonthlyCountryActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                country_reports[report.country_id] = report
+        # Bulk upsert
+        country_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} country reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(country_reports)} country reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed country level in {total_time:.2f}s")
         
         return country_reports
@@ -721,61 +625,15 @@ class Command(BaseCommand):
         start_time = time.time()
         total_updated = 0
 
-        # Update village -> subdistrict parent IDs
-        villages_to_update = []
-        for village_id, report in village_reports.items():
-            subdistrict_id = self.village_subdistrict_map.get(village_id)
-            if subdistrict_id and subdistrict_id in subdistrict_reports:
-                report.parent_id = subdistrict_reports[subdistrict_id].id
-                villages_to_update.append(report)
-                total_updated += 1
-        
-        if villages_to_update:
-            MonthlyVillageActivityReport.objects.bulk_update(
-                villages_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update subdistrict -> district parent IDs
-        subdistricts_to_update = []
-        for subdistrict_id, report in subdistrict_reports.items():
-            district_id = self.subdistrict_district_map.get(subdistrict_id)
-            if district_id and district_id in district_reports:
-                report.parent_id = district_reports[district_id].id
-                subdistricts_to_update.append(report)
-                total_updated += 1
-        
-        if subdistricts_to_update:
-            MonthlySubdistrictActivityReport.objects.bulk_update(
-                subdistricts_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update district -> state parent IDs
-        districts_to_update = []
-        for district_id, report in district_reports.items():
-            state_id = self.district_state_map.get(district_id)
-            if state_id and state_id in state_reports:
-                report.parent_id = state_reports[state_id].id
-                districts_to_update.append(report)
-                total_updated += 1
-        
-        if districts_to_update:
-            MonthlyDistrictActivityReport.objects.bulk_update(
-                districts_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update state -> country parent IDs
-        states_to_update = []
-        for state_id, report in state_reports.items():
-            country_id = self.state_country_map.get(state_id)
-            if country_id and country_id in country_reports:
-                report.parent_id = country_reports[country_id].id
-                states_to_update.append(report)
-                total_updated += 1
-        
-        if states_to_update:
-            MonthlyStateActivityReport.objects.bulk_update(
-                states_to_update, ['parent_id'], batch_size=self.batch_size
-            )
+        # One UPDATE per level: child -> parent report
+        levels = [
+            (MonthlyVillageActivityReport, village_reports, subdistrict_reports, self.village_subdistrict_map),
+            (MonthlySubdistrictActivityReport, subdistrict_reports, district_reports, self.subdistrict_district_map),
+            (MonthlyDistrictActivityReport, district_reports, state_reports, self.district_state_map),
+            (MonthlyStateActivityReport, state_reports, country_reports, self.state_country_map),
+        ]
+        for model, child_reports, parent_reports, parent_of in levels:
+            total_updated += link_parents(model, child_reports, parent_reports, parent_of)
 
         total_time = time.time() - start_time
         self.stdout.write(f"   ✅ Updated {total_updated} parent IDs in {total_time:.2f}s")
\ No newline at end of file
@@ -13,12 +13,17 @@ from activity_reports.models import (
     WeeklyCountryActivityReport
 )
 from users.models import Petitioner
+from reports.services.report_writer import ReportWriter, link_parents
+from reports.services.report_members import report_members
+from activity_reports.services.activity_matrix import ActivityMatrix
 from django.db.models import Prefetch
 
 
 class Command(BaseCommand):
     help = 'Generates weekly activity reports for all geographic levels'
 
+    ACTIVITY_BUCKETS = [1, 2, 3, 4, 5, 6, 7]
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--start-date',
@@ -84,7 +89,7 @@ class Command(BaseCommand):
 
                 # Get active users for the week
                 active_users_start = time.time()
-                active_user_ids = list(weekly_activity.keys())
+                active_user_ids = weekly_activity.user_ids.tolist()
                 active_users = Petitioner.objects.filter(
                     id__in=active_user_ids
                 ).select_related(
@@ -93,7 +98,7 @@ class Command(BaseCommand):
                     'village__subdistrict__district__state',
                     'village__subdistrict__district__state__country'
                 ).only(
-                    'id', 'first_name', 'last_name', 'gender', 'age',
+                    'id',
                     'village_id', 'village__subdistrict_id',
                     'village__subdistrict__district_id',
                     'village__subdistrict__district__state_id',
@@ -210,18 +215,11 @@ class Command(BaseCommand):
         self.stdout.write("   📊 Aggregating weekly activity...")
         start_time = time.time()
         
-        daily_summaries = DailyActivitySummary.objects.filter(
-            date__gte=week_start,
-            date__lte=week_end
-        )
-        
-        if not daily_summaries.exists():
+        # Users x days matrix of the period; every level's statistics are computed on it
+        user_activity = ActivityMatrix.from_summaries(week_start, week_end)
+        if user_activity is None:
             return None
-            
-        user_activity = defaultdict(int)
-        for summary in daily_summaries:
-            for uid in summary.active_users:
-                user_activity[uid] += 1
+        user_activity.load_geography()
 
         aggregation_time = time.time() - start_time
         self.stdout.write(f"   📈 Aggregated {len(user_activity)} user activities in {aggregation_time:.2f}s")
@@ -236,10 +234,12 @@ class Command(BaseCommand):
         grouping_start = time.time()
         village_users = defaultdict(dict)
         village_ids = set()
+        frequencies = weekly_activity.frequencies()
+        village_info = weekly_activity.report_info('village_id', self.ACTIVITY_BUCKETS)
         
         for user in active_users:
             if user.village_id:
-                activity_freq = weekly_activity.get(str(user.id), 0)
+                activity_freq = frequencies.get(user.id, 0)
                 village_users[user.village_id][user.id] = activity_freq
                 village_ids.add(user.village_id)
         
@@ -263,54 +263,31 @@ class Command(BaseCommand):
 
         # Create reports with bulk operations
         report_start = time.time()
-        reports_to_create = []
-        village_reports = {}
+        writer = ReportWriter(
+            WeeklyVillageActivityReport, 'village_id', {'week_number': week_number, 'year': year}, batch_size=self.batch_size
+        )
 
         for village_id, users in village_users.items():
-            # Calculate activity distribution
-            distribution = {str(i): 0 for i in range(1, 8)}
-            for freq in users.values():
-                freq = min(freq, 7)
-                for day in range(1, freq + 1):
-                    distribution[str(day)] += 1
-
-            # Prepare user data
-            user_data = {}
-            for user_id, freq in users.items():
-                user = next((u for u in active_users if u.id == user_id), None)
-                if user:
-                    user_data[str(user_id)] = {
-                        "id": str(user_id),
-                        "name": f"{user.first_name} {user.last_name}",
-                        "active_days": freq
-                    }
-
-            report = WeeklyVillageActivityReport(
-                village_id=village_id,
+            # Members and their active days as aligned arrays
+            member_ids = report_members.pack(users)
+
+            writer.add(
+                village_id,
                 active_users=len(users),
-                week_number=week_number,
-                year=year,
                 week_start_date=week_start,
                 week_last_date=week_end,
-                user_data=user_data,
-                additional_info={"activity_distribution": distribution}
+                member_ids=member_ids,
+                member_active_days=[users[user_id] for user_id in member_ids],
+                additional_info=village_info.get(village_id) or weekly_activity.empty_info(self.ACTIVITY_BUCKETS)
             )
-            reports_to_create.append(report)
-            village_reports[village_id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = WeeklyVillageActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            # Update the dictionary with actual objects (with IDs)
-            for report in created_reports:
-                village_reports[report.village_id] = report
+        # Bulk upsert
+        village_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} village reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(village_reports)} village reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed village level in {total_time:.2f}s")
 
         # Store the subdistrict mapping for parent ID updates
@@ -340,7 +317,10 @@ class Command(BaseCommand):
         ).prefetch_related(
             Prefetch('village_set', 
                     queryset=Village.objects.filter(id__in=village_ids).only('id', 'name'),
-                    to_attr='active_villages')
+                    to_attr='active_villages'),
+            Prefetch('village_set',
+                    queryset=Village.objects.only('id', 'name', 'subdistrict_id'),
+                    to_attr='all_villages')
         ).only('id', 'name', 'district_id')
         
         subdistrict_name_map = {s.id: s.name for s in subdistricts}
@@ -351,26 +331,21 @@ class Command(BaseCommand):
 
         # Calculate subdistrict user activity
         subdistrict_users_start = time.time()
-        subdistrict_users = defaultdict(lambda: defaultdict(int))
-        for user_id, freq in weekly_activity.items():
-            user_obj = Petitioner.objects.filter(id=user_id).only('subdistrict_id').first()
-            if user_obj and user_obj.subdistrict_id:
-                subdistrict_users[user_obj.subdistrict_id][user_id] = freq
+        subdistrict_info = weekly_activity.report_info('subdistrict_id', self.ACTIVITY_BUCKETS)
         subdistrict_users_time = time.time() - subdistrict_users_start
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        subdistrict_reports = {}
+        writer = ReportWriter(
+            WeeklySubdistrictActivityReport, 'subdistrict_id', {'week_number': week_number, 'year': year}, batch_size=self.batch_size
+        )
 
         for subdistrict in subdistricts:
             village_data = {}
             total_active_users = 0
             
             # Include ALL villages in this subdistrict (active and inactive)
-            all_villages = Village.objects.filter(
-                subdistrict_id=subdistrict.id
-            ).only('id', 'name')
+            all_villages = subdistrict.all_villages
             
             for village in all_villages:
                 village_report = village_reports.get(village.id)
@@ -384,38 +359,22 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                # Calculate activity distribution for this subdistrict
-                distribution = {str(i): 0 for i in range(1, 8)}
-                for freq in subdistrict_users.get(subdistrict.id, {}).values():
-                    freq = min(freq, 7)
-                    for day in range(1, freq + 1):
-                        distribution[str(day)] += 1
-
-                report = WeeklySubdistrictActivityReport(
-                    subdistrict_id=subdistrict.id,
+                writer.add(
+                    subdistrict.id,
                     active_users=total_active_users,
-                    week_number=week_number,
-                    year=year,
                     week_start_date=week_start,
                     week_last_date=week_end,
                     village_data=village_data,
-                    additional_info={"activity_distribution": distribution}
+                    additional_info=subdistrict_info.get(subdistrict.id) or weekly_activity.empty_info(self.ACTIVITY_BUCKETS)
                 )
-                reports_to_create.append(report)
-                subdistrict_reports[subdistrict.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = WeeklySubdistrictActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                subdistrict_reports[report.subdistrict_id] = report
+        # Bulk upsert
+        subdistrict_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} subdistrict reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(subdistrict_reports)} subdistrict reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed subdistrict level in {total_time:.2f}s")
 
         # Store district mapping for parent ID updates
@@ -456,17 +415,14 @@ class Command(BaseCommand):
 
         # Calculate district user activity
         district_users_start = time.time()
-        district_users = defaultdict(lambda: defaultdict(int))
-        for user_id, freq in weekly_activity.items():
-            user_obj = Petitioner.objects.filter(id=user_id).only('district_id').first()
-            if user_obj and user_obj.district_id:
-                district_users[user_obj.district_id][user_id] = freq
+        district_info = weekly_activity.report_info('district_id', self.ACTIVITY_BUCKETS)
         district_users_time = time.time() - district_users_start
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        district_reports = {}
+        writer = ReportWriter(
+            WeeklyDistrictActivityReport, 'district_id', {'week_number': week_number, 'year': year}, batch_size=self.batch_size
+        )
 
         for district in districts:
             subdistrict_data = {}
@@ -484,38 +440,22 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                # Calculate activity distribution for this district
-                distribution = {str(i): 0 for i in range(1, 8)}
-                for freq in district_users.get(district.id, {}).values():
-                    freq = min(freq, 7)
-                    for day in range(1, freq + 1):
-                        distribution[str(day)] += 1
-
-                report = WeeklyDistrictActivityReport(
-                    district_id=district.id,
+                writer.add(
+                    district.id,
                     active_users=total_active_users,
-                    week_number=week_number,
-                    year=year,
                     week_start_date=week_start,
                     week_last_date=week_end,
                     subdistrict_data=subdistrict_data,
-                    additional_info={"activity_distribution": distribution}
+                    additional_info=district_info.get(district.id) or weekly_activity.empty_info(self.ACTIVITY_BUCKETS)
                 )
-                reports_to_create.append(report)
-                district_reports[district.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = WeeklyDistrictActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                district_reports[report.district_id] = report
+        # Bulk upsert
+        district_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} district reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(district_reports)} district reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed district level in {total_time:.2f}s")
 
         # Store state mapping for parent ID updates
@@ -556,17 +496,14 @@ class Command(BaseCommand):
 
         # Calculate state user activity
         state_users_start = time.time()
-        state_users = defaultdict(lambda: defaultdict(int))
-        for user_id, freq in weekly_activity.items():
-            user_obj = Petitioner.objects.filter(id=user_id).only('state_id').first()
-            if user_obj and user_obj.state_id:
-                state_users[user_obj.state_id][user_id] = freq
+        state_info = weekly_activity.report_info('state_id', self.ACTIVITY_BUCKETS)
         state_users_time = time.time() - state_users_start
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        state_reports = {}
+        writer = ReportWriter(
+            WeeklyStateActivityReport, 'state_id', {'week_number': week_number, 'year': year}, batch_size=self.batch_size
+        )
 
         for state in states:
             district_data = {}
@@ -584,38 +521,22 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                # Calculate activity distribution for this state
-                distribution = {str(i): 0 for i in range(1, 8)}
-                for freq in state_users.get(state.id, {}).values():
-                    freq = min(freq, 7)
-                    for day in range(1, freq + 1):
-                        distribution[str(day)] += 1
-
-                report = WeeklyStateActivityReport(
-                    state_id=state.id,
+                writer.add(
+                    state.id,
                     active_users=total_active_users,
-                    week_number=week_number,
-                    year=year,
                     week_start_date=week_start,
                     week_last_date=week_end,
                     district_data=district_data,
-                    additional_info={"activity_distribution": distribution}
+                    additional_info=state_info.get(state.id) or weekly_activity.empty_info(self.ACTIVITY_BUCKETS)
                 )
-                reports_to_create.append(report)
-                state_reports[state.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = WeeklyStateActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                state_reports[report.state_id] = report
+        # Bulk upsert
+        state_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} state reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(state_reports)} state reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed state level in {total_time:.2f}s")
 
         # Store country mapping for parent ID updates
@@ -653,17 +574,14 @@ class Command(BaseCommand):
 
         # Calculate country user activity
         country_users_start = time.time()
-        country_users = defaultdict(lambda: defaultdict(int))
-        for user_id, freq in weekly_activity.items():
-            user_obj = Petitioner.objects.filter(id=user_id).only('country_id').first()
-            if user_obj and user_obj.country_id:
-                country_users[user_obj.country_id][user_id] = freq
+        country_info = weekly_activity.report_info('country_id', self.ACTIVITY_BUCKETS)
         country_users_time = time.time() - country_users_start
 
         # Create reports
         report_start = time.time()
-        reports_to_create = []
-        country_reports = {}
+        writer = ReportWriter(
+            WeeklyCountryActivityReport, 'country_id', {'week_number': week_number, 'year': year}, batch_size=self.batch_size
+        )
 
         for country in countries:
             state_data = {}
@@ -681,38 +599,22 @@ class Command(BaseCommand):
                 total_active_users += active_users
 
             if total_active_users > 0:
-                # Calculate activity distribution for this country
-                distribution = {str(i): 0 for i in range(1, 8)}
-                for freq in country_users.get(country.id, {}).values():
-                    freq = min(freq, 7)
-                    for day in range(1, freq + 1):
-                        distribution[str(day)] += 1
-
-                report = WeeklyCountryActivityReport(
-                    country_id=country.id,
+                writer.add(
+                    country.id,
                     active_users=total_active_users,
-                    week_number=week_number,
-                    year=year,
                     week_start_date=week_start,
                     week_last_date=week_end,
                     state_data=state_data,
-                    additional_info={"activity_distribution": distribution}
+                    additional_info=country_info.get(country.id) or weekly_activity.empty_info(self.ACTIVITY_BUCKETS)
                 )
-                reports_to_create.append(report)
-                country_reports[country.id] = report
 
-        # Bulk create
-        if reports_to_create:
-            created_reports = WeeklyCountryActivityReport.objects.bulk_create(
-                reports_to_create, batch_size=self.batch_size
-            )
-            for report in created_reports:
-                country_reports[report.country_id] = report
+        # Bulk upsert
+        country_reports = writer.save()
 
         report_time = time.time() - report_start
         total_time = time.time() - start_time
         
-        self.stdout.write(f"   💾 Created {len(reports_to_create)} country reports in {report_time:.2f}s")
+        self.stdout.write(f"   💾 Wrote {len(country_reports)} country reports ({writer.created} new, {writer.updated} updated) in {report_time:.2f}s")
         self.stdout.write(f"   ✅ Completed country level in {total_time:.2f}s")
         
         return country_reports
@@ -723,61 +625,15 @@ class Command(BaseCommand):
         start_time = time.time()
         total_updated = 0
 
-        # Update village -> subdistrict parent IDs
-        villages_to_update = []
-        for village_id, report in village_reports.items():
-            subdistrict_id = self.village_subdistrict_map.get(village_id)
-            if subdistrict_id and subdistrict_id in subdistrict_reports:
-                report.parent_id = subdistrict_reports[subdistrict_id].id
-                villages_to_update.append(report)
-                total_updated += 1
-        
-        if villages_to_update:
-            WeeklyVillageActivityReport.objects.bulk_update(
-                villages_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update subdistrict -> district parent IDs
-        subdistricts_to_update = []
-        for subdistrict_id, report in subdistrict_reports.items():
-            district_id = self.subdistrict_district_map.get(subdistrict_id)
-            if district_id and district_id in district_reports:
-                report.parent_id = district_reports[district_id].id
-                subdistricts_to_update.append(report)
-                total_updated += 1
-        
-        if subdistricts_to_update:
-            WeeklySubdistrictActivityReport.objects.bulk_update(
-                subdistricts_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update district -> state parent IDs
-        districts_to_update = []
-        for district_id, report in district_reports.items():
-            state_id = self.district_state_map.get(district_id)
-            if state_id and state_id in state_reports:
-                report.parent_id = state_reports[state_id].id
-                districts_to_update.append(report)
-                total_updated += 1
-        
-        if districts_to_update:
-            WeeklyDistrictActivityReport.objects.bulk_update(
-                districts_to_update, ['parent_id'], batch_size=self.batch_size
-            )
-
-        # Update state -> country parent IDs
-        states_to_update = []
-        for state_id, report in state_reports.items():
-            country_id = self.state_country_map.get(state_id)
-            if country_id and country_id in country_reports:
-                report.parent_id = country_reports[country_id].id
-                states_to_update.append(report)
-                total_updated += 1
-        
-        if states_to_update:
-            WeeklyStateActivityReport.objects.bulk_update(
-                states_to_update, ['parent_id'], batch_size=self.batch_size
-            )
+        # One UPDATE per level: child -> parent report
+        levels = [
+            (WeeklyVillageActivityReport, village_reports, subdistrict_reports, self.village_subdistrict_map),
+            (WeeklySubdistrictActivityReport, subdistrict_reports, district_reports, self.subdistrict_district_map),
+            (WeeklyDistrictActivityReport, district_reports, state_reports, self.district_state_map),
+            (WeeklyStateActivityReport, state_reports, country_reports, self.state_country_map),
+        ]
+        for model, child_reports, parent_reports, parent_of in levels:
+            total_updated += link_parents(model, child_reports, parent_reports, parent_of)
 
         total_time = time.time() - start_time
         self.stdout.write(f"   ✅ Updated {total_updated} parent IDs in {total_time:.2f}s")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from .records import DailyActivitySummary, UserMonthlyActivity
+from .records import DailyActivitySummary, DailyUserActivity, UserMonthlyActivity
 from .reports import (
     DailyVillageActivityReport,
     DailySubdistrictActivityReport,
@@ -24,6 +24,9 @@ class UserMonthlyActivity(models.Model):
         models.PositiveSmallIntegerField(),  # Stores day numbers (1-31)
         default=list
     )
+    # The same days as a bitmask, bit (day - 1) set for each active day;
+    # derived from active_days on save (see ActivityCalendar)
+    active_mask = models.IntegerField(default=0)
     
     class Meta:
         db_table = 'activity_reports"."user_monthly_activity'
@@ -38,6 +41,22 @@ class UserMonthlyActivity(models.Model):
     def __str__(self):
         return f"{self.user} - {self.year}/{self.month}"
 
+    @staticmethod
+    def mask_for(days):
+        """Bitmask of the day numbers ``days``"""
+        mask = 0
+        for day in days or []:
+            if 1 <= day <= 31:
+                mask |= 1 << (day - 1)
+        return mask
+
+    def save(self, *args, **kwargs):
+        self.active_mask = self.mask_for(self.active_days)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'active_days' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'active_mask'}
+        super().save(*args, **kwargs)
+
 class DailyActivitySummary(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     date = models.DateField(unique=True)
@@ -52,6 +71,32 @@ class DailyActivitySummary(models.Model):
     def __str__(self):
         return f"Activity on {self.date}"
 
+class DailyUserActivity(models.Model):
+    """
+    Append-only activity log: one row per user per active day.
+    Heartbeats only ever insert their own row, so writers never contend;
+    DailyActivitySummary is materialised from these rows by the compactor.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    date = models.DateField()
+    user_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'activity_reports"."daily_user_activity'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'user_id'],
+                name='unique_daily_user_activity'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['user_id']),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id} active on {self.date}"
+
 # # Signal to send updates on save
 # @receiver(post_save, sender=DailyActivitySummary)
 # def send_activity_update(sender, instance, **kwargs):
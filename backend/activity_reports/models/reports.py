@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.db.models import JSONField
+from django.contrib.postgres.fields import ArrayField
 from geographies.models.geos import Village, Subdistrict, District, State, Country
 
 # ======================s
@@ -10,7 +11,10 @@ class DailyVillageActivityReport(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     village = models.ForeignKey(Village, on_delete=models.CASCADE)
     active_users = models.PositiveIntegerField(default=0)
-    user_data = JSONField()
+    # Sorted IDs of the active users; names are resolved per page (reports/services/report_members.py)
+    member_ids = ArrayField(models.BigIntegerField(), default=list)
+    # Legacy JSON membership, superseded by member_ids (manage.py pack_report_members)
+    user_data = JSONField(null=True, blank=True, default=None)
     date = models.DateField()
     parent_id = models.UUIDField(null=True, blank=True)
 
@@ -26,7 +30,11 @@ class WeeklyVillageActivityReport(models.Model):
     year = models.PositiveSmallIntegerField()
     week_start_date = models.DateField()
     week_last_date = models.DateField()
-    user_data = JSONField()
+    # Sorted IDs of the active users and, aligned with them, their active days in the period
+    member_ids = ArrayField(models.BigIntegerField(), default=list)
+    member_active_days = ArrayField(models.PositiveSmallIntegerField(), default=list)
+    # Legacy JSON membership, superseded by member_ids (manage.py pack_report_members)
+    user_data = JSONField(null=True, blank=True, default=None)
     parent_id = models.UUIDField(null=True, blank=True)
     additional_info = JSONField(null=True, blank=True)
 
@@ -41,7 +49,11 @@ class MonthlyVillageActivityReport(models.Model):
     month = models.PositiveSmallIntegerField()
     year = models.PositiveSmallIntegerField()
     last_date = models.DateField()
-    user_data = JSONField()
+    # Sorted IDs of the active users and, aligned with them, their active days in the period
+    member_ids = ArrayField(models.BigIntegerField(), default=list)
+    member_active_days = ArrayField(models.PositiveSmallIntegerField(), default=list)
+    # Legacy JSON membership, superseded by member_ids (manage.py pack_report_members)
+    user_data = JSONField(null=True, blank=True, default=None)
     parent_id = models.UUIDField(null=True, blank=True)
     additional_info = JSONField(null=True, blank=True)
 
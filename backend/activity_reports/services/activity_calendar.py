@@ -0,0 +1,96 @@
+import calendar
+import logging
+from datetime import timedelta
+
+from django.db.models import Q
+
+from activity_reports.models import UserMonthlyActivity
+
+logger = logging.getLogger(__name__)
+
+
+def _days_mask(first_day, last_day):
+    """Bits of the days first_day..last_day of a month"""
+    return ((1 << last_day) - 1) & ~((1 << (first_day - 1)) - 1)
+
+
+class UserCalendar:
+    """
+    One user's active days as ``{(year, month): mask}``, bit (day - 1) set
+    for each active day. Range counts are a popcount per month and a streak
+    is the run of trailing ones, so nothing walks day by day.
+    """
+
+    def __init__(self, masks=None):
+        self.masks = masks or {}
+
+    def is_active(self, day):
+        return bool(self.masks.get((day.year, day.month), 0) >> (day.day - 1) & 1)
+
+    def count(self, start_date, end_date):
+        """Active days between the dates (inclusive)"""
+        total = 0
+        current = start_date
+        while current <= end_date:
+            month_end = current.replace(day=calendar.monthrange(current.year, current.month)[1])
+            last = min(end_date, month_end)
+            mask = self.masks.get((current.year, current.month), 0)
+            total += (mask & _days_mask(current.day, last.day)).bit_count()
+            current = last + timedelta(days=1)
+        return total
+
+    def streak(self, day, limit=None):
+        """Consecutive active days ending on ``day`` (0 if inactive that day), at most ``limit``"""
+        streak = 0
+        current = day
+        while limit is None or streak < limit:
+            mask = self.masks.get((current.year, current.month), 0)
+            # Inactive days of the month up to current; the latest one ends the run
+            gaps = ~mask & _days_mask(1, current.day)
+            if gaps:
+                streak += current.day - gaps.bit_length()
+                break
+            streak += current.day
+            current = current.replace(day=1) - timedelta(days=1)
+        return streak if limit is None else min(streak, limit)
+
+    def history(self, end_date, days):
+        """[{'date', 'active'}, ...] for the ``days`` days up to ``end_date``"""
+        start_date = end_date - timedelta(days=days - 1)
+        return [
+            {'date': day, 'active': self.is_active(day)}
+            for day in (start_date + timedelta(days=offset) for offset in range(days))
+        ]
+
+
+class ActivityCalendar:
+    """
+    Bulk reads of UserMonthlyActivity.active_mask: the calendars of any
+    number of users over a date range come from one query, and streaks,
+    range counts and histories are computed on the masks (see UserCalendar).
+    Only months inside the loaded range are known, so load as far back as
+    the longest streak or range asked for.
+    """
+
+    def load(self, user_ids, start_date, end_date):
+        """{user_id: UserCalendar} covering the months from start_date to end_date"""
+        user_ids = {uid for uid in user_ids if uid is not None}
+        calendars = {user_id: UserCalendar() for user_id in user_ids}
+        if not user_ids or start_date > end_date:
+            return calendars
+
+        rows = UserMonthlyActivity.objects.filter(
+            Q(year__gt=start_date.year) | Q(year=start_date.year, month__gte=start_date.month),
+            Q(year__lt=end_date.year) | Q(year=end_date.year, month__lte=end_date.month),
+            user_id__in=user_ids,
+        ).values_list('user_id', 'year', 'month', 'active_mask')
+        for user_id, year, month, mask in rows:
+            masks = calendars[user_id].masks
+            masks[(year, month)] = masks.get((year, month), 0) | mask
+        return calendars
+
+    def calendar(self, user_id, start_date, end_date):
+        return self.load([user_id], start_date, end_date)[user_id]
+
+
+activity_calendar = ActivityCalendar()
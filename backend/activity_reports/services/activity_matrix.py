@@ -0,0 +1,168 @@
+import logging
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from activity_reports.models import DailyActivitySummary
+from users.models import Petitioner
+
+logger = logging.getLogger(__name__)
+
+GEO_LEVELS = ('village_id', 'subdistrict_id', 'district_id', 'state_id', 'country_id')
+
+
+class ActivityMatrix:
+    """
+    Activity of a period (a week, a month) as a users × days boolean NumPy
+    matrix, for the report generators.
+
+    Every statistic is computed for all users at once: active days per user
+    are a row sum, daily counts a column sum, longest streaks one vectorised
+    pass per day, and per-geography rollups are bincounts over the users'
+    geography columns (``load_geography``, one query per batch of users
+    instead of one per level). Geography IDs of 0 mean unknown.
+    """
+
+    def __init__(self, start_date, user_ids, active):
+        self.start_date = start_date
+        self.user_ids = user_ids
+        self.active = active
+        self.geography = {}
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    @property
+    def days(self):
+        return self.active.shape[1]
+
+    @classmethod
+    def from_summaries(cls, start_date, end_date):
+        """Matrix of the DailyActivitySummary rows between the dates, or None if there are none"""
+        user_chunks, day_chunks = [], []
+        for day, active_users in DailyActivitySummary.objects.filter(
+            date__gte=start_date, date__lte=end_date
+        ).values_list('date', 'active_users'):
+            if active_users:
+                user_chunks.append(np.asarray(active_users, dtype=np.int64))
+                day_chunks.append(np.full(len(active_users), (day - start_date).days, dtype=np.int32))
+        if not user_chunks:
+            return None
+        return cls.from_pairs(
+            start_date, (end_date - start_date).days + 1,
+            np.concatenate(user_chunks), np.concatenate(day_chunks)
+        )
+
+    @classmethod
+    def from_pairs(cls, start_date, days, user_ids, day_index):
+        """Matrix from parallel arrays of (user ID, day offset) activity pairs"""
+        ids, rows = np.unique(user_ids, return_inverse=True)
+        active = np.zeros((len(ids), days), dtype=bool)
+        active[rows, day_index] = True
+        return cls(start_date, ids, active)
+
+    # -----------------------------
+    # Per-user and per-day statistics
+    # -----------------------------
+
+    def active_days(self):
+        """Active days of each user in the period"""
+        return self.active.sum(axis=1)
+
+    def daily_counts(self):
+        """{date: active users}"""
+        return {
+            self.start_date + timedelta(days=offset): int(count)
+            for offset, count in enumerate(self.active.sum(axis=0))
+        }
+
+    def longest_streaks(self):
+        """Longest run of consecutive active days of each user in the period"""
+        run = np.zeros(len(self.user_ids), dtype=np.int32)
+        longest = np.zeros(len(self.user_ids), dtype=np.int32)
+        for day in range(self.days):
+            run = (run + 1) * self.active[:, day]
+            np.maximum(longest, run, out=longest)
+        return longest
+
+    def frequencies(self):
+        """{user_id: active days}"""
+        return dict(zip(self.user_ids.tolist(), self.active_days().tolist()))
+
+    # -----------------------------
+    # Geography rollups
+    # -----------------------------
+
+    def load_geography(self, batch_size=50000):
+        """Load the users' geography columns, aligned with ``user_ids``"""
+        frames = []
+        for start in range(0, len(self.user_ids), batch_size):
+            batch = self.user_ids[start:start + batch_size].tolist()
+            frames.append(pd.DataFrame.from_records(
+                Petitioner.objects.filter(id__in=batch).values_list('id', *GEO_LEVELS),
+                columns=['id', *GEO_LEVELS]
+            ))
+        geography = pd.concat(frames).set_index('id') if frames else pd.DataFrame(columns=GEO_LEVELS)
+        geography = geography.reindex(self.user_ids).fillna(0).astype(np.int64)
+        self.geography = {level: geography[level].to_numpy() for level in GEO_LEVELS}
+        return self
+
+    def distribution_by(self, level, thresholds, values=None):
+        """{geo_id: {str(threshold): users with a value >= threshold}}, values defaulting to active days"""
+        values = self.active_days() if values is None else values
+        columns = np.column_stack([values >= threshold for threshold in thresholds])
+        keys = [str(threshold) for threshold in thresholds]
+        return {
+            geo_id: dict(zip(keys, counts))
+            for geo_id, counts in self._sum_by(self.geography[level], columns)
+        }
+
+    def retention_by(self, level):
+        """
+        {geo_id: {'cohort', 'active'}}: of the users active on the period's
+        first day, how many were active on each day of the period
+        """
+        cohort = self.active[:, 0]
+        return {
+            geo_id: {'cohort': counts[0], 'active': counts}
+            for geo_id, counts in self._sum_by(self.geography[level][cohort], self.active[cohort])
+        }
+
+    @staticmethod
+    def _sum_by(geo_ids, columns):
+        """(geo_id, [column sums]) per known geography, as Python ints ready for the JSON fields"""
+        known = geo_ids != 0
+        groups, inverse = np.unique(geo_ids[known], return_inverse=True)
+        columns = columns[known]
+        sums = np.column_stack([
+            np.bincount(inverse, weights=columns[:, index], minlength=len(groups))
+            for index in range(columns.shape[1])
+        ]).astype(np.int64) if len(groups) else np.zeros((0, columns.shape[1]), dtype=np.int64)
+        return zip(groups.tolist(), sums.tolist())
+
+    def report_info(self, level, thresholds):
+        """{geo_id: additional_info} of every report of the level: activity and streak distributions, retention"""
+        activity = self.distribution_by(level, thresholds)
+        streaks = self.distribution_by(level, thresholds, self.longest_streaks())
+        retention = self.retention_by(level)
+        return {
+            geo_id: {
+                "activity_distribution": distribution,
+                "streak_distribution": streaks[geo_id],
+                "retention": retention.get(geo_id, self.empty_retention()),
+            }
+            for geo_id, distribution in activity.items()
+        }
+
+    def empty_info(self, thresholds):
+        """additional_info of a report none of whose users are in the matrix"""
+        zeros = {str(threshold): 0 for threshold in thresholds}
+        return {
+            "activity_distribution": zeros,
+            "streak_distribution": dict(zeros),
+            "retention": self.empty_retention(),
+        }
+
+    def empty_retention(self):
+        return {'cohort': 0, 'active': [0] * self.days}
@@ -0,0 +1,188 @@
+import logging
+
+from django.db import connection, transaction
+from django.utils import timezone
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+
+from backend.redis_connection import get_redis_client
+from activity_reports.models import DailyActivitySummary, DailyUserActivity
+
+logger = logging.getLogger(__name__)
+
+
+class DailyActivityStore:
+    """
+    Ingestion side of daily activity.
+
+    Every active (user, day) pair is written once to DailyUserActivity with
+    ``ON CONFLICT DO NOTHING`` (whose RETURNING says who is new) and, once
+    that commits, added to the Redis set ``activity:{date}:users``, so
+    today's count (SCARD) and membership (SISMEMBER) are O(1) and no request
+    ever locks a shared row.
+    ``compact`` materialises DailyActivitySummary from the per-user rows for
+    the report generators. If Redis is unreachable the per-user rows answer
+    instead.
+    """
+
+    KEY = 'activity:{}:users'
+    # Marks a loaded day so a day with no activity is cached too
+    SENTINEL = '*'
+    TTL_SECONDS = 60 * 60 * 24 * 3
+    ACTIVITY_GROUP = 'activity_today'
+
+    def __init__(self, redis_client=None, channel_layer=None):
+        self._redis = redis_client
+        self._channel_layer = channel_layer
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    @property
+    def channel_layer(self):
+        if self._channel_layer is None:
+            self._channel_layer = get_channel_layer()
+        return self._channel_layer
+
+    def record(self, user_ids, day=None, broadcast=True):
+        """
+        Mark users active on ``day`` (today by default).
+        Returns how many of them were not already active that day.
+        """
+        return len(self.record_ids(user_ids, day, broadcast))
+
+    def record_ids(self, user_ids, day=None, broadcast=True):
+        """
+        ``record`` returning the IDs of the users that were not already active
+        that day. The rows are part of the caller's transaction and say who is
+        new; the Redis set and the count broadcast follow its commit, so a
+        rollback leaves neither behind.
+        """
+        day = day or timezone.localdate()
+        user_ids = sorted({uid for uid in user_ids if uid is not None})
+        if not user_ids:
+            return []
+
+        sql = """
+            INSERT INTO activity_reports.daily_user_activity (id, date, user_id, created_at)
+            SELECT gen_random_uuid(), %(day)s, u, now()
+            FROM unnest(%(user_ids)s::bigint[]) AS u
+            ON CONFLICT (date, user_id) DO NOTHING
+            RETURNING user_id
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'day': day, 'user_ids': user_ids})
+            newly_active = sorted(row[0] for row in cursor.fetchall())
+
+        if newly_active:
+            transaction.on_commit(lambda: self._mark_active(newly_active, day, broadcast))
+        return newly_active
+
+    def _mark_active(self, user_ids, day, broadcast):
+        """Add committed activity to the day's Redis set and push the new count"""
+        try:
+            # A rebuilt set already holds the committed rows; SADD is then a no-op
+            self._ensure_loaded(day)
+            key = self.KEY.format(day)
+            pipe = self.redis.pipeline()
+            pipe.sadd(key, *user_ids)
+            pipe.expire(key, self.TTL_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[ACTIVITY STORE] Redis unavailable, activity for {day} only stored in DB: {e}")
+
+        if broadcast and day == timezone.localdate():
+            self.broadcast_count(day)
+
+    def count(self, day=None):
+        """Number of distinct users active on ``day``"""
+        day = day or timezone.localdate()
+        try:
+            self._ensure_loaded(day)
+            return max(0, self.redis.scard(self.KEY.format(day)) - 1)
+        except Exception as e:
+            logger.warning(f"[ACTIVITY STORE] Redis unavailable, counting {day} from DB: {e}")
+            return DailyUserActivity.objects.filter(date=day).count()
+
+    def is_active(self, user_id, day=None):
+        day = day or timezone.localdate()
+        try:
+            self._ensure_loaded(day)
+            return bool(self.redis.sismember(self.KEY.format(day), user_id))
+        except Exception as e:
+            logger.warning(f"[ACTIVITY STORE] Redis unavailable, checking {day} in DB: {e}")
+            return DailyUserActivity.objects.filter(date=day, user_id=user_id).exists()
+
+    def active_among(self, user_ids, day=None):
+        """The subset of ``user_ids`` active on ``day``, in one round trip"""
+        day = day or timezone.localdate()
+        user_ids = list({uid for uid in user_ids if uid is not None})
+        if not user_ids:
+            return set()
+        try:
+            self._ensure_loaded(day)
+            pipe = self.redis.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.sismember(self.KEY.format(day), user_id)
+            return {user_id for user_id, member in zip(user_ids, pipe.execute()) if member}
+        except Exception as e:
+            logger.warning(f"[ACTIVITY STORE] Redis unavailable, checking {day} in DB: {e}")
+            return set(DailyUserActivity.objects.filter(
+                date=day, user_id__in=user_ids
+            ).values_list('user_id', flat=True))
+
+    def broadcast_count(self, day=None, count=None):
+        """Push the day's active count to the "activity_today" WebSocket group"""
+        count = self.count(day) if count is None else count
+        try:
+            async_to_sync(self.channel_layer.group_send)(
+                self.ACTIVITY_GROUP,
+                {
+                    "type": "activity_update",
+                    "count": count
+                }
+            )
+        except Exception as e:
+            logger.error(f"[ACTIVITY STORE] Could not broadcast activity count: {e}")
+
+    def compact(self, day):
+        """
+        Materialise DailyActivitySummary for ``day`` from the per-user rows in
+        one statement. Users already in the summary (e.g. written before the
+        per-user rows existed) are kept. Returns the summary's user count.
+        """
+        sql = """
+            INSERT INTO activity_reports.daily_activity_summary AS s (id, date, active_users)
+            SELECT gen_random_uuid(), %(day)s, array_agg(user_id ORDER BY user_id)
+            FROM activity_reports.daily_user_activity
+            WHERE date = %(day)s
+            HAVING count(*) > 0
+            ON CONFLICT (date) DO UPDATE
+                SET active_users = ARRAY(
+                    SELECT DISTINCT u
+                    FROM unnest(s.active_users || EXCLUDED.active_users) AS u
+                    ORDER BY u
+                )
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'day': day})
+
+        summary = DailyActivitySummary.objects.filter(date=day).values_list('active_users', flat=True).first()
+        return len(summary) if summary is not None else 0
+
+    def _ensure_loaded(self, day):
+        """Rebuild the day's Redis set from the per-user rows when it is missing"""
+        key = self.KEY.format(day)
+        if self.redis.exists(key):
+            return
+        user_ids = list(DailyUserActivity.objects.filter(date=day).values_list('user_id', flat=True))
+        pipe = self.redis.pipeline()
+        pipe.sadd(key, self.SENTINEL, *user_ids)
+        pipe.expire(key, self.TTL_SECONDS)
+        pipe.execute()
+
+
+activity_store = DailyActivityStore()
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.utils import timezone
+
+from activity_reports.services.activity_calendar import activity_calendar
+from activity_reports.services.activity_store import activity_store
+from users.services.audience_index import audience_index
+from users.services.presence import presence
+
+logger = logging.getLogger(__name__)
+
+
+class CircleActivityStream:
+    """
+    Push side of the heartbeat network page.
+
+    A client showing its circle's activity subscribes over the notifications
+    WebSocket, which puts the socket in the ``circle_activity_{user}`` group.
+    When users become active, ``publish`` computes their streaks with one
+    query and sends every online contact one ``circle_activity`` event with
+    the deltas, so clients no longer poll with their whole active/inactive
+    lists.
+
+    The polling endpoint remains as a fallback for missed deltas (reconnects,
+    day rollover). ``snapshot_version`` fingerprints what a user's page shows
+    (their contacts and which are active today) from Redis alone, so an
+    unchanged snapshot is answered without touching the database.
+    """
+
+    GROUP = 'circle_activity_{}'
+    MAX_STREAK_DAYS = 10
+
+    def __init__(self, channel_layer=None):
+        self.channel_layer = channel_layer
+
+    def statuses(self, user_ids, day=None):
+        """{user_id: {'is_active_today', 'streak_count'}} with one query"""
+        day = day or timezone.localdate()
+        calendars = activity_calendar.load(user_ids, day - timedelta(days=self.MAX_STREAK_DAYS), day)
+        return {
+            user_id: {
+                'is_active_today': user_calendar.is_active(day),
+                'streak_count': user_calendar.streak(day, limit=self.MAX_STREAK_DAYS),
+            }
+            for user_id, user_calendar in calendars.items()
+        }
+
+    def publish(self, user_ids, day=None):
+        """
+        Send the new status of ``user_ids`` (who just became active on
+        ``day``) to their online contacts; one event per contact. Returns
+        the number of events sent.
+        """
+        day = day or timezone.localdate()
+        user_ids = {uid for uid in user_ids if uid is not None}
+        if not user_ids or day != timezone.localdate():
+            return 0
+
+        statuses = self.statuses(user_ids, day)
+        updates = {}
+        for user_id in user_ids:
+            update = {'user_id': user_id, **statuses[user_id]}
+            for contact_id in audience_index.contacts(user_id):
+                updates.setdefault(contact_id, []).append(update)
+
+        recipients = presence.online_among(updates)
+        if not recipients:
+            return 0
+        events = {
+            self.GROUP.format(contact_id): {
+                "type": "circle_activity",
+                "date": day.isoformat(),
+                "updates": updates[contact_id],
+            }
+            for contact_id in recipients
+        }
+        try:
+            async_to_sync(self._send)(events)
+        except Exception as e:
+            logger.error(f"[CIRCLE ACTIVITY] Could not publish activity of {len(user_ids)} users: {e}")
+            return 0
+        return len(events)
+
+    def snapshot_version(self, user_id, day=None):
+        """Fingerprint of the user's network page: their contacts and which are active on ``day``"""
+        day = day or timezone.localdate()
+        contacts = audience_index.contacts(user_id)
+        active = activity_store.active_among(contacts, day)
+        raw = f"{day.isoformat()}|{sorted(contacts)}|{sorted(active)}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    async def _send(self, events):
+        channel_layer = self.channel_layer or get_channel_layer()
+        await asyncio.gather(*(
+            channel_layer.group_send(group, payload) for group, payload in events.items()
+        ))
+
+
+circle_activity = CircleActivityStream()
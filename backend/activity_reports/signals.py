@@ -3,26 +3,17 @@ import logging
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 from activity_reports.models import DailyActivitySummary
+from activity_reports.services.activity_store import activity_store
 
 logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=DailyActivitySummary, dispatch_uid="daily_activity_summary_update")
 def send_activity_update(sender, instance, **kwargs):
     logger.info(f"[Signal] Received update for {instance.date}")
-    today = timezone.now().date()
+    today = timezone.localdate()
     if instance.date == today:
-        logger.info(f"[Signal] Sending activity update for {instance.date} with {len(instance.active_users)} active users")
-        try:
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                "activity_today",
-                {
-                    "type": "activity_update",
-                    "count": len(instance.active_users)
-                }
-            )
-        except Exception as e:
-            logger.error(f"[Signal Error] {e}")
\ No newline at end of file
+        # Count from the activity store (O(1)) rather than the summary array
+        count = activity_store.count(today)
+        logger.info(f"[Signal] Sending activity update for {instance.date} with {count} active users")
+        activity_store.broadcast_count(today, count)
\ No newline at end of file
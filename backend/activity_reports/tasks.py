@@ -1,13 +1,14 @@
 from celery import shared_task
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
 from users.models import Petitioner
-from activity_reports.models import UserMonthlyActivity, DailyActivitySummary
+from activity_reports.models import UserMonthlyActivity
 from django.db import transaction
 from django.db import IntegrityError
 import logging
-from activity_reports.signals import send_activity_update  # Import the signal handler
+from activity_reports.services.activity_store import activity_store
+from activity_reports.services.circle_activity import circle_activity
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ def simulate_realtime_activity():
     MIN_INTERVAL_ACTIVE = 1
     
     now = timezone.now()
-    today = now.date()
+    today = timezone.localdate(now)
     day_of_month = today.day
     year, month = today.year, today.month
     
@@ -41,43 +42,10 @@ def simulate_realtime_activity():
     )
     active_users = random.sample(eligible_users, active_count)
     
-    summary = None
-    
-    # 1. Update daily activity summary with proper locking
-    try:
-        with transaction.atomic():
-            # Lock the daily summary record for update
-            summary, created = DailyActivitySummary.objects.select_for_update().get_or_create(
-                date=today,
-                defaults={'active_users': active_users}
-            )
-            
-            if not created:
-                # Merge and deduplicate user IDs in Python
-                existing_users = set(summary.active_users)
-                new_users = set(active_users)
-                updated_users = list(existing_users | new_users)
-                
-                summary.active_users = updated_users
-                summary.save()
-    except IntegrityError:
-        # Handle race condition by refetching with lock
-        with transaction.atomic():
-            summary = DailyActivitySummary.objects.select_for_update().get(date=today)
-            existing_users = set(summary.active_users)
-            new_users = set(active_users)
-            updated_users = list(existing_users | new_users)
-            
-            summary.active_users = updated_users
-            summary.save()
-    
-    # MANUALLY TRIGGER SIGNAL AFTER SAVING DAILY SUMMARY
-    if summary:
-        try:
-            logger.info(f"[Task] Manually triggering signal for {summary.date}")
-            send_activity_update(DailyActivitySummary, summary)
-        except Exception as e:
-            logger.error(f"[Task Error] Signal trigger failed: {e}")
+    # 1. Record daily activity (per-user rows, no shared row lock);
+    # the store broadcasts the new count when anyone became active
+    newly_active = activity_store.record(active_users, today)
+    logger.info(f"[Task] {newly_active} users newly active on {today}")
     
     # 2. Update monthly activity records
     # Create a list of records to update
@@ -146,14 +114,15 @@ def simulate_realtime_activity():
 
 from celery import shared_task
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
 from users.models import Petitioner
-from activity_reports.models import UserMonthlyActivity, DailyActivitySummary
+from activity_reports.models import UserMonthlyActivity
 from django.db import transaction
 from django.db import IntegrityError
 import logging
-from activity_reports.signals import send_activity_update  # Import the signal handler
+from activity_reports.services.activity_store import activity_store
+from activity_reports.services.circle_activity import circle_activity
 
 logger = logging.getLogger(__name__)
 
@@ -165,7 +134,7 @@ def simulate_realtime_activity():
     MIN_INTERVAL_ACTIVE = 1
     
     now = timezone.now()
-    today = now.date()
+    today = timezone.localdate(now)
     day_of_month = today.day
     year, month = today.year, today.month
     
@@ -187,43 +156,10 @@ def simulate_realtime_activity():
     )
     active_users = random.sample(eligible_users, active_count)
     
-    summary = None
-    
-    # 1. Update daily activity summary with proper locking
-    try:
-        with transaction.atomic():
-            # Lock the daily summary record for update
-            summary, created = DailyActivitySummary.objects.select_for_update().get_or_create(
-                date=today,
-                defaults={'active_users': active_users}
-            )
-            
-            if not created:
-                # Merge and deduplicate user IDs in Python
-                existing_users = set(summary.active_users)
-                new_users = set(active_users)
-                updated_users = list(existing_users | new_users)
-                
-                summary.active_users = updated_users
-                summary.save()
-    except IntegrityError:
-        # Handle race condition by refetching with lock
-        with transaction.atomic():
-            summary = DailyActivitySummary.objects.select_for_update().get(date=today)
-            existing_users = set(summary.active_users)
-            new_users = set(active_users)
-            updated_users = list(existing_users | new_users)
-            
-            summary.active_users = updated_users
-            summary.save()
-    
-    # MANUALLY TRIGGER SIGNAL AFTER SAVING DAILY SUMMARY
-    if summary:
-        try:
-            logger.info(f"[Task] Manually triggering signal for {summary.date}")
-            send_activity_update(DailyActivitySummary, summary)
-        except Exception as e:
-            logger.error(f"[Task Error] Signal trigger failed: {e}")
+    # 1. Record daily activity (per-user rows, no shared row lock);
+    # the store broadcasts the new count when anyone became active
+    newly_active = activity_store.record_ids(active_users, today)
+    logger.info(f"[Task] {len(newly_active)} users newly active on {today}")
     
     # 2. Update monthly activity records
     # Create a list of records to update
@@ -285,5 +221,23 @@ def simulate_realtime_activity():
                     if day_of_month not in existing.active_days:
                         existing.active_days.append(day_of_month)
                         existing.save()
+
+    # Streaks read the monthly records, so push them only now
+    circle_activity.publish(newly_active, today)
     
-    return f"Updated {len(active_users)} users at {now.strftime('%Y-%m-%d %H:%M:%S')}"
\ No newline at end of file
+    return f"Updated {len(active_users)} users at {now.strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+@shared_task
+def compact_daily_activity():
+    """
+    Materialise DailyActivitySummary from the per-user activity rows.
+    Yesterday is compacted as well so activity recorded just before midnight
+    reaches the daily reports.
+    """
+    today = timezone.localdate()
+    results = []
+    for day in (today - timedelta(days=1), today):
+        count = activity_store.compact(day)
+        results.append(f"{day}: {count}")
+    return f"Compacted daily activity ({', '.join(results)})"
\ No newline at end of file
@@ -1,11 +1,12 @@
 from django.urls import path
-from .activityreportview.views import ActivityReportDetailView
+from .activityreportview.views import ActivityReportDetailView, ActivityReportMembersView
 from .activityreportslist.views import CountryActivityReportListView, LatestCountryActivityReportsView
 from .heartbeat.views import CheckActivityView, MarkActiveView, ActivityHistoryView
 from .heartbeat.HeartbeatNetworkView import HeartbeatNetworkView
 
 urlpatterns = [
     path('activity-report/', ActivityReportDetailView.as_view(), name='activity-report-detail'),
+    path('activity-report/members/', ActivityReportMembersView.as_view(), name='activity-report-members'),
     path('activity-reports/list/', CountryActivityReportListView.as_view(), name='country-activity-reports-list'),
     path('activity-reports/latest/', LatestCountryActivityReportsView.as_view(), name='latest-country-activity-reports'),
     path('heartbeat/check-activity/', CheckActivityView.as_view(), name='check-activity'),
@@ -0,0 +1,220 @@
+import logging
+from functools import wraps
+
+from django.core.cache import caches
+from django.db import transaction
+from prometheus_client import Counter
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+cache_lookups_total = Counter(
+    'read_cache_lookups_total',
+    'Read-through cache lookups by namespace and result (l1_hit, l2_hit, miss, error)',
+    ['namespace', 'result']
+)
+cache_invalidations_total = Counter(
+    'read_cache_invalidations_total',
+    'Read-through cache invalidations by namespace',
+    ['namespace']
+)
+
+_MISSING = object()
+
+
+class ReadThroughCache:
+    """
+    Two-tier read-through cache: a per-process L1 (the "local" LocMemCache)
+    in front of the shared Redis L2 (the "default" cache).
+
+    Entries live in a namespace (``profile``, ``timeline``, ...) and an
+    optional scope inside it (usually a user ID). Every (namespace, scope)
+    has a version number stored in Redis and embedded in its keys, so
+    ``invalidate`` is a single INCR that orphans every entry of the scope
+    without having to know their keys; orphans simply expire. Versions are
+    themselves held in L1 for ``LOCAL_CACHE_TIMEOUT`` seconds, which bounds
+    how long other processes keep serving an invalidated entry.
+
+    Redis errors never fail a request: the lookup counts as ``error`` and
+    the loader runs as if the cache were empty.
+    """
+
+    def __init__(self, shared_alias='default', local_alias='local'):
+        self.shared_alias = shared_alias
+        self.local_alias = local_alias
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @property
+    def local(self):
+        return caches[self.local_alias]
+
+    def get_or_set(self, namespace, parts, loader, timeout=300, scope=None, cache_if=None):
+        """
+        Return the cached value for ``parts`` or compute it with ``loader()``
+        and store it in both tiers. ``cache_if(value)`` can veto storing.
+        """
+        key = self._key(namespace, scope, parts)
+
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            cache_lookups_total.labels(namespace=namespace, result='l1_hit').inc()
+            return value
+
+        try:
+            value = self.shared.get(key, _MISSING)
+            result = 'miss'
+        except Exception as e:
+            logger.warning(f"[READ CACHE] get {key} failed: {e}")
+            value, result = _MISSING, 'error'
+
+        if value is not _MISSING:
+            cache_lookups_total.labels(namespace=namespace, result='l2_hit').inc()
+            self.local.set(key, value)
+            return value
+
+        cache_lookups_total.labels(namespace=namespace, result=result).inc()
+        value = loader()
+        if cache_if is None or cache_if(value):
+            if result == 'miss':
+                try:
+                    self.shared.set(key, value, timeout)
+                except Exception as e:
+                    logger.warning(f"[READ CACHE] set {key} failed: {e}")
+            # While Redis is unreachable only the short-lived L1 holds the value
+            self.local.set(key, value)
+        return value
+
+    def get_or_set_many(self, namespace, entries, loader, timeout=300, cache_if=None):
+        """
+        ``get_or_set`` for many entries at once: ``entries`` maps an ID to its
+        (scope, parts) and ``loader(missing_ids)`` returns {id: value} for the
+        entries found in neither tier, so they are computed in one batch.
+        Returns {id: value} for every ID the cache or the loader had.
+        """
+        keys = {entry_id: self._key(namespace, scope, parts) for entry_id, (scope, parts) in entries.items()}
+        values = {}
+
+        local_hits = self.local.get_many(keys.values())
+        shared_hits, result = {}, 'miss'
+        remaining = [key for key in keys.values() if key not in local_hits]
+        if remaining:
+            try:
+                shared_hits = self.shared.get_many(remaining)
+            except Exception as e:
+                logger.warning(f"[READ CACHE] get_many in {namespace} failed: {e}")
+                result = 'error'
+        if shared_hits:
+            self.local.set_many(shared_hits)
+
+        missing = []
+        for entry_id, key in keys.items():
+            if key in local_hits:
+                cache_lookups_total.labels(namespace=namespace, result='l1_hit').inc()
+                values[entry_id] = local_hits[key]
+            elif key in shared_hits:
+                cache_lookups_total.labels(namespace=namespace, result='l2_hit').inc()
+                values[entry_id] = shared_hits[key]
+            else:
+                cache_lookups_total.labels(namespace=namespace, result=result).inc()
+                missing.append(entry_id)
+
+        if missing:
+            loaded = loader(missing)
+            to_store = {
+                keys[entry_id]: value for entry_id, value in loaded.items()
+                if entry_id in keys and (cache_if is None or cache_if(value))
+            }
+            if to_store:
+                if result == 'miss':
+                    try:
+                        self.shared.set_many(to_store, timeout)
+                    except Exception as e:
+                        logger.warning(f"[READ CACHE] set_many in {namespace} failed: {e}")
+                self.local.set_many(to_store)
+            values.update(loaded)
+        return values
+
+    def invalidate(self, namespace, scope=None):
+        """Drop every entry of (namespace, scope) by bumping its version"""
+        version_key = self._version_key(namespace, scope)
+        self.local.delete(version_key)
+        cache_invalidations_total.labels(namespace=namespace).inc()
+        try:
+            # add() is a no-op when the version exists; incr() needs the key
+            self.shared.add(version_key, 1, timeout=None)
+            self.shared.incr(version_key)
+        except Exception as e:
+            logger.warning(f"[READ CACHE] invalidate {version_key} failed: {e}")
+
+    def invalidate_on_commit(self, namespace, scope=None):
+        """``invalidate`` once the current transaction commits (immediately outside one)"""
+        transaction.on_commit(lambda: self.invalidate(namespace, scope))
+
+    def _version(self, namespace, scope):
+        version_key = self._version_key(namespace, scope)
+        version = self.local.get(version_key)
+        if version is None:
+            try:
+                version = self.shared.get(version_key) or 1
+            except Exception:
+                # Keys of version 0 only ever reach L1, see get_or_set
+                return 0
+            self.local.set(version_key, version)
+        return version
+
+    def _key(self, namespace, scope, parts):
+        version = self._version(namespace, scope)
+        return ':'.join([namespace, str(scope), f"v{version}", *(str(part) for part in parts)])
+
+    @staticmethod
+    def _version_key(namespace, scope):
+        return f"version:{namespace}:{scope}"
+
+
+read_cache = ReadThroughCache()
+
+
+def cached_view(namespace, key, timeout=300, scope=None):
+    """
+    Read-through caching for a DRF view function or APIView method.
+
+    ``key(request, **kwargs)`` returns the key parts for the request (view
+    kwargs are the URL kwargs) and ``scope(request, **kwargs)`` the optional
+    scope to invalidate by. Only 200 responses are cached; their ``data`` is
+    stored, so the response is rendered per request as usual. Responses carry
+    ``X-Cache: HIT`` or ``MISS``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Function views receive (request, ...), APIView methods (self, request, ...)
+            request = args[0] if isinstance(args[0], Request) else args[1]
+            responses = []
+
+            def load():
+                response = view(*args, **kwargs)
+                responses.append(response)
+                return response.data
+
+            data = read_cache.get_or_set(
+                namespace,
+                key(request, **kwargs),
+                load,
+                timeout=timeout,
+                scope=scope(request, **kwargs) if scope else None,
+                cache_if=lambda _: responses[0].status_code == 200
+            )
+            if responses:
+                response = responses[0]
+                response['X-Cache'] = 'MISS'
+                return response
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        return wrapper
+    return decorator
@@ -1,4 +1,5 @@
 from redis.asyncio.connection import Connection, RedisSSLContext
+import redis
 import ssl
 
 class CustomSSLConnection(Connection):
@@ -14,3 +15,26 @@ def get_custom_ssl_context():
     ssl_context.check_hostname = False
     ssl_context.verify_mode = ssl.CERT_NONE  # or ssl.CERT_REQUIRED based on your Redis cert config
     return ssl_context
+
+_redis_client = None
+
+def get_redis_client():
+    """
+    Shared synchronous Redis client for the same server the channel layer uses
+    (CHANNELS_URLS). Created lazily so importing settings never opens a socket.
+    """
+    global _redis_client
+    if _redis_client is None:
+        from django.conf import settings
+        parsed_url = settings.parsed_url
+        _redis_client = redis.Redis(
+            host=parsed_url.hostname,
+            port=parsed_url.port or 6379,
+            username=parsed_url.username,
+            password=parsed_url.password,
+            db=int(parsed_url.path.lstrip("/")) if parsed_url.path.lstrip("/") else 0,
+            ssl=parsed_url.scheme == "rediss",
+            ssl_cert_reqs=None,
+            decode_responses=True,
+        )
+    return _redis_client
@@ -215,6 +215,34 @@ CHANNEL_LAYERS = {
 }
 
 
+# Read-through cache for hot read endpoints (see backend/read_cache.py).
+# "default" is shared Redis (same server as the channel layer, its own
+# database); "local" is a small per-process L1 tier in front of it with a
+# short timeout, so cross-process invalidation lags by at most LOCAL_CACHE_TIMEOUT.
+CACHE_REDIS_DB = int(env("CACHE_REDIS_DB", 1))
+LOCAL_CACHE_TIMEOUT = int(env("LOCAL_CACHE_TIMEOUT", 5))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": parsed_url._replace(path=f"/{CACHE_REDIS_DB}").geturl(),
+        "KEY_PREFIX": "rc",
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "ssl_cert_reqs": None,
+        } if parsed_url.scheme == "rediss" else {},
+    },
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "read-cache-l1",
+        "TIMEOUT": LOCAL_CACHE_TIMEOUT,
+        "OPTIONS": {
+            "MAX_ENTRIES": 5000,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -402,6 +430,34 @@ CELERY_BEAT_SCHEDULE = {
             'expires': 60 * 60 * 2,  # Expire after 2 hours
         }
     },
+    'flush-population-deltas': {
+        'task': 'geographies.tasks.flush_population_deltas',
+        'schedule': 60.0,
+        'options': {
+            'expires': 50,
+        }
+    },
+    'sweep-presence': {
+        'task': 'users.tasks.sweep_presence',
+        'schedule': 60.0,
+        'options': {
+            'expires': 50,
+        }
+    },
+    'trim-blog-outbox': {
+        'task': 'blog.tasks.trim_blog_outbox',
+        'schedule': crontab(minute=45),  # Hourly
+        'options': {
+            'expires': 60 * 30,
+        }
+    },
+    'compact-daily-activity': {
+        'task': 'activity_reports.tasks.compact_daily_activity',
+        'schedule': crontab(minute='*/10'),
+        'options': {
+            'expires': 300,
+        }
+    },
     'simulate-activity-every-3-minutes': {
         'task': 'activity_reports.tasks.simulate_realtime_activity',
         'schedule': crontab(minute='*/10'),  # Every 3 minutes
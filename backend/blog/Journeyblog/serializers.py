@@ -30,11 +30,8 @@ class UserSummarySerializer(serializers.ModelSerializer):
 class BaseBlogSerializer(serializers.ModelSerializer):
     class Meta:
         model = BaseBlogModel
-        fields = [
-            'id', 'userid', 'likes', 'dislikes',
-            'relevant_count', 'irrelevant_count',
-            'shares', 'type', 'created_at', 'updated_at'
-        ]
+        # Reaction totals only; the legacy user ID arrays are cleared by migrate_reaction_arrays
+        fields = ['id', 'userid', 'reaction_counts', 'type', 'created_at', 'updated_at']
 
 class JourneyBlogSerializer(serializers.Serializer):
     id = serializers.UUIDField(read_only=True)
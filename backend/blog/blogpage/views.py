@@ -8,12 +8,13 @@ from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from users.models import Circle, UserTree, Petitioner
+from users.models import Circle, UserTree
 from users.login.authentication import CookieJWTAuthentication
-from ..models import BaseBlogModel, Comment, UserSharedBlog, BlogLoad
+from ..models import BaseBlogModel, Comment, UserSharedBlog
 from .serializers import BlogSerializer, CommentSerializer
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from ..newmodel.services.blog_event_pipeline import BlogEventPipeline
+from ..newmodel.services.reaction_store import reaction_store
+from ..newmodel.services.blog_payload_cache import blog_payload_cache
 
 class CircleBlogsView(generics.GenericAPIView):
     authentication_classes = [CookieJWTAuthentication]
@@ -88,6 +89,9 @@ class CircleBlogsView(generics.GenericAPIView):
         # Prefetch share information for all blogs
         share_info_map = self.get_share_info_map([b['blog'] for b in combined_blogs], user.id)
 
+        # The current user's likes and shares on these blogs, one query
+        reacted = reaction_store.reacted(user.id, {b['blog'].id for b in combined_blogs}, ('like', 'share'))
+
         valid_content_types = {'micro', 'short_essay', 'article'}
 
         blog_data = []
@@ -135,8 +139,8 @@ class CircleBlogsView(generics.GenericAPIView):
                 else:
                     relation = circle.onlinerelation.replace('_', ' ').title() if circle and circle.onlinerelation else "Connection"
 
-            has_liked = user.id in base_blog.likes
-            has_shared = user.id in base_blog.shares
+            has_liked = (base_blog.id, 'like') in reacted
+            has_shared = (base_blog.id, 'share') in reacted
             blog_comments = self.build_comment_hierarchy_with_serializer(
                 base_blog.id, comments_by_parent, comment_user_map, request
             )
@@ -362,25 +366,16 @@ class LikeBlogView(APIView):
             blog = BaseBlogModel.objects.get(id=blog_id)
             user_id = request.user.id
             
-            # Check if user already liked
-            if user_id in blog.likes:
-                # Remove like
-                blog.likes.remove(user_id)
-                action = 'removed'
-            else:
-                # Add like
-                blog.likes.append(user_id)
-                action = 'added'
-            
-            blog.save()
+            action, likes_count = reaction_store.toggle(BaseBlogModel, blog.id, user_id, 'like')
+            blog_payload_cache.invalidate(blog.id)
             
             # Send WebSocket update to all users who can see this blog
-            self.send_blog_update(blog_id, 'like', action, len(blog.likes), user_id)
+            self.send_blog_update(blog_id, 'like', action, likes_count, user_id)
             
             return Response({
                 'status': 'success',
                 'action': action,
-                'likes_count': len(blog.likes),
+                'likes_count': likes_count,
             })
             
         except BaseBlogModel.DoesNotExist:
@@ -390,49 +385,9 @@ class LikeBlogView(APIView):
             )
     
     def send_blog_update(self, blog_id, update_type, action, count, user_id):
-        """Send WebSocket update for blog changes"""
-        channel_layer = get_channel_layer()
-        
-        # Get all users who can see this blog (author + their circle)
-        blog = BaseBlogModel.objects.get(id=blog_id)
-        author_id = blog.userid
-        
-        # Get circle contacts for the author
-        circles = Circle.objects.filter(userid=author_id)
-        circle_user_ids = {circle.otherperson for circle in circles if circle.otherperson}
-        
-        # Include author in the list
-        user_ids = list(circle_user_ids) + [author_id]
-        
-        # Send update to each user's personal channel and the blog-specific channel
-        for uid in user_ids:
-            # Check if user is online
-            try:
-                user_obj = Petitioner.objects.get(id=uid)
-                if user_obj.is_online:
-                    # Send to user's personal notification channel
-                    async_to_sync(channel_layer.group_send)(
-                        f"notifications_{uid}",
-                        {
-                            "type": "blog_update",
-                            "blog_id": str(blog_id),
-                            "update_type": update_type,
-                            "action": action,
-                            "count": count,
-                            "user_id": user_id
-                        }
-                    )
-                else:
-                    # Update BlogLoad for offline users
-                    from .utils import update_blog_load_for_offline_user
-                    update_blog_load_for_offline_user(uid, blog_id)
-            except Petitioner.DoesNotExist:
-                print(f"User with ID {uid} does not exist")
-                continue
-        
-        # Also send to the blog-specific channel
-        async_to_sync(channel_layer.group_send)(
-            f"blog_{blog_id}",
+        """Queue WebSocket update for blog changes (delivered by the fan-out task)"""
+        BlogEventPipeline().enqueue(
+            blog_id,
             {
                 "type": "blog_update",
                 "blog_id": str(blog_id),
@@ -440,7 +395,8 @@ class LikeBlogView(APIView):
                 "action": action,
                 "count": count,
                 "user_id": user_id
-            }
+            },
+            coalesce_key=update_type
         )
 class ShareBlogView(APIView):
     authentication_classes = [CookieJWTAuthentication]
@@ -451,12 +407,10 @@ class ShareBlogView(APIView):
             blog = BaseBlogModel.objects.get(id=blog_id)
             user_id = request.user.id
             
-            # Check if user already shared this blog
-            if user_id in blog.shares:
-                # Remove share
-                blog.shares.remove(user_id)
-                action = 'removed'
-                
+            # Share, or unshare if the user already shared this blog
+            action, shares_count = reaction_store.toggle(BaseBlogModel, blog.id, user_id, 'share')
+            blog_payload_cache.invalidate(blog.id)
+            if action == 'removed':
                 # Also remove from UserSharedBlog
                 UserSharedBlog.objects.filter(
                     userid=user_id, 
@@ -466,10 +420,6 @@ class ShareBlogView(APIView):
                 # Send WebSocket update for unshare
                 self.send_unshare_update(blog_id, user_id, request)
             else:
-                # Add share
-                blog.shares.append(user_id)
-                action = 'added'
-                
                 # Create UserSharedBlog record
                 UserSharedBlog.objects.create(
                     userid=user_id,
@@ -480,12 +430,10 @@ class ShareBlogView(APIView):
                 # Send WebSocket update for share
                 self.send_share_update(blog_id, user_id, request)
             
-            blog.save()
-            
             return Response({
                 'status': 'success',
                 'action': action,
-                'shares_count': len(blog.shares)
+                'shares_count': shares_count
             })
             
         except BaseBlogModel.DoesNotExist:
@@ -511,8 +459,6 @@ class ShareBlogView(APIView):
 
     def send_share_update(self, blog_id, user_id, request):
         """Send complete blog data when someone shares a blog"""
-        channel_layer = get_channel_layer()
-        
         try:
             base_blog = BaseBlogModel.objects.get(id=blog_id)
             builder = BlogDataBuilder(request.user, request)
@@ -528,73 +474,21 @@ class ShareBlogView(APIView):
             # Convert UUID and datetime to strings recursively before sending
             serialized_blog = self.recursive_convert_objects_to_str(serialized_blog)
 
-            # Get the sharer's circle contacts
-            sharer_circles = Circle.objects.filter(userid=user_id)
-            sharer_circle_user_ids = {circle.otherperson for circle in sharer_circles if circle.otherperson}
-
-            # Also get the original author's circle contacts (for people who follow the original author)
-            original_author_id = base_blog.userid
-            author_circles = Circle.objects.filter(userid=original_author_id)
-            author_circle_user_ids = {circle.otherperson for circle in author_circles if circle.otherperson}
-
-            # Combine both sets - people who follow the sharer AND people who follow the original author
-            all_user_ids = sharer_circle_user_ids.union(author_circle_user_ids)
-            all_user_ids = list(all_user_ids) + [user_id, original_author_id]  # Include sharer and original author
-
-            # Remove duplicates
-            all_user_ids = list(set(all_user_ids))
-            
-            print(f"Sending share update to user IDs: {all_user_ids}")
-
-            for uid in all_user_ids:
-                try:
-                    # Check if user is online
-                    user_obj = Petitioner.objects.get(id=uid)
-                    if user_obj.is_online:
-                        # Send WebSocket to online users
-                        async_to_sync(channel_layer.group_send)(
-                            f"notifications_{uid}",
-                            {
-                                "type": "blog_shared",
-                                "blog_id": str(blog_id),
-                                "action": "shared",
-                                "blog": serialized_blog,
-                                "shared_by_user_id": user_id,
-                                "original_author_id": original_author_id,
-                                "user_id": user_id
-                            }
-                        )
-                    else:
-                        # Add to new_blogs for offline users
-                        blog_load, created = BlogLoad.objects.get_or_create(
-                            userid=uid,
-                            defaults={
-                                'new_blogs': [blog_id],
-                                'modified_blogs': [],
-                                'loaded_blogs': []
-                            }
-                        )
-                        if not created:
-                            # Add blog to new_blogs if not already present
-                            if blog_id not in blog_load.new_blogs:
-                                blog_load.new_blogs.append(blog_id)
-                                blog_load.save()
-                except Petitioner.DoesNotExist:
-                    print(f"User with ID {uid} does not exist")
-                    continue
-
-            # Always send to blog-specific channel
-            async_to_sync(channel_layer.group_send)(
-                f"blog_{blog_id}",
+            # Delivered to the original author's circle and the sharer's circle;
+            # offline users get it in new_blogs
+            BlogEventPipeline().enqueue(
+                blog_id,
                 {
                     "type": "blog_shared",
                     "blog_id": str(blog_id),
                     "action": "shared",
                     "blog": serialized_blog,
                     "shared_by_user_id": user_id,
-                    "original_author_id": original_author_id,
+                    "original_author_id": base_blog.userid,
                     "user_id": user_id
-                }
+                },
+                list_type='new_blogs',
+                audience_of=[user_id]
             )
 
         except BaseBlogModel.DoesNotExist:
@@ -606,67 +500,11 @@ class ShareBlogView(APIView):
 
     def send_unshare_update(self, blog_id, user_id, request):
         """Send unshare update when someone removes their share"""
-        channel_layer = get_channel_layer()
-        
         try:
-            base_blog = BaseBlogModel.objects.get(id=blog_id)
-            
-            # Get the sharer's circle contacts
-            sharer_circles = Circle.objects.filter(userid=user_id)
-            sharer_circle_user_ids = {circle.otherperson for circle in sharer_circles if circle.otherperson}
-
-            # Also get the original author's circle contacts
-            original_author_id = base_blog.userid
-            author_circles = Circle.objects.filter(userid=original_author_id)
-            author_circle_user_ids = {circle.otherperson for circle in author_circles if circle.otherperson}
-
-            # Combine both sets
-            all_user_ids = sharer_circle_user_ids.union(author_circle_user_ids)
-            all_user_ids = list(all_user_ids) + [user_id, original_author_id]
+            original_author_id = BaseBlogModel.objects.values_list('userid', flat=True).get(id=blog_id)
 
-            # Remove duplicates
-            all_user_ids = list(set(all_user_ids))
-            
-            print(f"Sending unshare update to user IDs: {all_user_ids}")
-
-            for uid in all_user_ids:
-                try:
-                    # Check if user is online
-                    user_obj = Petitioner.objects.get(id=uid)
-                    if user_obj.is_online:
-                        # Send WebSocket to online users
-                        async_to_sync(channel_layer.group_send)(
-                            f"notifications_{uid}",
-                            {
-                                "type": "blog_unshared",
-                                "blog_id": str(blog_id),
-                                "action": "unshared",
-                                "shared_by_user_id": user_id,
-                                "original_author_id": original_author_id,
-                                "user_id": user_id
-                            }
-                        )
-                    else:
-                        # Add to modified_blogs for offline users
-                        blog_load, created = BlogLoad.objects.get_or_create(
-                            userid=uid,
-                            defaults={
-                                'new_blogs': [],
-                                'modified_blogs': [blog_id],
-                                'loaded_blogs': []
-                            }
-                        )
-                        if not created:
-                            if blog_id not in blog_load.modified_blogs:
-                                blog_load.modified_blogs.append(blog_id)
-                                blog_load.save()
-                except Petitioner.DoesNotExist:
-                    print(f"User with ID {uid} does not exist")
-                    continue
-
-            # Always send to blog-specific channel
-            async_to_sync(channel_layer.group_send)(
-                f"blog_{blog_id}",
+            BlogEventPipeline().enqueue(
+                blog_id,
                 {
                     "type": "blog_unshared",
                     "blog_id": str(blog_id),
@@ -674,7 +512,8 @@ class ShareBlogView(APIView):
                     "shared_by_user_id": user_id,
                     "original_author_id": original_author_id,
                     "user_id": user_id
-                }
+                },
+                audience_of=[user_id]
             )
 
         except BaseBlogModel.DoesNotExist:
@@ -686,61 +525,9 @@ class ShareBlogView(APIView):
 
     def send_basic_update(self, blog_id, update_type, action, count, user_id):
         """Send basic WebSocket update for non-share actions (like unshare)"""
-        channel_layer = get_channel_layer()
-        
         try:
-            blog = BaseBlogModel.objects.get(id=blog_id)
-            author_id = blog.userid
-
-            # Get both sharer's and author's circles
-            sharer_circles = Circle.objects.filter(userid=user_id)
-            sharer_circle_user_ids = {circle.otherperson for circle in sharer_circles if circle.otherperson}
-
-            author_circles = Circle.objects.filter(userid=author_id)
-            author_circle_user_ids = {circle.otherperson for circle in author_circles if circle.otherperson}
-
-            # Combine both sets
-            all_user_ids = sharer_circle_user_ids.union(author_circle_user_ids)
-            all_user_ids = list(all_user_ids) + [user_id, author_id]
-
-            # Remove duplicates
-            all_user_ids = list(set(all_user_ids))
-
-            for uid in all_user_ids:
-                try:
-                    user_obj = Petitioner.objects.get(id=uid)
-                    if user_obj.is_online:
-                        async_to_sync(channel_layer.group_send)(
-                            f"notifications_{uid}",
-                            {
-                                "type": "blog_update",
-                                "blog_id": str(blog_id),
-                                "update_type": update_type,
-                                "action": action,
-                                "count": count,
-                                "user_id": user_id
-                            }
-                        )
-                    else:
-                        # Update BlogLoad for offline users
-                        blog_load, created = BlogLoad.objects.get_or_create(
-                            userid=uid,
-                            defaults={
-                                'new_blogs': [],
-                                'modified_blogs': [blog_id],
-                                'loaded_blogs': []
-                            }
-                        )
-                        if not created:
-                            if blog_id not in blog_load.modified_blogs:
-                                blog_load.modified_blogs.append(blog_id)
-                                blog_load.save()
-                except Petitioner.DoesNotExist:
-                    print(f"User with ID {uid} does not exist")
-                    continue
-
-            async_to_sync(channel_layer.group_send)(
-                f"blog_{blog_id}",
+            BlogEventPipeline().enqueue(
+                blog_id,
                 {
                     "type": "blog_update",
                     "blog_id": str(blog_id),
@@ -748,12 +535,10 @@ class ShareBlogView(APIView):
                     "action": action,
                     "count": count,
                     "user_id": user_id
-                }
+                },
+                coalesce_key=update_type,
+                audience_of=[user_id]
             )
-
-        except BaseBlogModel.DoesNotExist:
-            print(f"Blog with ID {blog_id} not found")
-            return
         except Exception as e:
             print(f"Error in send_basic_update: {str(e)}")
             return
@@ -787,7 +572,8 @@ class CommentView(APIView):
         # Add comment ID to the blog's comments list
         blog = get_object_or_404(BaseBlogModel, id=blog_id)
         blog.comments.append(comment.id)
-        blog.save()
+        blog.save(update_fields=['comments', 'updated_at'])
+        blog_payload_cache.invalidate(blog.id)
         
         # Send WebSocket update
         self.send_comment_update(blog_id, 'comment_added', comment, user.id)
@@ -796,50 +582,13 @@ class CommentView(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     def send_comment_update(self, blog_id, action, comment, user_id):
-        """Send WebSocket update for comment changes"""
-        channel_layer = get_channel_layer()
-        
-        # Get all users who can see this blog (author + their circle)
-        blog = BaseBlogModel.objects.get(id=blog_id)
-        author_id = blog.userid
-        
-        circles = Circle.objects.filter(userid=author_id)
-        circle_user_ids = {circle.otherperson for circle in circles if circle.otherperson}
-        
-        # Include author in the list
-        user_ids = list(circle_user_ids) + [author_id]
-        
+        """Queue WebSocket update for comment changes (delivered by the fan-out task)"""
         # Serialize comment for WebSocket
         comment_serializer = CommentSerializer(comment, context={'request': None})
         comment_data = comment_serializer.data
         
-        # Send update to each user's personal channel
-        for uid in user_ids:
-            # Check if user is online
-            try:
-                user_obj = Petitioner.objects.get(id=uid)
-                if user_obj.is_online:
-                    async_to_sync(channel_layer.group_send)(
-                        f"notifications_{uid}",
-                        {
-                            "type": "comment_update",
-                            "blog_id": str(blog_id),
-                            "action": action,
-                            "comment": comment_data,
-                            "user_id": user_id
-                        }
-                    )
-                else:
-                    # Update BlogLoad for offline users
-                    from .utils import update_blog_load_for_offline_user
-                    update_blog_load_for_offline_user(uid, blog_id)
-            except Petitioner.DoesNotExist:
-                print(f"User with ID {uid} does not exist")
-                continue
-        
-        # Also send to the blog-specific channel
-        async_to_sync(channel_layer.group_send)(
-            f"blog_{blog_id}",
+        BlogEventPipeline().enqueue(
+            blog_id,
             {
                 "type": "comment_update",
                 "blog_id": str(blog_id),
@@ -858,19 +607,13 @@ class CommentDetailView(APIView):
         user = request.user
         comment = get_object_or_404(Comment, id=comment_id)
         
-        if user.id in comment.likes:
-            # Unlike
-            comment.likes.remove(user.id)
-            action = 'removed'
-        else:
-            # Like
-            comment.likes.append(user.id)
-            action = 'added'
-            
-        comment.save()
+        # Like or unlike
+        action, likes_count = reaction_store.toggle(Comment, comment.id, user.id, 'like')
         
         # Get the blog ID for this comment
         blog_id = comment.get_root_blog_id()
+        if blog_id:
+            blog_payload_cache.invalidate(blog_id)
         if not blog_id:
             return Response(
                 {'error': 'Could not find root blog for comment'}, 
@@ -878,12 +621,12 @@ class CommentDetailView(APIView):
             )
         
         # Send WebSocket update for comment like
-        self.send_comment_like_update(blog_id, comment_id, action, len(comment.likes), user.id)
+        self.send_comment_like_update(blog_id, comment_id, action, likes_count, user.id)
         
         return Response({
             'status': 'success',
             'action': action,
-            'likes_count': len(comment.likes)
+            'likes_count': likes_count
         })
     
     def delete(self, request, comment_id):
@@ -900,7 +643,8 @@ class CommentDetailView(APIView):
         blog = get_object_or_404(BaseBlogModel, id=blog_id)
         if comment.id in blog.comments:
             blog.comments.remove(comment.id)
-            blog.save()
+            blog.save(update_fields=['comments', 'updated_at'])
+        blog_payload_cache.invalidate(blog.id)
         
         # Send WebSocket update for comment deletion
         self.send_comment_update(blog_id, 'comment_deleted', comment, user.id)
@@ -909,47 +653,9 @@ class CommentDetailView(APIView):
         return Response({'status': 'success'}, status=status.HTTP_200_OK)
     
     def send_comment_like_update(self, blog_id, comment_id, action, likes_count, user_id):
-        """Send WebSocket update for comment like changes"""
-        channel_layer = get_channel_layer()
-        
-        # Get all users who can see this blog (author + their circle)
-        blog = BaseBlogModel.objects.get(id=blog_id)
-        author_id = blog.userid
-        
-        circles = Circle.objects.filter(userid=author_id)
-        circle_user_ids = {circle.otherperson for circle in circles if circle.otherperson}
-        
-        # Include author in the list
-        user_ids = list(circle_user_ids) + [author_id]
-        
-        # Send update to each user's personal channel
-        for uid in user_ids:
-            # Check if user is online
-            try:
-                user_obj = Petitioner.objects.get(id=uid)
-                if user_obj.is_online:
-                    async_to_sync(channel_layer.group_send)(
-                        f"notifications_{uid}",
-                        {
-                            "type": "comment_like_update",
-                            "blog_id": str(blog_id),
-                            "comment_id": str(comment_id),
-                            "action": action,
-                            "likes_count": likes_count,
-                            "user_id": user_id
-                        }
-                    )
-                else:
-                    # Update BlogLoad for offline users
-                    from .utils import update_blog_load_for_offline_user
-                    update_blog_load_for_offline_user(uid, blog_id)
-            except Petitioner.DoesNotExist:
-                print(f"User with ID {uid} does not exist")
-                continue
-        
-        # Also send to the blog-specific channel
-        async_to_sync(channel_layer.group_send)(
-            f"blog_{blog_id}",
+        """Queue WebSocket update for comment like changes (delivered by the fan-out task)"""
+        BlogEventPipeline().enqueue(
+            blog_id,
             {
                 "type": "comment_like_update",
                 "blog_id": str(blog_id),
@@ -957,55 +663,18 @@ class CommentDetailView(APIView):
                 "action": action,
                 "likes_count": likes_count,
                 "user_id": user_id
-            }
+            },
+            coalesce_key=f"comment_like:{comment_id}"
         )
     
     def send_comment_update(self, blog_id, action, comment, user_id):
-        """Send WebSocket update for comment changes"""
-        # Similar implementation to CommentView's send_comment_update
-        channel_layer = get_channel_layer()
-        
-        # Get all users who can see this blog (author + their circle)
-        blog = BaseBlogModel.objects.get(id=blog_id)
-        author_id = blog.userid
-        
-        circles = Circle.objects.filter(userid=author_id)
-        circle_user_ids = {circle.otherperson for circle in circles if circle.otherperson}
-        
-        # Include author in the list
-        user_ids = list(circle_user_ids) + [author_id]
-        
+        """Queue WebSocket update for comment changes (delivered by the fan-out task)"""
         # Serialize comment for WebSocket
         comment_serializer = CommentSerializer(comment, context={'request': None})
         comment_data = comment_serializer.data
         
-        # Send update to each user's personal channel
-        for uid in user_ids:
-            # Check if user is online
-            try:
-                user_obj = Petitioner.objects.get(id=uid)
-                if user_obj.is_online:
-                    async_to_sync(channel_layer.group_send)(
-                        f"notifications_{uid}",
-                        {
-                            "type": "comment_update",
-                            "blog_id": str(blog_id),
-                            "action": action,
-                            "comment": comment_data,
-                            "user_id": user_id
-                        }
-                    )
-                else:
-                    # Update BlogLoad for offline users
-                    from .utils import update_blog_load_for_offline_user
-                    update_blog_load_for_offline_user(uid, blog_id)
-            except Petitioner.DoesNotExist:
-                print(f"User with ID {uid} does not exist")
-                continue
-        
-        # Also send to the blog-specific channel
-        async_to_sync(channel_layer.group_send)(
-            f"blog_{blog_id}",
+        BlogEventPipeline().enqueue(
+            blog_id,
             {
                 "type": "comment_update",
                 "blog_id": str(blog_id),
@@ -1032,25 +701,16 @@ class CommentLikeView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Check if user already liked
-            if user_id in comment.likes:
-                # Remove like
-                comment.likes.remove(user_id)
-                action = 'removed'
-            else:
-                # Add like
-                comment.likes.append(user_id)
-                action = 'added'
-            
-            comment.save()
+            action, likes_count = reaction_store.toggle(Comment, comment.id, user_id, 'like')
+            blog_payload_cache.invalidate(blog_id)
             
             # Send WebSocket update with blog_id
-            self.send_comment_like_update(blog_id, comment_id, action, len(comment.likes), user_id)
+            self.send_comment_like_update(blog_id, comment_id, action, likes_count, user_id)
             
             return Response({
                 'status': 'success',
                 'action': action,
-                'likes_count': len(comment.likes),
+                'likes_count': likes_count,
             })
             
         except Comment.DoesNotExist:
@@ -1060,47 +720,9 @@ class CommentLikeView(APIView):
             )
     
     def send_comment_like_update(self, blog_id, comment_id, action, count, user_id):
-        """Send WebSocket update for comment like changes"""
-        channel_layer = get_channel_layer()
-        
-        # Get all users who can see this blog (author + their circle)
-        blog = BaseBlogModel.objects.get(id=blog_id)
-        author_id = blog.userid
-        
-        circles = Circle.objects.filter(userid=author_id)
-        circle_user_ids = {circle.otherperson for circle in circles if circle.otherperson}
-        
-        # Include author in the list
-        user_ids = list(circle_user_ids) + [author_id]
-        
-        # Send update to each user's personal channel
-        for uid in user_ids:
-            # Check if user is online
-            try:
-                user_obj = Petitioner.objects.get(id=uid)
-                if user_obj.is_online:
-                    async_to_sync(channel_layer.group_send)(
-                        f"notifications_{uid}",
-                        {
-                            "type": "comment_like_update",
-                            "blog_id": str(blog_id),
-                            "comment_id": str(comment_id),
-                            "action": action,
-                            "likes_count": count,
-                            "user_id": user_id
-                        }
-                    )
-                else:
-                    # Update BlogLoad for offline users
-                    from .utils import update_blog_load_for_offline_user
-                    update_blog_load_for_offline_user(uid, blog_id)
-            except Petitioner.DoesNotExist:
-                print(f"User with ID {uid} does not exist")
-                continue
-        
-        # Also send to the blog-specific channel
-        async_to_sync(channel_layer.group_send)(
-            f"blog_{blog_id}",
+        """Queue WebSocket update for comment like changes (delivered by the fan-out task)"""
+        BlogEventPipeline().enqueue(
+            blog_id,
             {
                 "type": "comment_like_update",
                 "blog_id": str(blog_id),
@@ -1108,7 +730,8 @@ class CommentLikeView(APIView):
                 "action": action,
                 "likes_count": count,
                 "user_id": user_id
-            }
+            },
+            coalesce_key=f"comment_like:{comment_id}"
         )
 
 class ReplyView(APIView):
@@ -1116,50 +739,13 @@ class ReplyView(APIView):
     permission_classes = [IsAuthenticated]
     
     def send_reply_update(self, blog_id, comment_id, reply, user_id):
-        """Send WebSocket update for reply changes"""
-        channel_layer = get_channel_layer()
-        
-        # Get all users who can see this blog (author + their circle)
-        blog = BaseBlogModel.objects.get(id=blog_id)
-        author_id = blog.userid
-        
-        circles = Circle.objects.filter(userid=author_id)
-        circle_user_ids = {circle.otherperson for circle in circles if circle.otherperson}
-        
-        # Include author in the list
-        user_ids = list(circle_user_ids) + [author_id]
-        
+        """Queue WebSocket update for reply changes (delivered by the fan-out task)"""
         # Serialize reply for WebSocket
         reply_serializer = CommentSerializer(reply, context={'request': None})
         reply_data = reply_serializer.data
         
-        # Send update to each user's personal channel
-        for uid in user_ids:
-            # Check if user is online
-            try:
-                user_obj = Petitioner.objects.get(id=uid)
-                if user_obj.is_online:
-                    async_to_sync(channel_layer.group_send)(
-                        f"notifications_{uid}",
-                        {
-                            "type": "reply_update",
-                            "blog_id": str(blog_id),
-                            "comment_id": str(comment_id),
-                            "reply": reply_data,
-                            "user_id": user_id
-                        }
-                    )
-                else:
-                    # Update BlogLoad for offline users
-                    from .utils import update_blog_load_for_offline_user
-                    update_blog_load_for_offline_user(uid, blog_id)
-            except Petitioner.DoesNotExist:
-                print(f"User with ID {uid} does not exist")
-                continue
-        
-        # Also send to the blog-specific channel
-        async_to_sync(channel_layer.group_send)(
-            f"blog_{blog_id}",
+        BlogEventPipeline().enqueue(
+            blog_id,
             {
                 "type": "reply_update",
                 "blog_id": str(blog_id),
@@ -1197,7 +783,7 @@ class ReplyView(APIView):
         
         # Add reply ID to the parent comment's children list
         parent_comment.children.append(reply.id)
-        parent_comment.save()
+        parent_comment.save(update_fields=['children'])
         
         # Send WebSocket update with blog_id
         self.send_reply_update(blog_id, comment_id, reply, user.id)
@@ -1242,8 +828,9 @@ class BlogDetailView(APIView):
                 relation = circle.onlinerelation.replace('_', ' ').title() if circle and circle.onlinerelation else "Connection"
                 
             # Check if current user has liked this blog
-            has_liked = user.id in blog.likes
-            has_shared = user.id in blog.shares
+            reacted = reaction_store.reacted(user.id, [blog.id], ('like', 'share'))
+            has_liked = (blog.id, 'like') in reacted
+            has_shared = (blog.id, 'share') in reacted
             
             # Get comments for this blog with proper serialization
             comments = Comment.objects.filter(parent_type='blog', parent=blog_id).order_by('created_at')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.models import BaseBlogModel
+from blog.models.answeringquestion_blog import (
+    MicroAnsweringQuestionBlog,
+    ShortEssayAnsweringQuestionBlog,
+    ArticleAnsweringQuestionBlog,
+)
+
+
+class Command(BaseCommand):
+    help = ('Copies questionid from the answering_question blog tables onto base_blog_model, '
+            'which QuestionAnswersView filters on. Safe to rerun.')
+
+    ANSWER_MODELS = [MicroAnsweringQuestionBlog, ShortEssayAnsweringQuestionBlog, ArticleAnsweringQuestionBlog]
+
+    def handle(self, *args, **options):
+        base_table = self.table(BaseBlogModel)
+        total = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model in self.ANSWER_MODELS:
+                # Concrete blog rows share their ID with the base row
+                cursor.execute(
+                    f"""
+                    UPDATE {base_table} AS b
+                    SET questionid = a.questionid
+                    FROM {self.table(model)} a
+                    WHERE a.id = b.id AND b.questionid IS DISTINCT FROM a.questionid
+                    """
+                )
+                total += cursor.rowcount
+                self.stdout.write(f"{model.__name__}: {cursor.rowcount} base blogs updated")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Question index backfilled ({total} base blogs updated)"))
+
+    @staticmethod
+    def table(model):
+        return connection.ops.quote_name(model._meta.db_table)
@@ -0,0 +1,115 @@
+import random
+import time
+import uuid
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+
+from users.models import Petitioner, Circle
+from users.services.presence import presence
+from blog.models import BaseBlogModel
+from blog.newmodel.services.blog_fanout import BlogFanoutEngine
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks blog fan-out for a synthetic circle (queries per post and wall time)'
+
+    # Synthetic users live far above real 14-digit village IDs
+    SYNTHETIC_ID_BASE = 99_000_000_000_000
+    PRESENCE_CONNECTION = 'benchmark_blog_fanout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=10000, help='Circle size of the synthetic author')
+        parser.add_argument('--posts', type=int, default=5, help='Number of posts to distribute')
+        parser.add_argument('--online-ratio', type=float, default=0.2, help='Fraction of members marked online')
+        parser.add_argument('--batch-size', type=int, default=BlogFanoutEngine.BATCH_SIZE, help='WebSocket send batch size')
+        parser.add_argument('--use-channel-layer', action='store_true',
+                            help='Send through the configured channel layer instead of an in-memory one')
+
+    def handle(self, *args, **options):
+        members = options['members']
+        posts = options['posts']
+
+        channel_layer = get_channel_layer() if options['use_channel_layer'] else InMemoryChannelLayer(capacity=members * posts + 100)
+        engine = BlogFanoutEngine(channel_layer, batch_size=options['batch_size'])
+
+        # Everything is rolled back at the end so the benchmark leaves no data behind
+        online_ids = []
+        with transaction.atomic():
+            author_id, online_ids = self.seed_circle(members, options['online_ratio'])
+            self.stdout.write(f"Seeded author {author_id} with {members} circle members")
+
+            timings = []
+            query_counts = []
+            totals = (0, 0)
+            for _ in range(posts):
+                blog = BaseBlogModel.objects.create(userid=author_id, type='journey_micro')
+                message_data = {
+                    "type": "blog_created",
+                    "blog_id": str(blog.id),
+                    "action": "blog_created",
+                    "blog_type": "journey",
+                    "user_id": author_id
+                }
+
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    audience = set(
+                        Circle.objects.filter(userid=author_id, otherperson__isnull=False)
+                        .values_list('otherperson', flat=True)
+                    ) | {author_id}
+                    online_sent, offline_updated = engine.fan_out(audience, message_data, blog.id, 'new_blogs')
+                    timings.append(time.perf_counter() - started)
+                query_counts.append(len(ctx.captured_queries))
+                totals = (totals[0] + online_sent, totals[1] + offline_updated)
+
+            transaction.set_rollback(True)
+
+        # Presence leases live in Redis, outside the transaction
+        for user_id in online_ids:
+            presence.disconnect(user_id, self.PRESENCE_CONNECTION)
+
+        avg_time = sum(timings) / len(timings) if timings else 0
+        avg_queries = sum(query_counts) / len(query_counts) if query_counts else 0
+        self.stdout.write(f"Posts distributed:   {posts}")
+        self.stdout.write(f"Online deliveries:   {totals[0]}")
+        self.stdout.write(f"Offline BlogLoads:   {totals[1]}")
+        self.stdout.write(f"Queries per post:    {avg_queries:.1f}")
+        self.stdout.write(f"Wall time per post:  {avg_time * 1000:.1f} ms (max {max(timings, default=0) * 1000:.1f} ms)")
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, synthetic data rolled back"))
+
+    def seed_circle(self, members, online_ratio):
+        """Create a synthetic author plus ``members`` petitioners in their circle"""
+        author_id = self.SYNTHETIC_ID_BASE
+        member_ids = [self.SYNTHETIC_ID_BASE + i for i in range(1, members + 1)]
+
+        petitioners = [
+            Petitioner(
+                id=user_id,
+                gmail=f"fanout.bench.{user_id}@example.com",
+                first_name="Bench",
+                last_name=str(user_id),
+                date_of_birth=date(1990, 1, 1),
+                age=30,
+                gender='O',
+                is_online=False,
+                password='!'
+            )
+            for user_id in [author_id] + member_ids
+        ]
+        Petitioner.objects.bulk_create(petitioners, batch_size=2000)
+
+        # Online members hold a presence lease, as an open socket would
+        online_ids = [member_id for member_id in member_ids if random.random() < online_ratio]
+        for user_id in online_ids:
+            presence.connect(user_id, self.PRESENCE_CONNECTION)
+
+        circles = [
+            Circle(id=uuid.uuid4(), userid=author_id, otherperson=member_id, onlinerelation='connections')
+            for member_id in member_ids
+        ]
+        Circle.objects.bulk_create(circles, batch_size=2000)
+        return author_id, online_ids
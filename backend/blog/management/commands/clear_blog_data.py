@@ -32,6 +32,8 @@ class Command(BaseCommand):
             'answering_question_blog_short_essay',
             'answering_question_blog_article',
             'user_shared_blog',
+            'reaction',
+            'blog_outbox',
         ]
 
         with transaction.atomic():
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.models import BlogLoad, BlogOutboxEntry
+
+
+class Command(BaseCommand):
+    help = ('Moves the pending new/modified/deleted blog ID arrays of BlogLoad into the blog outbox '
+            'and empties them, so offline users still get those blogs replayed.')
+
+    # (legacy array column, outbox kind)
+    ARRAY_COLUMNS = [
+        ('new_blogs', 'created'),
+        ('modified_blogs', 'modified'),
+        ('deleted_blogs', 'deleted'),
+    ]
+
+    def handle(self, *args, **options):
+        outbox_table = self.table(BlogOutboxEntry)
+        blog_load_table = self.table(BlogLoad)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for column, kind in self.ARRAY_COLUMNS:
+                # Array order is the order the events were recorded in
+                cursor.execute(
+                    f"""
+                    INSERT INTO {outbox_table} (userid, blog_id, kind, created_at)
+                    SELECT bl.userid, u.blog_id, %s, now()
+                    FROM {blog_load_table} bl, unnest(bl.{column}) WITH ORDINALITY AS u(blog_id, position)
+                    WHERE cardinality(bl.{column}) > 0 AND u.blog_id IS NOT NULL
+                    ORDER BY bl.userid, u.position
+                    """,
+                    [kind]
+                )
+                self.stdout.write(f"BlogLoad.{column}: {cursor.rowcount} {kind} events moved to the outbox")
+
+            cursor.execute(
+                f"""
+                UPDATE {blog_load_table}
+                SET new_blogs = '{{}}', modified_blogs = '{{}}', deleted_blogs = '{{}}'
+                WHERE cardinality(new_blogs) > 0 OR cardinality(modified_blogs) > 0
+                   OR cardinality(deleted_blogs) > 0
+                """
+            )
+            self.stdout.write(f"BlogLoad: legacy arrays cleared on {cursor.rowcount} rows")
+
+        self.stdout.write(self.style.SUCCESS('Blog loads migrated successfully!'))
+
+    @staticmethod
+    def table(model):
+        return connection.ops.quote_name(model._meta.db_table)
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.models import BaseBlogModel, Comment, Reaction, UserSharedBlog
+
+
+class Command(BaseCommand):
+    help = ('Moves the legacy likes/dislikes/relevant/irrelevant/shares user ID arrays into blog.reaction '
+            'and recomputes reaction_counts. The arrays are emptied in the same transaction, so a rerun '
+            'does not restore reactions removed since.')
+
+    # (model, legacy array column, reaction kind)
+    ARRAY_COLUMNS = [
+        (BaseBlogModel, 'likes', 'like'),
+        (BaseBlogModel, 'dislikes', 'dislike'),
+        (BaseBlogModel, 'relevant_count', 'relevant'),
+        (BaseBlogModel, 'irrelevant_count', 'irrelevant'),
+        (BaseBlogModel, 'shares', 'share'),
+        (Comment, 'likes', 'like'),
+        (Comment, 'dislikes', 'dislike'),
+    ]
+
+    def handle(self, *args, **options):
+        reaction_table = self.table(Reaction)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model, column, kind in self.ARRAY_COLUMNS:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {reaction_table} (target_id, user_id, kind, created_at)
+                    SELECT DISTINCT t.id, u.user_id, %s, now()
+                    FROM {self.table(model)} t, unnest(t.{column}) AS u(user_id)
+                    WHERE cardinality(t.{column}) > 0 AND u.user_id IS NOT NULL
+                    ON CONFLICT (target_id, kind, user_id) DO NOTHING
+                    """,
+                    [kind]
+                )
+                self.stdout.write(f"{model.__name__}.{column}: {cursor.rowcount} {kind} reactions copied")
+
+            # Shares recorded only in user_shared_blogs
+            cursor.execute(
+                f"""
+                INSERT INTO {reaction_table} (target_id, user_id, kind, created_at)
+                SELECT DISTINCT s.shared_blog_id, s.userid, 'share', now()
+                FROM {self.table(UserSharedBlog)} s
+                ON CONFLICT (target_id, kind, user_id) DO NOTHING
+                """
+            )
+            self.stdout.write(f"UserSharedBlog: {cursor.rowcount} share reactions copied")
+
+            # Empty the copied arrays before committing so a rerun cannot copy them again
+            for model in (BaseBlogModel, Comment):
+                columns = [column for array_model, column, _ in self.ARRAY_COLUMNS if array_model is model]
+                cursor.execute(
+                    f"UPDATE {self.table(model)} SET "
+                    + ", ".join(f"{column} = '{{}}'" for column in columns)
+                    + " WHERE " + " OR ".join(f"cardinality({column}) > 0" for column in columns)
+                )
+                self.stdout.write(f"{model.__name__}: legacy arrays cleared on {cursor.rowcount} rows")
+
+            for model in (BaseBlogModel, Comment):
+                cursor.execute(
+                    f"""
+                    UPDATE {self.table(model)} AS t
+                    SET reaction_counts = COALESCE((
+                        SELECT jsonb_object_agg(kind, total)
+                        FROM (
+                            SELECT kind, count(*) AS total
+                            FROM {reaction_table} r
+                            WHERE r.target_id = t.id
+                            GROUP BY kind
+                        ) per_kind
+                    ), '{{}}'::jsonb)
+                    """
+                )
+                self.stdout.write(f"{model.__name__}: reaction_counts recomputed for {cursor.rowcount} rows")
+
+        self.stdout.write(self.style.SUCCESS('Reactions migrated successfully!'))
+
+    @staticmethod
+    def table(model):
+        return connection.ops.quote_name(model._meta.db_table)
@@ -6,12 +6,17 @@ class BaseBlogModel(models.Model):
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)  # Using UUID instead of BigAutoField
     userid = models.BigIntegerField(null=True, blank=True)  # User ID associated with the blog entry
+    # Reaction totals by kind ({"like": 3, "share": 1}), maintained by the reaction store.
+    # The user ID arrays below are legacy; reactions now live in blog.reaction.
+    reaction_counts = models.JSONField(default=dict, blank=True)
     likes = ArrayField(models.BigIntegerField(), blank=True, default=list)
     dislikes = ArrayField(models.BigIntegerField(), blank=True, default=list)
     relevant_count = ArrayField(models.BigIntegerField(), blank=True, default=list)
     irrelevant_count = ArrayField(models.BigIntegerField(), blank=True, default=list)
     shares = ArrayField(models.BigIntegerField(), blank=True, default=list)
     type= models.CharField(max_length=50, blank=True, null=True)  # Type of the blog entry
+    # Question answered by an answering_question blog, copied from the concrete row
+    questionid = models.IntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     comments = ArrayField(models.UUIDField(), blank=True, default=list)
@@ -19,6 +24,16 @@ class BaseBlogModel(models.Model):
 
     class Meta:
          db_table = 'blog"."base_blog_model'
+         indexes = [
+             # Keyset pagination of the circle feed
+             models.Index(fields=['userid', '-created_at', '-id']),
+             # Keyset pagination of a question's answers
+             models.Index(
+                 fields=['questionid', '-created_at', '-id'],
+                 name='base_blog_question_idx',
+                 condition=models.Q(questionid__isnull=False)
+             ),
+         ]
     def get_all_comments(self):
         """Get all comments for this blog with their replies in a hierarchical structure"""
         from ..blogpage.serializers import CommentSerializer  # Avoid circular import
@@ -9,6 +9,8 @@ class BlogLoad(models.Model):
     new_blogs = ArrayField(models.UUIDField(), blank=True, default=list)
     deleted_blogs = ArrayField(models.UUIDField(), blank=True, default=list)
     outdated=models.BooleanField(default=False)
+    # Last BlogOutboxEntry seq the user's client has acknowledged
+    replayed_seq = models.BigIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -16,3 +18,32 @@ class BlogLoad(models.Model):
     class Meta:
         db_table = 'blog"."blog_load'
 
+
+class BlogOutboxEntry(models.Model):
+    """
+    A blog event an offline user missed, in the order it happened. ``seq``
+    increases across all users, so "everything after seq N" is an index
+    range scan on (userid, seq).
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('modified', 'Modified'),
+        ('deleted', 'Deleted'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    userid = models.BigIntegerField()
+    blog_id = models.UUIDField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.userid} #{self.seq} {self.kind} {self.blog_id}"
+
+    class Meta:
+        db_table = 'blog"."blog_outbox'
+        indexes = [
+            models.Index(fields=['userid', 'seq']),
+            models.Index(fields=['created_at']),
+        ]
+
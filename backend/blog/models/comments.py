@@ -25,7 +25,9 @@ class Comment(models.Model):
         db_index=True,
     )
 
-    # reactions
+    # reactions: totals by kind, maintained by the reaction store (blog.reaction);
+    # the user ID arrays are legacy
+    reaction_counts = models.JSONField(default=dict, blank=True)
     likes = ArrayField(models.BigIntegerField(), blank=True, default=list)
     dislikes = ArrayField(models.BigIntegerField(), blank=True, default=list)
 
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class Reaction(models.Model):
+    """
+    One reaction of one user on a blog or a comment. Blog and comment IDs
+    are both UUIDs, so ``target_id`` identifies either without a type column.
+    The denormalised totals live in ``reaction_counts`` on the target row.
+    """
+    KIND_CHOICES = [
+        ('like', 'Like'),
+        ('dislike', 'Dislike'),
+        ('relevant', 'Relevant'),
+        ('irrelevant', 'Irrelevant'),
+        ('share', 'Share'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    target_id = models.UUIDField()
+    user_id = models.BigIntegerField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'blog"."reaction'
+        constraints = [
+            # Also serves "who reacted" (target_id, kind) and "has this user reacted" lookups
+            models.UniqueConstraint(fields=['target_id', 'kind', 'user_id'], name='unique_reaction'),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id} {self.kind} {self.target_id}"
@@ -11,9 +11,12 @@ from ..services.blog_distribution import BlogDistributionService
 from ..services.blog_interaction import BlogInteractionService
 from blog.models import BaseBlogModel, Comment, UserSharedBlog
 from ..utils.blog_data_builder import BlogDataBuilder
-from users.models import UserTree, Circle
+from ..utils.keyset_pagination import encode_cursor, keyset_filter, parse_page_params
+from users.models import UserTree
+from users.services.audience_index import audience_index
 from django.shortcuts import get_object_or_404
 from django.db import connection
+from django.db.models import Max
 from ..serializers.blog_serializers import BlogSerializer
 
 class BlogCreateAPIView(APIView):
@@ -100,8 +103,9 @@ class CommentView(APIView):
     
     def get(self, request, blog_id):
         """Get all comments for a blog"""
-        comments = Comment.objects.filter(parent_type='blog', parent=blog_id).order_by('created_at')
-        serializer = CommentSerializer(comments, many=True, context={'request': request})
+        comments = list(Comment.objects.filter(parent_type='blog', parent=blog_id).order_by('created_at'))
+        user_map = UserTree.objects.in_bulk({comment.user_id for comment in comments})
+        serializer = CommentSerializer(comments, many=True, context={'request': request, 'user_map': user_map})
         return Response(serializer.data)
     
     def post(self, request, blog_id):
@@ -181,143 +185,133 @@ class ReplyView(APIView):
 class CircleBlogsView(generics.GenericAPIView):
     """
     Get blogs for user's circle (including shared blogs) - New Implementation
+
+    Keyset-paginated: the feed is ordered by (timestamp, blog id) descending,
+    where the timestamp is created_at for posts by the circle and the latest
+    share time for blogs the circle shared from outside it. Pass the returned
+    ``next_cursor`` back as ``?cursor=`` to load the next page.
     """
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
-    
+
+    PAGE_SIZE = 10
+    MAX_PAGE_SIZE = 50
+
     def get(self, request):
         user = request.user
-        
-        # Get all circle contacts for current user
-        circles_qs = Circle.objects.filter(userid=user.id)
-        circle_user_ids = {circle.otherperson for circle in circles_qs if circle.otherperson}
+
+        try:
+            page_size, cursor = parse_page_params(request.query_params, self.PAGE_SIZE, self.MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({'error': 'Invalid cursor or page_size'}, status=status.HTTP_400_BAD_REQUEST)
+
         # Include self in the list of users to get blogs from
-        user_ids = list(circle_user_ids) + [user.id]
-        
-        # Get base blogs from circle contacts and self (original posts)
-        original_base_blogs = BaseBlogModel.objects.filter(userid__in=user_ids).order_by('-created_at')
-        print(f"[BLOGS] Initial fetched count from DB: {original_base_blogs.count()} for user {user.id}")
+        user_ids = list(audience_index.members(user.id) | {user.id})
 
-        # Get shared blogs by circle users
-        shared_blogs_by_circle = self.get_shared_blogs_by_circle_users(user_ids)
-        
-        # Combine and deduplicate blogs with proper timestamp sorting
-        combined_blogs = self.combine_and_sort_blogs(original_base_blogs, shared_blogs_by_circle)
-        
-        print(f"[BLOGS] After combining - Original: {original_base_blogs.count()}, Shared: {len(shared_blogs_by_circle)}, Combined: {len(combined_blogs)}")
+        # One page (+1 to detect more) from each source, merged on the sort key
+        original_items = self.get_original_blog_items(user_ids, cursor, page_size + 1)
+        shared_items = self.get_shared_blog_items(user_ids, cursor, page_size + 1)
+        combined_items = sorted(
+            original_items + shared_items,
+            key=lambda item: (item['timestamp'], item['blog_id']),
+            reverse=True
+        )
+        page_items = combined_items[:page_size]
+        has_more = len(combined_items) > page_size
+
+        print(f"[BLOGS] Page for user {user.id}: {len(page_items)} blogs "
+              f"(original candidates: {len(original_items)}, shared candidates: {len(shared_items)})")
+
+        page_blog_ids = [item['blog_id'] for item in page_items]
+        base_blogs = BaseBlogModel.objects.in_bulk(page_blog_ids)
+        share_info_map = self.get_share_info_map(page_blog_ids, user_ids)
 
-        # Build blog data using the BlogDataBuilder
+        # Build blog data for the whole page using the BlogDataBuilder
         blog_data_builder = BlogDataBuilder(user, request)
+        blog_data_map = blog_data_builder.get_blogs_data(
+            base_blogs[blog_id] for blog_id in page_blog_ids if blog_id in base_blogs
+        )
+
         processed_blogs = []
-        
-        for blog_data_item in combined_blogs:
-            base_blog = blog_data_item['blog']
-            is_shared = blog_data_item['is_shared']
-            share_timestamp = blog_data_item['timestamp']
-            
-            # Use BlogDataBuilder to get complete blog data
-            blog_data = blog_data_builder.get_blog_data(base_blog)
+        for item in page_items:
+            blog_data = blog_data_map.get(item['blog_id'])
             if not blog_data:
                 continue
-                
-            # Add share information
-            blog_data['is_shared'] = is_shared
-            blog_data['sort_timestamp'] = share_timestamp
-            
-            # Get share info if it's a shared blog
-            if is_shared:
-                share_info = self.get_share_info(base_blog.id, user.id)
-                blog_data['shared_by_user_id'] = share_info.get('shared_by_user_id')
-                blog_data['shared_at'] = share_info.get('shared_at')
-            
+
+            share_info = share_info_map.get(item['blog_id'])
+            blog_data['is_shared'] = share_info is not None
+            blog_data['sort_timestamp'] = item['timestamp']
+            if share_info:
+                blog_data['shared_by_user_id'] = share_info['shared_by_user_id']
+                blog_data['shared_at'] = share_info['shared_at']
             processed_blogs.append(blog_data)
 
-        # Final sort by timestamp (most recent first)
-        processed_blogs.sort(key=lambda x: x['sort_timestamp'], reverse=True)
-        
-        # Serialize using the new BlogSerializer
         serializer = BlogSerializer(processed_blogs, many=True, context={'request': request})
-        return Response(serializer.data)
 
-    def get_shared_blogs_by_circle_users(self, user_ids):
-        """Get blogs shared by circle users with share timestamp"""
-        # Get recent shares by circle users
-        recent_shared_blogs = UserSharedBlog.objects.filter(
-            userid__in=user_ids
-        ).order_by('-shared_at')
-        
-        # Get the actual blog objects that were shared
-        shared_blog_ids = [share.shared_blog_id for share in recent_shared_blogs]
-        shared_blogs = BaseBlogModel.objects.filter(id__in=shared_blog_ids)
-        
-        # Create a mapping for quick access
-        shared_blog_map = {blog.id: blog for blog in shared_blogs}
-        
-        # Return blogs with their share timestamps
-        result = []
-        for share in recent_shared_blogs:
-            blog = shared_blog_map.get(share.shared_blog_id)
-            if blog:
-                result.append({
-                    'blog': blog,
-                    'share_timestamp': share.shared_at,
-                    'is_shared': True
-                })
-                
-        return result
+        next_cursor = None
+        if has_more and page_items:
+            last_item = page_items[-1]
+            next_cursor = encode_cursor(last_item['timestamp'], last_item['blog_id'])
 
-    def combine_and_sort_blogs(self, original_blogs, shared_blogs):
-        """Combine original and shared blogs, deduplicate and sort by timestamp"""
-        blog_dict = {}  # Use dict to deduplicate by blog ID
-        
-        # Process original blogs (use created_at as timestamp)
-        for blog in original_blogs:
-            if blog.id not in blog_dict:
-                blog_dict[blog.id] = {
-                    'blog': blog,
-                    'timestamp': blog.created_at,
-                    'is_shared': False
-                }
-        
-        # Process shared blogs (use share_timestamp, prefer later timestamp if already exists)
-        for shared_data in shared_blogs:
-            blog = shared_data['blog']
-            share_timestamp = shared_data['share_timestamp']
-            
-            if blog.id in blog_dict:
-                # If this blog is already in the list (as original), mark it as shared
-                existing_data = blog_dict[blog.id]
-                existing_data['is_shared'] = True
-            else:
-                # New blog (only shared, not original)
-                blog_dict[blog.id] = {
-                    'blog': blog,
-                    'timestamp': share_timestamp,
-                    'is_shared': True
-                }
-        
-        # Convert to list and sort by timestamp (most recent first)
-        combined_list = list(blog_dict.values())
-        combined_list.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        return combined_list
+        return Response({
+            'results': serializer.data,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        })
 
-    def get_share_info(self, blog_id, current_user_id):
-        """Get share information for a specific blog"""
-        try:
-            share = UserSharedBlog.objects.filter(
-                shared_blog_id=blog_id
-            ).order_by('-shared_at').first()
-            
-            if share:
-                return {
-                    'shared_by_user_id': share.userid,
-                    'shared_at': share.shared_at
-                }
-        except UserSharedBlog.DoesNotExist:
-            pass
-        
-        return {}
+    def get_original_blog_items(self, user_ids, cursor, limit):
+        """Posts written by the circle (and self), keyed on created_at"""
+        queryset = BaseBlogModel.objects.filter(userid__in=user_ids)
+        if cursor:
+            queryset = queryset.filter(keyset_filter('created_at', 'id', cursor))
+        rows = queryset.order_by('-created_at', '-id').values_list('id', 'created_at')[:limit]
+        return [{'blog_id': blog_id, 'timestamp': created_at} for blog_id, created_at in rows]
+
+    def get_shared_blog_items(self, user_ids, cursor, limit):
+        """
+        Blogs from outside the circle shared by circle users, keyed on their
+        latest share. Blogs written by the circle already appear as originals.
+        """
+        queryset = (
+            UserSharedBlog.objects
+            .filter(userid__in=user_ids)
+            .exclude(shared_blog_id__in=BaseBlogModel.objects.filter(userid__in=user_ids).values('id'))
+            .values('shared_blog_id')
+            .annotate(last_shared_at=Max('shared_at'))
+        )
+        if cursor:
+            queryset = queryset.filter(keyset_filter('last_shared_at', 'shared_blog_id', cursor))
+        rows = queryset.order_by('-last_shared_at', '-shared_blog_id')[:limit]
+        return [{'blog_id': row['shared_blog_id'], 'timestamp': row['last_shared_at']} for row in rows]
+
+    def get_share_info_map(self, blog_ids, user_ids):
+        """
+        Latest share of each page blog, for blogs shared by the circle.
+        Returns {blog_id: {'shared_by_user_id', 'shared_at'}}.
+        """
+        if not blog_ids:
+            return {}
+
+        shared_by_circle = set(
+            UserSharedBlog.objects.filter(shared_blog_id__in=blog_ids, userid__in=user_ids)
+            .values_list('shared_blog_id', flat=True)
+            .distinct()
+        )
+        if not shared_by_circle:
+            return {}
+
+        latest_shares = (
+            UserSharedBlog.objects.filter(shared_blog_id__in=shared_by_circle)
+            .order_by('shared_blog_id', '-shared_at')
+            .distinct('shared_blog_id')
+        )
+        return {
+            share.shared_blog_id: {
+                'shared_by_user_id': share.userid,
+                'shared_at': share.shared_at
+            }
+            for share in latest_shares
+        }
 
 
 class BlogDetailView(APIView):
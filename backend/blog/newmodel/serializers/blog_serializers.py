@@ -8,6 +8,7 @@ from django.apps import apps
 import django.db.models as django_models
 import uuid
 from users.profilepic_manager.utils import get_profilepic_url
+from ..services.reaction_store import reaction_store
 
 
 
@@ -24,8 +25,9 @@ class CommentSerializer(serializers.Serializer):
     id = serializers.UUIDField()
     user = CommentUserSerializer()
     text = serializers.CharField()
-    likes = serializers.ListField(child=serializers.IntegerField())
-    dislikes = serializers.ListField(child=serializers.IntegerField())
+    likes = serializers.IntegerField()
+    dislikes = serializers.IntegerField()
+    reaction_counts = serializers.DictField(child=serializers.IntegerField())
     created_at = serializers.DateTimeField()
     replies = serializers.ListField(child=serializers.DictField(), required=False)
 
@@ -35,11 +37,15 @@ class CommentSerializer(serializers.Serializer):
         """
         request = self.context.get('request')
         
-        # Get user object
-        try:
-            user = UserTree.objects.get(id=instance.user_id)
-        except UserTree.DoesNotExist:
-            user = None
+        # Get user object, from the caller's batch-loaded users when given
+        user_map = self.context.get('user_map')
+        if user_map is not None:
+            user = user_map.get(instance.user_id)
+        else:
+            try:
+                user = UserTree.objects.get(id=instance.user_id)
+            except UserTree.DoesNotExist:
+                user = None
         
         # Use the CommentUserSerializer to ensure consistent profile pic formatting
         user_serializer = CommentUserSerializer(
@@ -57,8 +63,9 @@ class CommentSerializer(serializers.Serializer):
             "id": str(instance.id),
             "user": user_data,
             "text": instance.text,
-            "likes": instance.likes or [],
-            "dislikes": instance.dislikes or [],
+            "likes": reaction_store.count(instance, 'like'),
+            "dislikes": reaction_store.count(instance, 'dislike'),
+            "reaction_counts": reaction_store.counts(instance),
             "created_at": instance.created_at.isoformat() if instance.created_at else None,
             "replies": getattr(instance, 'replies', []),  # Use the replies added in the view
         }
@@ -90,10 +97,11 @@ class BlogBodySerializer(serializers.Serializer):
     body_type_fields = serializers.DictField()
 
 class BlogFooterSerializer(serializers.Serializer):
-    likes = serializers.ListField(child=serializers.IntegerField())
-    relevant_count = serializers.ListField(child=serializers.IntegerField())
-    irrelevant_count = serializers.ListField(child=serializers.IntegerField())
-    shares = serializers.ListField(child=serializers.IntegerField())
+    likes = serializers.IntegerField()
+    relevant_count = serializers.IntegerField()
+    irrelevant_count = serializers.IntegerField()
+    shares = serializers.IntegerField()
+    reaction_counts = serializers.DictField(child=serializers.IntegerField())
     comments = serializers.ListField(child=serializers.CharField())
     has_liked = serializers.BooleanField()
     has_shared = serializers.BooleanField()
@@ -452,10 +460,11 @@ class BlogSerializer(serializers.Serializer):
             body_type_fields['failure_reason'] = getattr(concrete_blog, 'failure_reason', None)
 
         footer_data = {
-            'likes': base_blog.likes,
-            'relevant_count': base_blog.relevant_count,
-            'irrelevant_count': base_blog.irrelevant_count,
-            'shares': base_blog.shares,
+            'likes': reaction_store.count(base_blog, 'like'),
+            'relevant_count': reaction_store.count(base_blog, 'relevant'),
+            'irrelevant_count': reaction_store.count(base_blog, 'irrelevant'),
+            'shares': reaction_store.count(base_blog, 'share'),
+            'reaction_counts': reaction_store.counts(base_blog),
             'comments': base_blog.comments,
             'has_liked': instance['has_liked'],
             'has_shared': instance['has_shared']
@@ -131,7 +131,9 @@ class BlogCreationService:
         # Create base blog
         base_blog = BaseBlogModel.objects.create(
             userid=userid,
-            type=f"{blog_type}_{content_type}"
+            type=f"{blog_type}_{content_type}",
+            # Indexes the answer under its question (QuestionAnswersView)
+            questionid=self.validated_data.get('questionid') if blog_type == 'answering_question' else None
         )
 
         # Create concrete blog based on type
@@ -1,10 +1,11 @@
 from django.db import transaction
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from users.models import Circle, Petitioner
-from blog.models import BlogLoad, BaseBlogModel
-from ..utils.blog_data_builder import BlogDataBuilder
-from ..serializers.blog_serializers import BlogSerializer
+from users.services.audience_index import audience_index
+from blog.models import BaseBlogModel
+from .blog_fanout import BlogFanoutEngine
+from .blog_event_pipeline import BlogEventPipeline
+from .reaction_store import reaction_store
+from .blog_payload_cache import blog_payload_cache
 
 class BlogDistributionService:
     """
@@ -15,6 +16,18 @@ class BlogDistributionService:
     def __init__(self, request):
         self.request = request
         self.channel_layer = get_channel_layer()
+        self.fanout = BlogFanoutEngine(self.channel_layer)
+        self.event_pipeline = BlogEventPipeline(fanout=self.fanout)
+
+    @staticmethod
+    def get_circle_member_ids(user_id):
+        """Return the set of circle contact IDs for a user"""
+        return audience_index.members(user_id)
+
+    @staticmethod
+    def get_sharer_ids(blog):
+        """Return the set of users currently sharing a blog"""
+        return set(reaction_store.user_ids(blog.id, 'share'))
     
     def get_audience_for_blog(self, blog):
         """
@@ -26,16 +39,15 @@ class BlogDistributionService:
         author_id = blog.userid
         
         # Get author's circle contacts
-        author_circles = Circle.objects.filter(userid=author_id)
-        circle_user_ids = {circle.otherperson for circle in author_circles if circle.otherperson}
+        circle_user_ids = self.get_circle_member_ids(author_id)
         
         # Include people who shared this blog (they should get updates too)
-        sharer_ids = set(blog.shares) if blog.shares else set()
+        sharer_ids = self.get_sharer_ids(blog)
         
         # Include author in the audience
         audience = list(circle_user_ids.union({author_id}).union(sharer_ids))
         
-        print(f"[BLOG DISTRIBUTION] Audience for blog {blog.id}: {audience}")
+        print(f"[BLOG DISTRIBUTION] Audience for blog {blog.id}: {len(audience)} users")
         return audience
     
     def get_audience_for_shared_blog(self, blog, sharer_id):
@@ -49,21 +61,19 @@ class BlogDistributionService:
         author_id = blog.userid
         
         # Get author's circle
-        author_circles = Circle.objects.filter(userid=author_id)
-        author_circle_ids = {circle.otherperson for circle in author_circles if circle.otherperson}
+        author_circle_ids = self.get_circle_member_ids(author_id)
         
         # Get sharer's circle
-        sharer_circles = Circle.objects.filter(userid=sharer_id)
-        sharer_circle_ids = {circle.otherperson for circle in sharer_circles if circle.otherperson}
+        sharer_circle_ids = self.get_circle_member_ids(sharer_id)
         
         # Get people who already shared this blog
-        existing_sharers = set(blog.shares) if blog.shares else set()
+        existing_sharers = self.get_sharer_ids(blog)
         
         # Combine all audiences: both circles + author + sharer + existing sharers
         audience = author_circle_ids.union(sharer_circle_ids).union({author_id, sharer_id}).union(existing_sharers)
         audience = list(audience)
         
-        print(f"[BLOG DISTRIBUTION] Audience for shared blog {blog.id}: {audience}")
+        print(f"[BLOG DISTRIBUTION] Audience for shared blog {blog.id}: {len(audience)} users")
         return audience
     
     def get_audience_for_unshare(self, blog, unsharer_id):
@@ -74,120 +84,87 @@ class BlogDistributionService:
         author_id = blog.userid
         
         # Get author's circle
-        author_circles = Circle.objects.filter(userid=author_id)
-        author_circle_ids = {circle.otherperson for circle in author_circles if circle.otherperson}
+        author_circle_ids = self.get_circle_member_ids(author_id)
         
         # Get unsharer's circle (people who saw the share)
-        unsharer_circles = Circle.objects.filter(userid=unsharer_id)
-        unsharer_circle_ids = {circle.otherperson for circle in unsharer_circles if circle.otherperson}
+        unsharer_circle_ids = self.get_circle_member_ids(unsharer_id)
         
         # Get people who still share this blog (they need share count updates)
-        remaining_sharers = set(blog.shares) if blog.shares else set()
+        remaining_sharers = self.get_sharer_ids(blog)
         
         # Combine: both circles + author + unsharer + remaining sharers
         audience = author_circle_ids.union(unsharer_circle_ids).union({author_id, unsharer_id}).union(remaining_sharers)
         audience = list(audience)
         
-        print(f"[BLOG DISTRIBUTION] Audience for unshare blog {blog.id}: {audience}")
+        print(f"[BLOG DISTRIBUTION] Audience for unshare blog {blog.id}: {len(audience)} users")
         return audience
     
     def prepare_blog_data(self, blog):
         """
-        Prepare complete blog data for WebSocket transmission
+        Prepare the viewer-independent blog body for WebSocket transmission,
+        shared with every other event on the same blog version
         """
         try:
-            builder = BlogDataBuilder(self.request.user, self.request)
-            blog_data = builder.get_blog_data(blog)
+            body = blog_payload_cache.body(blog, self.request)
             
-            if not blog_data:
+            if not body:
                 print(f"[BLOG DISTRIBUTION] No blog data found for blog {blog.id}")
                 return None
             
-            # Serialize the blog data
-            serializer = BlogSerializer(blog_data, context={'request': self.request})
-            serialized_data = serializer.data
-            
-            # Convert UUIDs and datetime objects to strings for JSON serialization
-            serialized_data = self.recursive_convert_objects_to_str(serialized_data)
-            
-            return serialized_data
+            return body
             
         except Exception as e:
             print(f"[BLOG DISTRIBUTION] Error preparing blog data: {str(e)}")
             return None
     
+    def personalise_blog(self, message_data, blog, body):
+        """
+        ``personalise`` callback for the fan-out: a copy of ``message_data``
+        per recipient with the blog rendered for them (relation labels,
+        has_liked/has_shared), computed for the whole batch at once
+        """
+        def personalise(user_ids):
+            overlays = blog_payload_cache.overlays(user_ids, {blog.id: body})
+            return {
+                user_id: {**message_data, "blog": blog_payload_cache.render(body, overlays[(user_id, blog.id)])}
+                for user_id in user_ids
+            }
+        return personalise
+    
+    def render_for_actor(self, blog, body):
+        """The blog as the acting user sees it, for the blog-specific channel"""
+        user_id = self.request.user.id
+        overlays = blog_payload_cache.overlays([user_id], {blog.id: body})
+        return blog_payload_cache.render(body, overlays[(user_id, blog.id)])
+    
     def send_to_online_users(self, user_ids, message_data):
         """
-        Send WebSocket message to online users
-        """
-        sent_count = 0
-        for user_id in user_ids:
-            try:
-                user_obj = Petitioner.objects.get(id=user_id)
-                if user_obj.is_online:
-                    async_to_sync(self.channel_layer.group_send)(
-                        f"notifications_{user_id}",
-                        message_data
-                    )
-                    print(f"[BLOG DISTRIBUTION] Sent to online user {user_id}")
-                    sent_count += 1
-                else:
-                    print(f"[BLOG DISTRIBUTION] User {user_id} is offline, storing in BlogLoad")
-                    
-            except Petitioner.DoesNotExist:
-                print(f"[BLOG DISTRIBUTION] User {user_id} does not exist")
-                continue
+        Send WebSocket message to the online users among user_ids
+        """
+        online_ids, _ = self.fanout.partition_audience(user_ids)
+        sent_count = self.fanout.send_to_users(online_ids, message_data)
         
         print(f"[BLOG DISTRIBUTION] Successfully sent to {sent_count} online users")
         return sent_count
     
     def update_blog_load_for_offline_users(self, user_ids, blog_id, list_type='new_blogs'):
         """
-        Update BlogLoad for offline users
-        """
-        updated_count = 0
-        for user_id in user_ids:
-            try:
-                user_obj = Petitioner.objects.get(id=user_id)
-                if not user_obj.is_online:
-                    self._update_single_blog_load(user_id, blog_id, list_type)
-                    print(f"[BLOG DISTRIBUTION] Updated BlogLoad for offline user {user_id}")
-                    updated_count += 1
-                    
-            except Petitioner.DoesNotExist:
-                print(f"[BLOG DISTRIBUTION] User {user_id} does not exist")
-                continue
-        
-        print(f"[BLOG DISTRIBUTION] Successfully updated BlogLoad for {updated_count} offline users")
+        Record the event in the blog outbox of the offline users among user_ids
+        """
+        _, offline_ids = self.fanout.partition_audience(user_ids)
+        updated_count = self.fanout.append_to_outbox(offline_ids, blog_id, list_type)
+        
+        print(f"[BLOG DISTRIBUTION] Recorded the event for {updated_count} offline users")
         return updated_count
     
     def _update_single_blog_load(self, user_id, blog_id, list_type):
         """
-        Update BlogLoad for a single user
+        Record the event in a single user's blog outbox
         """
         try:
-            blog_load, created = BlogLoad.objects.get_or_create(
-                userid=user_id,
-                defaults={
-                    'new_blogs': [],
-                    'modified_blogs': [],
-                    'loaded_blogs': [],
-                    'deleted_blogs': [],
-                    list_type: [blog_id]
-                }
-            )
-            
-            if not created:
-                current_list = getattr(blog_load, list_type)
-                if blog_id not in current_list:
-                    current_list.append(blog_id)
-                    setattr(blog_load, list_type, current_list)
-                    # blog_load.outdated = True
-                    
-                    blog_load.save()
-                    
+            self.fanout.append_to_outbox([user_id], blog_id, list_type)
         except Exception as e:
-            print(f"[BLOG DISTRIBUTION] Error updating BlogLoad for user {user_id}: {str(e)}")
+            print(f"[BLOG DISTRIBUTION] Error recording outbox event for user {user_id}: {str(e)}")
     
     def distribute_new_blog(self, blog):
         """
@@ -196,9 +173,9 @@ class BlogDistributionService:
         print(f"[BLOG DISTRIBUTION] Distributing new blog: {blog.id}")
         
         audience = self.get_audience_for_blog(blog)
-        blog_data = self.prepare_blog_data(blog)
+        body = self.prepare_blog_data(blog)
         
-        if not blog_data:
+        if not body:
             print(f"[BLOG DISTRIBUTION] Failed to prepare blog data for {blog.id}")
             return
         
@@ -211,21 +188,18 @@ class BlogDistributionService:
             "blog_id": str(blog.id),
             "action": "blog_created", 
             "blog_type": blog_base_type,
-            "blog": blog_data,
+            "blog": self.render_for_actor(blog, body),
             "user_id": self.request.user.id
         }
         
-        # Send to online users
-        online_sent = self.send_to_online_users(audience, message_data)
-        
-        # Update BlogLoad for offline users
-        offline_updated = self.update_blog_load_for_offline_users(audience, blog.id, 'new_blogs')
+        # Send to online users and record the event for offline users
+        online_sent, offline_updated = self.fanout.fan_out(
+            audience, message_data, blog.id, 'new_blogs',
+            personalise=self.personalise_blog(message_data, blog, body)
+        )
         
         # Also send to blog-specific channel for real-time subscribers
-        async_to_sync(self.channel_layer.group_send)(
-            f"blog_{blog.id}",
-            message_data
-        )
+        self.fanout.send_to_group(f"blog_{blog.id}", message_data)
         
         print(f"[BLOG DISTRIBUTION] Successfully distributed blog {blog.id} to {len(audience)} users "
               f"({online_sent} online, {offline_updated} offline)")
@@ -237,9 +211,9 @@ class BlogDistributionService:
         print(f"[BLOG DISTRIBUTION] Distributing blog share: {blog.id} by user {sharer_id}")
         
         audience = self.get_audience_for_shared_blog(blog, sharer_id)
-        blog_data = self.prepare_blog_data(blog)
+        body = self.prepare_blog_data(blog)
         
-        if not blog_data:
+        if not body:
             print(f"[BLOG DISTRIBUTION] Failed to prepare blog data for share {blog.id}")
             return
         
@@ -247,24 +221,21 @@ class BlogDistributionService:
             "type": "blog_shared", 
             "blog_id": str(blog.id),
             "action": "shared",
-            "blog": blog_data,
+            "blog": self.render_for_actor(blog, body),
             "shared_by_user_id": sharer_id,
             "original_author_id": blog.userid,
             "user_id": self.request.user.id,
-            "shares_count": len(blog.shares) if blog.shares else 0
+            "shares_count": reaction_store.count(blog, 'share')
         }
         
-        # Send to online users
-        online_sent = self.send_to_online_users(audience, message_data)
-        
-        # Update BlogLoad for offline users
-        offline_updated = self.update_blog_load_for_offline_users(audience, blog.id, 'new_blogs')
+        # Send to online users and record the event for offline users
+        online_sent, offline_updated = self.fanout.fan_out(
+            audience, message_data, blog.id, 'new_blogs',
+            personalise=self.personalise_blog(message_data, blog, body)
+        )
         
         # Send to blog-specific channel
-        async_to_sync(self.channel_layer.group_send)(
-            f"blog_{blog.id}",
-            message_data
-        )
+        self.fanout.send_to_group(f"blog_{blog.id}", message_data)
         
         print(f"[BLOG DISTRIBUTION] Successfully distributed share for blog {blog.id} to {len(audience)} users "
               f"({online_sent} online, {offline_updated} offline)")
@@ -285,111 +256,78 @@ class BlogDistributionService:
             "shared_by_user_id": unsharer_id,
             "original_author_id": blog.userid,
             "user_id": self.request.user.id,
-            "shares_count": len(blog.shares) if blog.shares else 0
+            "shares_count": reaction_store.count(blog, 'share')
         }
         
+        online_ids, offline_ids = self.fanout.partition_audience(audience)
+        
         # Send to online users
-        online_sent = self.send_to_online_users(audience, message_data)
+        online_sent = self.fanout.send_to_users(online_ids, message_data)
         
         # For offline users: if they have no other connection to the blog, mark as deleted
         # Otherwise mark as modified
-        for user_id in audience:
-            try:
-                user_obj = Petitioner.objects.get(id=user_id)
-                if not user_obj.is_online:
-                    # Check if user has any other connection to this blog
-                    should_delete = self._should_delete_blog_for_user(user_id, blog, unsharer_id)
-                    if should_delete:
-                        self._update_single_blog_load(user_id, blog.id, 'deleted_blogs')
-                        print(f"[BLOG DISTRIBUTION] Marked blog {blog.id} as deleted for offline user {user_id}")
-                    else:
-                        self._update_single_blog_load(user_id, blog.id, 'modified_blogs')
-                        print(f"[BLOG DISTRIBUTION] Marked blog {blog.id} as modified for offline user {user_id}")
-                    
-            except Petitioner.DoesNotExist:
-                continue
+        delete_ids = self._users_to_delete_blog_for(offline_ids, blog, unsharer_id)
+        modify_ids = set(offline_ids) - delete_ids
+        self.fanout.append_to_outbox(delete_ids, blog.id, 'deleted_blogs')
+        self.fanout.append_to_outbox(modify_ids, blog.id, 'modified_blogs')
+        print(f"[BLOG DISTRIBUTION] Marked blog {blog.id} as deleted for {len(delete_ids)} "
+              f"and modified for {len(modify_ids)} offline users")
         
         # Send to blog-specific channel
-        async_to_sync(self.channel_layer.group_send)(
-            f"blog_{blog.id}",
-            message_data
-        )
+        self.fanout.send_to_group(f"blog_{blog.id}", message_data)
         
         print(f"[BLOG DISTRIBUTION] Successfully distributed unshare for blog {blog.id} to {len(audience)} users "
               f"({online_sent} online)")
     
-    def _should_delete_blog_for_user(self, user_id, blog, unsharer_id):
+    def _users_to_delete_blog_for(self, user_ids, blog, unsharer_id):
         """
-        Check if a blog should be deleted (not just modified) for a user when unshared.
-        Returns True if user has no other connection to the blog (not in author's circle, 
-        not the author, not sharing it themselves, not connected to other sharers)
+        Return the subset of user_ids for whom a blog should be deleted (not just
+        modified) when unshared: users with no other connection to the blog (not
+        the author, not sharing it themselves, not in the circle of the author
+        or of any remaining sharer)
         """
         author_id = blog.userid
-        
-        # If user is the author, they should keep the blog
-        if user_id == author_id:
-            return False
-            
-        # If user is sharing the blog themselves, they should keep it
-        if blog.shares and user_id in blog.shares:
-            return False
-            
-        # Check if user is in author's circle
-        author_circles = Circle.objects.filter(userid=author_id, otherperson=user_id)
-        if author_circles.exists():
-            return False
-            
-        # Check if user is connected to any other sharers
-        other_sharers = set(blog.shares) if blog.shares else set()
+        other_sharers = self.get_sharer_ids(blog)
         other_sharers.discard(unsharer_id)  # Remove the unsharer
         
-        for sharer_id in other_sharers:
-            sharer_circles = Circle.objects.filter(userid=sharer_id, otherperson=user_id)
-            if sharer_circles.exists():
-                return False
-                
-        # If none of the above conditions are met, user should no longer see this blog
-        return True
+        # The author and people still sharing the blog keep it
+        candidates = set(user_ids) - other_sharers - {author_id}
+        if not candidates:
+            return set()
+        
+        # Anyone in the author's or a remaining sharer's circle keeps it
+        for member_ids in audience_index.members_of_many(other_sharers | {author_id}).values():
+            candidates -= member_ids
+        
+        return candidates
     
     def distribute_blog_interaction(self, blog, interaction_type, action, count, user_id):
         """
-        Distribute blog interactions (likes, etc.)
+        Queue blog interactions (likes, etc.) for the fan-out task.
+        Bursts on the same blog collapse to the latest count, so the frame
+        is a count refresh without the actor or direction of any one event.
         """
-        print(f"[BLOG DISTRIBUTION] Distributing {interaction_type} {action} for blog {blog.id}")
-        
-        audience = self.get_audience_for_blog(blog)
+        print(f"[BLOG DISTRIBUTION] Queueing {interaction_type} {action} for blog {blog.id}")
         
         message_data = {
             "type": "blog_update",
             "blog_id": str(blog.id),
             "update_type": interaction_type,
-            "action": action,
-            "count": count,
-            "user_id": user_id
+            "count": count
         }
         
-        # Send to online users
-        online_sent = self.send_to_online_users(audience, message_data)
-        
-        # Update BlogLoad for offline users (mark as modified)
-        offline_updated = self.update_blog_load_for_offline_users(audience, blog.id, 'modified_blogs')
-        
-        # Send to blog-specific channel
-        async_to_sync(self.channel_layer.group_send)(
-            f"blog_{blog.id}",
-            message_data
+        # Author's circle plus people who shared the blog
+        self.event_pipeline.enqueue(
+            blog.id, message_data,
+            coalesce_key=interaction_type,
+            recipients=self.get_sharer_ids(blog)
         )
-        
-        print(f"[BLOG DISTRIBUTION] Successfully distributed {interaction_type} {action} for blog {blog.id} "
-              f"to {len(audience)} users ({online_sent} online, {offline_updated} offline)")
     
     def distribute_comment_update(self, blog, comment_data, action, user_id):
         """
-        Distribute comment updates (new comment, deleted comment)
+        Queue comment updates (new comment, deleted comment) for the fan-out task
         """
-        print(f"[BLOG DISTRIBUTION] Distributing comment {action} for blog {blog.id}")
-        
-        audience = self.get_audience_for_blog(blog)
+        print(f"[BLOG DISTRIBUTION] Queueing comment {action} for blog {blog.id}")
         
         message_data = {
             "type": "comment_update",
@@ -399,52 +337,27 @@ class BlogDistributionService:
             "user_id": user_id
         }
         
-        # Send to online users
-        online_sent = self.send_to_online_users(audience, message_data)
-        
-        # Update BlogLoad for offline users
-        offline_updated = self.update_blog_load_for_offline_users(audience, blog.id, 'modified_blogs')
-        
-        # Send to blog-specific channel
-        async_to_sync(self.channel_layer.group_send)(
-            f"blog_{blog.id}",
-            message_data
-        )
-        
-        print(f"[BLOG DISTRIBUTION] Successfully distributed comment {action} for blog {blog.id} "
-              f"to {len(audience)} users ({online_sent} online, {offline_updated} offline)")
+        self.event_pipeline.enqueue(blog.id, message_data, recipients=self.get_sharer_ids(blog))
     
     def distribute_comment_like_update(self, blog, comment_id, action, count, user_id):
         """
-        Distribute comment like updates
+        Queue comment like updates for the fan-out task. Like blog
+        interactions they coalesce to a count refresh without an actor.
         """
-        print(f"[BLOG DISTRIBUTION] Distributing comment like {action} for comment {comment_id}")
-        
-        audience = self.get_audience_for_blog(blog)
+        print(f"[BLOG DISTRIBUTION] Queueing comment like {action} for comment {comment_id}")
         
         message_data = {
             "type": "comment_like_update",
             "blog_id": str(blog.id),
             "comment_id": str(comment_id),
-            "action": action,
-            "likes_count": count,
-            "user_id": user_id
+            "likes_count": count
         }
         
-        # Send to online users
-        online_sent = self.send_to_online_users(audience, message_data)
-        
-        # Update BlogLoad for offline users
-        offline_updated = self.update_blog_load_for_offline_users(audience, blog.id, 'modified_blogs')
-        
-        # Send to blog-specific channel
-        async_to_sync(self.channel_layer.group_send)(
-            f"blog_{blog.id}",
-            message_data
+        self.event_pipeline.enqueue(
+            blog.id, message_data,
+            coalesce_key=f"comment_like:{comment_id}",
+            recipients=self.get_sharer_ids(blog)
         )
-        
-        print(f"[BLOG DISTRIBUTION] Successfully distributed comment like {action} for comment {comment_id} "
-              f"to {len(audience)} users ({online_sent} online, {offline_updated} offline)")
     
     @staticmethod
     def recursive_convert_objects_to_str(data):
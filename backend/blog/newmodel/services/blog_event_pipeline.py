@@ -0,0 +1,192 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from django.core.serializers.json import DjangoJSONEncoder
+from prometheus_client import Counter, Histogram
+
+from backend.redis_connection import get_redis_client
+from users.services.audience_index import audience_index
+from blog.models import BaseBlogModel
+from .blog_fanout import BlogFanoutEngine
+
+logger = logging.getLogger(__name__)
+
+
+fanout_stage_seconds = Histogram(
+    'blog_fanout_stage_seconds',
+    'Time spent in each stage of the queued blog fan-out pipeline',
+    ['stage']
+)
+fanout_events_total = Counter(
+    'blog_fanout_events_total',
+    'Blog fan-out events by outcome (queued, coalesced, delivered, inline)',
+    ['outcome']
+)
+
+
+@contextmanager
+def track_stage(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        fanout_stage_seconds.labels(stage=stage).observe(time.perf_counter() - started)
+
+
+class BlogEventPipeline:
+    """
+    Queued fan-out of blog interaction events (likes, shares, comments).
+
+    Views call ``enqueue`` and return immediately. Events are buffered in Redis
+    per blog and a single ``deliver_blog_events`` Celery task is scheduled per
+    coalescing window. Count updates sharing a ``coalesce_key`` collapse to the
+    latest one, so a burst of 50 likes becomes one count update. The task then
+    resolves the audience and presence once and delivers every buffered event
+    in batches.
+    """
+
+    COALESCE_WINDOW_SECONDS = 1.0
+    SCHEDULE_TTL_SECONDS = 60
+    KEY_PREFIX = 'blog_events'
+
+    def __init__(self, redis_client=None, fanout=None):
+        self._redis = redis_client
+        self._fanout = fanout
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    @property
+    def fanout(self):
+        if self._fanout is None:
+            self._fanout = BlogFanoutEngine()
+        return self._fanout
+
+    def _keys(self, blog_id):
+        base = f"{self.KEY_PREFIX}:{blog_id}"
+        return f"{base}:counts", f"{base}:items", f"{base}:scheduled"
+
+    def enqueue(self, blog_id, message_data, coalesce_key=None, list_type='modified_blogs',
+                audience_of=None, recipients=None):
+        """
+        Buffer an event for ``blog_id``.
+
+        ``coalesce_key`` marks events whose latest value supersedes earlier
+        ones (absolute counts); events without one are all delivered.
+        The author's circle always receives the event; ``audience_of`` lists
+        extra users whose circles should too (e.g. the sharer) and
+        ``recipients`` extra individual users. Offline recipients get the blog
+        recorded in their blog outbox as ``list_type``.
+        """
+        envelope = json.dumps({
+            'message': message_data,
+            'list_type': list_type,
+            'audience_of': list(audience_of or []),
+            'recipients': list(recipients or []),
+            'enqueued_at': time.time(),
+        }, cls=DjangoJSONEncoder)
+        counts_key, items_key, scheduled_key = self._keys(blog_id)
+
+        try:
+            with track_stage('enqueue'):
+                pipe = self.redis.pipeline()
+                if coalesce_key:
+                    pipe.hset(counts_key, coalesce_key, envelope)
+                else:
+                    pipe.rpush(items_key, envelope)
+                pipe.set(scheduled_key, 1, nx=True, ex=self.SCHEDULE_TTL_SECONDS)
+                buffered, newly_scheduled = pipe.execute()
+        except Exception as e:
+            # Never lose the update because the buffer is unavailable
+            logger.warning(f"[BLOG PIPELINE] Buffer unavailable for blog {blog_id}, delivering inline: {e}")
+            fanout_events_total.labels(outcome='inline').inc()
+            self.deliver_events(blog_id, [json.loads(envelope)])
+            return
+
+        # HSET returns 0 when it overwrote a pending event with the same key
+        outcome = 'coalesced' if coalesce_key and not buffered else 'queued'
+        fanout_events_total.labels(outcome=outcome).inc()
+
+        if newly_scheduled:
+            try:
+                from blog.tasks import deliver_blog_events
+                deliver_blog_events.apply_async(args=[str(blog_id)], countdown=self.COALESCE_WINDOW_SECONDS)
+            except Exception as e:
+                logger.warning(f"[BLOG PIPELINE] Broker unavailable for blog {blog_id}, delivering inline: {e}")
+                self.deliver(blog_id)
+
+    def drain(self, blog_id):
+        """Atomically take every buffered event for a blog"""
+        counts_key, items_key, scheduled_key = self._keys(blog_id)
+        pipe = self.redis.pipeline()
+        # Clearing the flag first lets events arriving after the drain schedule a new run
+        pipe.delete(scheduled_key)
+        pipe.lrange(items_key, 0, -1)
+        pipe.delete(items_key)
+        pipe.hgetall(counts_key)
+        pipe.delete(counts_key)
+        _, items, _, counts, _ = pipe.execute()
+        return [json.loads(raw) for raw in items] + [json.loads(raw) for raw in counts.values()]
+
+    def deliver(self, blog_id):
+        """Drain and deliver the buffered events for a blog; returns events delivered"""
+        with track_stage('drain'):
+            events = self.drain(blog_id)
+        return self.deliver_events(blog_id, events)
+
+    def deliver_events(self, blog_id, events):
+        if not events:
+            return 0
+
+        now = time.time()
+        for event in events:
+            fanout_stage_seconds.labels(stage='queue_wait').observe(max(0.0, now - event['enqueued_at']))
+
+        with track_stage('audience'):
+            try:
+                author_id = BaseBlogModel.objects.values_list('userid', flat=True).get(id=blog_id)
+            except BaseBlogModel.DoesNotExist:
+                logger.info(f"[BLOG PIPELINE] Blog {blog_id} no longer exists, dropping {len(events)} events")
+                return 0
+
+            circle_owners = {author_id}
+            for event in events:
+                circle_owners.update(event['audience_of'])
+            members_by_owner = {
+                owner: member_ids | {owner}
+                for owner, member_ids in audience_index.members_of_many(circle_owners).items()
+            }
+            members_by_owner.setdefault(author_id, {author_id})
+
+        with track_stage('presence'):
+            everyone = set().union(*members_by_owner.values())
+            for event in events:
+                everyone.update(event['recipients'])
+            online_ids, offline_ids = self.fanout.partition_audience(everyone)
+            online_ids, offline_ids = set(online_ids), set(offline_ids)
+
+        offline_by_list = {}
+        for event in events:
+            audience = set(members_by_owner[author_id]) | set(event['recipients'])
+            for owner in event['audience_of']:
+                audience |= members_by_owner.get(owner, set())
+
+            with track_stage('websocket'):
+                self.fanout.send_to_users(audience & online_ids, event['message'])
+                self.fanout.send_to_group(f"blog_{blog_id}", event['message'])
+
+            offline_by_list.setdefault(event['list_type'], set()).update(audience & offline_ids)
+
+        with track_stage('blog_load'):
+            for list_type, user_ids in offline_by_list.items():
+                self.fanout.append_to_outbox(user_ids, blog_id, list_type)
+
+        fanout_events_total.labels(outcome='delivered').inc(len(events))
+        print(f"[BLOG PIPELINE] Delivered {len(events)} events for blog {blog_id} "
+              f"to {len(online_ids)} online / {len(offline_ids)} offline users")
+        return len(events)
@@ -0,0 +1,98 @@
+import asyncio
+
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+from users.models import Petitioner
+from users.services.presence import presence
+from .blog_outbox import blog_outbox
+
+
+class BlogFanoutEngine:
+    """
+    Set-based fan-out of blog events to an audience of user IDs.
+
+    The whole audience is resolved with one query and one presence lookup,
+    online users receive the WebSocket event in batches of ``batch_size``
+    group sends, and offline users get the event appended to their blog
+    outbox (see BlogOutbox) with a single insert statement.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, channel_layer=None, batch_size=None):
+        self.channel_layer = channel_layer or get_channel_layer()
+        self.batch_size = batch_size or self.BATCH_SIZE
+
+    def partition_audience(self, user_ids):
+        """
+        Split an audience into (online_ids, offline_ids) with one query and
+        one presence lookup. Unknown user IDs are dropped.
+        """
+        user_ids = {uid for uid in user_ids if uid is not None}
+        if not user_ids:
+            return [], []
+
+        known_ids = list(Petitioner.objects.filter(id__in=user_ids).values_list('id', flat=True))
+        online = presence.online_among(known_ids)
+        online_ids, offline_ids = [], []
+        for user_id in known_ids:
+            if user_id in online:
+                online_ids.append(user_id)
+            else:
+                offline_ids.append(user_id)
+        return online_ids, offline_ids
+
+    def send_to_users(self, user_ids, message_data):
+        """
+        Send a WebSocket message to each user's notification group, one
+        event-loop round trip per batch instead of one per user.
+        """
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), self.batch_size):
+            groups = [f"notifications_{uid}" for uid in user_ids[start:start + self.batch_size]]
+            async_to_sync(self._group_send_batch)(groups, message_data)
+        return len(user_ids)
+
+    def send_each(self, messages):
+        """``send_to_users`` with a message of its own per user ({user_id: message_data})"""
+        user_ids = list(messages)
+        for start in range(0, len(user_ids), self.batch_size):
+            batch = user_ids[start:start + self.batch_size]
+            async_to_sync(self._send_each_batch)({f"notifications_{uid}": messages[uid] for uid in batch})
+        return len(user_ids)
+
+    def send_to_group(self, group, message_data):
+        async_to_sync(self.channel_layer.group_send)(group, message_data)
+
+    async def _group_send_batch(self, groups, message_data):
+        await asyncio.gather(*(
+            self.channel_layer.group_send(group, message_data) for group in groups
+        ))
+
+    async def _send_each_batch(self, group_messages):
+        await asyncio.gather(*(
+            self.channel_layer.group_send(group, message_data) for group, message_data in group_messages.items()
+        ))
+
+    def append_to_outbox(self, user_ids, blog_id, list_type='new_blogs'):
+        """
+        Record the event in every user's blog outbox (one INSERT for all of
+        them); ``list_type`` names the pending list it used to go to
+        (new_blogs, modified_blogs, deleted_blogs).
+        """
+        return blog_outbox.append(user_ids, blog_id, list_type)
+
+    def fan_out(self, audience, message_data, blog_id, list_type='new_blogs', personalise=None):
+        """
+        Deliver ``message_data`` to online audience members and record
+        ``blog_id`` in ``list_type`` for offline ones. ``personalise(online_ids)``,
+        when given, returns {user_id: message_data} to send instead.
+        Returns (online_sent, offline_updated).
+        """
+        online_ids, offline_ids = self.partition_audience(audience)
+        if personalise is None:
+            online_sent = self.send_to_users(online_ids, message_data)
+        else:
+            online_sent = self.send_each(personalise(online_ids))
+        offline_updated = self.append_to_outbox(offline_ids, blog_id, list_type)
+        return online_sent, offline_updated
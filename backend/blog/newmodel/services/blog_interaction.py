@@ -2,6 +2,8 @@ from django.db import transaction
 from django.shortcuts import get_object_or_404
 from blog.models import BaseBlogModel, Comment, UserSharedBlog
 from .blog_distribution import BlogDistributionService
+from .reaction_store import reaction_store
+from .blog_payload_cache import blog_payload_cache
 
 
 class BlogInteractionService:
@@ -20,27 +22,18 @@ class BlogInteractionService:
             user_id = self.request.user.id
             
             with transaction.atomic():
-                # Check if user already liked
-                if user_id in blog.likes:
-                    # Remove like
-                    blog.likes.remove(user_id)
-                    action = 'removed'
-                else:
-                    # Add like
-                    blog.likes.append(user_id)
-                    action = 'added'
-                
-                blog.save()
+                action, likes_count = reaction_store.toggle(BaseBlogModel, blog.id, user_id, 'like')
+                blog_payload_cache.invalidate(blog.id)
                 
                 # Distribute the update
                 self.distribution_service.distribute_blog_interaction(
-                    blog, 'like', action, len(blog.likes), user_id
+                    blog, 'like', action, likes_count, user_id
                 )
                 
                 return {
                     'status': 'success',
                     'action': action,
-                    'likes_count': len(blog.likes),
+                    'likes_count': likes_count,
                 }
                 
         except BaseBlogModel.DoesNotExist:
@@ -53,6 +46,8 @@ class BlogInteractionService:
             user_id = self.request.user.id
             
             with transaction.atomic():
+                blog_payload_cache.invalidate(blog.id)
+                
                 # Check if user already shared this blog
                 shared_blog_exists = UserSharedBlog.objects.filter(
                     userid=user_id, 
@@ -61,8 +56,7 @@ class BlogInteractionService:
                 
                 if shared_blog_exists:
                     # Remove share
-                    if user_id in blog.shares:
-                        blog.shares.remove(user_id)
+                    _, shares_count = reaction_store.remove(BaseBlogModel, blog.id, user_id, 'share')
                     
                     # Remove from UserSharedBlog
                     UserSharedBlog.objects.filter(
@@ -72,16 +66,13 @@ class BlogInteractionService:
                     
                     action = 'removed'
                     
-                    # Save blog first to get updated shares count
-                    blog.save()
-                    
-                    # Distribute unshare
+                    # Distribute unshare with the updated shares count
+                    blog.refresh_from_db(fields=['reaction_counts'])
                     self.distribution_service.distribute_blog_unshare(blog, user_id)
                     
                 else:
                     # Add share
-                    if user_id not in blog.shares:
-                        blog.shares.append(user_id)
+                    _, shares_count = reaction_store.add(BaseBlogModel, blog.id, user_id, 'share')
                     
                     # Create UserSharedBlog record
                     UserSharedBlog.objects.create(
@@ -92,16 +83,14 @@ class BlogInteractionService:
                     
                     action = 'added'
                     
-                    # Save blog first to get updated shares count
-                    blog.save()
-                    
-                    # Distribute share
+                    # Distribute share with the updated shares count
+                    blog.refresh_from_db(fields=['reaction_counts'])
                     self.distribution_service.distribute_blog_share(blog, user_id)
                 
                 return {
                     'status': 'success',
                     'action': action,
-                    'shares_count': len(blog.shares) if blog.shares else 0
+                    'shares_count': shares_count
                 }
                 
         except BaseBlogModel.DoesNotExist:
@@ -130,7 +119,8 @@ class BlogInteractionService:
                 
                 # Add comment ID to the blog's comments list
                 blog.comments.append(comment.id)
-                blog.save()
+                blog.save(update_fields=['comments', 'updated_at'])
+                blog_payload_cache.invalidate(blog.id)
                 
                 # Prepare comment data for distribution
                 from ..serializers.blog_serializers import CommentSerializer
@@ -162,30 +152,21 @@ class BlogInteractionService:
                 return {'error': 'Could not find root blog for comment'}
             
             with transaction.atomic():
-                # Check if user already liked
-                if user_id in comment.likes:
-                    # Remove like
-                    comment.likes.remove(user_id)
-                    action = 'removed'
-                else:
-                    # Add like
-                    comment.likes.append(user_id)
-                    action = 'added'
-                
-                comment.save()
+                action, likes_count = reaction_store.toggle(Comment, comment.id, user_id, 'like')
+                blog_payload_cache.invalidate(blog_id)
                 
                 # Get the blog for distribution
                 blog = BaseBlogModel.objects.get(id=blog_id)
                 
                 # Distribute comment like update
                 self.distribution_service.distribute_comment_like_update(
-                    blog, comment_id, action, len(comment.likes), user_id
+                    blog, comment_id, action, likes_count, user_id
                 )
                 
                 return {
                     'status': 'success',
                     'action': action,
-                    'likes_count': len(comment.likes),
+                    'likes_count': likes_count,
                 }
                 
         except Comment.DoesNotExist:
@@ -208,7 +189,8 @@ class BlogInteractionService:
                 blog = BaseBlogModel.objects.get(id=blog_id)
                 if comment.id in blog.comments:
                     blog.comments.remove(comment.id)
-                    blog.save()
+                    blog.save(update_fields=['comments', 'updated_at'])
+                blog_payload_cache.invalidate(blog.id)
                 
                 # Prepare comment data for distribution before deletion
                 from ..serializers.blog_serializers import CommentSerializer
@@ -254,7 +236,8 @@ class BlogInteractionService:
                 
                 # Add reply ID to the parent comment's children list
                 parent_comment.children.append(reply.id)
-                parent_comment.save()
+                parent_comment.save(update_fields=['children'])
+                blog_payload_cache.invalidate(blog_id)
                 
                 # Prepare reply data for distribution
                 from ..serializers.blog_serializers import CommentSerializer
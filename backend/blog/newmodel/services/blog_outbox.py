@@ -0,0 +1,180 @@
+import json
+import logging
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import BaseBlogModel, BlogLoad, BlogOutboxEntry
+from .blog_payload_cache import blog_payload_cache
+
+logger = logging.getLogger(__name__)
+
+
+class BlogOutbox:
+    """
+    Bounded, ordered per-user outbox of the blog events offline users miss
+    (``blog.blog_outbox``).
+
+    Fan-out appends one row per offline user with a single
+    ``INSERT ... SELECT unnest``. On reconnect the client gets pages of
+    "everything after seq N": each page loads its blogs with one query and
+    renders them from the shared payload cache (see BlogPayloadCache),
+    instead of a query and a full build per pending blog. Several events for the same
+    blog within a page collapse into one. Clients acknowledge a seq
+    (``BlogLoad.replayed_seq``) by asking for the page after it; ``trim``
+    drops acknowledged rows and caps every outbox by age and size.
+    """
+
+    # BlogLoad list names used by the fan-out callers -> outbox kind
+    KINDS = {
+        'new_blogs': 'created',
+        'modified_blogs': 'modified',
+        'deleted_blogs': 'deleted',
+    }
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    MAX_ENTRIES_PER_USER = 1000
+    MAX_AGE = timedelta(days=30)
+
+    def append(self, user_ids, blog_id, kind):
+        """Record ``kind`` ('created', 'modified', 'deleted') of ``blog_id`` for every user; returns rows added"""
+        kind = self.KINDS.get(kind, kind)
+        if kind not in dict(BlogOutboxEntry.KIND_CHOICES):
+            raise ValueError(f"Unknown blog outbox kind: {kind}")
+        user_ids = sorted({uid for uid in user_ids if uid is not None})
+        if not user_ids:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self._table(BlogOutboxEntry)} (userid, blog_id, kind, created_at)
+                SELECT uid, %(blog_id)s::uuid, %(kind)s, now()
+                FROM unnest(%(user_ids)s::bigint[]) AS uid
+                """,
+                {'user_ids': user_ids, 'blog_id': str(blog_id), 'kind': kind}
+            )
+            return cursor.rowcount
+
+    def acknowledged_seq(self, user_id):
+        return BlogLoad.objects.filter(userid=user_id).values_list('replayed_seq', flat=True).first() or 0
+
+    def acknowledge(self, user_id, seq):
+        """Move the user's acknowledged seq forward (never back)"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self._table(BlogLoad)} AS bl
+                    (userid, loaded_blogs, modified_blogs, new_blogs, deleted_blogs, outdated, replayed_seq, updated_at)
+                VALUES (%(user_id)s, '{{}}', '{{}}', '{{}}', '{{}}', false, %(seq)s, now())
+                ON CONFLICT (userid) DO UPDATE
+                    SET replayed_seq = GREATEST(bl.replayed_seq, EXCLUDED.replayed_seq),
+                        updated_at = now()
+                """,
+                {'user_id': user_id, 'seq': seq}
+            )
+
+    def replay_page(self, user, after_seq=None, limit=PAGE_SIZE):
+        """
+        The user's next page as one ``blog_replay`` message: entries after
+        ``after_seq`` (default: the acknowledged seq), each with its blog
+        already serialised. Asking for a page acknowledges ``after_seq``.
+        """
+        if after_seq is None:
+            after_seq = self.acknowledged_seq(user.id)
+        else:
+            after_seq = int(after_seq)
+            self.acknowledge(user.id, after_seq)
+        limit = max(1, min(int(limit or self.PAGE_SIZE), self.MAX_PAGE_SIZE))
+
+        rows = list(
+            BlogOutboxEntry.objects.filter(userid=user.id, seq__gt=after_seq)
+            .order_by('seq')
+            .values_list('seq', 'blog_id', 'kind')[:limit + 1]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_seq = rows[-1][0] if rows else after_seq
+
+        # One entry per blog, at the position of its last event
+        latest = {}
+        for seq, blog_id, kind in rows:
+            previous = latest.get(blog_id)
+            if previous and previous[1] == 'created' and kind == 'modified':
+                # The client has never seen it, so it is still a creation
+                kind = 'created'
+            latest[blog_id] = (seq, kind)
+
+        live_ids = [blog_id for blog_id, (_, kind) in latest.items() if kind != 'deleted']
+        base_blogs = {blog.id: blog for blog in BaseBlogModel.objects.filter(id__in=live_ids)}
+        serialized = blog_payload_cache.render_for(user.id, base_blogs.values())
+
+        entries = []
+        for blog_id, (seq, kind) in sorted(latest.items(), key=lambda item: item[1][0]):
+            if kind == 'deleted':
+                entries.append({"seq": seq, "type": "blog_deleted", "action": "blog_deleted", "blog_id": blog_id})
+                continue
+            if blog_id not in serialized:
+                # Deleted since, or its content/author is gone
+                continue
+            base_blog = base_blogs[blog_id]
+            entry = {
+                "seq": seq,
+                "type": f"blog_{kind}",
+                "action": f"blog_{kind}",
+                "blog_id": blog_id,
+                "blog": serialized[blog_id],
+                "user_id": base_blog.userid,
+            }
+            if kind == 'created':
+                entry["blog_type"] = (base_blog.type or '').split('_')[0]
+            entries.append(entry)
+
+        # Pre-serialised once; UUIDs and datetimes become strings
+        return json.loads(json.dumps({
+            "type": "blog_replay",
+            "entries": entries,
+            "next_seq": next_seq,
+            "has_more": has_more,
+        }, cls=DjangoJSONEncoder))
+
+    def trim(self):
+        """
+        Delete acknowledged entries, entries older than MAX_AGE and all but
+        the newest MAX_ENTRIES_PER_USER of each user. Returns rows deleted.
+        """
+        outbox = self._table(BlogOutboxEntry)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                DELETE FROM {outbox} o
+                USING {self._table(BlogLoad)} bl
+                WHERE bl.userid = o.userid AND o.seq <= bl.replayed_seq
+                """
+            )
+            deleted = cursor.rowcount
+            cursor.execute(f"DELETE FROM {outbox} WHERE created_at < %s", [timezone.now() - self.MAX_AGE])
+            deleted += cursor.rowcount
+            cursor.execute(
+                f"""
+                DELETE FROM {outbox}
+                WHERE seq IN (
+                    SELECT seq FROM (
+                        SELECT seq, row_number() OVER (PARTITION BY userid ORDER BY seq DESC) AS position
+                        FROM {outbox}
+                    ) ranked
+                    WHERE position > %s
+                )
+                """,
+                [self.MAX_ENTRIES_PER_USER]
+            )
+            deleted += cursor.rowcount
+        return deleted
+
+    @staticmethod
+    def _table(model):
+        return connection.ops.quote_name(model._meta.db_table)
+
+
+blog_outbox = BlogOutbox()
@@ -0,0 +1,160 @@
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest
+
+from backend.read_cache import read_cache
+from blog.models import Reaction
+from users.models import Circle
+from ..serializers.blog_serializers import BlogSerializer
+from ..utils.blog_data_builder import BlogDataBuilder
+
+
+class BlogPayloadCache:
+    """
+    Serialised blog payloads shared by every recipient.
+
+    A blog's WebSocket payload is the same for every viewer except the
+    relation labels (to the author and to a journey/milestone target user)
+    and ``has_liked``/``has_shared``. The viewer-independent body is built
+    once, with an anonymous viewer, and kept in the read-through cache under
+    (blog_id, updated_at). ``overlays`` computes the viewer-specific fields
+    of a whole audience with two queries and ``render`` merges one into a
+    copy of the body at send time.
+
+    Reactions and comments change a blog's payload without always touching
+    ``updated_at``, so the interaction service calls ``invalidate`` for them.
+    """
+
+    NAMESPACE = 'blog_payload'
+    TIMEOUT = 60 * 60
+
+    def bodies(self, base_blogs, request=None):
+        """{blog_id: body} for the blogs; the uncached ones are built in one batch"""
+        base_blogs = {base_blog.id: base_blog for base_blog in base_blogs}
+        if not base_blogs:
+            return {}
+        request = self._neutral_request(request)
+        host = request.get_host()
+        entries = {
+            blog_id: (blog_id, (base_blog.updated_at.isoformat() if base_blog.updated_at else '', host))
+            for blog_id, base_blog in base_blogs.items()
+        }
+        return read_cache.get_or_set_many(
+            self.NAMESPACE,
+            entries,
+            lambda missing: self._build([base_blogs[blog_id] for blog_id in missing], request),
+            timeout=self.TIMEOUT
+        )
+
+    def body(self, base_blog, request=None):
+        return self.bodies([base_blog], request).get(base_blog.id)
+
+    def overlays(self, viewer_ids, bodies):
+        """
+        {(viewer_id, blog_id): overlay} for every viewer and every body in
+        ``bodies`` ({blog_id: body}): one query for the viewers' circles with
+        the people named in the blogs, one for their likes and shares
+        """
+        viewer_ids = {viewer_id for viewer_id in viewer_ids if viewer_id is not None}
+        if not viewer_ids or not bodies:
+            return {}
+
+        people = {}
+        for blog_id, body in bodies.items():
+            author_id = body['header']['user']['id']
+            target = body['body']['body_type_fields'].get('target_user')
+            # Only a target user other than the author carries a relation
+            target_id = target['id'] if target and 'relation' in target else None
+            people[blog_id] = (author_id, target_id)
+
+        person_ids = {person_id for pair in people.values() for person_id in pair if person_id is not None}
+        labels = {}
+        for userid, otherperson, onlinerelation in Circle.objects.filter(
+            userid__in=viewer_ids, otherperson__in=person_ids
+        ).order_by('id').values_list('userid', 'otherperson', 'onlinerelation'):
+            labels.setdefault((userid, otherperson), onlinerelation)
+
+        reacted = set(Reaction.objects.filter(
+            target_id__in=list(bodies), user_id__in=viewer_ids, kind__in=('like', 'share')
+        ).values_list('user_id', 'target_id', 'kind'))
+
+        overlays = {}
+        for viewer_id in viewer_ids:
+            for blog_id, (author_id, target_id) in people.items():
+                overlay = {
+                    'relation': self._relation(viewer_id, author_id, labels),
+                    'has_liked': (viewer_id, blog_id, 'like') in reacted,
+                    'has_shared': (viewer_id, blog_id, 'share') in reacted,
+                }
+                if target_id is not None:
+                    overlay['target_relation'] = self._relation(viewer_id, target_id, labels)
+                overlays[(viewer_id, blog_id)] = overlay
+        return overlays
+
+    @staticmethod
+    def render(body, overlay):
+        """A copy of ``body`` with the viewer's ``overlay`` merged in; ``body`` is left untouched"""
+        payload = dict(body)
+        header = dict(body['header'])
+        header['user'] = {**header['user'], 'relation': overlay['relation']}
+        payload['header'] = header
+        if 'target_relation' in overlay:
+            fields = dict(body['body']['body_type_fields'])
+            fields['target_user'] = {**fields['target_user'], 'relation': overlay['target_relation']}
+            payload['body'] = {**body['body'], 'body_type_fields': fields}
+        payload['footer'] = {
+            **body['footer'],
+            'has_liked': overlay['has_liked'],
+            'has_shared': overlay['has_shared'],
+        }
+        return payload
+
+    def render_for(self, viewer_id, base_blogs, request=None):
+        """{blog_id: payload} of the blogs as ``viewer_id`` sees them"""
+        bodies = self.bodies(base_blogs, request)
+        overlays = self.overlays([viewer_id], bodies)
+        return {
+            blog_id: self.render(body, overlays[(viewer_id, blog_id)])
+            for blog_id, body in bodies.items()
+        }
+
+    def invalidate(self, blog_id):
+        """Drop the blog's cached body once the current transaction commits"""
+        read_cache.invalidate_on_commit(self.NAMESPACE, blog_id)
+
+    def _build(self, base_blogs, request):
+        blog_data = BlogDataBuilder(request.user, request).get_blogs_data(base_blogs)
+        blog_ids = list(blog_data)
+        data = BlogSerializer([blog_data[blog_id] for blog_id in blog_ids], many=True, context={'request': request}).data
+        # Stored as plain JSON: UUIDs and datetimes become strings
+        return {
+            blog_id: json.loads(json.dumps(item, cls=DjangoJSONEncoder))
+            for blog_id, item in zip(blog_ids, data)
+        }
+
+    @staticmethod
+    def _relation(viewer_id, person_id, labels):
+        if viewer_id == person_id:
+            return 'Your blog'
+        onlinerelation = labels.get((viewer_id, person_id))
+        return onlinerelation.replace('_', ' ').title() if onlinerelation else "Connection"
+
+    @staticmethod
+    def _neutral_request(request=None):
+        # Serializers build absolute media URLs from the request, but the body
+        # must not depend on who is asking
+        neutral = HttpRequest()
+        neutral.method = 'GET'
+        neutral.user = AnonymousUser()
+        if request is not None:
+            neutral.META = dict(request.META)
+        else:
+            neutral.META['SERVER_NAME'] = 'localhost'
+            neutral.META['SERVER_PORT'] = '8000'
+            neutral.META['HTTP_HOST'] = 'localhost:8000'
+        return neutral
+
+
+blog_payload_cache = BlogPayloadCache()
@@ -0,0 +1,113 @@
+from django.db import connection, transaction
+
+from blog.models import BaseBlogModel, Reaction
+
+
+class ReactionStore:
+    """
+    Reactions (likes, dislikes, relevant/irrelevant, shares) as one row per
+    (target, kind, user) in ``blog.reaction`` plus a per-kind total in the
+    target's ``reaction_counts``.
+
+    A toggle is a ``DELETE`` or an ``INSERT ... ON CONFLICT DO NOTHING`` on
+    the unique (target_id, kind, user_id) index, followed by one ``UPDATE``
+    that adds the delta to the total. Both run in one transaction, so
+    concurrent clicks neither lose reactions nor count a user twice, and
+    "has this user reacted" is an index lookup instead of a scan of a user
+    ID array.
+    """
+
+    BLOG_KINDS = ('like', 'dislike', 'relevant', 'irrelevant', 'share')
+    COMMENT_KINDS = ('like', 'dislike')
+
+    def toggle(self, model, target_id, user_id, kind):
+        """Add the reaction if absent, remove it if present. Returns (action, total)."""
+        with transaction.atomic():
+            if self._delete(target_id, user_id, kind):
+                return 'removed', self._add_to_total(model, target_id, kind, -1)
+            inserted = self._insert(target_id, user_id, kind)
+            # A concurrent request of the same user already added it
+            return 'added', self._add_to_total(model, target_id, kind, 1 if inserted else 0)
+
+    def add(self, model, target_id, user_id, kind):
+        """Returns (added, total); ``added`` is False when the reaction already existed"""
+        with transaction.atomic():
+            inserted = self._insert(target_id, user_id, kind)
+            return inserted, self._add_to_total(model, target_id, kind, 1 if inserted else 0)
+
+    def remove(self, model, target_id, user_id, kind):
+        """Returns (removed, total)"""
+        with transaction.atomic():
+            deleted = self._delete(target_id, user_id, kind)
+            return deleted, self._add_to_total(model, target_id, kind, -1 if deleted else 0)
+
+    def has_reacted(self, user_id, target_id, kind):
+        return Reaction.objects.filter(target_id=target_id, kind=kind, user_id=user_id).exists()
+
+    def reacted(self, user_id, target_ids, kinds=None):
+        """{(target_id, kind)} the user reacted with, for a page of blogs or comments in one query"""
+        target_ids = list(target_ids)
+        if user_id is None or not target_ids:
+            return set()
+        reactions = Reaction.objects.filter(target_id__in=target_ids, user_id=user_id)
+        if kinds:
+            reactions = reactions.filter(kind__in=kinds)
+        return set(reactions.values_list('target_id', 'kind'))
+
+    def user_ids(self, target_id, kind):
+        """IDs of the users with this reaction on the target"""
+        return list(Reaction.objects.filter(target_id=target_id, kind=kind).values_list('user_id', flat=True))
+
+    @staticmethod
+    def count(target, kind):
+        return (target.reaction_counts or {}).get(kind, 0)
+
+    def counts(self, target):
+        kinds = self.BLOG_KINDS if isinstance(target, BaseBlogModel) else self.COMMENT_KINDS
+        return {kind: self.count(target, kind) for kind in kinds}
+
+    def _insert(self, target_id, user_id, kind):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self._table(Reaction)} (target_id, user_id, kind, created_at)
+                VALUES (%s, %s, %s, now())
+                ON CONFLICT (target_id, kind, user_id) DO NOTHING
+                """,
+                [target_id, user_id, kind]
+            )
+            return cursor.rowcount == 1
+
+    def _delete(self, target_id, user_id, kind):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self._table(Reaction)} WHERE target_id = %s AND kind = %s AND user_id = %s",
+                [target_id, kind, user_id]
+            )
+            return cursor.rowcount == 1
+
+    def _add_to_total(self, model, target_id, kind, delta):
+        """Add ``delta`` to the target's total in place; returns the new total"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {self._table(model)}
+                SET reaction_counts = jsonb_set(
+                    COALESCE(reaction_counts, '{{}}'::jsonb),
+                    ARRAY[%(kind)s],
+                    to_jsonb(GREATEST(COALESCE((reaction_counts ->> %(kind)s)::bigint, 0) + %(delta)s, 0))
+                )
+                WHERE id = %(id)s
+                RETURNING (reaction_counts ->> %(kind)s)::bigint
+                """,
+                {'kind': kind, 'delta': delta, 'id': target_id}
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _table(model):
+        return connection.ops.quote_name(model._meta.db_table)
+
+
+reaction_store = ReactionStore()
@@ -3,6 +3,7 @@ from blog.models import BaseBlogModel, Comment, UserSharedBlog
 from users.models import UserTree, Circle
 
 from ..serializers.blog_serializers import BlogSerializer, CommentSerializer
+from ..services.reaction_store import reaction_store
 
 
 class BlogDataBuilder:
@@ -14,7 +15,20 @@ class BlogDataBuilder:
         self.user = user
         self.request = request
 
-    def get_concrete_blog(self, blog_id, blog_type, content_type):
+    VALID_CONTENT_TYPES = ('micro', 'short_essay', 'article')
+
+    @classmethod
+    def split_blog_type(cls, blog_type_raw):
+        """Split a stored type (e.g. "journey_short_essay") into ("journey", "short_essay")"""
+        if not blog_type_raw:
+            return None, None
+        for ct in cls.VALID_CONTENT_TYPES:
+            if blog_type_raw.endswith('_' + ct):
+                return blog_type_raw[:-len(ct)-1], ct
+        return blog_type_raw, None
+
+    def get_model_map(self, blog_type):
+        """Concrete models for a blog type keyed by content type"""
         # Import models locally to avoid circular imports
         if blog_type == 'journey':
             from ...models import (
@@ -92,7 +106,11 @@ class BlogDataBuilder:
         else:
             return None
 
-        if not content_type or content_type not in model_map:
+        return model_map
+
+    def get_concrete_blog(self, blog_id, blog_type, content_type):
+        model_map = self.get_model_map(blog_type)
+        if not model_map or not content_type or content_type not in model_map:
             return None
 
         try:
@@ -106,11 +124,9 @@ class BlogDataBuilder:
             comments = []
             if parent_id in comments_by_parent:
                 for comment in comments_by_parent[parent_id]:
-                    user = user_map.get(comment.user_id)
-                    
                     comment_serializer = CommentSerializer(
                         comment, 
-                        context={'request': self.request}
+                        context={'request': self.request, 'user_map': user_map}
                     )
                     
                     comment_data = comment_serializer.data
@@ -139,8 +155,9 @@ class BlogDataBuilder:
             relation = circle.onlinerelation.replace('_', ' ').title() if circle and circle.onlinerelation else "Connection"
 
         # Check if current user has liked/shared
-        has_liked = self.user.id in base_blog.likes
-        has_shared = self.user.id in base_blog.shares
+        reacted = reaction_store.reacted(self.user.id, [base_blog.id], ('like', 'share'))
+        has_liked = (base_blog.id, 'like') in reacted
+        has_shared = (base_blog.id, 'share') in reacted
 
         # Get comments
         all_comment_ids = set(base_blog.comments)
@@ -188,15 +205,7 @@ class BlogDataBuilder:
             return None
 
         # Split the type correctly (e.g., "journey_short_essay" -> "journey", "short_essay")
-        valid_content_types = {'micro', 'short_essay', 'article'}
-        content_type = None
-        blog_type = blog_type_raw
-        
-        for ct in valid_content_types:
-            if blog_type_raw.endswith('_' + ct):
-                blog_type = blog_type_raw[:-len(ct)-1]  # Remove the suffix
-                content_type = ct
-                break
+        blog_type, content_type = self.split_blog_type(blog_type_raw)
 
         concrete_blog = self.get_concrete_blog(base_blog.id, blog_type, content_type)
         if not concrete_blog:
@@ -212,4 +221,109 @@ class BlogDataBuilder:
             'has_liked': has_liked,
             'has_shared': has_shared,
             'comments': blog_comments
-        }
\ No newline at end of file
+        }
+
+    def get_concrete_blogs(self, base_blogs):
+        """
+        Fetch the concrete blog of every base blog with one ``id__in`` query
+        per (type, content_type) instead of one query per blog.
+        Returns {blog_id: (blog_type, content_type, concrete_blog)}.
+        """
+        ids_by_type = {}
+        for base_blog in base_blogs:
+            blog_type, content_type = self.split_blog_type(base_blog.type)
+            if content_type:
+                ids_by_type.setdefault((blog_type, content_type), []).append(base_blog.id)
+
+        concrete_map = {}
+        for (blog_type, content_type), blog_ids in ids_by_type.items():
+            model_map = self.get_model_map(blog_type)
+            if not model_map or content_type not in model_map:
+                continue
+            for concrete_blog in model_map[content_type].objects.filter(id__in=blog_ids):
+                concrete_map[concrete_blog.id] = (blog_type, content_type, concrete_blog)
+        return concrete_map
+
+    def get_comments_for_blogs(self, base_blogs):
+        """Comment hierarchies for several blogs, loaded with one tree query for all of them"""
+        top_level_ids = {comment_id for base_blog in base_blogs for comment_id in base_blog.comments}
+        all_comment_ids = set(top_level_ids)
+        if top_level_ids:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    WITH RECURSIVE comment_tree AS (
+                        SELECT id, parent
+                        FROM blog.comment
+                        WHERE id = ANY(%s)
+                        UNION ALL
+                        SELECT c.id, c.parent
+                        FROM blog.comment c
+                        INNER JOIN comment_tree ct ON c.parent = ct.id AND c.parent_type = 'comment'
+                    )
+                    SELECT id FROM comment_tree;
+                """, [list(top_level_ids)])
+                all_comment_ids.update(row[0] for row in cursor.fetchall())
+
+        comments_by_parent = {}
+        comment_user_ids = set()
+        if all_comment_ids:
+            for comment in Comment.objects.filter(id__in=all_comment_ids).order_by('created_at'):
+                comments_by_parent.setdefault(comment.parent, []).append(comment)
+                comment_user_ids.add(comment.user_id)
+
+        comment_user_map = {u.id: u for u in UserTree.objects.filter(id__in=comment_user_ids)} if comment_user_ids else {}
+
+        return {
+            base_blog.id: self.build_comment_hierarchy(base_blog.id, comments_by_parent, comment_user_map)
+            for base_blog in base_blogs
+        }
+
+    def get_blogs_data(self, base_blogs):
+        """
+        Build complete blog data for a page of blogs with a fixed number of
+        queries: authors, relations, comments and each concrete table are
+        fetched once for the whole page. Returns {blog_id: blog_data};
+        blogs whose author or concrete content is missing are left out.
+        """
+        base_blogs = list(base_blogs)
+        if not base_blogs:
+            return {}
+
+        author_ids = {base_blog.userid for base_blog in base_blogs}
+        authors = {author.id: author for author in UserTree.objects.filter(id__in=author_ids)}
+
+        relations = {}
+        for circle in Circle.objects.filter(userid=self.user.id, otherperson__in=author_ids).order_by('id'):
+            relations.setdefault(circle.otherperson, circle)
+
+        concrete_map = self.get_concrete_blogs(base_blogs)
+        comments_map = self.get_comments_for_blogs(
+            [base_blog for base_blog in base_blogs if base_blog.id in concrete_map]
+        )
+        reacted = reaction_store.reacted(self.user.id, concrete_map, ('like', 'share'))
+
+        result = {}
+        for base_blog in base_blogs:
+            author = authors.get(base_blog.userid)
+            if not author or base_blog.id not in concrete_map:
+                continue
+
+            blog_type, content_type, concrete_blog = concrete_map[base_blog.id]
+            if base_blog.userid == self.user.id:
+                relation = 'Your blog'
+            else:
+                circle = relations.get(base_blog.userid)
+                relation = circle.onlinerelation.replace('_', ' ').title() if circle and circle.onlinerelation else "Connection"
+
+            result[base_blog.id] = {
+                'base': base_blog,
+                'concrete': concrete_blog,
+                'type': blog_type,
+                'content_type': content_type,
+                'author': author,
+                'relation': relation,
+                'has_liked': (base_blog.id, 'like') in reacted,
+                'has_shared': (base_blog.id, 'share') in reacted,
+                'comments': comments_map.get(base_blog.id, [])
+            }
+        return result
\ No newline at end of file
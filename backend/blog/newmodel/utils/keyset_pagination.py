@@ -0,0 +1,40 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(timestamp, blog_id):
+    raw = f"{timestamp.isoformat()}|{blog_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Returns (timestamp, blog_id) or None for the first page; ValueError if malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, blog_id = raw.split('|', 1)
+        return datetime.fromisoformat(timestamp), uuid.UUID(blog_id)
+    except (UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(str(e))
+
+
+def keyset_filter(timestamp_field, id_field, cursor):
+    """Rows strictly after the cursor in (timestamp, id) descending order"""
+    timestamp, blog_id = cursor
+    return Q(**{f"{timestamp_field}__lt": timestamp}) | Q(**{timestamp_field: timestamp, f"{id_field}__lt": blog_id})
+
+
+def parse_page_params(query_params, default_size, max_size):
+    """(page_size, cursor) from ``?page_size=&cursor=``; ValueError if either is invalid"""
+    try:
+        page_size = min(int(query_params.get('page_size', default_size)), max_size)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid page_size")
+    if page_size < 1:
+        raise ValueError("Invalid page_size")
+    return page_size, decode_cursor(query_params.get('cursor'))
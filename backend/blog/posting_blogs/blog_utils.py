@@ -3,6 +3,7 @@ from django.db import connection
 from ..models import BaseBlogModel, Comment
 from users.models import UserTree, Circle
 from ..blogpage.serializers import BlogSerializer, CommentSerializer
+from ..newmodel.services.reaction_store import reaction_store
 
 class BlogDataBuilder:
     def __init__(self, user, request):
@@ -134,8 +135,9 @@ class BlogDataBuilder:
             relation = circle.onlinerelation.replace('_', ' ').title() if circle and circle.onlinerelation else "Connection"
 
         # Check if current user has liked/shared
-        has_liked = self.user.id in base_blog.likes
-        has_shared = self.user.id in base_blog.shares
+        reacted = reaction_store.reacted(self.user.id, [base_blog.id], ('like', 'share'))
+        has_liked = (base_blog.id, 'like') in reacted
+        has_shared = (base_blog.id, 'share') in reacted
 
         # Get comments
         all_comment_ids = set(base_blog.comments)
@@ -78,7 +78,8 @@ class BlogCreateSerializer(serializers.Serializer):
         # Create base blog
         base_blog = BaseBlogModel.objects.create(
             userid=validated_data.get('userid'),
-            type=f"{blog_type}_{content_type}"
+            type=f"{blog_type}_{content_type}",
+            questionid=validated_data.get('questionid') if blog_type == 'answering_question' else None
         )
 
         # Handle different blog types
@@ -0,0 +1,30 @@
+from celery import shared_task
+import logging
+
+from blog.newmodel.services.blog_event_pipeline import BlogEventPipeline, track_stage
+from blog.newmodel.services.blog_outbox import blog_outbox
+
+logger = logging.getLogger(__name__)
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5)
+def deliver_blog_events(self, blog_id, events=None):
+    """
+    Deliver every buffered like/share/comment event for a blog in one pass.
+    Retries carry the drained events, which are no longer in the buffer.
+    """
+    pipeline = BlogEventPipeline()
+    try:
+        if events is None:
+            with track_stage('drain'):
+                events = pipeline.drain(blog_id)
+        return pipeline.deliver_events(blog_id, events)
+    except Exception as e:
+        logger.error(f"[BLOG PIPELINE] Delivery failed for blog {blog_id}: {e}")
+        raise self.retry(exc=e, args=[blog_id, events])
+
+
+@shared_task
+def trim_blog_outbox():
+    """Drop acknowledged, expired and over-cap blog outbox entries"""
+    deleted = blog_outbox.trim()
+    return f"Trimmed {deleted} blog outbox entries"
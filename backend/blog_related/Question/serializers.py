@@ -2,6 +2,8 @@ from rest_framework import serializers
 from ..models import Question
 
 class QuestionSerializer(serializers.ModelSerializer):
+    answer_count = serializers.IntegerField(read_only=True, default=0)
+
     class Meta:
         model = Question
-        fields = ['id', 'text', 'author_id', 'is_approved', 'rank', 'activity_score', 'created_at']
+        fields = ['id', 'text', 'author_id', 'is_approved', 'rank', 'activity_score', 'created_at', 'answer_count']
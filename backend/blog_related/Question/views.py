@@ -3,6 +3,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from blog.models import BaseBlogModel
 from ..models import Question
 from .serializers import QuestionSerializer
 from users.login.authentication import CookieJWTAuthentication
@@ -23,6 +26,18 @@ class QuestionListAPI(APIView):
         # Filter to approved questions only, ordered by rank and created_at
         queryset = Question.objects.filter(is_approved=True).order_by('rank', 'created_at')
 
+        # Answer counts from the question index on base blogs
+        answer_counts = (
+            BaseBlogModel.objects.filter(questionid=OuterRef('pk'))
+            .order_by()
+            .values('questionid')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        queryset = queryset.annotate(
+            answer_count=Coalesce(Subquery(answer_counts, output_field=IntegerField()), 0)
+        )
+
         paginator = self.pagination_class()
         paged_qs = paginator.paginate_queryset(queryset, request, view=self)
 
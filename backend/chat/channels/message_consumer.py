@@ -3,12 +3,10 @@ import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from django.db.models import Q
-from django.utils import timezone
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import TokenError
-from ..models import Conversation, Message
-from users.models import UserTree
+from ..services.message_store import message_store
+from ..services.write_buffer import ChatWriteBuffer
 import datetime
 
 logger = logging.getLogger(__name__)
@@ -20,6 +18,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.room_group_name = None
         self.conversation_id = None
         self.user = None
+        # Conversation membership and sender details, resolved once per socket
+        self.membership = None
+        self.write_buffer = None
 
     async def connect(self):
         try:
@@ -44,10 +45,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 await self.close()
                 return
                 
-            if not await self.validate_conversation_access():
+            self.membership = await database_sync_to_async(message_store.membership)(
+                self.conversation_id, self.user.id
+            )
+            if self.membership is None:
                 logger.warning(f"User {self.user.id} not in conversation {self.conversation_id}")
                 await self.close()
                 return
+            self.write_buffer = ChatWriteBuffer(self.membership, self.broadcast_saved_messages)
             
             self.room_group_name = f'chat_{self.conversation_id}'
             
@@ -67,6 +72,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
 
     async def disconnect(self, close_code):
+        if self.write_buffer is not None:
+            await self.write_buffer.flush()
         if self.room_group_name:
             await self.channel_layer.group_discard(
                 self.room_group_name,
@@ -93,10 +100,19 @@ class ChatConsumer(AsyncWebsocketConsumer):
             logger.error(f"Error processing message: {e}")
 
     async def handle_new_message(self, content):
-        message = await self.save_message(content)
-        
-        if message:
-            message_dict = await self.message_to_dict(message)
+        # Rejected here, a bad message would fail the whole batch it is written with
+        if not isinstance(content, str) or not content.strip():
+            await self.send_error('Message content must be non-empty text')
+            return
+        # Saved and broadcast with the rest of its batch, see broadcast_saved_messages
+        await self.write_buffer.add(content)
+
+    async def broadcast_saved_messages(self, pairs):
+        for message, _ in pairs:
+            if message is None:
+                await self.send_error('Message could not be saved')
+                continue
+            message_dict = self.message_to_dict(message)
             # Broadcast to others EXCEPT sender
             await self.channel_layer.group_send(
                 self.room_group_name,
@@ -111,7 +127,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 **message_dict,
                 'type': 'message_ack'
             }))
-            await self.update_conversation_last_message(message)
+
+    async def send_error(self, error):
+        await self.send(text_data=json.dumps({
+            'type': 'error',
+            'error': error
+        }))
 
     async def chat_message(self, event):
         # Only send to clients that are not the sender
@@ -142,83 +163,27 @@ class ChatConsumer(AsyncWebsocketConsumer):
         except User.DoesNotExist:
             return None
 
-    @database_sync_to_async
-    def validate_conversation_access(self):
-        try:
-            user_id = self.user.id
-            return Conversation.objects.filter(
-                Q(id=self.conversation_id),
-                Q(participant1_id=user_id) | Q(participant2_id=user_id)
-            ).exists()
-        except Exception:
-            return False
-
-    @database_sync_to_async
-    def save_message(self, content):
+    async def mark_conversation_read(self):
         try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            message = Message.objects.create(
-                conversation=conversation,
-                sender_id=self.user.id,
-                content=content
+            rows = await database_sync_to_async(message_store.mark_read)(
+                self.membership.conversation_id, self.user.id
             )
-            return message
-        except Exception as e:
-            logger.error(f"Error saving message: {e}")
-            return None
-
-    @database_sync_to_async
-    def update_conversation_last_message(self, message):
-        conversation = Conversation.objects.get(id=self.conversation_id)
-        conversation.last_message = message.content
-        conversation.last_message_timestamp = message.timestamp
-        conversation.last_active = message.timestamp
-        conversation.save()
-
-    @database_sync_to_async
-    def mark_conversation_read(self):
-        try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            if conversation.participant1_id == self.user.id:
-                conversation.participant1_last_read = timezone.now()
-            else:
-                conversation.participant2_last_read = timezone.now()
-            conversation.save()
+            await message_store.send(message_store.status_events(rows))
         except Exception as e:
             logger.error(f"Error updating read status: {e}")
 
-    @database_sync_to_async
     def message_to_dict(self, message):
-        try:
-            user_tree = UserTree.objects.get(id=message.sender_id)
-            sender = {
-                'id': user_tree.id,
-                'name': user_tree.name,
-                'profile_pic': self.get_profile_pic_url(user_tree)
-            }
-        except UserTree.DoesNotExist:
-            try:
-                user = User.objects.get(id=message.sender_id)
-                sender = {
-                    'id': user.id,
-                    'name': f"{user.first_name} {user.last_name}",
-                    'profile_pic': None
-                }
-            except User.DoesNotExist:
-                logger.error(f"User not found for message sender: {message.sender_id}")
-                sender = {
-                    'id': message.sender_id,
-                    'name': 'Unknown',
-                    'profile_pic': None
-                }
-        
         return {
             'type': 'chat_message',
             'id': str(message.id),
             'content': message.content,
             'timestamp': message.timestamp.isoformat(),
-            'read': message.read,
-            'sender': sender,
+            'read': message.status in ('read', 'read_update'),
+            'sender': {
+                'id': self.membership.user_id,
+                'name': self.membership.sender_name,
+                'profile_pic': self.membership.sender_profile
+            },
             'is_own': message.sender_id == self.user.id
         }
         
@@ -228,8 +193,3 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'type': 'message_read_update',
                 'timestamp': event['timestamp']
             }))
-
-    def get_profile_pic_url(self, user_tree):
-        if user_tree.profilepic:
-            return f"http://localhost:8000{user_tree.profilepic.url}"
-        return None
@@ -24,7 +24,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
 class ConversationListSerializer(serializers.ModelSerializer):
     other_user = serializers.SerializerMethodField()
-    unread_count = serializers.SerializerMethodField()
+    unread_count = serializers.IntegerField(read_only=True)
     last_message_timestamp = serializers.DateTimeField(source='last_active', format="%Y-%m-%dT%H:%M:%S")
 
     def get_other_user(self, obj):
@@ -44,15 +44,6 @@ class ConversationListSerializer(serializers.ModelSerializer):
                 'profile_pic': None
             }
 
-    def get_unread_count(self, obj):
-        current_user = self.context['request'].user
-        unread_messages = getattr(obj, 'unread_messages', [])
-        # Count messages where sender is not current user and status is NOT 'read' or 'read_update'
-        return sum(
-            1 for msg in unread_messages
-            if msg.sender != current_user and msg.status not in ['read', 'read_update']
-        )
-
     class Meta:
         model = Conversation
         fields = [
@@ -1,8 +1,8 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Prefetch, Q
-from ..models import Conversation, Message
+from django.db.models import Q
+from ..models import Conversation
 from users.models import UserTree
 from .serializers import ConversationListSerializer
 from users.login.authentication import CookieJWTAuthentication
@@ -20,17 +20,10 @@ class ConversationListView(generics.ListAPIView):
             Q(participant1=user) | Q(participant2=user)
         ).select_related('participant1', 'participant2')
 
-        # Prefetch unread messages: status NOT 'read'/'read_update' and receiver=current user
-        unread_msgs = Prefetch(
-            'messages',
-            queryset=Message.objects.filter(
-                receiver=user
-            ).exclude(
-                status__in=['read', 'read_update']
-            ),
-            to_attr='unread_messages'
-        )
-        return conversations.prefetch_related(unread_msgs).order_by('-last_active')
+        # The user's side of the maintained unread counters
+        return conversations.annotate(
+            unread_count=Conversation.unread_count_for(user.id)
+        ).order_by('-last_active')
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -49,7 +49,7 @@ class MessageSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or not hasattr(request, 'user'):
             return False
-        return obj.sender == request.user
+        return obj.sender_id == request.user.id
 
 
 class ConversationDetailSerializer(serializers.ModelSerializer):
@@ -7,6 +7,8 @@ from django.utils import timezone
 from ..models import Conversation, Message
 from users.models import UserTree
 from .serializers import MessageSerializer, ConversationDetailSerializer
+from ..services.message_store import message_store
+from blog.newmodel.utils.keyset_pagination import encode_cursor, keyset_filter, parse_page_params
 from users.login.authentication import CookieJWTAuthentication
 
 import logging
@@ -40,34 +42,66 @@ class ConversationDetailView(generics.RetrieveAPIView):
 
 
 class MessageListView(generics.ListAPIView):
+    """
+    A conversation's history, one page at a time.
+
+    Keyset-paginated on (timestamp, id) over the (conversation, timestamp,
+    id) index, so a page costs the same however long the history is. The
+    first page holds the newest messages; pass ``next_cursor`` back as
+    ``?cursor=`` for the page before it. Each page is ordered oldest first.
+    """
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = MessageSerializer
+
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
     
     def get_queryset(self):
-        conversation_id = self.kwargs['conversation_id']
-        return Message.objects.filter(
-            Q(conversation__id=conversation_id) &
-            (Q(conversation__participant1=self.request.user) | 
-             Q(conversation__participant2=self.request.user))
-        ).order_by('timestamp')
+        return Message.objects.filter(conversation_id=self.kwargs['conversation_id']).select_related('sender')
     
     def list(self, request, *args, **kwargs):
+        is_participant = Conversation.objects.filter(
+            Q(participant1=request.user) | Q(participant2=request.user),
+            id=self.kwargs['conversation_id']
+        ).exists()
+        if not is_participant:
+            return Response(
+                {"error": "Conversation not found or access denied"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            page_size, cursor = parse_page_params(request.query_params, self.PAGE_SIZE, self.MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({'error': 'Invalid cursor or page_size'}, status=status.HTTP_400_BAD_REQUEST)
+
         queryset = self.get_queryset()
-        
-        # Get unique sender IDs from messages
-        sender_ids = set(queryset.values_list('sender_id', flat=True))
+        if cursor:
+            queryset = queryset.filter(keyset_filter('timestamp', 'id', cursor))
+        messages = list(queryset.order_by('-timestamp', '-id')[:page_size + 1])
+        has_more = len(messages) > page_size
+        messages = messages[:page_size]
+
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(messages[-1].timestamp, messages[-1].id)
+        messages.reverse()
         
         # Fetch related UserTree objects for sender details
-        user_trees = UserTree.objects.filter(id__in=sender_ids)
+        user_trees = UserTree.objects.filter(id__in={message.sender_id for message in messages})
         user_tree_map = {ut.id: ut for ut in user_trees}
         
         # Pass UserTree mapping in serializer context
         context = self.get_serializer_context()
         context['user_tree_map'] = user_tree_map
         
-        serializer = self.get_serializer(queryset, many=True, context=context)
-        return Response(serializer.data)
+        serializer = self.get_serializer(messages, many=True, context=context)
+        return Response({
+            'results': serializer.data,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        })
 
 
 class SendMessageView(APIView):
@@ -75,13 +109,8 @@ class SendMessageView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request, conversation_id):
-        try:
-            conversation = Conversation.objects.get(
-                Q(id=conversation_id) & 
-                (Q(participant1=request.user) | 
-                 Q(participant2=request.user))
-            )
-        except Conversation.DoesNotExist:
+        membership = message_store.membership(conversation_id, request.user.id)
+        if membership is None:
             return Response(
                 {"error": "Conversation not found or access denied"},
                 status=status.HTTP_404_NOT_FOUND
@@ -94,25 +123,9 @@ class SendMessageView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Determine receiver automatically
-        if request.user == conversation.participant1:
-            receiver = conversation.participant2
-        else:
-            receiver = conversation.participant1
-        
-        # Create the new message
-        message = Message.objects.create(
-            conversation=conversation,
-            sender=request.user,
-            receiver=receiver,
-            content=content
-        )
-        
-        # Update conversation's last message info & last_active
-        conversation.last_message = content
-        conversation.last_message_timestamp = message.timestamp
-        conversation.last_active = message.timestamp
-        conversation.save()
+        # Saves the message and updates the conversation's last message info
+        message = message_store.write_batch(membership, [content])[0]
+        message_store.send_sync(message_store.new_message_events([message], membership))
         
         # Get UserTree for sender to add to serializer context
         try:
@@ -126,9 +139,9 @@ class SendMessageView(APIView):
             'user_tree_map': user_tree_map
         })
         
-        # Log if receiver is offline; message delivery will be handled elsewhere
-        if not receiver.is_online:
-            logger.info(f"Receiver {receiver.id} is offline. Message will be delivered when online.")
+        # Offline receivers get it on their next connection
+        if message.status == 'sent':
+            logger.info(f"Receiver {membership.other_id} is offline. Message will be delivered when online.")
         
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
@@ -145,21 +158,49 @@ class MarkAsReadView(APIView):
                  Q(participant2=request.user))
             )
             
-            # Only mark messages as read where user is the receiver and message is unread
-            messages = Message.objects.filter(
-                conversation=conversation,
-                receiver=request.user,
-                # Using status for unread detection; you may want to adjust based on your model
-                status__in=['sent', 'delivered']  # Messages not yet 'read' or 'read_update'
-            )
-            
-            for message in messages:
-                message.mark_as_read()
+            # Every unread message the user received, in one statement
+            rows = message_store.mark_read(conversation.id, request.user.id)
+            message_store.send_sync(message_store.status_events(rows))
             
-            return Response({"status": "marked as read"})
+            return Response({"status": "marked as read", "count": len(rows)})
             
         except Conversation.DoesNotExist:
             return Response(
                 {"error": "Conversation not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
+
+
+class MarkReadBatchView(APIView):
+    """Mark the given messages the user received in the conversation as read"""
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, conversation_id):
+        message_ids = request.data.get('message_ids')
+        if not isinstance(message_ids, list):
+            return Response(
+                {"error": "message_ids must be a list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        is_participant = Conversation.objects.filter(
+            Q(participant1=request.user) | Q(participant2=request.user),
+            id=conversation_id
+        ).exists()
+        if not is_participant:
+            return Response(
+                {"error": "Conversation not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            rows = message_store.mark_read(conversation_id, request.user.id, message_ids=message_ids)
+        except ValueError:
+            return Response(
+                {"error": "Invalid message ID"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        message_store.send_sync(message_store.status_events(rows))
+
+        return Response({"status": "marked as read", "count": len(rows)})
@@ -8,6 +8,7 @@ def get_profilepic_url(obj, request):
     return None
 
 class ContactSerializer(serializers.Serializer):
+    """A contact's UserTree annotated with first_name, last_name and conversation_id"""
     id = serializers.IntegerField()
     name = serializers.SerializerMethodField()
     profile_pic = serializers.SerializerMethodField()
@@ -15,11 +16,11 @@ class ContactSerializer(serializers.Serializer):
     conversation_id = serializers.UUIDField(allow_null=True)
 
     def get_name(self, obj):
-        return f"{obj['petitioner'].first_name} {obj['petitioner'].last_name}"
+        return f"{obj.first_name} {obj.last_name}"
 
     def get_profile_pic(self, obj):
         request = self.context.get('request')
-        return get_profilepic_url(obj['user_tree'], request)
+        return get_profilepic_url(obj, request)
 
     def get_has_conversation(self, obj):
-        return obj['conversation_id'] is not None
+        return obj.conversation_id is not None
@@ -2,7 +2,7 @@
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q, Subquery
 from users.models import Circle, UserTree
 from ..models import Conversation
 from .serializers import ContactSerializer
@@ -15,44 +15,25 @@ from users.login.authentication import CookieJWTAuthentication
 @permission_classes([IsAuthenticated])
 def contact_list(request):
     current_user = request.user
-    # Get connections from Circle
-    circles = Circle.objects.filter(
-        Q(userid=current_user.id) | Q(otherperson=current_user.id)
+    # Everyone in the user's circle, in either direction
+    in_circle = (
+        Q(id__in=Circle.objects.filter(userid=current_user.id).values('otherperson')) |
+        Q(id__in=Circle.objects.filter(otherperson=current_user.id).values('userid'))
     )
-    
-    # Extract unique connection IDs
-    connection_ids = set()
-    for circle in circles:
-        if circle.userid == current_user.id:
-            connection_ids.add(circle.otherperson)
-        else:
-            connection_ids.add(circle.userid)
-    
-    # Remove current user and None values
-    connection_ids = {cid for cid in connection_ids if cid and cid != current_user.id}
-    
-    # Get user details and existing conversations
-    contacts = []
-    for user_id in connection_ids:
-        try:
-            # Get Petitioner and UserTree details
-            petitioner = Petitioner.objects.get(id=user_id)
-            user_tree = UserTree.objects.get(id=user_id)
-            
-            # Check for existing conversation
-            conversation = Conversation.objects.filter(
-                (Q(participant1=current_user.id) & Q(participant2=user_id)) |
-                (Q(participant2=current_user.id) & Q(participant1=user_id))
-            ).first()
-            
-            contacts.append({
-                'id': user_id,
-                'petitioner': petitioner,
-                'user_tree': user_tree,
-                'conversation_id': conversation.id if conversation else None
-            })
-        except (Petitioner.DoesNotExist, UserTree.DoesNotExist):
-            continue
+    petitioner = Petitioner.objects.filter(id=OuterRef('id'))
+    conversation = Conversation.objects.filter(
+        Q(participant1=current_user.id, participant2=OuterRef('id')) |
+        Q(participant2=current_user.id, participant1=OuterRef('id'))
+    )
+
+    # One query: profiles joined with the contacts' names and conversations
+    contacts = UserTree.objects.filter(in_circle, Exists(petitioner)).exclude(
+        id=current_user.id
+    ).annotate(
+        first_name=Subquery(petitioner.values('first_name')[:1]),
+        last_name=Subquery(petitioner.values('last_name')[:1]),
+        conversation_id=Subquery(conversation.values('id')[:1]),
+    ).only('id', 'profilepic')
     
     serializer = ContactSerializer(contacts, many=True, context={'request': request})
     return Response(serializer.data)
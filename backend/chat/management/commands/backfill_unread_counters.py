@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from chat.models import Conversation, Message
+
+
+class Command(BaseCommand):
+    help = ('Recomputes Conversation.unread_count_p1/unread_count_p2 from the messages each participant '
+            'has not read. Run once after adding the counters, or to repair them.')
+
+    def handle(self, *args, **options):
+        conversation_table = self.table(Conversation)
+        message_table = self.table(Message)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {conversation_table} c
+                SET unread_count_p1 = COALESCE(u.p1, 0), unread_count_p2 = COALESCE(u.p2, 0)
+                FROM {conversation_table} c2
+                LEFT JOIN (
+                    SELECT m.conversation_id,
+                           count(*) FILTER (WHERE m.receiver_id = cv.participant1_id) AS p1,
+                           count(*) FILTER (WHERE m.receiver_id = cv.participant2_id) AS p2
+                    FROM {message_table} m
+                    JOIN {conversation_table} cv ON cv.id = m.conversation_id
+                    WHERE m.status = ANY(%s)
+                    GROUP BY m.conversation_id
+                ) u ON u.conversation_id = c2.id
+                WHERE c2.id = c.id
+                  AND (c.unread_count_p1 <> COALESCE(u.p1, 0) OR c.unread_count_p2 <> COALESCE(u.p2, 0))
+                """,
+                [list(Message.UNREAD_STATUSES)]
+            )
+            self.stdout.write(f"Conversation: unread counters corrected on {cursor.rowcount} rows")
+
+        self.stdout.write(self.style.SUCCESS('Unread counters backfilled successfully!'))
+
+    @staticmethod
+    def table(model):
+        return connection.ops.quote_name(model._meta.db_table)
@@ -0,0 +1,139 @@
+import asyncio
+import time
+import uuid
+from datetime import date
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from chat.models import Conversation, Message
+from chat.services.message_store import message_store
+from chat.services.write_buffer import ChatWriteBuffer
+from users.models import Petitioner
+
+
+class Command(BaseCommand):
+    help = ('Load test of the chat write path: messages/sec of one worker for synthetic conversations, '
+            'batched (ChatWriteBuffer) or one Message.save() per message')
+
+    # Synthetic users live far above real 14-digit village IDs
+    SYNTHETIC_ID_BASE = 98_000_000_000_000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conversations', type=int, default=20, help='Concurrent synthetic conversations (sockets)')
+        parser.add_argument('--messages', type=int, default=100, help='Messages sent per conversation')
+        parser.add_argument('--max-batch', type=int, default=ChatWriteBuffer.MAX_BATCH, help='Write buffer size')
+        parser.add_argument('--flush-delay', type=float, default=ChatWriteBuffer.FLUSH_DELAY, help='Write buffer delay (s)')
+        parser.add_argument('--legacy', action='store_true', help='Also time Message.objects.create per message')
+
+    def handle(self, *args, **options):
+        conversations = options['conversations']
+        per_conversation = options['messages']
+        # Notifications go to an in-memory layer: the benchmark measures the database side
+        message_store.channel_layer = InMemoryChannelLayer(capacity=conversations * per_conversation * 4 + 100)
+
+        user_ids, conversation_ids = self.seed(conversations)
+        try:
+            self.stdout.write(f"Seeded {conversations} conversations between {len(user_ids)} synthetic users")
+
+            memberships = [
+                message_store.membership(conversation_id, user_ids[2 * index])
+                for index, conversation_id in enumerate(conversation_ids)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                # async_to_sync runs database_sync_to_async work on this thread, so its queries are captured
+                saved = async_to_sync(self.send_batched)(memberships, per_conversation, options)
+                batched_seconds = time.perf_counter() - started
+            self.report('Batched', saved, batched_seconds, len(ctx.captured_queries))
+
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                read_rows = sum(
+                    len(message_store.mark_read(membership.conversation_id, membership.other_id))
+                    for membership in memberships
+                )
+                read_seconds = time.perf_counter() - started
+            self.stdout.write(
+                f"Read receipts:       {read_rows} messages in {len(ctx.captured_queries)} queries, "
+                f"{read_seconds * 1000:.1f} ms"
+            )
+
+            if options['legacy']:
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    for membership in memberships:
+                        for number in range(per_conversation):
+                            Message.objects.create(
+                                conversation_id=membership.conversation_id,
+                                sender_id=membership.user_id,
+                                receiver_id=membership.other_id,
+                                content=f"legacy message {number}"
+                            )
+                    legacy_seconds = time.perf_counter() - started
+                self.report('Message.save()', conversations * per_conversation, legacy_seconds,
+                            len(ctx.captured_queries))
+        finally:
+            self.cleanup(user_ids, conversation_ids)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, synthetic data deleted"))
+
+    async def send_batched(self, memberships, per_conversation, options):
+        saved = []
+
+        async def on_saved(pairs):
+            saved.extend(message for message, _ in pairs if message is not None)
+
+        buffers = [
+            ChatWriteBuffer(membership, on_saved, flush_delay=options['flush_delay'], max_batch=options['max_batch'])
+            for membership in memberships
+        ]
+        # Frames of all sockets interleave, as on a busy worker
+        for number in range(per_conversation):
+            for buffer in buffers:
+                await buffer.add(f"bench message {number}")
+            await asyncio.sleep(0)
+        for buffer in buffers:
+            await buffer.flush()
+        return len(saved)
+
+    def report(self, label, count, seconds, queries):
+        rate = count / seconds if seconds else 0
+        self.stdout.write(
+            f"{label + ':':<20} {count} messages in {seconds:.2f}s "
+            f"({rate:.0f} messages/s, {queries / count if count else 0:.2f} queries/message)"
+        )
+
+    def seed(self, conversations):
+        """Two synthetic, offline petitioners per conversation"""
+        user_ids = [self.SYNTHETIC_ID_BASE + i for i in range(1, 2 * conversations + 1)]
+        Petitioner.objects.bulk_create([
+            Petitioner(
+                id=user_id,
+                gmail=f"chat.bench.{user_id}@example.com",
+                first_name="Bench",
+                last_name=str(user_id),
+                date_of_birth=date(1990, 1, 1),
+                age=30,
+                gender='O',
+                is_online=False,
+                password='!'
+            )
+            for user_id in user_ids
+        ], batch_size=2000)
+
+        # bulk_create skips Conversation.clean(), which requires a Circle link
+        conversation_rows = [
+            Conversation(id=uuid.uuid4(), participant1_id=user_ids[2 * index], participant2_id=user_ids[2 * index + 1])
+            for index in range(conversations)
+        ]
+        Conversation.objects.bulk_create(conversation_rows)
+        return user_ids, [conversation.id for conversation in conversation_rows]
+
+    def cleanup(self, user_ids, conversation_ids):
+        Message.objects.filter(conversation_id__in=conversation_ids).delete()
+        Conversation.objects.filter(id__in=conversation_ids).delete()
+        Petitioner.objects.filter(id__in=user_ids).delete()
@@ -1,7 +1,8 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 import uuid
-from django.db.models import Q
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from users.models import Petitioner, Circle, UserTree
 
@@ -21,6 +22,9 @@ class Conversation(models.Model):
     last_active = models.DateTimeField(auto_now=True)
     last_message = models.TextField(null=True, blank=True)
     last_message_timestamp = models.DateTimeField(null=True, blank=True)
+    # Messages each participant received and has not read, maintained by the writes
+    unread_count_p1 = models.PositiveIntegerField(default=0)
+    unread_count_p2 = models.PositiveIntegerField(default=0)
 
     class Meta:
         constraints = [
@@ -61,6 +65,27 @@ class Conversation(models.Model):
         self.last_message = message.content
         self.last_message_timestamp = message.timestamp
         self.save(update_fields=['last_message', 'last_message_timestamp'])
+        if message.status in message.UNREAD_STATUSES:
+            Conversation.objects.filter(id=self.id).update(**self.unread_update(message.receiver_id, 1))
+
+    @staticmethod
+    def unread_update(receiver_id, delta):
+        """
+        ``update()`` kwargs moving the receiver's unread counter by ``delta``,
+        as one atomic UPDATE that never goes below zero
+        """
+        return {
+            field: Case(
+                When(**{participant: receiver_id}, then=Greatest(F(field) + delta, Value(0), output_field=models.PositiveIntegerField())),
+                default=F(field)
+            )
+            for participant, field in (('participant1_id', 'unread_count_p1'), ('participant2_id', 'unread_count_p2'))
+        }
+
+    @staticmethod
+    def unread_count_for(user_id):
+        """Expression for the user's unread counter, for annotating their conversations"""
+        return Case(When(participant1_id=user_id, then=F('unread_count_p1')), default=F('unread_count_p2'))
 
     def __str__(self):
         return f"Chat between {self.participant1} and {self.participant2}"
@@ -18,6 +18,8 @@ class Message(models.Model):
         ('read', 'Read'),
         ('read_update', 'Read Update'),
     )
+    # Statuses a receiver has not read yet
+    UNREAD_STATUSES = ('sent', 'delivered', 'delivered_update')
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
@@ -34,6 +36,8 @@ class Message(models.Model):
         db_table = 'chat"."message'  # Note: double quotes mean this is for PostgreSQL!
         indexes = [
             models.Index(fields=['receiver', 'status']),
+            # Keyset pagination of a conversation's history
+            models.Index(fields=['conversation', 'timestamp', 'id']),
         ]
 
     def clean(self):
@@ -67,8 +71,13 @@ class Message(models.Model):
     def update_status(self, new_status):
         """Update message status and trigger notifications"""
         if self.status != new_status:
+            was_unread = self.status in self.UNREAD_STATUSES
             self.status = new_status
             self.save(update_fields=['status', 'last_status_update'])
+            if was_unread and new_status not in self.UNREAD_STATUSES:
+                Conversation.objects.filter(id=self.conversation_id).update(
+                    **Conversation.unread_update(self.receiver_id, -1)
+                )
             self.notify_status_change()
 
     def notify_status_change(self):
@@ -103,8 +112,9 @@ class Message(models.Model):
 
     def try_deliver(self):
         """Attempt to deliver the message if receiver is online."""
+        from users.services.presence import presence
         try:
-            if getattr(self.receiver, 'is_online', False):
+            if presence.is_online(self.receiver_id):
                 self.update_status('delivered')
                 self.send_new_message_notification()
             else:
@@ -157,7 +167,8 @@ class Message(models.Model):
         """Mark message as read and update status"""
         if self.status not in ['read', 'read_update']:
             # Upgrade to 'read_update' if sender is online
-            if getattr(self.sender, 'is_online', False):
+            from users.services.presence import presence
+            if presence.is_online(self.sender_id):
                 self.update_status('read_update')
             else:
                 self.update_status('read')
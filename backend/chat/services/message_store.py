@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict, namedtuple
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import connection, transaction
+from django.db.models import Q
+
+from chat.models import Conversation, Message
+from users.models import Petitioner, UserTree
+from users.services.presence import presence
+
+logger = logging.getLogger(__name__)
+
+# A user's side of a conversation, resolved once per socket
+Membership = namedtuple('Membership', ['conversation_id', 'user_id', 'other_id', 'sender_name', 'sender_profile'])
+
+STATUS_SUBTYPES = {
+    'delivered': 'message_delivered',
+    'delivered_update': 'message_delivered_update',
+    'read': 'message_read',
+    'read_update': 'message_read_update',
+}
+
+
+class ChatMessageStore:
+    """
+    Set-based chat writes.
+
+    ``Message.save()`` validates participants, updates the conversation and
+    delivers the message one row at a time. Here the participants are
+    resolved once (``membership``), a batch of messages is one
+    ``bulk_create`` plus one conversation UPDATE, and status transitions
+    (delivered / read receipts) cover a whole conversation or user with one
+    ``UPDATE ... RETURNING``. Each write moves the receiver's unread
+    counter on the conversation in the same transaction. Notifications are
+    built from the written rows and sent concurrently; status changes of
+    many messages reach their sender as one ``messages_status`` event.
+    """
+
+    def __init__(self, channel_layer=None):
+        self.channel_layer = channel_layer
+
+    def membership(self, conversation_id, user_id):
+        """The user's Membership of the conversation, or None if they are not a participant"""
+        row = Conversation.objects.filter(
+            Q(participant1_id=user_id) | Q(participant2_id=user_id), id=conversation_id
+        ).values_list('participant1_id', 'participant2_id').first()
+        if row is None:
+            return None
+        other_id = row[1] if row[0] == user_id else row[0]
+        if other_id == user_id:
+            return None
+
+        sender = UserTree.objects.filter(id=user_id).first()
+        if sender is not None:
+            sender_name = sender.name
+            sender_profile = f"http://127.0.0.1:8000{sender.profilepic.url}" if sender.profilepic else None
+        else:
+            names = Petitioner.objects.filter(id=user_id).values_list('first_name', 'last_name').first()
+            sender_name = f"{names[0]} {names[1]}" if names else 'Unknown'
+            sender_profile = None
+        return Membership(uuid.UUID(str(conversation_id)), user_id, other_id, sender_name, sender_profile)
+
+    def write_batch(self, membership, contents):
+        """
+        Save ``contents`` as messages from the member to the other participant,
+        in order. They start out delivered when the receiver is online.
+        Returns the saved messages.
+        """
+        if not contents:
+            return []
+        status = 'delivered' if presence.is_online(membership.other_id) else 'sent'
+
+        messages = [
+            Message(
+                id=uuid.uuid4(),
+                conversation_id=membership.conversation_id,
+                sender_id=membership.user_id,
+                receiver_id=membership.other_id,
+                content=content,
+                status=status,
+            )
+            for content in contents
+        ]
+        with transaction.atomic():
+            # auto_now_add stamps each row in order
+            Message.objects.bulk_create(messages)
+            last = messages[-1]
+            Conversation.objects.filter(id=membership.conversation_id).update(
+                last_message=last.content,
+                last_message_timestamp=last.timestamp,
+                last_active=last.timestamp,
+                **Conversation.unread_update(membership.other_id, len(messages))
+            )
+        return messages
+
+    def mark_read(self, conversation_id, reader_id, message_ids=None):
+        """
+        Mark the messages the reader received in the conversation as read
+        (``read_update`` when its sender is online): all of them, or only
+        ``message_ids``. Returns the changed rows as (message_id,
+        conversation_id, sender_id, status).
+        """
+        params = [conversation_id, reader_id, list(Message.UNREAD_STATUSES)]
+        only_ids = ''
+        if message_ids is not None:
+            only_ids = 'AND m.id = ANY(%s)'
+            params.append([uuid.UUID(str(message_id)) for message_id in message_ids])
+
+        with transaction.atomic():
+            rows = self._transition(
+                f"""
+                UPDATE {self._table(Message)} m
+                SET status = CASE WHEN p.is_online THEN 'read_update' ELSE 'read' END,
+                    last_status_update = now()
+                FROM {self._table(Petitioner)} p
+                WHERE p.id = m.sender_id
+                  AND m.conversation_id = %s AND m.receiver_id = %s
+                  AND m.status = ANY(%s) {only_ids}
+                RETURNING m.id, m.conversation_id, m.sender_id, m.status
+                """,
+                params
+            )
+            if rows:
+                Conversation.objects.filter(id=conversation_id).update(
+                    **Conversation.unread_update(reader_id, -len(rows))
+                )
+        return rows
+
+    def deliver_pending(self, receiver_id):
+        """
+        Mark every message waiting for the receiver as delivered
+        (``delivered_update`` when its sender is online). Returns the
+        delivered messages, oldest first.
+        """
+        rows = self._transition(
+            f"""
+            UPDATE {self._table(Message)} m
+            SET status = CASE WHEN p.is_online THEN 'delivered_update' ELSE 'delivered' END,
+                last_status_update = now()
+            FROM {self._table(Petitioner)} p
+            WHERE p.id = m.sender_id AND m.receiver_id = %s AND m.status = 'sent'
+            RETURNING m.id
+            """,
+            [receiver_id]
+        )
+        if not rows:
+            return []
+        return list(Message.objects.filter(id__in=[row[0] for row in rows]).order_by('timestamp'))
+
+    def promote_pending_updates(self, sender_id):
+        """
+        The sender is back online: their delivered and read messages become
+        ``delivered_update`` / ``read_update``. Returns the changed rows as
+        (message_id, conversation_id, sender_id, status).
+        """
+        return self._transition(
+            f"""
+            UPDATE {self._table(Message)}
+            SET status = status || '_update', last_status_update = now()
+            WHERE sender_id = %s AND status IN ('delivered', 'read')
+            RETURNING id, conversation_id, sender_id, status
+            """,
+            [sender_id]
+        )
+
+    # -----------------------------
+    # Notifications
+    # -----------------------------
+
+    def new_message_events(self, messages, membership=None):
+        """
+        ``new_message`` events for the receivers of ``messages`` plus the
+        status events of the ones already delivered. Sender details come
+        from ``membership`` or one UserTree query.
+        """
+        if not messages:
+            return []
+        senders = {}
+        if membership is not None:
+            senders[membership.user_id] = (membership.sender_name, membership.sender_profile)
+        missing = {message.sender_id for message in messages} - set(senders)
+        if missing:
+            for sender in UserTree.objects.filter(id__in=missing):
+                senders[sender.id] = (
+                    sender.name,
+                    f"http://127.0.0.1:8000{sender.profilepic.url}" if sender.profilepic else None
+                )
+
+        events = []
+        for message in messages:
+            sender_name, sender_profile = senders.get(message.sender_id, ('Unknown', None))
+            events.append((f"notifications_{message.receiver_id}", {
+                "type": "notification_message",
+                "category": "chat_system",
+                "subtype": "new_message",
+                "message_id": str(message.id),
+                "conversation_id": str(message.conversation_id),
+                "content": message.content,
+                "sender_id": str(message.sender_id),
+                "timestamp": message.timestamp.isoformat(),
+                "status": message.status,
+                "sender_name": sender_name,
+                "sender_profile": sender_profile,
+            }))
+        events.extend(self.status_events([
+            (message.id, message.conversation_id, message.sender_id, message.status)
+            for message in messages if message.status != 'sent'
+        ]))
+        return events
+
+    @staticmethod
+    def status_events(rows):
+        """
+        One event per (sender, conversation, status) for the rows of a
+        transition: the single-message subtype for one message,
+        ``messages_status`` with all the IDs otherwise
+        """
+        grouped = defaultdict(list)
+        for message_id, conversation_id, sender_id, status in rows:
+            if status in STATUS_SUBTYPES:
+                grouped[(sender_id, str(conversation_id), status)].append(str(message_id))
+
+        events = []
+        for (sender_id, conversation_id, status), message_ids in grouped.items():
+            payload = {
+                "type": "notification_message",
+                "category": "chat_system",
+                "conversation_id": conversation_id,
+                "status": status,
+            }
+            if len(message_ids) == 1:
+                payload.update(subtype=STATUS_SUBTYPES[status], message_id=message_ids[0])
+            else:
+                payload.update(subtype="messages_status", message_ids=message_ids)
+            events.append((f"notifications_{sender_id}", payload))
+        return events
+
+    async def send(self, events):
+        """Send (group, payload) events concurrently"""
+        if not events:
+            return
+        channel_layer = self.channel_layer or get_channel_layer()
+        results = await asyncio.gather(
+            *(channel_layer.group_send(group, payload) for group, payload in events),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send chat notification: {result}")
+
+    def send_sync(self, events):
+        async_to_sync(self.send)(events)
+
+    def _transition(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    @staticmethod
+    def _table(model):
+        return connection.ops.quote_name(model._meta.db_table)
+
+
+message_store = ChatMessageStore()
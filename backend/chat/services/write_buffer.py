@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+from channels.db import database_sync_to_async
+
+from .message_store import message_store
+
+logger = logging.getLogger(__name__)
+
+
+class ChatWriteBuffer:
+    """
+    Per-socket buffer of outgoing messages for one conversation.
+
+    A consumer handles one frame at a time, so ``add`` only queues the
+    message and returns; the queue is written with
+    ``ChatMessageStore.write_batch`` once it holds ``MAX_BATCH`` messages or
+    ``FLUSH_DELAY`` seconds after its first one, and ``on_saved(pairs)`` is
+    awaited with [(message, meta), ...] in the order they were added (e.g.
+    to acknowledge client temp IDs). If the batch write fails its messages
+    are saved one at a time, and the ones that still fail are passed as
+    ``(None, meta)``. Consumers flush on disconnect.
+    """
+
+    FLUSH_DELAY = 0.02
+    MAX_BATCH = 100
+
+    def __init__(self, membership, on_saved, flush_delay=None, max_batch=None):
+        self.membership = membership
+        self.on_saved = on_saved
+        self.flush_delay = self.FLUSH_DELAY if flush_delay is None else flush_delay
+        self.max_batch = max_batch or self.MAX_BATCH
+        self.pending = []
+        self._timer = None
+        self._lock = asyncio.Lock()
+
+    async def add(self, content, meta=None):
+        self.pending.append((content, meta))
+        if len(self.pending) >= self.max_batch:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.flush_delay, lambda: asyncio.ensure_future(self.flush())
+            )
+
+    async def flush(self):
+        """Write and announce everything queued; returns the number of messages written"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # A timer flush and a size/disconnect flush must not interleave their batches
+        async with self._lock:
+            batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+            try:
+                messages, events = await database_sync_to_async(self._write)([content for content, _ in batch])
+            except Exception as e:
+                logger.error(f"Error saving {len(batch)} chat messages: {e}")
+                await self.on_saved([(None, meta) for _, meta in batch])
+                return 0
+            await message_store.send(events)
+            await self.on_saved([(message, meta) for message, (_, meta) in zip(messages, batch)])
+            return sum(message is not None for message in messages)
+
+    def _write(self, contents):
+        try:
+            messages = message_store.write_batch(self.membership, contents)
+        except Exception as e:
+            # One bad message must not lose the rest of its batch
+            logger.error(f"Error saving {len(contents)} chat messages, saving them one by one: {e}")
+            messages = [self._write_one(content) for content in contents]
+        saved = [message for message in messages if message is not None]
+        return messages, message_store.new_message_events(saved, self.membership)
+
+    def _write_one(self, content):
+        try:
+            return message_store.write_batch(self.membership, [content])[0]
+        except Exception as e:
+            logger.error(f"Error saving chat message: {e}")
+            return None
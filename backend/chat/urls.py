@@ -4,7 +4,8 @@ from .chatroom.views import (
     ConversationDetailView,
     MessageListView,
     SendMessageView,
-    MarkAsReadView
+    MarkAsReadView,
+    MarkReadBatchView
 )
 from .contact_list.views import contact_list, start_conversation
 # from contact_list.views import ContactListAPIView, StartConversationAPIView
@@ -28,6 +29,9 @@ urlpatterns = [
     path('chat/<uuid:conversation_id>/mark_read/', 
          MarkAsReadView.as_view(), 
          name='chat-mark-read'),
+    path('chat/<uuid:conversation_id>/mark_read_batch/', 
+         MarkReadBatchView.as_view(), 
+         name='chat-mark-read-batch'),
     path('contacts/', contact_list, name='contact_list'),
     path('conversation/start/<int:contact_id>/', start_conversation, name='start_conversation'),
      # path('contacts/', ContactListAPIView.as_view(), name='contact-list'),
@@ -23,14 +23,21 @@ class SpeakerInvitationSerializer(serializers.ModelSerializer):
     def get_notification_type(self, obj):
         return "Group_Speaker_Invitation"
 
+    def get_founder(self, obj):
+        # Batch callers pass the founders as context['user_trees'] ({id: UserTree})
+        user_trees = self.context.get('user_trees')
+        if user_trees is not None:
+            return user_trees.get(obj.group.founder)
+        return UserTree.objects.filter(id=obj.group.founder).first()
+
     def get_notification_message(self, obj):
-        founder_instance = UserTree.objects.filter(id=obj.group.founder).first()
+        founder_instance = self.get_founder(obj)
         founder_name = founder_instance.name if founder_instance else "The founder"
         return f"{founder_name} of {obj.group.name} has invited you to be a speaker. Will you accept?"
 
     def get_notification_data(self, obj):
         base_url = "http://localhost:8000/"  # Ensure URLs are properly prefixed
-        founder_instance = UserTree.objects.filter(id=obj.group.founder).first()
+        founder_instance = self.get_founder(obj)
         founder_name = founder_instance.name if founder_instance else "Unknown Founder"
 
         # Convert founder profile picture field to URL
@@ -5,6 +5,8 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
+from backend.read_cache import cached_view
+
 from ..models.geos import Country, State, District, Subdistrict, Village
 from .serializers import IDBreakdownSerializer
 
@@ -22,6 +24,7 @@ from .serializers import IDBreakdownSerializer
     responses=IDBreakdownSerializer
 )
 @api_view(['GET'])
+@cached_view('geographies', key=lambda request, id_str: ('id_breakdown', id_str), timeout=60 * 60)
 def id_breakdown(request, id_str):
     """
     Breaks a 14‑digit ID into state, district, subdistrict, village and person_code.
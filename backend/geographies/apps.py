@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GeographiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'geographies'
+
+    def ready(self):
+        import geographies.signals
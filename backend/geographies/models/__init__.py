@@ -0,0 +1 @@
+from .population import PopulationDelta
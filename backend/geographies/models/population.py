@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class PopulationDelta(models.Model):
+    """
+    A pending change to the online_population of a subdistrict, district,
+    state or country. Verifications append one row per level instead of
+    updating the shared rows; ``population_counter.flush`` folds them in.
+    """
+    LEVEL_CHOICES = [
+        ('subdistrict', 'Subdistrict'),
+        ('district', 'District'),
+        ('state', 'State'),
+        ('country', 'Country'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES)
+    entity_id = models.BigIntegerField()
+    amount = models.IntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'population_delta'
+        indexes = [
+            models.Index(fields=['level', 'entity_id'])
+        ]
@@ -0,0 +1,348 @@
+import logging
+from collections import Counter
+
+from django.db import connection, transaction
+
+from backend.redis_connection import get_redis_client
+from geographies.models.geos import Country, State, District, Subdistrict, Village
+from geographies.models.population import PopulationDelta
+
+logger = logging.getLogger(__name__)
+
+
+class PopulationCounter:
+    """
+    Allocates the per-geography sequence numbers of new users and keeps the
+    ``online_population`` columns.
+
+    The village number, which goes into the 14-digit user ID, comes from an
+    ``UPDATE ... RETURNING`` on the village row: it is never stale and only
+    verifications in the same village wait on each other.
+
+    Subdistrict, district, state and country numbers come from Redis INCR
+    counters (``population:{level}:{id}``), seeded from the database when
+    missing. Their ``online_population`` columns are updated by ``flush``,
+    which folds the PopulationDelta rows appended by each verification into
+    every row with one statement, so a verification never locks a state or
+    country row. A rolled-back verification leaves a gap in these numbers,
+    like a database sequence would. If Redis is unreachable the level row
+    is incremented directly instead, and once that commits the counter is
+    dropped, or, if Redis is still down, raised to the database value
+    before this process next uses it, so it never hands out those numbers
+    again.
+    """
+
+    KEY = 'population:{}:{}'
+    # SET with GT semantics, then INCRBY: ARGV[1] is the persisted population, ARGV[2] the amount
+    _RESEED_INCRBY = """
+        local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+        if tonumber(ARGV[1]) > current then
+            redis.call('SET', KEYS[1], ARGV[1])
+        end
+        return redis.call('INCRBY', KEYS[1], ARGV[2])
+    """
+    # (level, model), village excluded, in ID hierarchy order
+    PARENT_LEVELS = (
+        ('subdistrict', Subdistrict),
+        ('district', District),
+        ('state', State),
+        ('country', Country),
+    )
+
+    def __init__(self, redis_client=None):
+        self._redis = redis_client
+        # Counters behind the database after an in-place increment Redis could not hear about
+        self._stale = set()
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    def allocate(self, village_id):
+        """
+        Count one new user in the village and every level above it. Returns
+        {'village_number', 'subdistrict_number', ..., 'country_number'}; a
+        level missing from the hierarchy gets 0.
+        """
+        numbers = {'village_number': self.allocate_village_number(village_id)}
+        parents = Village.objects.filter(id=village_id).values_list(
+            'subdistrict_id',
+            'subdistrict__district_id',
+            'subdistrict__district__state_id',
+            'subdistrict__district__state__country_id',
+        ).first() or (None,) * len(self.PARENT_LEVELS)
+
+        deltas = []
+        for (level, model), entity_id in zip(self.PARENT_LEVELS, parents):
+            if entity_id is None:
+                logger.warning(f"No {level} found for village {village_id}")
+                numbers[f'{level}_number'] = 0
+                continue
+            number = self._next_number(level, model, entity_id)
+            if number is None:
+                number = self._increment(model, entity_id, level)
+                self._invalidate_on_commit([self.KEY.format(level, entity_id)])
+            else:
+                deltas.append(PopulationDelta(level=level, entity_id=entity_id))
+            numbers[f'{level}_number'] = number
+
+        # Part of the caller's transaction, like the user row itself
+        PopulationDelta.objects.bulk_create(deltas)
+        return numbers
+
+    def allocate_many(self, village_ids):
+        """
+        ``allocate`` for a batch of new users, one village ID per user, with
+        one UPDATE for all villages, one hierarchy query, one Redis round
+        trip and one delta per touched entity. Returns the number dicts in
+        the order of ``village_ids``.
+        """
+        per_village = Counter(village_ids)
+        if not per_village:
+            return []
+        village_totals = self._increment_many(Village, per_village)
+        hierarchy = {
+            village_id: parents
+            for village_id, *parents in Village.objects.filter(id__in=per_village).values_list(
+                'id',
+                'subdistrict_id',
+                'subdistrict__district_id',
+                'subdistrict__district__state_id',
+                'subdistrict__district__state__country_id',
+            )
+        }
+
+        # New users per entity of every parent level
+        per_entity = {level: Counter() for level, _ in self.PARENT_LEVELS}
+        for village_id, amount in per_village.items():
+            for (level, _), entity_id in zip(self.PARENT_LEVELS, hierarchy.get(village_id, ())):
+                if entity_id is not None:
+                    per_entity[level][entity_id] += amount
+
+        # Last number handed out per entity; numbers are dealt downwards from it
+        totals = {}
+        deltas = []
+        for level, model in self.PARENT_LEVELS:
+            level_totals = self._next_numbers(level, model, per_entity[level])
+            if level_totals is None:
+                level_totals = self._increment_many(model, per_entity[level], level)
+                self._invalidate_on_commit([self.KEY.format(level, entity_id) for entity_id in per_entity[level]])
+            else:
+                deltas += [
+                    PopulationDelta(level=level, entity_id=entity_id, amount=amount)
+                    for entity_id, amount in per_entity[level].items()
+                ]
+            totals[level] = level_totals
+        PopulationDelta.objects.bulk_create(deltas)
+
+        next_number = {('village', village_id): village_totals[village_id] - amount + 1
+                       for village_id, amount in per_village.items()}
+        for level, _ in self.PARENT_LEVELS:
+            for entity_id, amount in per_entity[level].items():
+                next_number[(level, entity_id)] = totals[level][entity_id] - amount + 1
+
+        results = []
+        for village_id in village_ids:
+            numbers = {}
+            entities = [('village', village_id)] + list(zip(
+                (level for level, _ in self.PARENT_LEVELS), hierarchy.get(village_id, (None,) * len(self.PARENT_LEVELS))
+            ))
+            for level, entity_id in entities:
+                if entity_id is None:
+                    numbers[f'{level}_number'] = 0
+                    continue
+                numbers[f'{level}_number'] = next_number[(level, entity_id)]
+                next_number[(level, entity_id)] += 1
+            results.append(numbers)
+        return results
+
+    def allocate_village_number(self, village_id):
+        """Increment the village's online_population; returns the new value"""
+        return self._increment(Village, village_id)
+
+    def flush(self):
+        """
+        Apply every committed PopulationDelta to its level's online_population
+        and delete them, in one statement. Returns {level: rows updated}.
+        """
+        updates = []
+        for level, model in self.PARENT_LEVELS:
+            updates.append(f"""
+                {level}_updated AS (
+                    UPDATE {self._table(model)} AS t
+                    SET online_population = COALESCE(t.online_population, 0) + totals.amount
+                    FROM totals
+                    WHERE totals.level = '{level}' AND t.id = totals.entity_id
+                    RETURNING t.id
+                )""")
+        counts = ', '.join(f"(SELECT count(*) FROM {level}_updated)" for level, _ in self.PARENT_LEVELS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                WITH flushed AS (
+                    DELETE FROM {self._table(PopulationDelta)}
+                    RETURNING level, entity_id, amount
+                ),
+                totals AS (
+                    SELECT level, entity_id, sum(amount) AS amount
+                    FROM flushed
+                    GROUP BY level, entity_id
+                ),
+                {','.join(updates)}
+                SELECT {counts}
+            """)
+            row = cursor.fetchone()
+        return {level: count for (level, _), count in zip(self.PARENT_LEVELS, row)}
+
+    def _next_number(self, level, model, entity_id):
+        """Next number from the level's Redis counter, or None if Redis is unreachable"""
+        key = self.KEY.format(level, entity_id)
+        try:
+            if key in self._stale:
+                number = self.redis.eval(
+                    self._RESEED_INCRBY, 1, key, self._persisted_population(level, model, entity_id), 1
+                )
+                self._stale.discard(key)
+                return number
+            if not self.redis.exists(key):
+                # nx: a concurrent seed wins and both INCRs still differ
+                self.redis.set(key, self._persisted_population(level, model, entity_id), nx=True)
+            return self.redis.incr(key)
+        except Exception as e:
+            logger.warning(f"[POPULATION] Redis unavailable, updating {level} {entity_id} in place: {e}")
+            return None
+
+    def _next_numbers(self, level, model, amounts):
+        """
+        INCRBY every counter of the level in one pipeline; returns
+        {entity_id: new value}, or None if Redis is unreachable
+        """
+        if not amounts:
+            return {}
+        entity_ids = list(amounts)
+        stale = {entity_id for entity_id in entity_ids if self.KEY.format(level, entity_id) in self._stale}
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for entity_id in entity_ids:
+                pipe.exists(self.KEY.format(level, entity_id))
+            missing = [
+                entity_id for entity_id, exists in zip(entity_ids, pipe.execute())
+                if not exists and entity_id not in stale
+            ]
+            for entity_id in missing:
+                self.redis.set(
+                    self.KEY.format(level, entity_id),
+                    self._persisted_population(level, model, entity_id),
+                    nx=True
+                )
+            pipe = self.redis.pipeline(transaction=False)
+            for entity_id in entity_ids:
+                key = self.KEY.format(level, entity_id)
+                if entity_id in stale:
+                    pipe.eval(
+                        self._RESEED_INCRBY, 1, key,
+                        self._persisted_population(level, model, entity_id), amounts[entity_id]
+                    )
+                else:
+                    pipe.incrby(key, amounts[entity_id])
+            totals = dict(zip(entity_ids, pipe.execute()))
+            self._stale.difference_update(self.KEY.format(level, entity_id) for entity_id in stale)
+            return totals
+        except Exception as e:
+            logger.warning(f"[POPULATION] Redis unavailable, updating {level} rows in place: {e}")
+            return None
+
+    def _persisted_population(self, level, model, entity_id):
+        """online_population plus the deltas not flushed yet, read in one statement"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT COALESCE(t.online_population, 0) + COALESCE((
+                    SELECT sum(d.amount) FROM {self._table(PopulationDelta)} d
+                    WHERE d.level = %s AND d.entity_id = t.id
+                ), 0)
+                FROM {self._table(model)} t
+                WHERE t.id = %s
+                """,
+                [level, entity_id]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def _invalidate_on_commit(self, keys):
+        """
+        After in-place increments commit, drop the Redis counters they bypassed
+        so the next allocation seeds them from the database; if Redis is still
+        unreachable, reseed them before their next use in this process
+        """
+        if not keys:
+            return
+
+        def invalidate():
+            try:
+                self.redis.delete(*keys)
+                self._stale.difference_update(keys)
+            except Exception as e:
+                logger.warning(f"[POPULATION] Could not drop {len(keys)} stale counters, reseeding on next use: {e}")
+                self._stale.update(keys)
+
+        transaction.on_commit(invalidate)
+
+    def _pending(self, level):
+        """SQL for the unflushed deltas of row ``t`` at ``level``, which its number must count too"""
+        if level is None:
+            return '0'
+        return f"""COALESCE((
+                    SELECT sum(pd.amount) FROM {self._table(PopulationDelta)} pd
+                    WHERE pd.level = '{level}' AND pd.entity_id = t.id
+                ), 0)"""
+
+    def _increment(self, model, entity_id, level=None):
+        """Add one to online_population; returns the entity's new number, unflushed deltas of ``level`` included"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {self._table(model)} AS t
+                SET online_population = COALESCE(t.online_population, 0) + 1
+                WHERE t.id = %s
+                RETURNING t.online_population + {self._pending(level)}
+                """,
+                [entity_id]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise model.DoesNotExist(f"{model.__name__} {entity_id} does not exist")
+        return row[0]
+
+    def _increment_many(self, model, amounts, level=None):
+        """
+        Add {entity_id: amount} to online_population in one UPDATE; returns
+        {entity_id: new number}, unflushed deltas of ``level`` included
+        """
+        if not amounts:
+            return {}
+        entity_ids = list(amounts)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {self._table(model)} AS t
+                SET online_population = COALESCE(t.online_population, 0) + d.amount
+                FROM unnest(%s::bigint[], %s::int[]) AS d(id, amount)
+                WHERE t.id = d.id
+                RETURNING t.id, t.online_population + {self._pending(level)}
+                """,
+                [entity_ids, [amounts[entity_id] for entity_id in entity_ids]]
+            )
+            totals = dict(cursor.fetchall())
+        missing = set(entity_ids) - set(totals)
+        if missing:
+            raise model.DoesNotExist(f"{model.__name__} {sorted(missing)} do not exist")
+        return totals
+
+    @staticmethod
+    def _table(model):
+        return connection.ops.quote_name(model._meta.db_table)
+
+
+population_counter = PopulationCounter()
@@ -0,0 +1,21 @@
+# geographies/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.read_cache import read_cache
+from .models.geos import Country, State, District, Subdistrict, Village
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=State)
+@receiver(post_save, sender=District)
+@receiver(post_save, sender=Subdistrict)
+@receiver(post_save, sender=Village)
+@receiver(post_delete, sender=Country)
+@receiver(post_delete, sender=State)
+@receiver(post_delete, sender=District)
+@receiver(post_delete, sender=Subdistrict)
+@receiver(post_delete, sender=Village)
+def invalidate_cached_geographies(sender, instance, **kwargs):
+    # Lists and ID breakdowns are cached together (geographies/views.py)
+    read_cache.invalidate_on_commit('geographies')
@@ -0,0 +1,10 @@
+from celery import shared_task
+
+from geographies.services.population import population_counter
+
+
+@shared_task
+def flush_population_deltas():
+    """Fold pending population deltas into the subdistrict..country rows"""
+    updated = population_counter.flush()
+    return f"Flushed population deltas ({', '.join(f'{level}: {count}' for level, count in updated.items())})"
@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from prometheus_client import Counter
 from django.db import connection
+from backend.read_cache import cached_view
 from .models.geos import Country, State, District, Subdistrict, Village
 from .serializers import CountrySerializer, StateSerializer, DistrictSerializer, SubDistrictSerializer, VillageSerializer
 
@@ -10,8 +11,12 @@ from .serializers import CountrySerializer, StateSerializer, DistrictSerializer,
 api_call_counter = Counter('api_requests_total', 'Total number of API calls per endpoint', ['endpoint'])
 db_query_counter = Counter('database_queries_total', 'Total number of database queries executed per endpoint', ['endpoint'])
 
+# Geography lists only change through imports, which invalidate the namespace (geographies/signals.py)
+GEOGRAPHY_CACHE_TIMEOUT = 60 * 60 * 24
+
 @extend_schema(responses=CountrySerializer(many=True))
 @api_view(['GET'])
+@cached_view('geographies', key=lambda request: ('get_countries',), timeout=GEOGRAPHY_CACHE_TIMEOUT)
 def get_countries(request):
     api_call_counter.labels(endpoint='get_countries').inc()
     countries = Country.objects.all()
@@ -22,6 +27,7 @@ def get_countries(request):
 
 @extend_schema(parameters=[{'name': 'country_id', 'required': True, 'type': 'integer'}], responses=StateSerializer(many=True))
 @api_view(['GET'])
+@cached_view('geographies', key=lambda request, country_id: ('get_states', country_id), timeout=GEOGRAPHY_CACHE_TIMEOUT)
 def get_states(request, country_id):
     api_call_counter.labels(endpoint='get_states').inc()
     states = State.objects.filter(country_id=country_id)
@@ -32,6 +38,7 @@ def get_states(request, country_id):
 
 @extend_schema(parameters=[{'name': 'state_id', 'required': True, 'type': 'integer'}], responses=DistrictSerializer(many=True))
 @api_view(['GET'])
+@cached_view('geographies', key=lambda request, state_id: ('get_districts_by_state', state_id), timeout=GEOGRAPHY_CACHE_TIMEOUT)
 def get_districts_by_state(request, state_id):
     api_call_counter.labels(endpoint='get_districts_by_state').inc()
     districts = District.objects.filter(state_id=state_id)
@@ -42,6 +49,7 @@ def get_districts_by_state(request, state_id):
 
 @extend_schema(parameters=[{'name': 'district_id', 'required': True, 'type': 'integer'}], responses=SubDistrictSerializer(many=True))
 @api_view(['GET'])
+@cached_view('geographies', key=lambda request, district_id: ('get_subdistricts_by_district', district_id), timeout=GEOGRAPHY_CACHE_TIMEOUT)
 def get_subdistricts_by_district(request, district_id):
     api_call_counter.labels(endpoint='get_subdistricts_by_district').inc()
     subdistricts = Subdistrict.objects.filter(district_id=district_id)
@@ -52,6 +60,7 @@ def get_subdistricts_by_district(request, district_id):
 
 @extend_schema(parameters=[{'name': 'subdistrict_id', 'required': True, 'type': 'integer'}], responses=VillageSerializer(many=True))
 @api_view(['GET'])
+@cached_view('geographies', key=lambda request, subdistrict_id: ('get_villages_by_subdistrict', subdistrict_id), timeout=GEOGRAPHY_CACHE_TIMEOUT)
 def get_villages_by_subdistrict(request, subdistrict_id):
     api_call_counter.labels(endpoint='get_villages_by_subdistrict').inc()
     villages = Village.objects.filter(subdistrict_id=subdistrict_id)
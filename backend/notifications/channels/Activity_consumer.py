@@ -2,8 +2,8 @@ import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from datetime import date
-# Fixed absolute import - REPLACE 'yourapp' with your actual app name
-from activity_reports.models import DailyActivitySummary
+from asgiref.sync import sync_to_async
+from activity_reports.services.activity_store import activity_store
 
 logger = logging.getLogger(__name__)
 
@@ -39,13 +39,8 @@ class ActivityConsumer(AsyncWebsocketConsumer):
 
     async def send_initial_count(self):
         today = date.today()
-        try:
-            summary = await DailyActivitySummary.objects.aget(date=today)
-            count = len(summary.active_users)
-            logger.info(f"Initial active users count: {count}")
-        except DailyActivitySummary.DoesNotExist:
-            count = 0
-            logger.warning("No daily activity summary found for today")
+        count = await sync_to_async(activity_store.count)(today)
+        logger.info(f"Initial active users count: {count}")
             
         await self.send(text_data=json.dumps({
             'count': count
@@ -1,24 +1,20 @@
+import asyncio
 import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from asgiref.sync import sync_to_async
-from django.utils import timezone
-from django.db.models import Q
-from django.http import HttpRequest
 
 # Import your notification/chat handlers
 from notifications.channels_handlers.initiation_notification_handler import handle_initiation_notification
 from notifications.channels_handlers.connection_notification_handler import handle_connection_notification
 from notifications.channels_handlers.connection_status_handler import handle_connection_status
 from notifications.channels_handlers.speaker_invitation_handler import handle_speaker_invitation
-from notifications.channels_handlers.chat_system_handler import handle_chat_system
+from notifications.channels_handlers.chat_system_handler import handle_chat_system, flush_chat_buffers
 from notifications.channels_handlers.milestone_handler import handle_milestone_notification
-from notifications.login_push.services.push_notifications import handle_user_notifications_on_login
+from notifications.login_push.services.inbox_snapshot import inbox_snapshot
 
-from users.models import Circle
-from blog.models import BlogLoad, BaseBlogModel
-from blog.posting_blogs.blog_utils import BlogDataBuilder  # Fixed import
-from blog.blogpage.serializers import BlogSerializer
+from users.services.presence import presence
+from blog.newmodel.services.blog_outbox import blog_outbox
 
 logger = logging.getLogger(__name__)
 
@@ -30,92 +26,66 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         """Handles WebSocket connection."""
         self.user_id = self.scope["url_route"]["kwargs"]["user_id"]
         self.group_name = f"notifications_{self.user_id}"
+        # Per-socket chat state, see chat_system_handler
+        self.chat_memberships = {}
+        self.chat_buffers = {}
         logger.info(f"User {self.user_id} connected to WebSocket.")
 
         # Add to notification group
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
 
-        # Mark user as online
+        # Take a presence lease, renewed while the socket is open
         await self.mark_user_online(True)
+        self.presence_heartbeat = asyncio.ensure_future(self.renew_presence())
 
-        # Send pending notifications
-        # Resolve the scope user (which may be a channels.auth.UserLazyObject) to
-        # the application's Petitioner model instance before processing. This
-        # prevents passing a UserLazyObject into code that expects a Petitioner
-        # or a numeric id (which caused "Field 'id' expected a number" errors).
-        from users.models import Petitioner
-        try:
-            petitioner = await sync_to_async(Petitioner.objects.get)(id=self.user_id)
-        except Exception as e:
-            logger.error(f"Failed to fetch Petitioner {self.user_id} for notifications: {e}")
-            petitioner = None
-
-        await sync_to_async(handle_user_notifications_on_login)(petitioner)
+        # Send pending notifications and milestones as one inbox frame
+        await self.send_notification_inbox()
 
-        # Send pending blogs
-        await self.send_pending_new_blogs()
-        
-        # Send modified blogs
-        await self.send_pending_modified_blogs()
-        
-        # Remove deleted blogs
-        await self.remove_deleted_blogs()
+        # Replay blog events missed while offline
+        await self.replay_blog_outbox()
 
         # Fetch undelivered messages
         await self.fetch_undelivered_messages()
 
-        # Fetch undelivered milestones (CONSUMER RECONNECT FLOW)
-        await self.fetch_undelivered_milestones()
-
     async def disconnect(self, close_code):
         """Handles WebSocket disconnection."""
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        await self.channel_layer.group_discard(f"circle_activity_{self.user_id}", self.channel_name)
         logger.info(f"User {self.user_id} disconnected from WebSocket.")
 
-        # Mark user as offline
+        # Save chat messages still waiting in the write buffers
+        await flush_chat_buffers(self)
+
+        # Release the presence lease
+        heartbeat = getattr(self, 'presence_heartbeat', None)
+        if heartbeat is not None:
+            heartbeat.cancel()
         await self.mark_user_online(False)
 
     async def mark_user_online(self, online):
-        """Update user's online status and notify connections."""
+        """Take or release this socket's presence lease and notify connections on a change."""
         try:
-            from users.models import Petitioner
-            user = await sync_to_async(Petitioner.objects.get)(id=self.user_id)
-            user.is_online = online
-            await sync_to_async(user.save)(update_fields=['is_online'])
-
-            # Notify user's connections about status change
-            await self.notify_connection_status(online)
+            user_id = int(self.user_id)
+            if online:
+                if await sync_to_async(presence.connect)(user_id, self.channel_name):
+                    await presence.came_online(user_id)
+            elif await sync_to_async(presence.disconnect)(user_id, self.channel_name):
+                # Announced once the user stays away past the debounce delay
+                asyncio.ensure_future(presence.went_offline(user_id))
         except Exception as e:
             logger.error(f"Error updating online status: {str(e)}")
 
-    async def notify_connection_status(self, online):
-        """Notify user's connections about online/offline status change."""
-        try:
-            connections = await sync_to_async(list)(
-                Circle.objects.filter(
-                    Q(userid=self.user_id) | Q(otherperson=self.user_id)
-                ).distinct()
-            )
-            for connection in connections:
-                other_id = (
-                    connection.userid if str(connection.userid) != str(self.user_id)
-                    else connection.otherperson
-                )
-                group_name = f"notifications_{other_id}"
-
-                await self.channel_layer.group_send(
-                    group_name,
-                    {
-                        "type": "notification_message",
-                        "category": "connection_status",
-                        "user_id": self.user_id,
-                        "online": online,
-                        "timestamp": timezone.now().isoformat(),
-                    }
-                )
-        except Exception as e:
-            logger.error(f"Error notifying connection status: {str(e)}")
+    async def renew_presence(self):
+        """Renew the presence lease until the socket closes; a dead worker's lease expires"""
+        user_id = int(self.user_id)
+        while True:
+            await asyncio.sleep(presence.HEARTBEAT_SECONDS)
+            try:
+                if await sync_to_async(presence.heartbeat)(user_id, self.channel_name):
+                    await presence.came_online(user_id)
+            except Exception as e:
+                logger.error(f"Error renewing presence of user {user_id}: {str(e)}")
 
     async def fetch_undelivered_messages(self):
         """Fetch undelivered messages for the user."""
@@ -127,59 +97,25 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error(f"Error fetching undelivered messages: {str(e)}")
 
-    async def fetch_undelivered_milestones(self):
-        """CONSUMER RULE: Fetch undelivered milestones for the user on reconnect"""
+    async def send_notification_inbox(self, offset=None, limit=None):
+        """
+        Send one ``notification_inbox`` page of the user's pending
+        notifications (initiations, connections, speaker invitations,
+        milestones), then acknowledge its milestones and invitations. The
+        client asks for the next page with ``next_page`` while ``has_more``
+        is set.
+        """
         try:
-            from users.models import Milestone
-
-            # CRITICAL: Only fetch milestones where delivered=False AND completed=False
-            milestones = await sync_to_async(list)(
-                Milestone.objects.filter(
-                    user_id=self.user_id, 
-                    delivered=False,
-                    completed=False  # Add this condition
-                )
-            )
-            
-            logger.info(f"Found {len(milestones)} undelivered milestones for user {self.user_id}")
-            
-            for milestone in milestones:
-                # Send notification to client
-                await self.send_milestone_notification(milestone)
-
-                # CONSUMER RULE: Immediately update delivered to True
-                milestone.delivered = True
-                await sync_to_async(milestone.save)(update_fields=['delivered'])
-                logger.info(f"Milestone {milestone.id} marked as delivered=True on reconnect")
-                
+            user_id = int(self.user_id)
+            frame = await sync_to_async(inbox_snapshot.page)(user_id, offset, limit)
+            # Nothing pending on connect: no message needed
+            if not frame["notifications"] and offset is None:
+                return
+            logger.info(f"Sending {len(frame['notifications'])} of {frame['total']} pending notifications to user {user_id}")
+            await self.send(text_data=json.dumps(frame))
+            await sync_to_async(inbox_snapshot.acknowledge)(user_id, frame["notifications"])
         except Exception as e:
-            logger.error(f"Error fetching undelivered milestones: {str(e)}")
-
-    async def send_milestone_notification(self, milestone):
-        """Send milestone notification to client WITHOUT completed field"""
-        notification = {
-            "notification_type": "Milestone_Notification",
-            "notification_message": f"Achievement unlocked: {milestone.title}",
-            "notification_data": {
-                "milestone_id": str(milestone.id),
-                "user_id": milestone.user_id,
-                "title": milestone.title,
-                "text": milestone.text,
-                "created_at": milestone.created_at.isoformat(),
-                "delivered": milestone.delivered,  # Include delivered status
-                "photo_id": milestone.photo_id,
-                "photo_url": milestone.photo_url,
-                "type": milestone.type
-                # DO NOT INCLUDE completed field
-            },
-            "notification_number": str(milestone.id),
-            "notification_freshness": True,
-            "created_at": milestone.created_at.isoformat()
-        }
-
-        await self.send(json.dumps({
-            "notification": notification
-        }))
+            logger.error(f"Error sending notification inbox: {str(e)}")
 
     async def receive(self, text_data):
         """Handles incoming WebSocket messages and delegates processing."""
@@ -203,6 +139,15 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             elif category == "message_status_update":
                 await self.handle_message_status_update(data)
 
+            # Handle circle activity (heartbeat network page)
+            elif category == "circle_activity":
+                await self.handle_circle_activity(data)
+
+            # Next page of the pending notifications inbox
+            elif category == "notification_inbox":
+                if data.get("action") == "next_page":
+                    await self.send_notification_inbox(data.get("offset"), data.get("limit"))
+
             # Other notification types
             elif data.get("notificationType") == "Initiation_Notification":
                 await handle_initiation_notification(self, data)
@@ -246,6 +191,24 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             blog_id = data.get("blog_id")
             await self.channel_layer.group_discard(f"blog_{blog_id}", self.channel_name)
 
+        elif action == "replay_blogs":
+            # Next page of missed blog events; acknowledges everything up to after_seq
+            await self.replay_blog_outbox(data.get("after_seq"), data.get("limit"))
+
+        elif action == "ack_replay":
+            await sync_to_async(blog_outbox.acknowledge)(int(self.user_id), int(data.get("seq") or 0))
+
+    async def handle_circle_activity(self, data):
+        """Subscribe to or unsubscribe from the activity of the user's circle"""
+        action = data.get("action")
+        group = f"circle_activity_{self.user_id}"
+
+        if action == "subscribe":
+            await self.channel_layer.group_add(group, self.channel_name)
+
+        elif action == "unsubscribe":
+            await self.channel_layer.group_discard(group, self.channel_name)
+
     async def handle_message_status_update(self, data):
         """Handle client-side message status updates."""
         try:
@@ -278,6 +241,14 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         logger.info(f"Sending notification to user {self.user_id}: {event}")
         await self.send(text_data=json.dumps(event))
 
+    async def notification_inbox(self, event):
+        """Sends a pending notifications page pushed on login (see InboxSnapshot.push)"""
+        await self.send(text_data=json.dumps({**event, "type": "notification_inbox"}))
+
+    async def circle_activity(self, event):
+        """Sends activity changes of the user's circle to the WebSocket client"""
+        await self.send(text_data=json.dumps(event))
+
     async def blog_update(self, event):
         """Sends blog updates to the WebSocket client"""
         await self.send(text_data=json.dumps(event))
@@ -354,158 +325,27 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         await self.send(text_data=json.dumps(unshare_data))
 
     # -----------------------------
-    # ✅ Pending Blog Senders
+    # ✅ Blog Outbox Replay
     # -----------------------------
-    
-    async def send_pending_new_blogs(self):
-        """Check for new blogs in BlogLoad and send them to the user"""
-        try:
-            blog_load = await sync_to_async(
-                BlogLoad.objects.filter(userid=self.user_id).first
-            )()
-
-            if blog_load and blog_load.new_blogs:
-                logger.info(f"Found {len(blog_load.new_blogs)} new blogs for user {self.user_id}")
-
-                request = HttpRequest()
-                request.method = 'GET'
-                request.user = self.scope.get('user', None)
-
-                # Add required META keys to avoid SERVER_NAME error
-                request.META['SERVER_NAME'] = 'localhost'
-                request.META['SERVER_PORT'] = '8000'
-                request.META['HTTP_HOST'] = 'localhost:8000'
-
-                from users.models import Petitioner
-                user_obj = await sync_to_async(Petitioner.objects.get)(id=self.user_id)
-
-                # Make a copy of new_blogs to iterate safely while modifying original list
-                new_blogs_copy = list(blog_load.new_blogs)
-
-                for blog_id in new_blogs_copy:
-                    try:
-                        base_blog = await sync_to_async(BaseBlogModel.objects.get)(id=blog_id)
-                        builder = BlogDataBuilder(user_obj, request)
-                        blog_data = await sync_to_async(builder.get_blog_data)(base_blog)
-
-                        if blog_data:
-                            serializer = BlogSerializer(blog_data, context={'request': request})
-                            serialized_blog = serializer.data
-                            serialized_blog = self.recursive_convert_objects_to_str(serialized_blog)
-
-                            await self.send(text_data=json.dumps({
-                                "type": "blog_created",
-                                "blog_id": str(blog_id),
-                                "action": "blog_created",
-                                "blog_type": base_blog.type.split('_')[0],
-                                "blog": serialized_blog,
-                                "user_id": str(base_blog.userid)
-                            }))
-
-                            logger.info(f"Sent pending blog {blog_id} to user {self.user_id}")
-
-                            # Remove the blog_id from new_blogs after successfully sending
-                            blog_load.new_blogs.remove(blog_id)
-                            await sync_to_async(blog_load.save)()
-
-                    except BaseBlogModel.DoesNotExist:
-                        logger.warning(f"Blog {blog_id} not found, skipping")
-                        # Remove invalid blog_id to avoid retrying endlessly
-                        blog_load.new_blogs.remove(blog_id)
-                        await sync_to_async(blog_load.save)()
-                        continue
 
-        except Exception as e:
-            logger.error(f"Error sending pending new blogs: {str(e)}")
-            
-    async def send_pending_modified_blogs(self):
-        """Check for modified blogs in BlogLoad and send them to the user"""
+    async def replay_blog_outbox(self, after_seq=None, limit=None):
+        """
+        Send the user's missed blog events after ``after_seq`` (default: the
+        last acknowledged seq) as one ``blog_replay`` page. The client asks
+        for the next page with ``replay_blogs`` while ``has_more`` is set and
+        acknowledges the last one with ``ack_replay``.
+        """
         try:
-            blog_load = await sync_to_async(
-                BlogLoad.objects.filter(userid=self.user_id).first
-            )()
-
-            if blog_load and blog_load.modified_blogs:
-                logger.info(f"Found {len(blog_load.modified_blogs)} modified blogs for user {self.user_id}")
-
-                request = HttpRequest()
-                request.method = 'GET'
-                request.user = self.scope.get('user', None)
-
-                # Add required META keys to avoid SERVER_NAME error
-                request.META['SERVER_NAME'] = 'localhost'
-                request.META['SERVER_PORT'] = '8000'
-                request.META['HTTP_HOST'] = 'localhost:8000'
-
-                from users.models import Petitioner
-                user_obj = await sync_to_async(Petitioner.objects.get)(id=self.user_id)
-
-                # Make a copy of modified_blogs to iterate safely while modifying original list
-                modified_blogs_copy = list(blog_load.modified_blogs)
-
-                for blog_id in modified_blogs_copy:
-                    try:
-                        base_blog = await sync_to_async(BaseBlogModel.objects.get)(id=blog_id)
-                        builder = BlogDataBuilder(user_obj, request)
-                        blog_data = await sync_to_async(builder.get_blog_data)(base_blog)
-
-                        if blog_data:
-                            serializer = BlogSerializer(blog_data, context={'request': request})
-                            serialized_blog = serializer.data
-                            serialized_blog = self.recursive_convert_objects_to_str(serialized_blog)
-
-                            await self.send(text_data=json.dumps({
-                                "type": "blog_modified",
-                                "blog_id": str(blog_id),
-                                "action": "blog_modified",
-                                "blog": serialized_blog,
-                                "user_id": str(base_blog.userid)
-                            }))
-
-                            logger.info(f"Sent modified blog {blog_id} to user {self.user_id}")
-
-                            # Remove the blog_id from modified_blogs after successfully sending
-                            blog_load.modified_blogs.remove(blog_id)
-                            await sync_to_async(blog_load.save)()
-
-                    except BaseBlogModel.DoesNotExist:
-                        logger.warning(f"Blog {blog_id} not found, skipping")
-                        # Remove invalid blog_id to avoid retrying endlessly
-                        blog_load.modified_blogs.remove(blog_id)
-                        await sync_to_async(blog_load.save)()
-                        continue
-
-        except Exception as e:
-            logger.error(f"Error sending pending modified blogs: {str(e)}")
-
-    async def remove_deleted_blogs(self):
-        """Check for deleted blogs in BlogLoad and send removal commands to the client"""
-        try:
-            blog_load = await sync_to_async(
-                BlogLoad.objects.filter(userid=self.user_id).first
-            )()
-
-            if blog_load and blog_load.deleted_blogs:
-                logger.info(f"Found {len(blog_load.deleted_blogs)} deleted blogs for user {self.user_id}")
-
-                # Make a copy of deleted_blogs to iterate safely while modifying original list
-                deleted_blogs_copy = list(blog_load.deleted_blogs)
-
-                for blog_id in deleted_blogs_copy:
-                    await self.send(text_data=json.dumps({
-                        "type": "blog_deleted",
-                        "blog_id": str(blog_id),
-                        "action": "blog_deleted"
-                    }))
-
-                    logger.info(f"Sent blog deletion for {blog_id} to user {self.user_id}")
-
-                    # Remove the blog_id from deleted_blogs after successfully sending
-                    blog_load.deleted_blogs.remove(blog_id)
-                    await sync_to_async(blog_load.save)()
-
+            from users.models import Petitioner
+            user_obj = await sync_to_async(Petitioner.objects.get)(id=self.user_id)
+            page = await sync_to_async(blog_outbox.replay_page)(user_obj, after_seq, limit)
+            # Nothing missed on connect: no message needed
+            if not page["entries"] and after_seq is None:
+                return
+            logger.info(f"Replaying {len(page['entries'])} blog events to user {self.user_id}")
+            await self.send(text_data=json.dumps(page))
         except Exception as e:
-            logger.error(f"Error removing deleted blogs: {str(e)}")
+            logger.error(f"Error replaying blog outbox: {str(e)}")
 
     @staticmethod
     def recursive_convert_objects_to_str(data):
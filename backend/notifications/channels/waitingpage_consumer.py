@@ -8,7 +8,7 @@ from django.core.cache import cache
 from django.db import transaction
 from pendingusers.models.notifications import InitiationNotification
 from pendingusers.models import PendingVerificationNotification, PendingUser, NoInitiatorUser
-from users.models import UserTree
+from users.models import UserTree, Petitioner
 from notifications.login_push.services.push_notifications import handle_user_notifications_on_login
 
 logger = logging.getLogger(__name__)
@@ -210,6 +210,11 @@ class WaitingpageConsumer(AsyncWebsocketConsumer):
             with transaction.atomic():
                 # Get the pending user
                 pending_user = PendingUser.objects.select_for_update().get(gmail=user_email, id=pending_user_id)
+
+                # Already transferred by bulk verification
+                petitioner = Petitioner.objects.filter(gmail=user_email).first()
+                if petitioner is not None:
+                    return petitioner, UserTree.objects.get(id=petitioner.id)
                 
                 # Get the NoInitiatorUser to find who verified it
                 no_initiator_data = getattr(pending_user, 'no_initiator_data', None)
@@ -2,7 +2,10 @@ import json
 import logging
 from asgiref.sync import sync_to_async
 from chat.models import Message
+from chat.services.message_store import message_store
+from chat.services.write_buffer import ChatWriteBuffer
 from users.models import Petitioner
+from users.services.presence import presence
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,8 @@ async def handle_chat_system(consumer, data):
         await handle_send_message(consumer, data)
     elif action == "update_message_status":
         await update_message_status(consumer, data)
+    elif action == "mark_conversation_read":
+        await mark_conversation_read(consumer, data.get("conversation_id"), user_id)
     else:
         await consumer.send(json.dumps({
             "status": "error",
@@ -30,19 +35,51 @@ async def handle_chat_system(consumer, data):
             "message": f"Unknown chat system action: {action}"
         }))
 
+async def get_membership(consumer, conversation_id):
+    """The socket user's conversation membership, looked up once per socket"""
+    memberships = consumer.chat_memberships
+    if conversation_id not in memberships:
+        memberships[conversation_id] = await sync_to_async(message_store.membership)(
+            conversation_id, int(consumer.user_id)
+        )
+    return memberships[conversation_id]
+
 async def handle_send_message(consumer, data):
+    """Queue the message in the socket's write buffer; it is acknowledged once the batch is saved"""
     try:
         conversation_id = data.get("conversation_id")
+        membership = await get_membership(consumer, conversation_id)
+        if membership is None:
+            raise PermissionError("Conversation not found or access denied")
         content = data.get("content")
-        temp_id = data.get("temp_id")
+        if not isinstance(content, str) or not content.strip():
+            raise ValueError("Message content must be non-empty text")
 
-        message = await sync_to_async(Message.objects.create)(
-            conversation_id=conversation_id,
-            sender_id=consumer.user_id,
-            content=content
-        )
-        # Try to deliver immediately (if possible)
-        await sync_to_async(message.try_deliver)()
+        buffers = consumer.chat_buffers
+        if conversation_id not in buffers:
+            async def acknowledge(pairs):
+                await send_message_acks(consumer, conversation_id, pairs)
+            buffers[conversation_id] = ChatWriteBuffer(membership, acknowledge)
+        await buffers[conversation_id].add(content, data.get("temp_id"))
+    except Exception as e:
+        logger.error(f"Error sending message: {str(e)}")
+        await consumer.send(json.dumps({
+            "status": "error",
+            "category": "chat_system",
+            "message": str(e),
+            "temp_id": data.get("temp_id")
+        }))
+
+async def send_message_acks(consumer, conversation_id, pairs):
+    for message, temp_id in pairs:
+        if message is None:
+            await consumer.send(json.dumps({
+                "status": "error",
+                "category": "chat_system",
+                "message": "Message could not be saved",
+                "temp_id": temp_id
+            }))
+            continue
         await consumer.send(json.dumps({
             "type": "notification_message",
             "category": "chat_system",
@@ -50,17 +87,38 @@ async def handle_send_message(consumer, data):
             "message_id": str(message.id),
             "temp_id": temp_id,
             "conversation_id": conversation_id,
-            "content": content,
+            "content": message.content,
             "timestamp": message.timestamp.isoformat(),
             "status": message.status
         }))
+
+async def flush_chat_buffers(consumer):
+    """Save whatever the socket still has queued (on disconnect)"""
+    for buffer in consumer.chat_buffers.values():
+        await buffer.flush()
+
+async def mark_conversation_read(consumer, conversation_id, user_id):
+    """Read receipt for every message the user received in the conversation, in one statement"""
+    try:
+        membership = await get_membership(consumer, conversation_id)
+        if membership is None:
+            raise PermissionError("Conversation not found or access denied")
+        rows = await sync_to_async(message_store.mark_read)(membership.conversation_id, int(user_id))
+        await message_store.send(message_store.status_events(rows))
+        await consumer.send(json.dumps({
+            "status": "success",
+            "category": "chat_system",
+            "action": "conversation_read",
+            "conversation_id": conversation_id,
+            "count": len(rows)
+        }))
     except Exception as e:
-        logger.error(f"Error sending message: {str(e)}")
+        logger.error(f"Error marking conversation as read: {str(e)}")
         await consumer.send(json.dumps({
             "status": "error",
             "category": "chat_system",
             "message": str(e),
-            "temp_id": data.get("temp_id")
+            "conversation_id": conversation_id
         }))
 
 async def mark_message_as_read(consumer, message_id, user_id):
@@ -148,13 +206,13 @@ async def update_message_status(consumer, data):
         # Status logic and cascading rules
         if new_status == 'delivered':
             await sync_to_async(message.update_status)('delivered')
-            if getattr(message.sender, "is_online", False):
+            if await sync_to_async(presence.is_online)(message.sender_id):
                 await sync_to_async(message.update_status)('delivered_update')
         elif new_status == 'delivered_update':
             await sync_to_async(message.update_status)('delivered_update')
         elif new_status == 'read':
             await sync_to_async(message.update_status)('read')
-            if getattr(message.sender, "is_online", False):
+            if await sync_to_async(presence.is_online)(message.sender_id):
                 await sync_to_async(message.update_status)('read_update')
         elif new_status == 'read_update':
             await sync_to_async(message.update_status)('read_update')
@@ -185,9 +243,8 @@ async def update_message_status(consumer, data):
 async def handle_user_online(consumer, user_id):
     """Handle user coming online - deliver pending messages and pending status updates"""
     try:
+        # Presence is held by the socket itself (see NotificationConsumer)
         user = await sync_to_async(Petitioner.objects.get)(id=user_id)
-        user.is_online = True
-        await sync_to_async(user.save)(update_fields=["is_online"])
 
         # Deliver any messages as receiver
         await deliver_pending_messages(consumer, user)
@@ -209,33 +266,21 @@ async def handle_user_online(consumer, user_id):
         }))
 
 async def deliver_pending_messages(consumer, user):
-    """Deliver all pending messages (as receiver)"""
+    """Deliver all pending messages (as receiver) with one status update"""
     try:
-        # 'sent' means not yet delivered
-        pending_messages = await sync_to_async(list)(
-            Message.objects.filter(receiver=user, status='sent')
-        )
-        for message in pending_messages:
-            await sync_to_async(message.try_deliver)()
-        # Optionally, re-send unread/delayed messages
+        def deliver():
+            messages = message_store.deliver_pending(user.id)
+            return message_store.new_message_events(messages)
+
+        await message_store.send(await sync_to_async(deliver)())
     except Exception as e:
         logger.error(f"Error delivering pending messages: {str(e)}")
 
 async def process_pending_status_updates(consumer, user):
     """Send pending status updates (as sender) when user returns online"""
     try:
-        delivered_messages = await sync_to_async(list)(
-            Message.objects.filter(sender=user, status='delivered')
-        )
-        for message in delivered_messages:
-            await sync_to_async(message.update_status)('delivered_update')
-
-        read_messages = await sync_to_async(list)(
-            Message.objects.filter(sender=user, status='read')
-        )
-        for message in read_messages:
-            await sync_to_async(message.update_status)('read_update')
-
+        rows = await sync_to_async(message_store.promote_pending_updates)(user.id)
+        await message_store.send(message_store.status_events(rows))
     except Exception as e:
         logger.error(f"Error processing status updates: {str(e)}")
 
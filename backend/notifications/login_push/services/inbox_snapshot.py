@@ -0,0 +1,165 @@
+import logging
+from heapq import merge
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from pendingusers.models.notifications import InitiationNotification
+from pendingusers.serializers.NotificationSerializer import NotificationSerializer as InitiationNotificationSerializer
+from users.models import Milestone
+from users.models.Connectionnotification import ConnectionNotification
+from users.models.usertree import UserTree
+from users.makingconnections.serializers.connection_notification_serializer import (
+    NotificationSerializer as ConnectionNotificationSerializer
+)
+from users.makingconnections.serializers.connection_status_serializer import ConnectionStatusSerializer
+from event.models.group_speaker_invitation_notifiation import GroupSpeakerInvitationNotification
+from event.Speaker_Invitation_Notifications.speaker_invitation_serializer import SpeakerInvitationSerializer
+
+logger = logging.getLogger(__name__)
+
+_GEOGRAPHY = ('country', 'state', 'district', 'subdistrict', 'village')
+
+
+class InboxSnapshot:
+    """
+    Everything a user has pending when they connect, as paged
+    ``notification_inbox`` frames instead of one channel-layer message per
+    notification.
+
+    Pending items are initiation requests to react to, connection requests
+    (as the connection), connection statuses (as the applicant), speaker
+    invitations and milestones not yet completed. A page costs one
+    ``(id, created_at)`` query per source to order the whole inbox (newest
+    first), one query per source for the items on the page with their
+    related rows, and one UserTree query for every profile picture and group
+    founder on it. ``acknowledge`` then marks the page's speaker invitations
+    seen and its milestones delivered with one UPDATE each.
+
+    Frames carry the same notification payloads as the per-item pushes.
+    Clients ask for the next page with ``next_offset`` while ``has_more`` is
+    set.
+    """
+
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    def sources(self, user_id):
+        """(notification type, pending queryset, related rows, serializer or None) per source"""
+        return (
+            ('Initiation_Notification',
+             InitiationNotification.objects.filter(initiator_id=user_id, reacted=False),
+             [f'applicant__{field}' for field in _GEOGRAPHY],
+             InitiationNotificationSerializer),
+            ('Connection_Notification',
+             ConnectionNotification.objects.filter(connection_id=user_id, reacted=False),
+             [f'applicant__{field}' for field in _GEOGRAPHY],
+             ConnectionNotificationSerializer),
+            ('Connection_Status',
+             ConnectionNotification.objects.filter(applicant_id=user_id, completed=False),
+             ['connection'],
+             ConnectionStatusSerializer),
+            ('Group_Speaker_Invitation',
+             GroupSpeakerInvitationNotification.objects.filter(speaker_id=user_id),
+             ['group'],
+             SpeakerInvitationSerializer),
+            # Undelivered (offline when reached) and delivered but not yet acknowledged
+            ('Milestone_Notification',
+             Milestone.objects.filter(user_id=user_id, completed=False),
+             [],
+             None),
+        )
+
+    def page(self, user_id, offset=0, limit=None):
+        """One ``notification_inbox`` frame of the user's pending notifications, newest first"""
+        offset = max(int(offset or 0), 0)
+        limit = min(max(int(limit or self.PAGE_SIZE), 1), self.MAX_PAGE_SIZE)
+        sources = self.sources(user_id)
+
+        # Order the whole inbox on (created_at, id) alone, then load only the page
+        ordered = merge(*(
+            (
+                (created_at, notification_type, pk)
+                for pk, created_at in queryset.order_by('-created_at', '-id').values_list('id', 'created_at')
+            )
+            for notification_type, queryset, _, _ in sources
+        ), key=lambda item: item[0], reverse=True)
+        entries = list(ordered)
+        page_entries = entries[offset:offset + limit]
+
+        page_ids = {}
+        for _, notification_type, pk in page_entries:
+            page_ids.setdefault(notification_type, []).append(pk)
+        objects = {}
+        for notification_type, queryset, related, _ in sources:
+            if notification_type in page_ids:
+                objects[notification_type] = queryset.select_related(*related).in_bulk(page_ids[notification_type])
+
+        context = {'user_trees': self._user_trees(objects)}
+        serializers = {notification_type: serializer for notification_type, _, _, serializer in sources}
+        notifications = []
+        for _, notification_type, pk in page_entries:
+            obj = objects[notification_type].get(pk)
+            if obj is None:
+                # Gone between the two queries
+                continue
+            serializer = serializers[notification_type]
+            notifications.append(
+                obj.notification() if serializer is None else serializer(obj, context=context).data
+            )
+
+        next_offset = offset + len(page_entries)
+        return {
+            "type": "notification_inbox",
+            "notifications": notifications,
+            "total": len(entries),
+            "offset": offset,
+            "next_offset": next_offset,
+            "has_more": next_offset < len(entries),
+        }
+
+    def acknowledge(self, user_id, notifications):
+        """Mark the speaker invitations of a sent page seen and its milestones delivered"""
+        numbers = {}
+        for notification in notifications:
+            numbers.setdefault(notification["notification_type"], []).append(notification["notification_number"])
+
+        seen = delivered = 0
+        if numbers.get('Group_Speaker_Invitation'):
+            seen = GroupSpeakerInvitationNotification.objects.filter(
+                speaker_id=user_id, id__in=numbers['Group_Speaker_Invitation'], seen=False
+            ).update(seen=True)
+        if numbers.get('Milestone_Notification'):
+            delivered = Milestone.objects.filter(
+                user_id=user_id, id__in=numbers['Milestone_Notification'], delivered=False
+            ).update(delivered=True)
+        if seen or delivered:
+            logger.info(f"[INBOX] User {user_id}: {seen} invitations seen, {delivered} milestones delivered")
+
+    def push(self, user_id):
+        """Send the first page to every socket of the user through the channel layer; returns the frame"""
+        frame = self.page(user_id)
+        if not frame["notifications"]:
+            return frame
+        async_to_sync(get_channel_layer().group_send)(
+            f"notifications_{user_id}", {**frame, "type": "notification.inbox"}
+        )
+        self.acknowledge(user_id, frame["notifications"])
+        return frame
+
+    @staticmethod
+    def _user_trees(objects):
+        """{id: UserTree} of the connections' profile pictures and the groups' founders on a page"""
+        ids = set()
+        for notification_type, by_id in objects.items():
+            for obj in by_id.values():
+                if notification_type == 'Connection_Notification':
+                    ids.add(obj.applicant_id)
+                elif notification_type == 'Connection_Status':
+                    ids.add(obj.connection_id)
+                elif notification_type == 'Group_Speaker_Invitation':
+                    ids.add(obj.group.founder)
+        return UserTree.objects.in_bulk(ids) if ids else {}
+
+
+inbox_snapshot = InboxSnapshot()
@@ -1,142 +1,31 @@
 import logging
-from django.db import transaction
-from pendingusers.models.notifications import InitiationNotification
-from users.models.Connectionnotification import ConnectionNotification
-from event.models.group_speaker_invitation_notifiation import GroupSpeakerInvitationNotification
-from users.models import Milestone  # Add this import
 
-from pendingusers.services.send_notification_to_initiator import send_notification_to_initiator
-from users.makingconnections.services.send_notfication_to_connection import send_notification_to_connection
-from users.makingconnections.services.send_status_to_applicant import send_status_to_applicant
-from event.Speaker_Invitation_Notifications.send_speaker_invitation import send_speaker_invitation
+from notifications.login_push.services.inbox_snapshot import inbox_snapshot
 
 logger = logging.getLogger(__name__)
 
 def handle_user_notifications_on_login(user):
     """
     Handle pending notifications for a user upon login.
-    
-    Checks for:
+
+    Sends the user's sockets one ``notification_inbox`` frame with the first
+    page of everything pending:
     1. InitiationNotifications where user is initiator
     2. ConnectionNotifications where user is either:
-       - connection (receiver) 
+       - connection (receiver)
        - applicant (sender)
-    3. Milestones for login push
-    
-    Triggers appropriate notification services based on user's role in notifications.
-    
+    3. GroupSpeakerInvitationNotifications where user is the speaker
+    4. Milestones not yet completed
+
+    The client asks for further pages over the socket (see InboxSnapshot).
+
     Args:
         user: Authenticated user instance
     """
     logger.info(f"Processing notifications for user {user.id}")
-    
-    try:
-        # Process InitiationNotifications
-        _process_initiation_notifications(user)
-        
-        # Process ConnectionNotifications
-        _process_connection_notifications(user)
-
-        # Process GroupSpeakerInvitationNotifications
-        _process_speaker_invitation_notifications(user)
-        
-        # LOGIN FLOW: Process milestones for login push
-        _process_milestones_on_login(user)
-
-        logger.info(f"Completed notification processing for user {user.id}")
-    except Exception as e:
-        logger.critical(f"Critical failure processing notifications for user {user.id}: {str(e)}")
-
-def _process_initiation_notifications(user):
-    """Process InitiationNotifications where user is the initiator"""
-    notifications = InitiationNotification.objects.filter(
-        initiator_id=user.id,
-        reacted=False
-    )
-    
-    logger.debug(f"Found {notifications.count()} pending InitiationNotifications for initiator {user.id}")
-    
-    for notification in notifications:
-        try:
-            with transaction.atomic():
-                logger.info(f"Sending initiator notification for InitiationNotification {notification.id}")
-                send_notification_to_initiator(notification)
-                logger.debug(f"Successfully sent initiator notification for {notification.id}")
-        except Exception as e:
-            logger.error(f"Failed to send initiator notification for {notification.id}: {str(e)}")
 
-def _process_connection_notifications(user):
-    """Process ConnectionNotifications where user is connection or applicant"""
-    # As connection (receiver)
-    as_connection = ConnectionNotification.objects.filter(
-        connection=user,
-        reacted=False
-    )
-    
-    logger.debug(f"Found {as_connection.count()} ConnectionNotifications as connection for user {user.id}")
-    
-    for notification in as_connection:
-        try:
-            with transaction.atomic():
-                logger.info(f"Sending connection notification for ConnectionNotification {notification.id}")
-                send_notification_to_connection(notification)
-                logger.debug(f"Successfully sent connection notification for {notification.id}")
-        except Exception as e:
-            logger.error(f"Failed to send connection notification for {notification.id}: {str(e)}")
-    
-    # As applicant (sender)
-    as_applicant = ConnectionNotification.objects.filter(
-        applicant=user,
-        completed=False
-    )
-    
-    logger.debug(f"Found {as_applicant.count()} ConnectionNotifications as applicant for user {user.id}")
-    
-    for notification in as_applicant:
-        try:
-            with transaction.atomic():
-                logger.info(f"Sending applicant status for ConnectionNotification {notification.id}")
-                send_status_to_applicant(notification)
-                logger.debug(f"Successfully sent applicant status for {notification.id}")
-        except Exception as e:
-            logger.error(f"Failed to send applicant status for {notification.id}: {str(e)}")
-
-def _process_speaker_invitation_notifications(user):
-    """Process GroupSpeakerInvitationNotification where user is the invited speaker"""
-    # Assuming `speaker` is a Petitioner linked to `user`
-    notifications = GroupSpeakerInvitationNotification.objects.filter(
-        speaker=user,
-    )
-    for notification in notifications:
-        try:
-            with transaction.atomic():
-                # send the push/in-app invitation
-                send_speaker_invitation(notification)
-                # mark notification as seen so it isn't re-sent
-                notification.mark_as_seen()
-        except Exception as e:
-            logger.error(f"Failed to send speaker invitation {notification.id}: {e}")
-
-def _process_milestones_on_login(user):
-    """LOGIN FLOW: Process milestones when user logs in"""
-    logger.info(f"Processing milestones for login push for user {user.id}")
     try:
-        # LOGIN RULE: Only push if delivered=True AND completed=False
-        milestones = Milestone.objects.filter(
-            user_id=user.id,
-            delivered=True,
-            completed=False
-        )
-        
-        logger.info(f"Found {milestones.count()} milestones for login push for user {user.id}")
-        
-        for milestone in milestones:
-            try:
-                # Send notification without modifying the milestone
-                milestone.send_milestone_notification_stage_2()
-                logger.info(f"Sent login push for milestone {milestone.id}")
-            except Exception as e:
-                logger.error(f"Failed to send login push for milestone {milestone.id}: {str(e)}")
-                
+        frame = inbox_snapshot.push(user.id)
+        logger.info(f"Completed notification processing for user {user.id}: {frame['total']} pending")
     except Exception as e:
-        logger.error(f"Error processing milestones on login: {str(e)}")
\ No newline at end of file
+        logger.critical(f"Critical failure processing notifications for user {user.id}: {str(e)}")
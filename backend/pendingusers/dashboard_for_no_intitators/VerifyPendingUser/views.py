@@ -17,6 +17,8 @@ from rest_framework.permissions import IsAuthenticated
 from users.permissions.permissions import IsSuperUser
 from rest_framework.pagination import PageNumberPagination
 from users.models.usertree import UserTree
+from ...services.bulk_verification import bulk_verifier
+from ...tasks import bulk_verify_pending_users
 import logging
 
 logger = logging.getLogger(__name__)
@@ -141,6 +143,64 @@ class VerifyPendingUser(APIView):
         except Exception as e:
             logger.error(f"Failed to send WebSocket notification: {str(e)}")
 
+class BulkVerifyPendingUsers(APIView):
+    """
+    Verify a wave of claimed no-initiator users at once. Their Petitioner,
+    tree node and circles are created right away with the current admin as
+    online initiator. Up to SYNC_LIMIT users are verified in the request,
+    larger waves (or ``"async": true``) are queued as a Celery task.
+    """
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated, IsSuperUser]
+
+    SYNC_LIMIT = 200
+    MAX_USERS = 5000
+
+    def post(self, request):
+        pending_user_ids = request.data.get('pending_user_ids')
+        if not isinstance(pending_user_ids, list) or not pending_user_ids:
+            return Response({"error": "pending_user_ids must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(pending_user_ids) > self.MAX_USERS:
+            return Response({"error": f"At most {self.MAX_USERS} users per request"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            pending_user_ids = [int(pending_user_id) for pending_user_id in pending_user_ids]
+        except (TypeError, ValueError):
+            return Response({"error": "pending_user_ids must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            current_usertree = UserTree.objects.get(id=request.user.id)
+        except UserTree.DoesNotExist:
+            return Response({"error": "UserTree entry not found for current user"}, status=status.HTTP_404_NOT_FOUND)
+
+        # Same rule as VerifyPendingUser: only users claimed by this admin
+        claimed_ids = set(NoInitiatorUser.objects.filter(
+            pending_user_id__in=pending_user_ids,
+            pending_user__initiator_id__isnull=True,
+            claimed_by=current_usertree
+        ).values_list('pending_user_id', flat=True))
+        skipped = {
+            pending_user_id: "not claimed by you"
+            for pending_user_id in pending_user_ids if pending_user_id not in claimed_ids
+        }
+        claimed_ids = [pending_user_id for pending_user_id in pending_user_ids if pending_user_id in claimed_ids]
+
+        if claimed_ids and (len(claimed_ids) > self.SYNC_LIMIT or request.data.get('async')):
+            task = bulk_verify_pending_users.delay(claimed_ids, current_usertree.id)
+            return Response({
+                "message": f"Verification of {len(claimed_ids)} users queued",
+                "task_id": task.id,
+                "skipped": skipped,
+            }, status=status.HTTP_202_ACCEPTED)
+
+        result = bulk_verifier.verify(claimed_ids, verified_by=current_usertree)
+        skipped.update(result['skipped'])
+        return Response({
+            "verified": result['verified'],
+            "skipped": skipped,
+            "batches": result['batches'],
+        }, status=status.HTTP_200_OK)
+
+
 class RejectPendingUser(APIView):
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated, IsSuperUser]
@@ -54,7 +54,8 @@ class InitiationNotification(models.Model):
         super().save(*args, **kwargs) 
 
         if is_new:
-            if self.initiator.is_online:
+            from users.services.presence import presence
+            if presence.is_online(self.initiator_id):
                 self.process_notification()
             else:
                 self._set_offline_status()
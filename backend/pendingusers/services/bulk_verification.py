@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import re
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.utils import timezone
+from prometheus_client import Counter, Gauge, Histogram
+
+from geographies.services.population import population_counter
+from users.models.AdditionalInfo import AdditionalInfo
+from users.models.petitioners import Petitioner
+from users.models.usertree import UserTree
+from users.services.tree_maintenance import tree_engine
+from .pending_user_service import pendinguser_verified
+from ..models import PendingUser, NoInitiatorUser
+from ..models.notifications import InitiationNotification
+
+logger = logging.getLogger(__name__)
+
+
+bulk_verification_seconds = Histogram(
+    'pendinguser_bulk_verification_seconds',
+    'Time spent per batch in each stage of bulk verification',
+    ['stage']
+)
+bulk_verification_users_total = Counter(
+    'pendinguser_bulk_verification_users_total',
+    'Pending users handled by bulk verification by outcome (verified, skipped)',
+    ['outcome']
+)
+bulk_verification_throughput = Gauge(
+    'pendinguser_bulk_verification_users_per_second',
+    'Users verified per second by the last bulk verification batch'
+)
+
+
+class BulkVerifier:
+    """
+    Verifies pending users in batches, the set-based counterpart of
+    ``verify_and_transfer_user``.
+
+    Per batch, in one transaction: lock the pending users, allocate their
+    IDs and geographic sequence numbers with ``population_counter.allocate_many``,
+    bulk-create the Petitioner and AdditionalInfo rows and insert the
+    UserTree nodes with ``tree_engine.bulk_insert``, which applies childcount,
+    influence and depth once per affected ancestor and bulk-creates the
+    Circle rows. Initiation notifications are marked verified with one
+    UPDATE, and the WebSocket messages go out together after commit.
+
+    Pending users without an initiator are attached to whoever verified them
+    as an online initiation, like the waiting page flow; they and any user
+    that is locked, lacks a village or already has a Petitioner are skipped
+    with a reason.
+    """
+
+    BATCH_SIZE = 500
+
+    def verify(self, pending_user_ids, verified_by=None, batch_size=BATCH_SIZE):
+        """
+        Verify the pending users in batches of ``batch_size``. ``verified_by``
+        (a UserTree) is recorded on and becomes the initiator of users that
+        have none. Returns {'verified': {pending_user_id: user_id},
+        'skipped': {pending_user_id: reason}, 'batches': [stats, ...]}.
+        """
+        result = {'verified': {}, 'skipped': {}, 'batches': []}
+        pending_user_ids = list(dict.fromkeys(pending_user_ids))
+        for start in range(0, len(pending_user_ids), batch_size):
+            batch = self.verify_batch(pending_user_ids[start:start + batch_size], verified_by)
+            result['verified'].update(batch.pop('verified'))
+            result['skipped'].update(batch.pop('skipped'))
+            result['batches'].append(batch)
+        return result
+
+    def verify_batch(self, pending_user_ids, verified_by=None):
+        started = time.perf_counter()
+        skipped = {}
+
+        with transaction.atomic():
+            with self._stage('load'):
+                users = list(
+                    PendingUser.objects.select_for_update(skip_locked=True, of=('self',))
+                    .select_related('no_initiator_data', 'village')
+                    .filter(id__in=pending_user_ids)
+                    .order_by('id')
+                )
+                existing_gmails = set(Petitioner.objects.filter(
+                    gmail__in=[user.gmail for user in users]
+                ).values_list('gmail', flat=True))
+
+            found_ids = {user.id for user in users}
+            for pending_user_id in pending_user_ids:
+                if pending_user_id not in found_ids:
+                    skipped[pending_user_id] = 'not found or being verified'
+            accepted = []
+            for user in users:
+                reason = self._skip_reason(user, existing_gmails, verified_by)
+                if reason:
+                    skipped[user.id] = reason
+                else:
+                    accepted.append(user)
+
+            verified = {}
+            if accepted:
+                with self._stage('allocate'):
+                    numbers = population_counter.allocate_many([user.village_id for user in accepted])
+                with self._stage('create'):
+                    verified, without_initiator = self._create_users(accepted, numbers, verified_by)
+                with self._stage('notifications'):
+                    notification_ids = self._mark_notifications(accepted)
+                users_by_id = {user.id: user for user in accepted}
+                transaction.on_commit(
+                    lambda: self._notify(users_by_id, verified, without_initiator, notification_ids)
+                )
+
+        seconds = time.perf_counter() - started
+        bulk_verification_users_total.labels(outcome='verified').inc(len(verified))
+        bulk_verification_users_total.labels(outcome='skipped').inc(len(skipped))
+        pendinguser_verified.inc(len(verified))
+        users_per_second = len(verified) / seconds if seconds > 0 else 0.0
+        if verified:
+            bulk_verification_throughput.set(users_per_second)
+        logger.info(
+            f"[BULK VERIFY] {len(verified)} verified, {len(skipped)} skipped in {seconds:.2f}s "
+            f"({users_per_second:.1f} users/s)"
+        )
+        return {
+            'verified': verified,
+            'skipped': skipped,
+            'seconds': seconds,
+            'users_per_second': users_per_second,
+        }
+
+    @staticmethod
+    def _skip_reason(user, existing_gmails, verified_by):
+        if user.village_id is None:
+            return 'no village'
+        if user.gmail in existing_gmails:
+            return 'already verified'
+        if user.initiator_id is None:
+            no_initiator_data = getattr(user, 'no_initiator_data', None)
+            if no_initiator_data is None:
+                return 'no initiator'
+            if verified_by is None and no_initiator_data.verified_by_id is None:
+                return 'no verifier'
+        return None
+
+    def _create_users(self, users, numbers, verified_by):
+        """
+        Create the Petitioner, AdditionalInfo and UserTree rows. Returns
+        ({pending_user_id: user_id}, {pending_user_ids verified without initiator}).
+        """
+        no_initiator_rows = []
+        without_initiator = set()
+        for user in users:
+            if user.initiator_id is None:
+                # As on the waiting page, the verifier becomes the online initiator
+                no_initiator_data = user.no_initiator_data
+                if verified_by is not None:
+                    no_initiator_data.verified_by = verified_by
+                no_initiator_data.verification_status = 'verified'
+                no_initiator_rows.append(no_initiator_data)
+                user.initiator_id = no_initiator_data.verified_by_id
+                user.event_type = 'online'
+                without_initiator.add(user.id)
+        if no_initiator_rows:
+            NoInitiatorUser.objects.bulk_update(no_initiator_rows, ['verified_by', 'verification_status'])
+            PendingUser.objects.bulk_update(
+                [user for user in users if user.id in without_initiator], ['initiator_id', 'event_type']
+            )
+
+        parents = UserTree.objects.in_bulk({user.initiator_id for user in users if user.initiator_id})
+        verified = {}
+        petitioners, additional_info, nodes, roots = [], [], [], []
+        for user, user_numbers in zip(users, numbers):
+            user_id = int(str(user.village_id).zfill(9) + str(user_numbers['village_number']).zfill(5))
+            verified[user.id] = user_id
+
+            petitioner = Petitioner(
+                id=user_id,
+                gmail=user.gmail,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                date_of_birth=user.date_of_birth,
+                gender=user.gender,
+                country_id=user.country_id,
+                state_id=user.state_id,
+                district_id=user.district_id,
+                subdistrict_id=user.subdistrict_id,
+                village_id=user.village_id,
+            )
+            # bulk_create skips Petitioner.save()
+            petitioner.age = petitioner.calculate_age()
+            petitioners.append(petitioner)
+
+            additional_info.append(AdditionalInfo(
+                user_id=user_id, active_days=0, last_active_date=None, **user_numbers
+            ))
+
+            full_name = f"{user.first_name} {user.last_name}"
+            name = user.first_name if len(full_name) > 15 else full_name.strip()
+            if user.initiator_id in (0, None):
+                nodes.append(UserTree(id=user_id, name=name, profilepic=user.profile_picture))
+                roots.append(user.id)
+            else:
+                parent = parents.get(user.initiator_id)
+                if parent is None:
+                    logger.warning(f"No parent found for initiator_id {user.initiator_id}. Proceeding without parent.")
+                nodes.append(UserTree(
+                    id=user_id,
+                    name=name,
+                    profilepic=user.profile_picture,
+                    parentid=parent,
+                    event_choice=user.event_type,
+                    event_id=user.event_id,
+                ))
+
+        Petitioner.objects.bulk_create(petitioners)
+        AdditionalInfo.objects.bulk_create(additional_info)
+        tree_engine.bulk_insert(nodes, batch_size=len(nodes))
+
+        if roots:
+            PendingUser.objects.filter(id__in=roots).delete()
+        return verified, without_initiator
+
+    @staticmethod
+    def _mark_notifications(users):
+        """Mark the users' initiation notifications verified; returns {pending_user_id: notification_id}"""
+        notifications = InitiationNotification.objects.filter(
+            applicant_id__in=[user.id for user in users]
+        ).exclude(status=InitiationNotification.Status.VERIFIED)
+        notification_ids = dict(notifications.values_list('applicant_id', 'id'))
+        if notification_ids:
+            InitiationNotification.objects.filter(id__in=notification_ids.values()).update(
+                reacted=True, status=InitiationNotification.Status.VERIFIED, updated_at=timezone.now()
+            )
+        return notification_ids
+
+    def _notify(self, users_by_id, verified, without_initiator, notification_ids):
+        """Send every waiting page message of the batch and one user count update together"""
+        verified_message = InitiationNotification.STATUS_MESSAGES[InitiationNotification.Status.VERIFIED]
+        events = []
+        for pending_user_id in verified:
+            group_name = self._group_name(users_by_id[pending_user_id].gmail)
+            if pending_user_id in without_initiator:
+                events.append((group_name, {
+                    "type": "admin_verification_message",
+                    "message": {
+                        "type": "admin_verification",
+                        "status": "verified",
+                        "message": "🎉 Congratulations! Your account has been verified by our team.",
+                        "pending_user_id": pending_user_id,
+                    }
+                }))
+            elif pending_user_id in notification_ids:
+                events.append((group_name, {
+                    "type": "waitingpage_message",
+                    "notification_id": notification_ids[pending_user_id],
+                    "status": InitiationNotification.Status.VERIFIED,
+                    "message": verified_message,
+                }))
+        events.append(("user_count", {"type": "user_count_update", "total": Petitioner.objects.count()}))
+
+        channel_layer = get_channel_layer()
+
+        async def send_all():
+            results = await asyncio.gather(
+                *(channel_layer.group_send(group_name, event) for group_name, event in events),
+                return_exceptions=True
+            )
+            failed = [result for result in results if isinstance(result, Exception)]
+            if failed:
+                logger.error(f"[BULK VERIFY] {len(failed)} of {len(events)} notifications failed: {failed[0]}")
+
+        try:
+            with self._stage('notify'):
+                async_to_sync(send_all)()
+        except Exception as e:
+            logger.error(f"[BULK VERIFY] Could not send notifications: {e}")
+
+    @staticmethod
+    def _group_name(gmail):
+        return f"waiting_{re.sub(r'[^a-zA-Z0-9]', '_', gmail)}"
+
+    @staticmethod
+    def _stage(stage):
+        return bulk_verification_seconds.labels(stage=stage).time()
+
+
+bulk_verifier = BulkVerifier()
@@ -3,6 +3,7 @@ from django.db import transaction
 from users.models.petitioners import Petitioner
 from users.models.usertree import UserTree
 from users.models.AdditionalInfo import AdditionalInfo
+from geographies.services.population import population_counter
 from prometheus_client import Counter
 from ..models import PendingUser, NoInitiatorUser
 
@@ -41,67 +42,12 @@ def handle_pending_user_creation(user):
         logger.error(f"Error creating initiation notification: {e}")
 
 def update_all_geographical_populations(village):
-    """Update population counts for all geographical levels and return sequence numbers"""
+    """Count the new user at every geographical level and return its sequence numbers"""
     try:
-        sequence_numbers = {}
-        
-        # Update village population
-        village.online_population = (village.online_population or 0) + 1
-        sequence_numbers['village_number'] = village.online_population
-        village.save()
-        logger.info(f"Updated village {village.name} population to {village.online_population}")
-        
-        # Update subdistrict population
-        if village.subdistrict:
-            subdistrict = village.subdistrict
-            subdistrict.online_population = (subdistrict.online_population or 0) + 1
-            sequence_numbers['subdistrict_number'] = subdistrict.online_population
-            subdistrict.save()
-            logger.info(f"Updated subdistrict {subdistrict.name} population to {subdistrict.online_population}")
-        else:
-            sequence_numbers['subdistrict_number'] = 0
-            logger.warning(f"No subdistrict found for village {village.name}")
-        
-        # Update district population
-        if village.subdistrict and village.subdistrict.district:
-            district = village.subdistrict.district
-            district.online_population = (district.online_population or 0) + 1
-            sequence_numbers['district_number'] = district.online_population
-            district.save()
-            logger.info(f"Updated district {district.name} population to {district.online_population}")
-        else:
-            sequence_numbers['district_number'] = 0
-            logger.warning(f"No district found for village {village.name}")
-        
-        # Update state population
-        if (village.subdistrict and 
-            village.subdistrict.district and 
-            village.subdistrict.district.state):
-            state = village.subdistrict.district.state
-            state.online_population = (state.online_population or 0) + 1
-            sequence_numbers['state_number'] = state.online_population
-            state.save()
-            logger.info(f"Updated state {state.name} population to {state.online_population}")
-        else:
-            sequence_numbers['state_number'] = 0
-            logger.warning(f"No state found for village {village.name}")
-        
-        # Update country population
-        if (village.subdistrict and 
-            village.subdistrict.district and 
-            village.subdistrict.district.state and
-            village.subdistrict.district.state.country):
-            country = village.subdistrict.district.state.country
-            country.online_population = (country.online_population or 0) + 1
-            sequence_numbers['country_number'] = country.online_population
-            country.save()
-            logger.info(f"Updated country {country.name} population to {country.online_population}")
-        else:
-            sequence_numbers['country_number'] = 0
-            logger.warning(f"No country found for village {village.name}")
-        
+        sequence_numbers = population_counter.allocate(village.id)
+        logger.info(f"Allocated sequence numbers in village {village.name}: {sequence_numbers}")
         return sequence_numbers
-        
+
     except Exception as e:
         logger.error(f"Error updating geographical populations: {e}")
         raise
@@ -122,7 +68,7 @@ def verify_and_transfer_user(user):
 
         # Generate a unique ID
         village_id = str(user.village.id).zfill(9)
-        pop_code = str(user.village.online_population).zfill(5)
+        pop_code = str(sequence_numbers['village_number']).zfill(5)
         generated_id = int(village_id + pop_code)
         logger.info(f"Generated unique ID: {generated_id}")
 
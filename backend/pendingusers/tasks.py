@@ -21,4 +21,22 @@ def unclaim_expired_users():
         claim.claimed_at = None
         claim.save()
     
-    return f"Unclaimed {expired_claims.count()} expired claims"
\ No newline at end of file
+    return f"Unclaimed {expired_claims.count()} expired claims"
+
+
+@shared_task
+def bulk_verify_pending_users(pending_user_ids, verified_by_id=None):
+    """
+    Verify a wave of pending users with the batch pipeline. ``verified_by_id``
+    is the UserTree ID of the admin verifying users that have no initiator.
+    """
+    from users.models.usertree import UserTree
+    from .services.bulk_verification import bulk_verifier
+
+    verified_by = UserTree.objects.filter(id=verified_by_id).first() if verified_by_id else None
+    result = bulk_verifier.verify(pending_user_ids, verified_by=verified_by)
+    seconds = sum(batch['seconds'] for batch in result['batches'])
+    return (
+        f"Verified {len(result['verified'])} pending users, skipped {len(result['skipped'])} "
+        f"in {len(result['batches'])} batches ({seconds:.2f}s)"
+    )
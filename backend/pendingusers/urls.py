@@ -8,6 +8,7 @@ from .no_initiator.phone_number_views import PhoneNumberAPIView
 from .dashboard_for_no_intitators.views import PendingUserNoInitiatorListView, ClaimPendingUser, UnclaimPendingUser,  UpdatePendingUserNotes, MarkAsSpam
 from .dashboard_for_no_intitators.VerifyPendingUser.views import VerifyPendingUser
 from .dashboard_for_no_intitators.VerifyPendingUser.views import RejectPendingUser
+from .dashboard_for_no_intitators.VerifyPendingUser.views import BulkVerifyPendingUsers
 from .deletions.normalpendinguser.views import delete_pending_user_by_email
 # from .dashboard_for_no_intitators.VerifyPendingUser.views import AcceptRejectionCleanup
 
@@ -19,6 +20,7 @@ urlpatterns = [
     path('admin/pending-users/no-initiator/', PendingUserNoInitiatorListView.as_view(), name='pending-users-no-initiator'),
     path('admin/pending-users/<int:user_id>/claim/', ClaimPendingUser.as_view(), name='claim-pending-user'),
     path('admin/pending-users/<int:user_id>/verify/', VerifyPendingUser.as_view(), name='verify-pending-user'),
+    path('admin/pending-users/bulk-verify/', BulkVerifyPendingUsers.as_view(), name='bulk-verify-pending-users'),
     path('admin/pending-users/<int:user_id>/unclaim/', UnclaimPendingUser.as_view(), name='unclaim-pending-user'),
     path('admin/pending-users/<int:user_id>/notes/', UpdatePendingUserNotes.as_view(), name='update-pending-user-notes'),
     path('admin/pending-users/<int:user_id>/mark-spam/', MarkAsSpam.as_view(), name='mark-pending-user-spam'),
@@ -0,0 +1,147 @@
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from geographies.models.geos import Village, Subdistrict, District, State
+from reports.models import (
+    VillageDailyReport, SubdistrictDailyReport,
+    DistrictDailyReport, StateDailyReport, CountryDailyReport
+)
+from users.models import Petitioner
+from reports.management.commands.generate_historical_daily_reports import Command as HistoricalCommand
+from reports.management.commands.generate_daily_reports import Command as DailyCommand
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks a daily report backfill: the per-row update_or_create path, the day-by-day bulk '
+            'report writer and the single-pass SQL rollup. Everything is rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Days to backfill (default: 30)')
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            help='Last day of the backfill in YYYY-MM-DD format (default: yesterday)'
+        )
+
+    def handle(self, *args, **options):
+        end_date = (
+            date.fromisoformat(options['end_date'])
+            if options.get('end_date')
+            else date.today() - timedelta(days=1)
+        )
+        days = [end_date - timedelta(days=offset) for offset in range(options['days'] - 1, -1, -1)]
+        self.stdout.write(f"Backfilling {len(days)} days ({days[0]} to {days[-1]}) with both writers")
+
+        for label, backfill in (
+            ('legacy', self.legacy_backfill),
+            ('writer', self.writer_backfill),
+            ('rollup', self.rollup_backfill),
+        ):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    rows = backfill(days)
+                    elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+            self.stdout.write(
+                f"{label:<7} {elapsed:8.2f}s  {len(ctx.captured_queries):>8} queries  "
+                f"{rows:>8} reports  {len(days) / elapsed:6.2f} days/s"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, all reports rolled back"))
+
+    def writer_backfill(self, days):
+        command = HistoricalCommand(stdout=self.stdout)
+        command.load_hierarchy()
+        rows = 0
+        for report_date in days:
+            village_reports = command.create_village_reports(report_date)
+            subdistrict_reports = command.create_subdistrict_reports(report_date, village_reports)
+            district_reports = command.create_district_reports(report_date, subdistrict_reports)
+            state_reports = command.create_state_reports(report_date, district_reports)
+            country_reports = command.create_country_reports(report_date, state_reports)
+            rows += sum(map(len, (
+                village_reports, subdistrict_reports, district_reports, state_reports, country_reports
+            )))
+        return rows
+
+    def rollup_backfill(self, days):
+        """The whole range through the SQL rollup engine in one pass"""
+        command = DailyCommand(stdout=self.stdout)
+        command.verbose = False
+        command.batch_size = 1000
+        return sum(len(reports) for reports in command.generate_reports_for_days(days).values())
+
+    def legacy_backfill(self, days):
+        """The per-entity update_or_create and per-child parent save the generators used before"""
+        levels = (
+            (Village, 'subdistrict_id', SubdistrictDailyReport, 'subdistrict_id', 'village_data'),
+            (Subdistrict, 'district_id', DistrictDailyReport, 'district_id', 'subdistrict_data'),
+            (District, 'state_id', StateDailyReport, 'state_id', 'district_data'),
+            (State, 'country_id', CountryDailyReport, 'country_id', 'state_data'),
+        )
+        rows = 0
+        for report_date in days:
+            village_users = defaultdict(list)
+            for user in Petitioner.objects.filter(
+                date_joined__date=report_date, village__isnull=False
+            ).only('id', 'first_name', 'last_name', 'village_id'):
+                village_users[user.village_id].append(user)
+
+            child_reports = {}
+            for village_id, users in village_users.items():
+                report, _ = VillageDailyReport.objects.update_or_create(
+                    date=report_date,
+                    village_id=village_id,
+                    defaults={
+                        'new_users': len(users),
+                        'user_data': {
+                            str(user.id): {"id": str(user.id), "name": f"{user.first_name} {user.last_name}"}
+                            for user in users
+                        }
+                    }
+                )
+                child_reports[village_id] = report
+            rows += len(child_reports)
+
+            for child_model, parent_field, report_model, report_key, data_field in levels:
+                children = defaultdict(list)
+                for child in child_model.objects.only('id', 'name', parent_field):
+                    children[getattr(child, parent_field)].append(child)
+
+                parent_reports = {}
+                for parent_id, parent_children in children.items():
+                    entries = {}
+                    total_new_users = 0
+                    for child in parent_children:
+                        child_report = child_reports.get(child.id)
+                        entries[str(child.id)] = {
+                            "id": str(child.id),
+                            "name": child.name,
+                            "new_users": child_report.new_users if child_report else 0,
+                            "report_id": str(child_report.id) if child_report else None
+                        }
+                        if child_report:
+                            total_new_users += child_report.new_users
+                    if total_new_users == 0:
+                        continue
+
+                    report, _ = report_model.objects.update_or_create(
+                        date=report_date,
+                        **{report_key: parent_id},
+                        defaults={'new_users': total_new_users, data_field: entries}
+                    )
+                    parent_reports[parent_id] = report
+                    for child in parent_children:
+                        if child.id in child_reports:
+                            child_report = child_reports[child.id]
+                            child_report.parent_id = report.id
+                            child_report.save()
+                rows += len(parent_reports)
+                child_reports = parent_reports
+        return rows
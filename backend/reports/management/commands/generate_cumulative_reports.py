@@ -1,10 +1,11 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from django.db.models import F, Max
+from django.db.models import Max, Q
 from datetime import date, timedelta
 from geographies.models.geos import Village, Subdistrict, District, State, Country
 from reports.models import CumulativeReport
 from users.models import Petitioner
+from reports.services.report_writer import add_to_cumulative
 from collections import defaultdict
 
 class Command(BaseCommand):
@@ -135,26 +136,33 @@ class Command(BaseCommand):
             date_joined__date=process_date
         ).values_list('id', flat=True)
         
-        # Clean village reports
-        village_reports = CumulativeReport.objects.filter(level='village')
-        for report in village_reports:
+        user_keys = [str(uid) for uid in user_ids]
+        
+        # Clean village reports that list one of these users
+        to_update = []
+        to_delete = []
+        for report in CumulativeReport.objects.filter(level='village', user_data__has_any_keys=user_keys):
+            for key in user_keys:
+                if key in report.user_data:
+                    del report.user_data[key]
+                    report.total_users -= 1
+            
+            if report.total_users < 0:
+                report.total_users = 0
+            
+            # Save if we modified or delete if empty
             if report.user_data:
-                # Remove users created on this date
-                for uid in user_ids:
-                    if str(uid) in report.user_data:
-                        del report.user_data[str(uid)]
-                        report.total_users -= 1
-                
-                if report.total_users < 0:
-                    report.total_users = 0
-                
-                # Save if we modified or delete if empty
-                if report.user_data:
-                    report.save()
-                else:
-                    report.delete()
+                to_update.append(report)
             else:
-                report.delete()
+                to_delete.append(report.id)
+        
+        if to_update:
+            CumulativeReport.objects.bulk_update(to_update, ['user_data', 'total_users'], batch_size=1000)
+        if to_delete:
+            CumulativeReport.objects.filter(id__in=to_delete).delete()
+        CumulativeReport.objects.filter(level='village').filter(
+            Q(user_data__isnull=True) | Q(user_data={})
+        ).delete()
         
         # Higher levels will be recalculated during processing
         CumulativeReport.objects.filter(level__in=[
@@ -200,60 +208,11 @@ class Command(BaseCommand):
         self.update_higher_level('country', country_counts)
 
     def update_village_reports(self, village_data):
-        for village_id, data in village_data.items():
-            # Get or create village cumulative report
-            report, created = CumulativeReport.objects.get_or_create(
-                level='village',
-                geographical_entity=village_id,
-                defaults={
-                    'total_users': data['count'],
-                    'user_data': data['user_data']
-                }
-            )
-            
-            if not created:
-                # Update existing report
-                current_data = report.user_data or {}
-                current_data.update(data['user_data'])
-                
-                CumulativeReport.objects.filter(
-                    level='village',
-                    geographical_entity=village_id
-                ).update(
-                    total_users=F('total_users') + data['count'],
-                    user_data=current_data
-                )
+        add_to_cumulative(
+            'village',
+            {village_id: data['count'] for village_id, data in village_data.items()},
+            {village_id: data['user_data'] for village_id, data in village_data.items()}
+        )
 
     def update_higher_level(self, level, entity_counts):
-        # Get existing reports for efficiency
-        entity_ids = list(entity_counts.keys())
-        existing_reports = CumulativeReport.objects.filter(
-            level=level,
-            geographical_entity__in=entity_ids
-        )
-        existing_map = {r.geographical_entity: r for r in existing_reports}
-        
-        # Prepare batch updates
-        to_create = []
-        to_update = []
-        
-        for entity_id, count in entity_counts.items():
-            if entity_id in existing_map:
-                to_update.append(entity_id)
-            else:
-                to_create.append(CumulativeReport(
-                    level=level,
-                    geographical_entity=entity_id,
-                    total_users=count
-                ))
-        
-        # Create new reports
-        if to_create:
-            CumulativeReport.objects.bulk_create(to_create)
-        
-        # Update existing reports
-        if to_update:
-            CumulativeReport.objects.filter(
-                level=level,
-                geographical_entity__in=to_update
-            ).update(total_users=F('total_users') + count)
\ No newline at end of file
+        add_to_cumulative(level, entity_counts)
@@ -2,12 +2,15 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 from datetime import date, timedelta
-from geographies.models.geos import Village, Subdistrict, District, State, Country
+from geographies.models.geos import Village, Subdistrict, District, State
 from reports.models import (
     VillageDailyReport, SubdistrictDailyReport,
     DistrictDailyReport, StateDailyReport, CountryDailyReport
 )
 from users.models import Petitioner
+from reports.services.report_writer import ReportWriter, link_parents
+from reports.services.report_members import report_members
+from backend.read_cache import read_cache
 from collections import defaultdict
 
 class Command(BaseCommand):
@@ -29,6 +32,9 @@ class Command(BaseCommand):
         start_date, end_date = self.get_date_range(kwargs)
         self.stdout.write(f"Generating reports from {start_date} to {end_date}")
         
+        # Geography does not change between days, load the hierarchy once
+        self.load_hierarchy()
+        
         current_date = start_date
         processed_days = 0
         
@@ -49,10 +55,27 @@ class Command(BaseCommand):
             if processed_days % 10 == 0:
                 self.stdout.write(f"Processed {processed_days} days...")
         
+        read_cache.invalidate('reports')
         self.stdout.write(self.style.SUCCESS(
             f'Successfully generated daily reports for {processed_days} days'
         ))
 
+    def load_hierarchy(self):
+        """{level: (children by parent, parent of child)} for every parent level"""
+        self.hierarchy = {}
+        for child_model, parent_field, level in (
+            (Village, 'subdistrict_id', 'subdistrict'),
+            (Subdistrict, 'district_id', 'district'),
+            (District, 'state_id', 'state'),
+            (State, 'country_id', 'country'),
+        ):
+            children = defaultdict(list)
+            parent_of = {}
+            for child_id, parent_id, name in child_model.objects.order_by('id').values_list('id', parent_field, 'name'):
+                children[parent_id].append((child_id, name))
+                parent_of[child_id] = parent_id
+            self.hierarchy[level] = (children, parent_of)
+
     def get_date_range(self, kwargs):
         first_user = Petitioner.objects.order_by('date_joined').first()
         default_start = first_user.date_joined.date() if first_user else date.today()
@@ -84,243 +107,84 @@ class Command(BaseCommand):
             district__isnull=True,
             state__isnull=True,
             country__isnull=True
-        ).select_related('village')
+        ).only('id', 'village_id')
         
         village_users = defaultdict(list)
         for user in users:
             village_users[user.village_id].append(user)
         
-        village_reports = {}
+        writer = ReportWriter(VillageDailyReport, 'village_id', {'date': report_date})
         for village_id, users in village_users.items():
-            village = Village.objects.get(id=village_id)
-            user_data = {
-                str(user.id): {
-                    "id": user.id,
-                    "name": f"{user.first_name} {user.last_name}"
-                } for user in users
-            }
-            
-            report, created = VillageDailyReport.objects.update_or_create(
-                date=report_date,
-                village=village,
-                defaults={
-                    'new_users': len(users),
-                    'user_data': user_data
-                }
+            writer.add(
+                village_id,
+                new_users=len(users),
+                member_ids=report_members.pack(user.id for user in users)
             )
-            village_reports[village_id] = report
+        village_reports = writer.save()
         
-        # Delete reports with zero users
+        # Delete reports of villages without new users
         VillageDailyReport.objects.filter(
-            date=report_date, 
-            new_users=0
-        ).delete()
+            date=report_date
+        ).exclude(village_id__in=list(village_reports)).delete()
             
         return village_reports
 
-    def create_subdistrict_reports(self, report_date, village_reports):
-        # Get all villages grouped by subdistrict
-        villages = Village.objects.select_related('subdistrict').all()
-        subdistrict_villages = defaultdict(list)
-        for village in villages:
-            subdistrict_villages[village.subdistrict_id].append(village)
+    def create_level_reports(self, report_date, level, child_reports, child_report_model,
+                             report_model, report_key, data_field):
+        """
+        Write the reports of one level in bulk from the level below, link the
+        child reports to them and drop reports of parents without new users.
+        """
+        children, parent_of = self.hierarchy[level]
         
-        subdistrict_reports = {}
-        for subdistrict_id, villages in subdistrict_villages.items():
-            subdistrict = Subdistrict.objects.get(id=subdistrict_id)
-            
-            village_data = {}
+        writer = ReportWriter(report_model, report_key, {'date': report_date})
+        for parent_id in sorted({parent_of.get(child_id) for child_id in child_reports} - {None}):
+            entries = {}
             total_new_users = 0
-            parent_report_id = None
             
-            for village in villages:
-                report = village_reports.get(village.id)
-                village_data[str(village.id)] = {
-                    "id": village.id,
-                    "name": village.name,
+            for child_id, child_name in children.get(parent_id, []):
+                report = child_reports.get(child_id)
+                entries[str(child_id)] = {
+                    "id": str(child_id),
+                    "name": child_name,
                     "new_users": report.new_users if report else 0,
-                    "report_id": report.id if report else None
+                    "report_id": str(report.id) if report else None
                 }
                 if report:
                     total_new_users += report.new_users
             
             # Only create report if there are new users
             if total_new_users > 0:
-                report, created = SubdistrictDailyReport.objects.update_or_create(
-                    date=report_date,
-                    subdistrict=subdistrict,
-                    defaults={
-                        'new_users': total_new_users,
-                        'village_data': village_data
-                    }
-                )
-                subdistrict_reports[subdistrict_id] = report
-                
-                # Update village reports with parent ID
-                for village in villages:
-                    if village.id in village_reports:
-                        village_report = village_reports[village.id]
-                        village_report.parent_id = report.id
-                        village_report.save()
-            else:
-                # Delete if exists
-                SubdistrictDailyReport.objects.filter(
-                    date=report_date,
-                    subdistrict=subdistrict
-                ).delete()
+                writer.add(parent_id, new_users=total_new_users, **{data_field: entries})
+        reports = writer.save()
+        
+        link_parents(child_report_model, child_reports, reports, parent_of)
+        report_model.objects.filter(
+            date=report_date
+        ).exclude(**{f"{report_key}__in": list(reports)}).delete()
                 
-        return subdistrict_reports
+        return reports
+
+    def create_subdistrict_reports(self, report_date, village_reports):
+        return self.create_level_reports(
+            report_date, 'subdistrict', village_reports, VillageDailyReport,
+            SubdistrictDailyReport, 'subdistrict_id', 'village_data'
+        )
 
     def create_district_reports(self, report_date, subdistrict_reports):
-        # Get all subdistricts grouped by district
-        subdistricts = Subdistrict.objects.select_related('district').all()
-        district_subdistricts = defaultdict(list)
-        for sub in subdistricts:
-            district_subdistricts[sub.district_id].append(sub)
-        
-        district_reports = {}
-        for district_id, subdistricts in district_subdistricts.items():
-            district = District.objects.get(id=district_id)
-            
-            subdistrict_data = {}
-            total_new_users = 0
-            parent_report_id = None
-            
-            for sub in subdistricts:
-                report = subdistrict_reports.get(sub.id)
-                subdistrict_data[str(sub.id)] = {
-                    "id": sub.id,
-                    "name": sub.name,
-                    "new_users": report.new_users if report else 0,
-                    "report_id": report.id if report else None
-                }
-                if report:
-                    total_new_users += report.new_users
-            
-            # Only create report if there are new users
-            if total_new_users > 0:
-                report, created = DistrictDailyReport.objects.update_or_create(
-                    date=report_date,
-                    district=district,
-                    defaults={
-                        'new_users': total_new_users,
-                        'subdistrict_data': subdistrict_data
-                    }
-                )
-                district_reports[district_id] = report
-                
-                # Update subdistrict reports with parent ID
-                for sub in subdistricts:
-                    if sub.id in subdistrict_reports:
-                        sub_report = subdistrict_reports[sub.id]
-                        sub_report.parent_id = report.id
-                        sub_report.save()
-            else:
-                # Delete if exists
-                DistrictDailyReport.objects.filter(
-                    date=report_date,
-                    district=district
-                ).delete()
-                
-        return district_reports
+        return self.create_level_reports(
+            report_date, 'district', subdistrict_reports, SubdistrictDailyReport,
+            DistrictDailyReport, 'district_id', 'subdistrict_data'
+        )
 
     def create_state_reports(self, report_date, district_reports):
-        # Get all districts grouped by state
-        districts = District.objects.select_related('state').all()
-        state_districts = defaultdict(list)
-        for district in districts:
-            state_districts[district.state_id].append(district)
-        
-        state_reports = {}
-        for state_id, districts in state_districts.items():
-            state = State.objects.get(id=state_id)
-            
-            district_data = {}
-            total_new_users = 0
-            parent_report_id = None
-            
-            for district in districts:
-                report = district_reports.get(district.id)
-                district_data[str(district.id)] = {
-                    "id": district.id,
-                    "name": district.name,
-                    "new_users": report.new_users if report else 0,
-                    "report_id": report.id if report else None
-                }
-                if report:
-                    total_new_users += report.new_users
-            
-            # Only create report if there are new users
-            if total_new_users > 0:
-                report, created = StateDailyReport.objects.update_or_create(
-                    date=report_date,
-                    state=state,
-                    defaults={
-                        'new_users': total_new_users,
-                        'district_data': district_data
-                    }
-                )
-                state_reports[state_id] = report
-                
-                # Update district reports with parent ID
-                for district in districts:
-                    if district.id in district_reports:
-                        dist_report = district_reports[district.id]
-                        dist_report.parent_id = report.id
-                        dist_report.save()
-            else:
-                # Delete if exists
-                StateDailyReport.objects.filter(
-                    date=report_date,
-                    state=state
-                ).delete()
-                
-        return state_reports
+        return self.create_level_reports(
+            report_date, 'state', district_reports, DistrictDailyReport,
+            StateDailyReport, 'state_id', 'district_data'
+        )
 
     def create_country_reports(self, report_date, state_reports):
-        # Get all states grouped by country
-        states = State.objects.select_related('country').all()
-        country_states = defaultdict(list)
-        for state in states:
-            country_states[state.country_id].append(state)
-        
-        for country_id, states in country_states.items():
-            country = Country.objects.get(id=country_id)
-            
-            state_data = {}
-            total_new_users = 0
-            
-            for state in states:
-                report = state_reports.get(state.id)
-                state_data[str(state.id)] = {
-                    "id": state.id,
-                    "name": state.name,
-                    "new_users": report.new_users if report else 0,
-                    "report_id": report.id if report else None
-                }
-                if report:
-                    total_new_users += report.new_users
-            
-            # Only create report if there are new users
-            if total_new_users > 0:
-                report, created = CountryDailyReport.objects.update_or_create(
-                    date=report_date,
-                    country=country,
-                    defaults={
-                        'new_users': total_new_users,
-                        'state_data': state_data
-                    }
-                )
-                
-                # Update state reports with parent ID
-                for state in states:
-                    if state.id in state_reports:
-                        state_report = state_reports[state.id]
-                        state_report.parent_id = report.id
-                        state_report.save()
-            else:
-                # Delete if exists
-                CountryDailyReport.objects.filter(
-                    date=report_date,
-                    country=country
-                ).delete()
\ No newline at end of file
+        return self.create_level_reports(
+            report_date, 'country', state_reports, StateDailyReport,
+            CountryDailyReport, 'country_id', 'state_data'
+        )
\ No newline at end of file
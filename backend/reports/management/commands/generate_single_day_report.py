@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction, models
+from django.db import transaction
 from datetime import date
 from geographies.models.geos import Village, Subdistrict, District, State, Country
 from reports.models import (
@@ -7,6 +7,8 @@ from reports.models import (
     DistrictDailyReport, StateDailyReport, CountryDailyReport
 )
 from users.models import Petitioner
+from reports.services.report_writer import ReportWriter, link_parents, parent_map, children_by_parent
+from reports.services.report_members import report_members
 
 
 class Command(BaseCommand):
@@ -42,16 +44,10 @@ class Command(BaseCommand):
             self.stdout.write(f"No users joined on {report_date}. Creating empty country report...")
 
             with transaction.atomic():
-                countries = Country.objects.all()
-                for country in countries:
-                    CountryDailyReport.objects.update_or_create(
-                        date=report_date,
-                        country=country,
-                        defaults={
-                            'new_users': 0,
-                            'state_data': {}
-                        }
-                    )
+                writer = ReportWriter(CountryDailyReport, 'country_id', {'date': report_date})
+                for country_id in Country.objects.values_list('id', flat=True):
+                    writer.add(country_id, new_users=0, state_data={})
+                writer.save()
 
             self.stdout.write(self.style.SUCCESS(
                 f"✅ Created empty CountryDailyReport for {report_date}"
@@ -75,184 +71,77 @@ class Command(BaseCommand):
     # ============ Helper methods ============
 
     def create_village_reports(self, report_date):
-        villages = Village.objects.annotate(
-            new_users_count=models.Count(
-                'petitioner',
-                filter=models.Q(petitioner__date_joined__date=report_date)
+        village_users = {}
+        for user_id, village_id in Petitioner.objects.filter(
+            date_joined__date=report_date, village__isnull=False
+        ).values_list('id', 'village_id'):
+            village_users.setdefault(village_id, []).append(user_id)
+
+        writer = ReportWriter(VillageDailyReport, 'village_id', {'date': report_date})
+        for village_id, users in village_users.items():
+            writer.add(
+                village_id,
+                new_users=len(users),
+                member_ids=report_members.pack(users)
             )
-        ).prefetch_related('petitioner_set')
-
-        village_reports = {}
-        for village in villages:
-            if village.new_users_count == 0:
-                continue
-
-            users = village.petitioner_set.filter(
-                date_joined__date=report_date
-            ).values('id', 'first_name', 'last_name')
-
-            user_data = {
-                str(u['id']): {
-                    "id": str(u['id']),
-                    "name": f"{u['first_name']} {u['last_name']}"
-                } for u in users
-            }
-
-            report, _ = VillageDailyReport.objects.update_or_create(
-                date=report_date,
-                village=village,
-                defaults={
-                    'new_users': village.new_users_count,
-                    'user_data': user_data
-                }
-            )
-            village_reports[village.id] = report
-        return village_reports
-
-    def create_subdistrict_reports(self, report_date, village_reports):
-        subdistricts = Subdistrict.objects.prefetch_related('village_set')
-        subdistrict_reports = {}
-
-        for subdistrict in subdistricts:
-            villages = subdistrict.village_set.all()
+        return writer.save()
+
+    def create_level_reports(self, report_date, child_reports, child_report_model, child_model,
+                             parent_field, report_model, report_key, data_field, parent_ids=None):
+        """
+        Write one level from the level below in bulk and link the child
+        reports to it. Only parents with new users get a report unless
+        ``parent_ids`` lists the parents to report on regardless.
+        """
+        parent_of = parent_map(child_model, parent_field, list(child_reports))
+        if parent_ids is None:
+            parent_ids = sorted({pid for pid in parent_of.values() if pid is not None})
+        children = children_by_parent(child_model, parent_field, parent_ids)
+
+        writer = ReportWriter(report_model, report_key, {'date': report_date})
+        for parent_id in parent_ids:
             total_new_users = 0
-            village_data = {}
+            entries = {}
 
-            for village in villages:
-                report = village_reports.get(village.id)
-                village_data[str(village.id)] = {
-                    "id": str(village.id),
-                    "name": village.name,
+            for child_id, child_name in children.get(parent_id, []):
+                report = child_reports.get(child_id)
+                entries[str(child_id)] = {
+                    "id": str(child_id),
+                    "name": child_name,
                     "new_users": report.new_users if report else 0,
                     "report_id": str(report.id) if report else None
                 }
                 if report:
                     total_new_users += report.new_users
 
-            if total_new_users > 0:
-                report, _ = SubdistrictDailyReport.objects.update_or_create(
-                    date=report_date,
-                    subdistrict=subdistrict,
-                    defaults={
-                        'new_users': total_new_users,
-                        'village_data': village_data
-                    }
-                )
-                subdistrict_reports[subdistrict.id] = report
-
-                for village in villages:
-                    if village.id in village_reports:
-                        vreport = village_reports[village.id]
-                        vreport.parent_id = report.id
-                        vreport.save()
-        return subdistrict_reports
-
-    def create_district_reports(self, report_date, subdistrict_reports):
-        districts = District.objects.prefetch_related('subdistrict_set')
-        district_reports = {}
-
-        for district in districts:
-            subs = district.subdistrict_set.all()
-            total_new_users = 0
-            sub_data = {}
+            writer.add(parent_id, new_users=total_new_users, **{data_field: entries})
+        reports = writer.save()
 
-            for sub in subs:
-                report = subdistrict_reports.get(sub.id)
-                sub_data[str(sub.id)] = {
-                    "id": str(sub.id),
-                    "name": sub.name,
-                    "new_users": report.new_users if report else 0,
-                    "report_id": str(report.id) if report else None
-                }
-                if report:
-                    total_new_users += report.new_users
+        link_parents(child_report_model, child_reports, reports, parent_of)
+        return reports
 
-            if total_new_users > 0:
-                report, _ = DistrictDailyReport.objects.update_or_create(
-                    date=report_date,
-                    district=district,
-                    defaults={
-                        'new_users': total_new_users,
-                        'subdistrict_data': sub_data
-                    }
-                )
-                district_reports[district.id] = report
+    def create_subdistrict_reports(self, report_date, village_reports):
+        return self.create_level_reports(
+            report_date, village_reports, VillageDailyReport, Village, 'subdistrict_id',
+            SubdistrictDailyReport, 'subdistrict_id', 'village_data'
+        )
 
-                for sub in subs:
-                    if sub.id in subdistrict_reports:
-                        sreport = subdistrict_reports[sub.id]
-                        sreport.parent_id = report.id
-                        sreport.save()
-        return district_reports
+    def create_district_reports(self, report_date, subdistrict_reports):
+        return self.create_level_reports(
+            report_date, subdistrict_reports, SubdistrictDailyReport, Subdistrict, 'district_id',
+            DistrictDailyReport, 'district_id', 'subdistrict_data'
+        )
 
     def create_state_reports(self, report_date, district_reports):
-        states = State.objects.prefetch_related('district_set')
-        state_reports = {}
-
-        for state in states:
-            districts = state.district_set.all()
-            total_new_users = 0
-            dist_data = {}
-
-            for district in districts:
-                report = district_reports.get(district.id)
-                dist_data[str(district.id)] = {
-                    "id": str(district.id),
-                    "name": district.name,
-                    "new_users": report.new_users if report else 0,
-                    "report_id": str(report.id) if report else None
-                }
-                if report:
-                    total_new_users += report.new_users
-
-            if total_new_users > 0:
-                report, _ = StateDailyReport.objects.update_or_create(
-                    date=report_date,
-                    state=state,
-                    defaults={
-                        'new_users': total_new_users,
-                        'district_data': dist_data
-                    }
-                )
-                state_reports[state.id] = report
-
-                for district in districts:
-                    if district.id in district_reports:
-                        dreport = district_reports[district.id]
-                        dreport.parent_id = report.id
-                        dreport.save()
-        return state_reports
+        return self.create_level_reports(
+            report_date, district_reports, DistrictDailyReport, District, 'state_id',
+            StateDailyReport, 'state_id', 'district_data'
+        )
 
     def create_country_reports(self, report_date, state_reports):
-        countries = Country.objects.prefetch_related('state_set')
-
-        for country in countries:
-            states = country.state_set.all()
-            total_new_users = 0
-            state_data = {}
-
-            for state in states:
-                report = state_reports.get(state.id)
-                state_data[str(state.id)] = {
-                    "id": str(state.id),
-                    "name": state.name,
-                    "new_users": report.new_users if report else 0,
-                    "report_id": str(report.id) if report else None
-                }
-                if report:
-                    total_new_users += report.new_users
-
-            report, _ = CountryDailyReport.objects.update_or_create(
-                date=report_date,
-                country=country,
-                defaults={
-                    'new_users': total_new_users,
-                    'state_data': state_data
-                }
-            )
-
-            for state in states:
-                if state.id in state_reports:
-                    sreport = state_reports[state.id]
-                    sreport.parent_id = report.id
-                    sreport.save()
+        # Every country gets a report, with zeros when nobody joined there
+        return self.create_level_reports(
+            report_date, state_reports, StateDailyReport, State, 'country_id',
+            CountryDailyReport, 'country_id', 'state_data',
+            parent_ids=list(Country.objects.order_by('id').values_list('id', flat=True))
+        )
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from reports.models import VillageDailyReport, VillageWeeklyReport, VillageMonthlyReport
+from activity_reports.models import (
+    DailyVillageActivityReport, WeeklyVillageActivityReport, MonthlyVillageActivityReport
+)
+
+# (model, per-member values kept in arrays aligned with member_ids)
+MODELS = (
+    (VillageDailyReport, ()),
+    (VillageWeeklyReport, ()),
+    (VillageMonthlyReport, ()),
+    (DailyVillageActivityReport, ()),
+    (WeeklyVillageActivityReport, ('active_days',)),
+    (MonthlyVillageActivityReport, ('active_days',)),
+)
+
+
+class Command(BaseCommand):
+    help = ('Moves the membership of village reports from the legacy user_data JSON into the '
+            'member_ids arrays, then clears user_data. Run once after adding the columns; '
+            'reports already written with member_ids keep them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Reports per UPDATE (default: 5000)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model, values in MODELS:
+            packed = 0
+            while True:
+                with transaction.atomic():
+                    rows = self.pack_batch(model, values, batch_size)
+                packed += rows
+                if rows < batch_size:
+                    break
+            self.stdout.write(f"{model.__name__}: packed {packed} reports")
+
+        self.stdout.write(self.style.SUCCESS('Report members packed successfully!'))
+
+    def pack_batch(self, model, values, batch_size):
+        """Pack up to ``batch_size`` reports that still have user_data; returns how many"""
+        table = connection.ops.quote_name(model._meta.db_table)
+        # User IDs are the keys of user_data; aligned values come from each user's entry
+        assignments = [self.packed_array('k::bigint', 'member_ids')]
+        for value in values:
+            assignments.append(self.packed_array(
+                f"COALESCE((r.user_data -> k ->> '{value}')::int, 0)", f"member_{value}"
+            ))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} r
+                SET {', '.join(assignments)}, user_data = NULL
+                WHERE r.id IN (
+                    SELECT id FROM {table} WHERE user_data IS NOT NULL LIMIT %s
+                )
+                """,
+                [batch_size]
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def packed_array(expression, field):
+        """SET clause filling ``field`` from user_data unless the report already has members"""
+        return f"""{field} = CASE
+            WHEN cardinality(r.member_ids) > 0 OR jsonb_typeof(r.user_data) <> 'object' THEN r.{field}
+            ELSE COALESCE((
+                SELECT array_agg({expression} ORDER BY k::bigint)
+                FROM jsonb_object_keys(r.user_data) AS k
+                WHERE k ~ '^[0-9]+$'
+            ), '{{}}')
+        END"""
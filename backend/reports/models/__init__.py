@@ -9,6 +9,7 @@ from .intitationreports import (
     StateMonthlyReport, CountryMonthlyReport,
     CumulativeReport, OverallReport
 )
+from .backfill import BackfillCheckpoint
 
     
 
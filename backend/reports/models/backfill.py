@@ -0,0 +1,39 @@
+from django.db import models
+import uuid
+
+
+class BackfillCheckpoint(models.Model):
+    """One chunk of a report backfill; reruns skip chunks already done"""
+    KIND_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running')
+    rows_written = models.PositiveIntegerField(default=0)
+    duration_seconds = models.FloatField(default=0)
+    error = models.TextField(blank=True, default='')
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'report"."backfill_checkpoint'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'start_date', 'end_date'], name='unique_backfill_chunk')
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'status'])
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.start_date}..{self.end_date} ({self.status})"
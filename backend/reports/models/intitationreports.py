@@ -1,5 +1,6 @@
 from django.db import models
 from django.db.models import JSONField
+from django.contrib.postgres.fields import ArrayField
 from geographies.models.geos import Country, State, District, Subdistrict, Village
 import uuid
 
@@ -8,7 +9,10 @@ class VillageDailyReport(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     village = models.ForeignKey(Village, on_delete=models.CASCADE)
     new_users = models.PositiveIntegerField(default=0)
-    user_data = JSONField()
+    # Sorted IDs of the new users; names are resolved per page (reports/services/report_members.py)
+    member_ids = ArrayField(models.BigIntegerField(), default=list)
+    # Legacy JSON membership, superseded by member_ids (manage.py pack_report_members)
+    user_data = JSONField(null=True, blank=True, default=None)
     date = models.DateField()
     parent_id = models.UUIDField(null=True, blank=True)
 
@@ -23,7 +27,10 @@ class VillageWeeklyReport(models.Model):
     year = models.PositiveSmallIntegerField()
     week_start_date = models.DateField()
     week_last_date = models.DateField()
-    user_data = JSONField()
+    # Sorted IDs of the new users; names are resolved per page (reports/services/report_members.py)
+    member_ids = ArrayField(models.BigIntegerField(), default=list)
+    # Legacy JSON membership, superseded by member_ids (manage.py pack_report_members)
+    user_data = JSONField(null=True, blank=True, default=None)
     parent_id =  models.UUIDField(null=True, blank=True)
 
     class Meta:
@@ -36,7 +43,10 @@ class VillageMonthlyReport(models.Model):
     month = models.PositiveSmallIntegerField()
     year = models.PositiveSmallIntegerField()
     last_date = models.DateField()
-    user_data = JSONField()
+    # Sorted IDs of the new users; names are resolved per page (reports/services/report_members.py)
+    member_ids = ArrayField(models.BigIntegerField(), default=list)
+    # Legacy JSON membership, superseded by member_ids (manage.py pack_report_members)
+    user_data = JSONField(null=True, blank=True, default=None)
     parent_id = models.UUIDField(null=True, blank=True)
 
     class Meta:
@@ -242,5 +252,7 @@ class OverallReport(models.Model):
         db_table = 'report"."overall_report'
         unique_together = ('level', 'geographical_entity')
         indexes = [
-            models.Index(fields=['level', 'geographical_entity'])
+            models.Index(fields=['level', 'geographical_entity']),
+            # Subtree walks of reports/overallreport
+            models.Index(fields=['parent_id'])
         ]
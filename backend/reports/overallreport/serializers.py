@@ -1,12 +1,10 @@
 from rest_framework import serializers
 from ..models.intitationreports import OverallReport
 
-class GeographicalEntitySerializer(serializers.Serializer):
-    id = serializers.IntegerField()
-    name = serializers.CharField()
 
-class OverallReportSerializer(serializers.ModelSerializer):
-    geographical_entity = GeographicalEntitySerializer()
+class OverallReportNodeSerializer(serializers.ModelSerializer):
+    """A report inside a tree loaded by ``overall_tree``; nodes at the depth limit have no ``children`` key"""
+    geographical_entity = serializers.SerializerMethodField()
     children = serializers.SerializerMethodField()
 
     class Meta:
@@ -17,23 +15,31 @@ class OverallReportSerializer(serializers.ModelSerializer):
             'geographical_entity',
             'total_users',
             'last_updated',
-            'data',
-            'last30daysdata',
             'parent_id',
             'children'
         ]
 
+    def get_geographical_entity(self, obj):
+        return {
+            'id': obj.geographical_entity,
+            'name': obj.name
+        }
+
     def get_children(self, obj):
-        children = OverallReport.objects.filter(parent_id=obj.id)
-        return [
-            {
-                'id': child.id,
-                'level': child.level,
-                'geographical_entity': {
-                    'id': child.geographical_entity,
-                    'name': child.name
-                },
-                'total_users': child.total_users
-            }
-            for child in children
-        ]
+        children = getattr(obj, 'tree_children', None)
+        if children is None:
+            return None
+        return OverallReportNodeSerializer(children, many=True).data
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if data['children'] is None:
+            data.pop('children')
+        return data
+
+
+class OverallReportSerializer(OverallReportNodeSerializer):
+    """A root report of the tree, with its user data and last 30 days"""
+
+    class Meta(OverallReportNodeSerializer.Meta):
+        fields = OverallReportNodeSerializer.Meta.fields + ['data', 'last30daysdata']
@@ -1,49 +1,54 @@
 # views.py
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound
-from ..models.intitationreports import OverallReport
-from geographies.models.geos import Country
+from reports.services.overall_tree import overall_tree
 from .serializers import OverallReportSerializer
 
+
 class OverallReportView(APIView):
+    """
+    The overall report of one entity (``level`` + ``entity_id``), or of every
+    country, with its subtree down to ``depth`` levels (default 1, the direct
+    children). Responses carry ETag and Last-Modified and conditional
+    requests get a 304.
+    """
+
     def get(self, request):
         level = request.query_params.get('level', 'country')
         entity_id = request.query_params.get('entity_id')
 
         try:
-            # root: list all countries
-            if level == 'country' and not entity_id:
-                countries = Country.objects.all()
-                reports = []
-                for country in countries:
-                    try:
-                        rep = OverallReport.objects.get(
-                            level='country',
-                            geographical_entity=country.id
-                        )
-                    except OverallReport.DoesNotExist:
-                        continue
-                    rep.geographical_entity = {
-                        'id': country.id,
-                        'name': country.name
-                    }
-                    reports.append(rep)
-                serializer = OverallReportSerializer(reports, many=True)
-                return Response(serializer.data)
-
-            # specific entity
-            if not entity_id:
+            depth = int(request.query_params.get('depth', 1))
+            if not 0 <= depth <= overall_tree.MAX_DEPTH:
+                raise ValueError(f'depth must be between 0 and {overall_tree.MAX_DEPTH}')
+            if entity_id is not None:
+                entity_id = int(entity_id)
+            elif level != 'country':
                 raise ValueError('Missing entity_id for non-country level')
-            report = OverallReport.objects.get(level=level, geographical_entity=entity_id)
-            report.geographical_entity = {
-                'id': report.geographical_entity,
-                'name': report.name
-            }
-            serializer = OverallReportSerializer(report)
-            return Response(serializer.data)
-
-        except OverallReport.DoesNotExist:
-            raise NotFound('Report not found')
         except ValueError as e:
             return Response({'error': str(e)}, status=400)
+
+        node_count, last_modified = overall_tree.validator(depth, level, entity_id)
+        if entity_id is not None and not node_count:
+            raise NotFound('Report not found')
+
+        etag = f'"{overall_tree.etag(level, entity_id, depth, node_count, last_modified)}"'
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            roots = overall_tree.fetch(depth, level, entity_id)
+            # root: list all countries
+            if entity_id is None:
+                response = Response(OverallReportSerializer(roots, many=True).data)
+            else:
+                response = Response(OverallReportSerializer(roots[0]).data)
+
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # Cached copies must be revalidated, which is a cheap 304 while unchanged
+        response['Cache-Control'] = 'private, no-cache'
+        return response
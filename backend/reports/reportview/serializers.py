@@ -50,6 +50,9 @@ class BaseReportSerializer(serializers.ModelSerializer):
         }
 
     def get_children_data(self, obj):
+        # Village reports list their users through ReportMembersView, page by page
+        if not self.Meta.children_field:
+            return {}
         return getattr(obj, self.Meta.children_field, {})
 
     class Meta:
@@ -60,11 +63,11 @@ class BaseReportSerializer(serializers.ModelSerializer):
 class VillageDailyReportSerializer(BaseReportSerializer):
     class Meta:
         model = VillageDailyReport
-        fields = '__all__'
+        exclude = ('member_ids', 'user_data')
         entity_field = 'village'
         entity_type = 'village'
         level = 'village'
-        children_field = 'user_data'
+        children_field = None
 
 
 class VillageWeeklyReportSerializer(BaseReportSerializer):
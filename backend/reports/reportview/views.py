@@ -19,6 +19,21 @@ from .serializers import (
     CountryDailyReportSerializer, CountryWeeklyReportSerializer, CountryMonthlyReportSerializer
 )
 from geographies.models.geos import Country
+from backend.read_cache import cached_view
+from reports.services.report_members import report_members
+
+
+def report_cache_key(request):
+    params = request.query_params
+    return tuple(
+        params.get(name, '')
+        for name in ('type', 'level', 'report_id', 'date', 'week', 'year', 'month', 'entity_id')
+    )
+
+
+def members_cache_key(request):
+    params = request.query_params
+    return ('members',) + tuple(params.get(name, '') for name in ('type', 'report_id', 'page', 'page_size'))
 
 
 class ReportDetailView(APIView):
@@ -70,6 +85,8 @@ class ReportDetailView(APIView):
         }
     }
 
+    # Report generation invalidates the namespace (reports/services/rollup_engine.py)
+    @cached_view('reports', key=lambda request, **kwargs: report_cache_key(request), timeout=60 * 60)
     def get(self, request, *args, **kwargs):
         report_type = request.query_params.get('type', 'daily')
         level = request.query_params.get('level', 'country')
@@ -94,15 +111,18 @@ class ReportDetailView(APIView):
         Fetch report by UUID string.
         Convert `report_id` from string to UUID object before querying.
         """
-        model = self.MODEL_MAPPING[report_type][level]
         try:
             report_uuid = uuid.UUID(report_id)  # ✅ Convert string to UUID
         except ValueError:
             raise NotFound("Invalid report_id format")
-        return model.objects.get(id=report_uuid)
+        return self.get_queryset(report_type, level).get(id=report_uuid)
+
+    def get_queryset(self, report_type, level):
+        # Membership arrays are not serialized; leave them in the database
+        excluded = getattr(self.SERIALIZER_MAPPING[report_type][level].Meta, 'exclude', ())
+        return self.MODEL_MAPPING[report_type][level].objects.defer(*excluded)
 
     def get_report_by_params(self, report_type, level, params):
-        model = self.MODEL_MAPPING[report_type][level]
         filters = {}
 
         # Time filters
@@ -133,4 +153,39 @@ class ReportDetailView(APIView):
             }[level]
             filters[entity_field] = entity_id
 
-        return model.objects.get(**filters)
+        return self.get_queryset(report_type, level).get(**filters)
+
+
+class ReportMembersView(APIView):
+    """
+    Members of a village report, one page at a time:
+    ``?type=daily|weekly|monthly&report_id=<uuid>&page=1&page_size=50``.
+    """
+    MODEL_MAPPING = {
+        report_type: models['village'] for report_type, models in ReportDetailView.MODEL_MAPPING.items()
+    }
+    # Per report type, arrays aligned with member_ids to return with each member
+    ALIGNED_FIELDS = {}
+
+    @cached_view('reports', key=lambda request, **kwargs: members_cache_key(request), timeout=60 * 60)
+    def get(self, request, *args, **kwargs):
+        return self.members_response(request)
+
+    def members_response(self, request):
+        report_type = request.query_params.get('type', 'daily')
+        model = self.MODEL_MAPPING.get(report_type)
+        if model is None:
+            return Response({'error': f"Unknown report type '{report_type}'"}, status=400)
+        try:
+            report_uuid = uuid.UUID(request.query_params.get('report_id', ''))
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', report_members.DEFAULT_PAGE_SIZE))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        members = report_members.page(
+            model, report_uuid, page, page_size, aligned=self.ALIGNED_FIELDS.get(report_type, ())
+        )
+        if members is None:
+            return Response({'error': 'Report not found'}, status=404)
+        return Response(members)
@@ -0,0 +1,256 @@
+import io
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.db import connections
+from django.utils import timezone
+
+from reports.models import BackfillCheckpoint
+from reports.management.commands.generate_daily_reports import Command as DailyCommand
+from reports.management.commands.generate_weekly_reports import Command as WeeklyCommand
+from reports.management.commands.generate_monthly_reports import Command as MonthlyCommand
+
+logger = logging.getLogger(__name__)
+
+
+def plan_periods(kind, start_date, end_date):
+    """
+    Days, weeks (Monday..Sunday) or months of [start_date, end_date] as
+    [(first_day, last_day), ...]. Weeks and months are whole: the first one
+    starts on or before ``start_date`` and the last one ends by ``end_date``.
+    """
+    if kind == 'daily':
+        periods = []
+        day = start_date
+        while day <= end_date:
+            periods.append((day, day))
+            day += timedelta(days=1)
+    elif kind == 'weekly':
+        periods = []
+        week_start = start_date - timedelta(days=start_date.weekday())
+        while week_start + timedelta(days=6) <= end_date:
+            periods.append((week_start, week_start + timedelta(days=6)))
+            week_start += timedelta(weeks=1)
+    elif kind == 'monthly':
+        periods = []
+        month_start = date(start_date.year, start_date.month, 1)
+        while month_start + relativedelta(months=1) - timedelta(days=1) <= end_date:
+            periods.append((month_start, month_start + relativedelta(months=1) - timedelta(days=1)))
+            month_start += relativedelta(months=1)
+    else:
+        raise ValueError(f"Unknown backfill kind: {kind}")
+    return periods
+
+
+def chunk_periods(periods, chunk_size):
+    """Group consecutive periods into chunks of up to ``chunk_size``; a gap starts a new chunk"""
+    chunks = []
+    run = []
+    for period in periods:
+        if run and (len(run) == chunk_size or period[0] != run[-1][1] + timedelta(days=1)):
+            chunks.append((run[0][0], run[-1][1]))
+            run = []
+        run.append(period)
+    if run:
+        chunks.append((run[0][0], run[-1][1]))
+    return chunks
+
+
+def plan_chunks(kind, start_date, end_date, chunk_size):
+    """
+    Split [start_date, end_date] into checkpoint chunks of ``chunk_size``
+    days, weeks or months (see ``plan_periods``).
+    Returns [(first_day, last_day), ...].
+    """
+    return chunk_periods(plan_periods(kind, start_date, end_date), chunk_size)
+
+
+def run_chunk(kind, start_date, end_date):
+    """
+    Generate one chunk of reports and record its checkpoint. Runs in the
+    command's process, a pool worker or a Celery worker alike.
+    Returns {'kind', 'start_date', 'end_date', 'rows', 'seconds'}.
+    """
+    if isinstance(start_date, str):
+        start_date, end_date = date.fromisoformat(start_date), date.fromisoformat(end_date)
+
+    checkpoint, _ = BackfillCheckpoint.objects.update_or_create(
+        kind=kind, start_date=start_date, end_date=end_date,
+        defaults={'status': 'running', 'error': '', 'finished_at': None}
+    )
+    started = time.perf_counter()
+    try:
+        if kind == 'daily':
+            command = DailyCommand(stdout=io.StringIO())
+            command.verbose = False
+            command.batch_size = 1000
+            days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+            written = command.generate_reports_for_days(days)
+        elif kind == 'weekly':
+            command = WeeklyCommand(stdout=io.StringIO())
+            command.batch_size = 1000
+            week_starts = [first for first, _ in plan_periods('weekly', start_date, end_date)]
+            written = command.generate_reports_for_weeks(week_starts)
+        else:
+            command = MonthlyCommand(stdout=io.StringIO())
+            command.batch_size = 1000
+            month_starts = [first for first, _ in plan_periods('monthly', start_date, end_date)]
+            written = command.generate_reports_for_months(month_starts)
+    except Exception as e:
+        BackfillCheckpoint.objects.filter(id=checkpoint.id).update(
+            status='failed', error=str(e), duration_seconds=time.perf_counter() - started,
+            finished_at=timezone.now()
+        )
+        raise
+
+    rows = sum(len(reports) for reports in written.values())
+    seconds = time.perf_counter() - started
+    BackfillCheckpoint.objects.filter(id=checkpoint.id).update(
+        status='done', rows_written=rows, duration_seconds=seconds, finished_at=timezone.now()
+    )
+    return {
+        'kind': kind,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'rows': rows,
+        'seconds': seconds,
+    }
+
+
+def _run_chunk_in_worker(kind, start_date, end_date):
+    # Each pool process opens its own database connection
+    connections.close_all()
+    return run_chunk(kind, start_date, end_date)
+
+
+class BackfillScheduler:
+    """
+    Resumable report backfill.
+
+    The date range is split into chunks (``plan_chunks``). Every chunk
+    records a BackfillCheckpoint. A rerun skips the days, weeks and months
+    that done checkpoints cover, whatever chunk bounds or ``--start-date``
+    they were run with, and retries the rest. Daily chunks run first, on a
+    process pool when ``workers > 1``, and reach back to the start of the
+    first week and month so those are complete. Weekly and monthly chunks
+    run once every day of their periods has a done daily checkpoint, because
+    they are rolled up from the stored daily reports.
+    """
+
+    STAGES = ('daily', 'weekly', 'monthly')
+
+    def __init__(self, chunk_sizes=None, workers=1, restart=False, stdout=None):
+        self.chunk_sizes = {'daily': 31, 'weekly': 13, 'monthly': 12, **(chunk_sizes or {})}
+        self.workers = max(1, workers)
+        self.restart = restart
+        self.stdout = stdout
+
+    def pending_chunks(self, kind, start_date, end_date):
+        """Chunks of the periods in the range that no done checkpoint covers"""
+        periods = plan_periods(kind, start_date, end_date)
+        if periods and not self.restart:
+            done_days = self.done_days(kind, periods[0][0], periods[-1][1])
+            periods = [
+                period for period in periods
+                if not all(day in done_days for day in self.days_between(*period))
+            ]
+        return chunk_periods(periods, self.chunk_sizes[kind])
+
+    def ready_chunks(self, kind, chunks):
+        """The weekly or monthly chunks whose every day has a done daily checkpoint"""
+        if not chunks:
+            return []
+        done_days = self.done_days('daily', chunks[0][0], chunks[-1][1])
+        ready = [chunk for chunk in chunks if all(day in done_days for day in self.days_between(*chunk))]
+        if len(ready) < len(chunks):
+            self.write(f"   ⏸️  {len(chunks) - len(ready)} {kind} chunks wait for daily reports")
+        return ready
+
+    def daily_start(self, start_date, stages=STAGES):
+        """First day the daily stage covers: the start of the first week and month the other stages roll up"""
+        first = start_date
+        if 'weekly' in stages:
+            first = min(first, start_date - timedelta(days=start_date.weekday()))
+        if 'monthly' in stages:
+            first = min(first, start_date.replace(day=1))
+        return first
+
+    def done_days(self, kind, start_date, end_date):
+        """Days in the range covered by done checkpoints of ``kind``"""
+        days = set()
+        for first, last in BackfillCheckpoint.objects.filter(
+            kind=kind, status='done', start_date__lte=end_date, end_date__gte=start_date
+        ).values_list('start_date', 'end_date'):
+            days.update(self.days_between(first, last))
+        return days
+
+    @staticmethod
+    def days_between(first, last):
+        return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+    def run(self, start_date, end_date, stages=STAGES):
+        """Run the stages over the range; returns {stage: {'chunks', 'rows', 'days', 'seconds', 'failed'}}"""
+        summary = {}
+        for kind in stages:
+            if kind == 'daily':
+                chunks = self.pending_chunks(kind, self.daily_start(start_date, stages), end_date)
+            else:
+                chunks = self.ready_chunks(kind, self.pending_chunks(kind, start_date, end_date))
+            summary[kind] = self.run_stage(kind, chunks)
+        return summary
+
+    def run_stage(self, kind, chunks):
+        stats = {'chunks': 0, 'rows': 0, 'days': 0, 'seconds': 0.0, 'failed': 0}
+        if not chunks:
+            self.write(f"⏭️  No pending {kind} chunks")
+            return stats
+
+        self.write(f"\n🚚 {kind.title()}: {len(chunks)} chunks on {self.workers} worker(s)")
+        started = time.perf_counter()
+
+        def record(chunk, result=None, error=None):
+            if error is not None:
+                stats['failed'] += 1
+                self.write(f"   ❌ {chunk[0]} to {chunk[1]} failed: {error}")
+                return
+            stats['chunks'] += 1
+            stats['rows'] += result['rows']
+            stats['days'] += (chunk[1] - chunk[0]).days + 1
+            self.write(
+                f"   ✓ {chunk[0]} to {chunk[1]}: {result['rows']} reports in {result['seconds']:.2f}s"
+            )
+
+        if self.workers == 1:
+            for chunk in chunks:
+                try:
+                    record(chunk, run_chunk(kind, *chunk))
+                except Exception as e:
+                    logger.exception(f"[BACKFILL] {kind} chunk {chunk[0]}..{chunk[1]} failed")
+                    record(chunk, error=e)
+        else:
+            # Children must not share the parent's database connection
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(_run_chunk_in_worker, kind, *chunk): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    try:
+                        record(futures[future], future.result())
+                    except Exception as e:
+                        record(futures[future], error=e)
+
+        stats['seconds'] = time.perf_counter() - started
+        if stats['seconds'] > 0:
+            self.write(
+                f"   📈 {stats['days']} days, {stats['rows']} reports in {stats['seconds']:.2f}s "
+                f"({stats['days'] / stats['seconds']:.2f} days/s, {stats['rows'] / stats['seconds']:.0f} rows/s)"
+            )
+        return stats
+
+    def write(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+        else:
+            logger.info(f"[BACKFILL] {message.strip()}")
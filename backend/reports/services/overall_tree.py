@@ -0,0 +1,93 @@
+import hashlib
+
+from django.db import connection
+
+from reports.models import OverallReport
+
+
+class OverallReportTree:
+    """
+    Loads a subtree of OverallReport (linked through ``parent_id``) down to a
+    given depth with one recursive CTE and links it up in memory, instead of
+    one query per node.
+
+    The roots are either one report (``level`` + ``entity_id``) or every
+    country report. ``validator`` walks the same subtree but only returns
+    its size and newest ``last_updated``; views turn that into an ETag and
+    Last-Modified, so polling clients get a 304 without the tree being
+    loaded or serialized. ``generate_overall_reports`` bumps ``last_updated``
+    on every report it touches, parents included.
+    """
+
+    MAX_DEPTH = 4
+
+    def validator(self, depth, level='country', entity_id=None):
+        """(node_count, newest last_updated) of the subtree"""
+        sql, params = self._subtree_sql(depth, level, entity_id)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql} SELECT count(*), max(last_updated) FROM tree", params)
+            return cursor.fetchone()
+
+    def fetch(self, depth, level='country', entity_id=None):
+        """
+        The root reports, each with ``tree_children`` set on every node above
+        ``depth``. Only the roots load the large ``data`` and
+        ``last30daysdata`` fields.
+        """
+        sql, params = self._subtree_sql(depth, level, entity_id)
+        nodes = list(OverallReport.objects.raw(
+            f"""
+            {sql}
+            SELECT r.id, r.level, r.geographical_entity, r.name, r.total_users, r.last_updated, r.parent_id,
+                   CASE WHEN tree.depth = 0 THEN r.data END AS data,
+                   CASE WHEN tree.depth = 0 THEN r.last30daysdata END AS last30daysdata,
+                   tree.depth AS tree_depth
+            FROM tree
+            JOIN {self._table()} r ON r.id = tree.id
+            ORDER BY tree.depth, r.geographical_entity
+            """,
+            params
+        ))
+
+        by_id = {}
+        roots = []
+        for node in nodes:
+            if node.tree_depth < depth:
+                node.tree_children = []
+            by_id[node.id] = node
+            if node.tree_depth == 0:
+                roots.append(node)
+            else:
+                by_id[node.parent_id].tree_children.append(node)
+        return roots
+
+    @staticmethod
+    def etag(level, entity_id, depth, node_count, last_modified):
+        key = f"{level}:{entity_id}:{depth}:{node_count}:{last_modified.isoformat() if last_modified else ''}"
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def _subtree_sql(self, depth, level, entity_id):
+        if entity_id is None:
+            root_filter = "level = %(level)s"
+        else:
+            root_filter = "level = %(level)s AND geographical_entity = %(entity_id)s"
+        sql = f"""
+            WITH RECURSIVE tree AS (
+                SELECT id, last_updated, 0 AS depth
+                FROM {self._table()}
+                WHERE {root_filter}
+                UNION ALL
+                SELECT child.id, child.last_updated, tree.depth + 1
+                FROM {self._table()} child
+                JOIN tree ON child.parent_id = tree.id
+                WHERE tree.depth < %(depth)s
+            )
+        """
+        return sql, {'level': level, 'entity_id': entity_id, 'depth': depth}
+
+    @staticmethod
+    def _table():
+        return connection.ops.quote_name(OverallReport._meta.db_table)
+
+
+overall_tree = OverallReportTree()
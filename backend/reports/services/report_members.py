@@ -0,0 +1,99 @@
+import logging
+
+from django.db import connection
+
+from users.models.petitioners import Petitioner
+
+logger = logging.getLogger(__name__)
+
+
+class ReportMembers:
+    """
+    Members of village-level reports (the new users of an initiation report,
+    the active users of an activity report).
+
+    Reports store their members as a packed, sorted ``member_ids`` bigint
+    array, with per-member values such as ``member_active_days`` in aligned
+    arrays, instead of a JSON object of every user's id and name. A report
+    row stays a few bytes per member and reading it never decodes user
+    records. ``page`` slices the arrays in SQL and resolves names and
+    demographics for that page only, with one Petitioner query.
+    """
+
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    @staticmethod
+    def pack(user_ids):
+        """Sorted, de-duplicated ``member_ids`` value"""
+        return sorted({int(uid) for uid in user_ids if uid is not None})
+
+    def page(self, model, report_id, page=1, page_size=None, aligned=()):
+        """
+        {'count', 'page', 'page_size', 'has_next', 'results'} of one report,
+        or None if it does not exist. ``aligned`` names array fields kept in
+        step with member_ids; each result carries their values under the
+        field name without the ``member_`` prefix.
+        """
+        page = max(int(page or 1), 1)
+        page_size = min(max(int(page_size or self.DEFAULT_PAGE_SIZE), 1), self.MAX_PAGE_SIZE)
+        # Postgres arrays are 1-based and slices inclusive
+        first = (page - 1) * page_size + 1
+        last = first + page_size - 1
+
+        columns = ', '.join(
+            f"{connection.ops.quote_name(field)}[%(first)s:%(last)s]" for field in ('member_ids', *aligned)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT cardinality(member_ids), {columns}
+                FROM {connection.ops.quote_name(model._meta.db_table)}
+                WHERE id = %(id)s
+                """,
+                {'first': first, 'last': last, 'id': report_id}
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+
+        count, member_ids, *values = row
+        member_ids = member_ids or []
+        return {
+            'count': count or 0,
+            'page': page,
+            'page_size': page_size,
+            'has_next': last < (count or 0),
+            'results': self.resolve(member_ids, {
+                field.removeprefix('member_'): column or [] for field, column in zip(aligned, values)
+            }),
+        }
+
+    def resolve(self, member_ids, aligned=None):
+        """[{'id', 'name', 'gender', 'age', **aligned values}] in member_ids order"""
+        users = {
+            user['id']: user
+            for user in Petitioner.objects.filter(id__in=member_ids).values(
+                'id', 'first_name', 'last_name', 'gender', 'age'
+            )
+        }
+        gender_labels = dict(Petitioner._meta.get_field('gender').choices)
+        results = []
+        for index, user_id in enumerate(member_ids):
+            user = users.get(user_id)
+            if user is None:
+                # Deleted since the report was written; the count still includes them
+                continue
+            member = {
+                'id': str(user_id),
+                'name': f"{user['first_name']} {user['last_name']}",
+                'gender': gender_labels.get(user['gender'], user['gender']),
+                'age': user['age'],
+            }
+            for name, column in (aligned or {}).items():
+                member[name] = column[index] if index < len(column) else None
+            results.append(member)
+        return results
+
+
+report_members = ReportMembers()
@@ -0,0 +1,185 @@
+import json
+from collections import defaultdict
+
+from django.db import connection
+
+from reports.models import CumulativeReport
+
+
+class ReportWriter:
+    """
+    Collects one level of geographic reports and writes them in bulk.
+
+    Rows are keyed by their geographic entity (``key_field``, e.g.
+    ``village_id``) within a ``scope`` shared by the whole level (e.g.
+    ``{'date': report_date}``). ``save`` looks up the existing reports of the
+    scope with one query, then issues ``bulk_create`` for new rows and
+    ``bulk_update`` for existing ones, so report IDs referenced by parent
+    reports stay stable across regenerations. The report tables have no
+    unique constraint on (scope, entity), which is why this is a lookup plus
+    two bulk statements rather than ``bulk_create(update_conflicts=True)``.
+
+    ``key_field`` may also be a tuple of fields (e.g. ``('date', 'village_id')``)
+    to write many periods at once; keys are then tuples in the same order.
+    """
+
+    def __init__(self, model, key_field, scope, batch_size=1000):
+        self.model = model
+        self.key_field = key_field
+        self.key_fields = key_field if isinstance(key_field, tuple) else (key_field,)
+        self.scope = scope
+        self.batch_size = batch_size
+        self.rows = {}
+        self.created = 0
+        self.updated = 0
+
+    def add(self, key, **values):
+        self.rows[key] = values
+
+    def __len__(self):
+        return len(self.rows)
+
+    def save(self):
+        """Write every collected row; returns {key: report} with IDs set"""
+        if not self.rows:
+            return {}
+
+        lookups = {
+            f"{field}__in": sorted({self._key_values(key)[index] for key in self.rows})
+            for index, field in enumerate(self.key_fields)
+        }
+        # With composite keys the lookup is a superset, rows are matched exactly below
+        existing = {
+            self._report_key(report): report
+            for report in self.model.objects.filter(**self.scope, **lookups)
+        }
+
+        to_create, to_update = [], []
+        update_fields = set()
+        reports = {}
+        for key, values in self.rows.items():
+            report = existing.get(key)
+            if report is None:
+                report = self.model(**self.scope, **dict(zip(self.key_fields, self._key_values(key))), **values)
+                to_create.append(report)
+            else:
+                for field, value in values.items():
+                    setattr(report, field, value)
+                update_fields.update(values)
+                to_update.append(report)
+            reports[key] = report
+
+        if to_create:
+            self.model.objects.bulk_create(to_create, batch_size=self.batch_size)
+        if to_update and update_fields:
+            self.model.objects.bulk_update(to_update, sorted(update_fields), batch_size=self.batch_size)
+
+        self.created += len(to_create)
+        self.updated += len(to_update)
+        self.rows = {}
+        return reports
+
+    def _key_values(self, key):
+        return key if isinstance(self.key_field, tuple) else (key,)
+
+    def _report_key(self, report):
+        values = tuple(getattr(report, field) for field in self.key_fields)
+        return values if isinstance(self.key_field, tuple) else values[0]
+
+
+def link_parents(model, child_reports, parent_reports, parent_of, field='parent_id'):
+    """
+    Point each child report at its parent's report with one UPDATE.
+
+    ``child_reports`` and ``parent_reports`` map entity IDs to reports and
+    ``parent_of`` maps a child entity ID to its parent entity ID. Returns the
+    number of reports linked.
+    """
+    child_ids, parent_ids = [], []
+    for child_key, child_report in child_reports.items():
+        parent_report = parent_reports.get(parent_of.get(child_key))
+        if parent_report is None:
+            continue
+        setattr(child_report, field, parent_report.id)
+        child_ids.append(child_report.id)
+        parent_ids.append(parent_report.id)
+
+    if not child_ids:
+        return 0
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} AS t
+            SET {column} = d.parent_id
+            FROM unnest(%s::uuid[], %s::uuid[]) AS d(id, parent_id)
+            WHERE t.id = d.id
+            """,
+            [child_ids, parent_ids]
+        )
+    return len(child_ids)
+
+
+def parent_map(geo_model, parent_field, ids):
+    """{entity_id: parent_entity_id} for the given geographic entities, one query"""
+    if not ids:
+        return {}
+    return dict(geo_model.objects.filter(id__in=ids).values_list('id', parent_field))
+
+
+def children_by_parent(geo_model, parent_field, parent_ids):
+    """{parent_id: [(child_id, child_name), ...]} for every child of the given parents, one query"""
+    children = defaultdict(list)
+    if not parent_ids:
+        return children
+    rows = geo_model.objects.filter(
+        **{f"{parent_field}__in": parent_ids}
+    ).order_by('id').values_list(parent_field, 'id', 'name')
+    for parent_id, child_id, name in rows:
+        children[parent_id].append((child_id, name))
+    return children
+
+
+def add_to_cumulative(level, entity_counts, entity_user_data=None):
+    """
+    Add ``entity_counts`` ({entity_id: new_users}) to the CumulativeReport
+    rows of ``level`` with one ``INSERT ... ON CONFLICT``. CumulativeReport is
+    unique on (level, geographical_entity), so existing rows are incremented
+    in place; ``entity_user_data`` ({entity_id: {user_id: name}}) is merged
+    into their user_data.
+    """
+    if not entity_counts:
+        return 0
+    entity_user_data = entity_user_data or {}
+    entities = list(entity_counts)
+    user_data = [
+        json.dumps(entity_user_data[entity]) if entity in entity_user_data else None
+        for entity in entities
+    ]
+
+    table = connection.ops.quote_name(CumulativeReport._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} AS r (id, level, geographical_entity, total_users, last_updated, user_data)
+            SELECT gen_random_uuid(), %(level)s, d.entity, d.amount, now(), d.user_data
+            FROM unnest(%(entities)s::bigint[], %(amounts)s::int[], %(user_data)s::jsonb[])
+                AS d(entity, amount, user_data)
+            ON CONFLICT (level, geographical_entity) DO UPDATE
+            SET total_users = r.total_users + EXCLUDED.total_users,
+                last_updated = EXCLUDED.last_updated,
+                user_data = CASE
+                    WHEN EXCLUDED.user_data IS NULL THEN r.user_data
+                    ELSE COALESCE(r.user_data, '{{}}'::jsonb) || EXCLUDED.user_data
+                END
+            """,
+            {
+                'level': level,
+                'entities': entities,
+                'amounts': [entity_counts[entity] for entity in entities],
+                'user_data': user_data,
+            }
+        )
+    return len(entities)
@@ -0,0 +1,242 @@
+import time
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from geographies.models.geos import Village, Subdistrict, District, State, Country
+from reports.models import VillageDailyReport
+from reports.services.report_writer import ReportWriter, link_parents, children_by_parent
+from backend.read_cache import read_cache
+from users.models.petitioners import Petitioner
+
+
+# (level, geography model, entity column on the report, field listing the children:
+# JSON summaries of the child reports, or the packed user IDs at village level)
+LEVELS = (
+    ('country', Country, 'country_id', 'state_data'),
+    ('state', State, 'state_id', 'district_data'),
+    ('district', District, 'district_id', 'subdistrict_data'),
+    ('subdistrict', Subdistrict, 'subdistrict_id', 'village_data'),
+    ('village', Village, 'village_id', 'member_ids'),
+)
+LEVEL_NAMES = tuple(level for level, *_ in LEVELS)
+
+# GROUPING() bitmask of the ROLLUP columns (country .. village) -> level of the row
+_GROUPING_LEVELS = {0: 'village', 1: 'subdistrict', 3: 'district', 7: 'state', 15: 'country'}
+
+_GEOGRAPHY_JOINS = """
+    JOIN {village} v ON v.id = {village_column}
+    JOIN {subdistrict} s ON s.id = v.subdistrict_id
+    JOIN {district} d ON d.id = s.district_id
+    JOIN {state} st ON st.id = d.state_id
+"""
+_ROLLUP_COLUMNS = "st.country_id, d.state_id, s.district_id, v.subdistrict_id, v.id"
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _geography_joins(village_column):
+    return _GEOGRAPHY_JOINS.format(
+        village=_table(Village), subdistrict=_table(Subdistrict),
+        district=_table(District), state=_table(State), village_column=village_column
+    )
+
+
+class Rollup:
+    """New-user counts of one period at every level, plus the hierarchy seen in it"""
+
+    def __init__(self):
+        # {level: {entity_id: new_users}}
+        self.counts = {level: {} for level in LEVEL_NAMES}
+        # {level: {entity_id: parent_entity_id}}
+        self.parent_of = {level: {} for level in LEVEL_NAMES[1:]}
+
+    def add_row(self, level, ids, new_users):
+        depth = LEVEL_NAMES.index(level)
+        self.counts[level][ids[depth]] = new_users
+        if depth:
+            self.parent_of[level][ids[depth]] = ids[depth - 1]
+
+
+class InitiationRollup:
+    """
+    Computes initiation (new user) counts for all five geographic levels with
+    one ``GROUP BY period, ROLLUP(country, state, district, subdistrict,
+    village)`` query per date range, instead of aggregating each level in
+    Python from the level below.
+
+    ``daily`` counts petitioners by the local day they joined. ``periods``
+    sums the stored village daily reports into weeks or months, so weekly and
+    monthly reports never rescan ``Petitioner``.
+    """
+
+    def daily(self, start_date, end_date):
+        """{day: Rollup} for every day in [start_date, end_date] with new users"""
+        tz = timezone.get_current_timezone()
+        # Days are local days, matching date_joined__date
+        sql = f"""
+            SELECT (p.date_joined AT TIME ZONE %(tz)s)::date AS period,
+                   {_ROLLUP_COLUMNS},
+                   GROUPING({_ROLLUP_COLUMNS}) AS grouping_id,
+                   count(*) AS new_users
+            FROM {_table(Petitioner)} p
+            {_geography_joins('p.village_id')}
+            WHERE p.date_joined >= %(start)s AND p.date_joined < %(end)s
+            GROUP BY period, ROLLUP ({_ROLLUP_COLUMNS})
+        """
+        return self._run(sql, {
+            'tz': timezone.get_current_timezone_name(),
+            'start': timezone.make_aware(datetime.combine(start_date, dt_time.min), tz),
+            'end': timezone.make_aware(datetime.combine(end_date + timedelta(days=1), dt_time.min), tz),
+        })
+
+    def periods(self, periods):
+        """
+        {period_key: Rollup} summed from VillageDailyReport, where ``periods``
+        is a list of (period_key, first_day, last_day) and period_key is a date
+        """
+        if not periods:
+            return {}
+        sql = f"""
+            SELECT per.period_key AS period,
+                   {_ROLLUP_COLUMNS},
+                   GROUPING({_ROLLUP_COLUMNS}) AS grouping_id,
+                   sum(r.new_users) AS new_users
+            FROM unnest(%(keys)s::date[], %(starts)s::date[], %(ends)s::date[])
+                AS per(period_key, first_day, last_day)
+            JOIN {_table(VillageDailyReport)} r
+                ON r.date BETWEEN per.first_day AND per.last_day
+            {_geography_joins('r.village_id')}
+            GROUP BY per.period_key, ROLLUP ({_ROLLUP_COLUMNS})
+            HAVING sum(r.new_users) > 0
+        """
+        keys, starts, ends = zip(*periods)
+        return self._run(sql, {'keys': list(keys), 'starts': list(starts), 'ends': list(ends)})
+
+    def period_members(self, periods):
+        """
+        {(period_key, village_id): member_ids}, the union of the village
+        daily reports' members in each period, for the same ``periods`` as
+        ``periods()``
+        """
+        if not periods:
+            return {}
+        sql = f"""
+            SELECT per.period_key, r.village_id, array_agg(DISTINCT m.user_id ORDER BY m.user_id)
+            FROM unnest(%(keys)s::date[], %(starts)s::date[], %(ends)s::date[])
+                AS per(period_key, first_day, last_day)
+            JOIN {_table(VillageDailyReport)} r
+                ON r.date BETWEEN per.first_day AND per.last_day
+            CROSS JOIN LATERAL unnest(r.member_ids) AS m(user_id)
+            GROUP BY per.period_key, r.village_id
+        """
+        keys, starts, ends = zip(*periods)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'keys': list(keys), 'starts': list(starts), 'ends': list(ends)})
+            return {(period_key, village_id): members for period_key, village_id, members in cursor.fetchall()}
+
+    def _run(self, sql, params):
+        rollups = defaultdict(Rollup)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            for period, *ids, grouping_id, new_users in cursor.fetchall():
+                level = _GROUPING_LEVELS.get(grouping_id)
+                # The per-period grand total has no level
+                if level is not None:
+                    rollups[period].add_row(level, ids, int(new_users))
+        return dict(rollups)
+
+
+def write_rollup_reports(rollups, report_models, period_field, period_values, village_members,
+                         batch_size=1000, stdout=None):
+    """
+    Write the reports of every level and period in ``rollups`` with one bulk
+    writer per level, then link each level to its parents in one UPDATE.
+
+    ``report_models`` maps level -> report model, ``period_field`` is the
+    report column identifying the period (``date``, ``week_last_date``,
+    ``last_date``) and ``period_values`` lists every period being written
+    with its other columns ({period_key: {field: value}}), including periods
+    without new users. ``village_members`` maps
+    (period_key, village_id) -> member_ids. Parent reports list all of their
+    children, zeros included. Reports of these periods for entities that no
+    longer have new users are deleted. Returns {level: {(period_key,
+    entity_id): report}}.
+    """
+    written = {}
+    periods = sorted(period_values)
+    rollups = {period: rollups.get(period) or Rollup() for period in periods}
+    for depth in range(len(LEVELS) - 1, -1, -1):
+        level, geo_model, entity_field, data_field = LEVELS[depth]
+        model = report_models[level]
+        started = time.time()
+
+        children = {}
+        if level != 'village':
+            child_level, child_model = LEVELS[depth + 1][:2]
+            parent_ids = sorted({pid for rollup in rollups.values() for pid in rollup.counts[level]})
+            children = children_by_parent(child_model, f"{level}_id", parent_ids)
+            child_reports = written[child_level]
+
+        writer = ReportWriter(model, (period_field, entity_field), {}, batch_size=batch_size)
+        for period in periods:
+            for entity_id, new_users in rollups[period].counts[level].items():
+                if level == 'village':
+                    data = village_members.get((period, entity_id), [])
+                else:
+                    data = {}
+                    for child_id, child_name in children.get(entity_id, []):
+                        child_report = child_reports.get((period, child_id))
+                        data[str(child_id)] = {
+                            "id": str(child_id),
+                            "name": child_name,
+                            "new_users": rollups[period].counts[child_level].get(child_id, 0),
+                            "report_id": str(child_report.id) if child_report else None
+                        }
+                writer.add((period, entity_id), new_users=new_users, **{data_field: data}, **period_values[period])
+        reports = writer.save()
+        written[level] = reports
+
+        linked = 0
+        if level != 'village':
+            parent_of = {
+                (period, child_id): (period, parent_id)
+                for period in periods
+                for child_id, parent_id in rollups[period].parent_of[child_level].items()
+            }
+            linked = link_parents(report_models[child_level], child_reports, reports, parent_of)
+
+        stale = _delete_stale(model, period_field, periods, [report.id for report in reports.values()])
+
+        if stdout is not None:
+            stdout.write(
+                f"   💾 {level.title()}: {writer.created} created, {writer.updated} updated, "
+                f"{stale} stale deleted, {linked} children linked in {time.time() - started:.2f}s"
+            )
+    # Cached report views (reports/reportview) may hold the old rows
+    read_cache.invalidate_on_commit('reports')
+    return written
+
+
+def _delete_stale(model, period_field, periods, keep_ids):
+    """Delete reports of ``periods`` not in ``keep_ids``; returns how many"""
+    if not periods:
+        return 0
+    column = connection.ops.quote_name(model._meta.get_field(period_field).column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            DELETE FROM {_table(model)}
+            WHERE {column} = ANY(%s::date[])
+              AND id NOT IN (SELECT unnest(%s::uuid[]))
+            """,
+            [periods, keep_ids]
+        )
+        return cursor.rowcount
+
+
+rollup_engine = InitiationRollup()
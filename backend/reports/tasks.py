@@ -1,11 +1,12 @@
 import logging
-from celery import shared_task
+from celery import shared_task, chord, group
 from django.utils import timezone
 from datetime import date, timedelta
 from django.core.management import call_command
 from celery.exceptions import MaxRetriesExceededError
 from reports.models import CountryDailyReport, CountryMonthlyReport, CountryWeeklyReport
 from dateutil.relativedelta import relativedelta
+from reports.services.backfill import BackfillScheduler, run_chunk
 
 logger = logging.getLogger(__name__)
 
@@ -104,3 +105,66 @@ def generate_monthly_report(self):
             logger.critical("Max retries exceeded for monthly report generation")
         return False
     
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=60)
+def backfill_report_chunk(self, kind, start_date, end_date):
+    """One checkpointed backfill chunk (see reports.services.backfill)"""
+    try:
+        return run_chunk(kind, start_date, end_date)
+    except Exception as e:
+        logger.error(f"Backfill {kind} chunk {start_date}..{end_date} failed: {str(e)}", exc_info=True)
+        raise self.retry(exc=e)
+
+
+@shared_task
+def backfill_dependent_reports(daily_results, start_date, end_date, chunk_sizes=None, restart=False,
+                               skip_cumulative=False):
+    """
+    Chord callback: runs once every daily chunk has finished and fans out the
+    weekly and monthly chunks whose days are all backfilled, then rebuilds
+    the cumulative reports once they have finished too.
+    """
+    scheduler = BackfillScheduler(chunk_sizes=chunk_sizes, restart=restart)
+    tasks = []
+    for kind in ('weekly', 'monthly'):
+        pending = scheduler.pending_chunks(kind, date.fromisoformat(start_date), date.fromisoformat(end_date))
+        for first, last in scheduler.ready_chunks(kind, pending):
+            tasks.append(backfill_report_chunk.s(kind, first.isoformat(), last.isoformat()))
+    logger.info(
+        f"Daily backfill finished ({sum(r['rows'] for r in daily_results)} reports), "
+        f"queueing {len(tasks)} weekly/monthly chunks"
+    )
+    if skip_cumulative:
+        if tasks:
+            group(tasks).apply_async()
+    elif tasks:
+        chord(tasks)(backfill_cumulative_reports.si(start_date, end_date))
+    else:
+        backfill_cumulative_reports.delay(start_date, end_date)
+    return len(tasks)
+
+
+@shared_task
+def backfill_cumulative_reports(start_date, end_date):
+    """Rebuild the cumulative reports over a finished backfill, as the inline backfill does"""
+    call_command('generate_cumulative_reports', start_date=start_date, end_date=end_date, clean=True)
+    logger.info(f"Backfill cumulative reports updated from {start_date} to {end_date}")
+
+
+def queue_backfill(start_date, end_date, chunk_sizes=None, restart=False, skip_cumulative=False):
+    """
+    Queue a backfill as a Celery chord: daily chunks in parallel, then weekly
+    and monthly, then the cumulative reports
+    """
+    scheduler = BackfillScheduler(chunk_sizes=chunk_sizes, restart=restart)
+    daily = [
+        backfill_report_chunk.s('daily', first.isoformat(), last.isoformat())
+        for first, last in scheduler.pending_chunks('daily', scheduler.daily_start(start_date), end_date)
+    ]
+    callback = backfill_dependent_reports.s(
+        start_date.isoformat(), end_date.isoformat(), chunk_sizes, restart, skip_cumulative
+    )
+    if not daily:
+        return callback.delay([])
+    return chord(daily)(callback)
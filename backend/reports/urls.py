@@ -29,7 +29,7 @@
 # reports/manulreports/urls.py
 from django.urls import path
 from .reportslist.views import CountryReportListView, LatestCountryReportsView
-from .reportview.views import ReportDetailView
+from .reportview.views import ReportDetailView, ReportMembersView
 from .overallreport.views import OverallReportView
 from .manulreports.views import (
     YesterdayReportStatusView,
@@ -40,6 +40,7 @@ urlpatterns = [
     path('reports/list/', CountryReportListView.as_view(), name='reports-list'),
     path('reports/latest/', LatestCountryReportsView.as_view(), name='latest-reports'),
     path('reports/view/', ReportDetailView.as_view(), name='report-detail'),
+    path('reports/view/members/', ReportMembersView.as_view(), name='report-members'),
     path('overall-report/', OverallReportView.as_view(), name='overall-report'),
 
     # Simple report generation endpoints
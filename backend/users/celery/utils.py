@@ -4,14 +4,14 @@ from django.contrib.auth.hashers import make_password
 from datetime import datetime, timedelta
 from django.utils import timezone
 from users.models import Petitioner
+from geographies.services.population import population_counter
 
 fake = Faker('en_IN')
 
 def create_live_user(villages, existing_users):
     """Create single user with realistic live data"""
     village = random.choice(villages)
-    village.online_population += 1
-    village.save(update_fields=['online_population'])
+    village.online_population = population_counter.allocate_village_number(village.id)
     
     # Generate unique ID
     village_id_str = str(village.id)[-9:].zfill(9)
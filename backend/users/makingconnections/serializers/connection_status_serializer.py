@@ -32,7 +32,7 @@ class ConnectionStatusSerializer(serializers.ModelSerializer):
         Returns connection-specific data including applicant details and status.
         """
         petitioner = obj.connection
-        profile_picture = PetitionerSerializer().get_profile_picture(petitioner) if petitioner else None
+        profile_picture = PetitionerSerializer(context=self.context).get_profile_picture(petitioner) if petitioner else None
         return {
 
             "connection_id": obj.id,
@@ -21,9 +21,14 @@ class PetitionerSerializer(serializers.ModelSerializer):
         """
         Fetches profile_picture from UserTree using the petitioner's ID.
         Assumes that UserTree has an entry with the same ID as the Petitioner.
+        Batch callers pass the UserTrees as ``context['user_trees']`` ({id: UserTree}).
         """
         base_url = "http://localhost:8000/"
-        user_tree = UserTree.objects.filter(id=obj.id).first()
+        user_trees = self.context.get('user_trees')
+        if user_trees is not None:
+            user_tree = user_trees.get(obj.id)
+        else:
+            user_tree = UserTree.objects.filter(id=obj.id).first()
 
         if user_tree and user_tree.profilepic and hasattr(user_tree.profilepic, 'url'):
             return f"{base_url}{user_tree.profilepic.url.lstrip('/')}"
@@ -0,0 +1,109 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+
+from users.models import UserTree
+from users.services.tree_maintenance import tree_engine
+from users.management.commands.seed_network import Command as SeedNetworkCommand
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks UserTree insert maintenance (childcount, influence, depth) against a synthetic tree '
+            'built with "seed_network --synthetic-tree N"')
+
+    INSERT_ID_BASE = SeedNetworkCommand.SYNTHETIC_TREE_BASE + SeedNetworkCommand.SYNTHETIC_TREE_SPAN // 2
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inserts', type=int, default=200, help='Nodes to insert per scenario')
+        parser.add_argument('--skip-legacy', action='store_true', help='Only measure the tree engine')
+
+    def handle(self, *args, **options):
+        base = SeedNetworkCommand.SYNTHETIC_TREE_BASE
+        synthetic = UserTree.objects.filter(id__gte=base, id__lt=self.INSERT_ID_BASE)
+        node_count = synthetic.count()
+        if not node_count:
+            self.stdout.write(self.style.ERROR(
+                "No synthetic tree found, build one with: manage.py seed_network --synthetic-tree 1000000"
+            ))
+            return
+
+        deepest = synthetic.order_by('-height').values_list('id', 'height').first()
+        self.stdout.write(f"Synthetic tree: {node_count} nodes, deepest node {deepest[0]} at height {deepest[1]}")
+
+        scenarios = [('engine', self.engine_insert)]
+        if not options['skip_legacy']:
+            scenarios.append(('legacy', self.legacy_insert))
+
+        for label, insert in scenarios:
+            for placement in ('deep', 'random'):
+                # Every scenario runs on the same tree and is rolled back
+                with transaction.atomic():
+                    stats = self.run(insert, placement, deepest[0], base, node_count, options['inserts'])
+                    transaction.set_rollback(True)
+                self.stdout.write(
+                    f"{label:<7} {placement:<7} queries/insert: {stats['queries']:.1f}  "
+                    f"time/insert: {stats['avg_ms']:.2f} ms (max {stats['max_ms']:.2f} ms)"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, inserted nodes rolled back"))
+
+    def run(self, insert, placement, deepest_id, base, node_count, inserts):
+        timings = []
+        queries = 0
+        parent_id = deepest_id
+        for index in range(inserts):
+            if placement == 'random':
+                parent_id = base + random.randrange(node_count)
+            parent = UserTree.objects.get(id=parent_id)
+            node = UserTree(
+                id=self.INSERT_ID_BASE + index,
+                normal_id=self.INSERT_ID_BASE + index,
+                name=f"Benchmark {index}",
+                profilepic='',
+                parentid=parent,
+                height=(parent.height or 0) + 1,
+                depth=0
+            )
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                UserTree.objects.bulk_create([node])
+                insert(node)
+                timings.append(time.perf_counter() - started)
+            queries += len(ctx.captured_queries)
+            if placement == 'deep':
+                # Keep growing the deepest chain
+                parent_id = node.id
+
+        return {
+            'queries': queries / inserts,
+            'avg_ms': sum(timings) / inserts * 1000,
+            'max_ms': max(timings) * 1000,
+        }
+
+    def engine_insert(self, node):
+        tree_engine.apply_insert(node, create_milestones=False)
+
+    def legacy_insert(self, node):
+        """The per-ancestor maintenance UserTree.save() used before the tree engine"""
+        parent = node.parentid
+        parent.childcount += 1
+        parent.save(update_fields=['childcount'])
+        if parent.parentid:
+            grandparent = parent.parentid
+            grandparent.influence += 1
+            grandparent.save(update_fields=['influence'])
+
+        current = parent
+        while current is not None:
+            max_child_depth = UserTree.objects.filter(parentid=current).aggregate(max_depth=Max('depth'))['max_depth'] or -1
+            new_depth = max_child_depth + 1
+            if new_depth > current.depth:
+                current.depth = new_depth
+                current.save(update_fields=['depth'])
+                current = current.parentid
+            else:
+                break
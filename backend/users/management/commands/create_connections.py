@@ -3,6 +3,7 @@ from collections import defaultdict
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from users.models import Petitioner, UserTree, Circle
+from users.services.audience_index import audience_index
 import logging
 
 logger = logging.getLogger(__name__)
@@ -142,6 +143,9 @@ class Command(BaseCommand):
         # Bulk create all entries
         Circle.objects.bulk_create(circle_entries)
 
+        # bulk_create skips the Circle signals, so drop cached circle sets
+        audience_index.invalidate_all()
+
 
 # # Create connections (5-15 per user)
 # python manage.py create_connections
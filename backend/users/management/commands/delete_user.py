@@ -4,7 +4,7 @@ from django.db import transaction
 from django.db.models import Q
 from users.models import UserTree, Petitioner, Milestone, Circle
 from chat.models import Conversation, Message
-from activity_reports.models import UserMonthlyActivity, DailyActivitySummary
+from activity_reports.models import UserMonthlyActivity, DailyActivitySummary, DailyUserActivity
 import logging
 
 logger = logging.getLogger(__name__)
@@ -53,6 +53,7 @@ class Command(BaseCommand):
                 for summary in daily_summaries:
                     summary.active_users.remove(user_id)
                     summary.save()
+                DailyUserActivity.objects.filter(user_id=user_id).delete()
                 self.stdout.write("Removed user from daily activity summaries")
                 
                 # 7. Handle UserTree relationships
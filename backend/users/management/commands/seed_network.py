@@ -4,26 +4,39 @@ import logging
 from io import BytesIO
 from datetime import date
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connection, transaction
 from django.contrib.auth.hashers import make_password
 from django.core.files import File
 from faker import Faker
 from geographies.models.geos import Country, State, District, Subdistrict, Village
 from users.models import Petitioner, UserTree
 from event.models.groups import Group
+from users.services.tree_maintenance import tree_engine
 
 logger = logging.getLogger(__name__)
 fake = Faker('en_IN')
 
 class Command(BaseCommand):
     help = 'Populates database with hierarchical user network including groups and initiations'
+
+    # Synthetic tree nodes live far above real 14-digit village IDs
+    SYNTHETIC_TREE_BASE = 98_000_000_000_000
+    SYNTHETIC_TREE_SPAN = 1_000_000_000_000
     
     def add_arguments(self, parser):
         parser.add_argument('--users', type=int, default=100, help='Number of users to create')
         parser.add_argument('--groups', type=int, default=10, help='Number of groups to create')
         parser.add_argument('--flush', action='store_true', help='Delete existing data first')
+        parser.add_argument('--synthetic-tree', type=int, default=0,
+                            help='Bulk-build a synthetic UserTree of this many nodes (no petitioners, pictures or circles)')
+        parser.add_argument('--chain-length', type=int, default=1000,
+                            help='Length of the single deep chain at the top of the synthetic tree')
     
     def handle(self, *args, **options):
+        if options['synthetic_tree']:
+            self.seed_synthetic_tree(options['synthetic_tree'], options['chain_length'], options['flush'])
+            return
+
         user_count = options['users']
         group_count = options['groups']
         flush = options['flush']
@@ -90,6 +103,56 @@ class Command(BaseCommand):
             f"Successfully created network with {len(all_users)} users and {len(groups)} groups"
         ))
     
+    def seed_synthetic_tree(self, node_count, chain_length, flush):
+        """
+        Build a synthetic tree for benchmarks: a chain of ``chain_length``
+        nodes (deep ancestor walks) and the rest attached to uniformly random
+        earlier nodes. Inserted through the tree engine's bulk mode.
+        """
+        base = self.SYNTHETIC_TREE_BASE
+        synthetic = UserTree.objects.filter(id__gte=base, id__lt=base + self.SYNTHETIC_TREE_SPAN)
+        if synthetic.exists():
+            if not flush:
+                self.stdout.write(self.style.ERROR("Synthetic tree already exists, pass --flush to rebuild it"))
+                return
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "DELETE FROM userschema.usertree WHERE id >= %s AND id < %s",
+                    [base, base + self.SYNTHETIC_TREE_SPAN]
+                )
+            self.stdout.write("Removed existing synthetic tree")
+
+        chain_length = max(1, min(chain_length, node_count))
+        nodes = []
+        for index in range(node_count):
+            if index == 0:
+                parent_id = None
+            elif index < chain_length:
+                parent_id = base + index - 1
+            else:
+                parent_id = base + random.randrange(index)
+            nodes.append(UserTree(
+                id=base + index,
+                normal_id=base + index,
+                name=f"Synthetic {index}",
+                profilepic='',
+                parentid_id=parent_id,
+                event_choice='no_event'
+            ))
+
+        batch_size = 10000
+        for start in range(0, node_count, batch_size):
+            tree_engine.bulk_insert(
+                nodes[start:start + batch_size],
+                create_circles=False,
+                create_milestones=False
+            )
+            self.stdout.write(f"Inserted {min(start + batch_size, node_count)}/{node_count} synthetic nodes")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Synthetic tree ready: root {base}, {node_count} nodes, chain of {chain_length}"
+        ))
+
     def ensure_geography(self):
         """Ensure geography hierarchy exists"""
         country, created = Country.objects.get_or_create(
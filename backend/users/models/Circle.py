@@ -46,3 +46,7 @@ class Circle(models.Model):
 
     class Meta:
         db_table = 'userschema"."circle'  # Schema-aware table name
+        indexes = [
+            models.Index(fields=['userid', 'otherperson']),
+            models.Index(fields=['otherperson']),
+        ]
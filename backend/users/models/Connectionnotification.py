@@ -53,7 +53,8 @@ class ConnectionNotification(models.Model):
         super().save(*args, **kwargs)
         
         if is_new:
-            if self.connection.is_online:
+            from ..services.presence import presence
+            if presence.is_online(self.connection_id):
                 self.process_notification()
                 from ..makingconnections.services.send_status_to_applicant import send_status_to_applicant
                 send_status_to_applicant(self)
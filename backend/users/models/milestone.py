@@ -55,9 +55,10 @@ class Milestone(models.Model):
         
         if is_new:
             from .petitioners import Petitioner
+            from ..services.presence import presence
             try:
                 user = Petitioner.objects.get(id=self.user_id)
-                if user.is_online:
+                if presence.is_online(user.id):
                     # User is online, send immediately via WebSocket
                     self.send_milestone_notification()
                     logger.info(f"Milestone notification sent for {self.title} to user {self.user_id}")
@@ -67,6 +68,28 @@ class Milestone(models.Model):
             except Petitioner.DoesNotExist:
                 logger.error(f"User {self.user_id} not found when saving milestone {self.id}")
 
+    def notification(self):
+        """WebSocket notification payload of the milestone, WITHOUT the completed field"""
+        return {
+            "notification_type": "Milestone_Notification",
+            "notification_message": f"Achievement unlocked: {self.title} for {self.type}",
+            "notification_data": {
+                "milestone_id": str(self.id),
+                "user_id": self.user_id,
+                "title": self.title,
+                "text": self.text,
+                'delivered': self.delivered,  # Send delivered status
+                "created_at": self.created_at.isoformat(),
+                "photo_id": self.photo_id,
+                "photo_url": self.photo_url,
+                "type": self.type,
+                # DO NOT INCLUDE completed field
+            },
+            "notification_number": str(self.id),
+            "notification_freshness": True,
+            "created_at": self.created_at.isoformat(),
+        }
+
     def send_milestone_notification(self):
         """Send milestone notification via WebSocket when user is online."""
         try:
@@ -80,28 +103,7 @@ class Milestone(models.Model):
             channel_layer = get_channel_layer()
             group_name = f"notifications_{self.user_id}"
             
-            # Send notification WITHOUT completed field
-            notification_data = {
-                "notification": {
-                    "notification_type": "Milestone_Notification",
-                    "notification_message": f"Achievement unlocked: {self.title} for {self.type}",
-                    "notification_data": {
-                        "milestone_id": str(self.id),
-                        "user_id": self.user_id,
-                        "title": self.title,
-                        "text": self.text,
-                        'delivered': self.delivered,  # Send delivered status
-                        "created_at": self.created_at.isoformat(),
-                        "photo_id": self.photo_id,
-                        "photo_url": self.photo_url,
-                        "type": self.type,
-                        # DO NOT INCLUDE completed field
-                    },
-                    "notification_number": str(self.id),
-                    "notification_freshness": True,
-                    "created_at": self.created_at.isoformat(),
-                }
-            }
+            notification_data = {"notification": self.notification()}
 
             async_to_sync(channel_layer.group_send)(
                 group_name,
@@ -140,28 +142,7 @@ class Milestone(models.Model):
             channel_layer = get_channel_layer()
             group_name = f"notifications_{self.user_id}"
             
-            # Send notification WITHOUT completed field
-            notification_data = {
-                "notification": {
-                    "notification_type": "Milestone_Notification",
-                    "notification_message": f"Achievement unlocked: {self.title} for {self.type}",
-                    "notification_data": {
-                        "milestone_id": str(self.id),
-                        "user_id": self.user_id,
-                        "title": self.title,
-                        "text": self.text,
-                        'delivered': self.delivered,  # Send delivered status
-                        "created_at": self.created_at.isoformat(),
-                        "photo_id": self.photo_id,
-                        "photo_url": self.photo_url,
-                        "type": self.type,
-                        # DO NOT INCLUDE completed field
-                    },
-                    "notification_number": str(self.id),
-                    "notification_freshness": True,
-                    "created_at": self.created_at.isoformat(),
-                }
-            }
+            notification_data = {"notification": self.notification()}
 
             async_to_sync(channel_layer.group_send)(
                 group_name,
@@ -1,5 +1,4 @@
 from django.db import models
-from django.db.models import Max
 from django.utils import timezone
 import logging
 
@@ -88,40 +87,13 @@ class UserTree(models.Model):
         super().save(*args, **kwargs)
 
         if is_new:
-            self.update_parent_childcount()
-            self.update_grandparent_influence()
+            from users.services.tree_maintenance import tree_engine
+
+            # Atomic childcount/influence increments, milestones and one depth CTE
+            tree_engine.apply_insert(self)
             if self.parentid:
                 self.create_initiator_circle_relation()
 
-            # Update ancestor depths up the tree
-            current = self.parentid
-            while current is not None:
-                max_child_depth = UserTree.objects.filter(parentid=current).aggregate(max_depth=Max('depth'))['max_depth'] or -1
-                new_depth = max_child_depth + 1
-                if new_depth > current.depth:
-                    current.depth = new_depth
-                    current.save(update_fields=['depth'])
-                    current = current.parentid
-                else:
-                    break
-
-    def update_parent_childcount(self):
-        """Increment parent's childcount and check milestone."""
-        if self.parentid:
-            self.parentid.childcount += 1
-            self.parentid.save(update_fields=['childcount'])
-            if hasattr(self.parentid, 'check_milestone'):
-                self.parentid.check_milestone()
-
-    def update_grandparent_influence(self):
-        """Increment grandparent's influence and check milestone."""
-        if self.parentid and self.parentid.parentid:
-            grandparent = self.parentid.parentid
-            grandparent.influence += 1
-            grandparent.save(update_fields=['influence'])
-            if hasattr(grandparent, 'check_grandchild_milestone'):
-                grandparent.check_grandchild_milestone()
-
     def increment_connection_count(self):
         """Increment connection count and check for milestones."""
         self.connection_count += 1
@@ -150,10 +122,8 @@ class UserTree(models.Model):
         from .petitioners import Petitioner
         from .milestone import Milestone
 
-        try:
-            petitioner = Petitioner.objects.get(id=self.id)
-            gender = petitioner.gender
-        except Petitioner.DoesNotExist:
+        gender = Petitioner.objects.filter(id=self.id).values_list('gender', flat=True).first()
+        if gender is None:
             gender = 'M'
             logger.error(f"Petitioner not found for UserTree ID: {self.id}")
 
@@ -186,97 +156,52 @@ class UserTree(models.Model):
             )
 
     def create_initiator_circle_relation(self):
-        from .Circle import Circle
         from event.models.groups import Group
 
+        groups = {}
+        if self.event_choice == 'group' and self.event_id:
+            groups = Group.objects.in_bulk([self.event_id])
+        # Saved one by one so the Circle signals update the audience index
+        for circle in self.build_initiator_circles(groups):
+            circle.save()
+        group = groups.get(self.event_id)
+        if group is not None and self.id not in group.members:
+            group.members.append(self.id)
+            group.save(update_fields=['members'])
+
+    def build_initiator_circles(self, groups):
+        """
+        Unsaved Circle rows linking this node to its initiator (and event
+        speakers). ``groups`` maps event IDs to already loaded Groups.
+        """
+        from .Circle import Circle
+
+        def pair(relation, other, back_relation):
+            return [
+                Circle(userid=self.id, onlinerelation=relation, otherperson=other),
+                Circle(userid=other, onlinerelation=back_relation, otherperson=self.id),
+            ]
+
+        parent_id = self.parentid_id
         if self.event_choice == 'online':
-            Circle.objects.create(
-                userid=self.id,
-                onlinerelation='online_initiator',
-                otherperson=self.parentid.id
-            )
-            Circle.objects.create(
-                userid=self.parentid.id,
-                onlinerelation='online_initiate',
-                otherperson=self.id
-            )
-        elif self.event_choice == 'private' and self.event_id:
-            Circle.objects.create(
-                userid=self.id,
-                onlinerelation='agent',
-                otherperson=self.parentid.id
-            )
-            Circle.objects.create(
-                userid=self.parentid.id,
-                onlinerelation='members',
-                otherperson=self.id
-            )
-            Circle.objects.create(
-                userid=self.id,
-                onlinerelation='speaker',
-                otherperson=self.event_id
-            )
-            Circle.objects.create(
-                userid=self.event_id,
-                onlinerelation='audience',
-                otherperson=self.id
-            )
-        elif self.event_choice == 'group' and self.event_id:
-            Circle.objects.create(
-                userid=self.id,
-                onlinerelation='groupagent',
-                otherperson=self.parentid.id
-            )
-            Circle.objects.create(
-                userid=self.parentid.id,
-                onlinerelation='groupmembers',
-                otherperson=self.id
-            )
-            try:
-                group = Group.objects.get(id=self.event_id)
-                if group.speakers is None:
-                    if group.founder and group.founder != self.parentid.id:
-                        Circle.objects.create(
-                            userid=self.id,
-                            onlinerelation='speaker',
-                            otherperson=group.founder
-                        )
-                        Circle.objects.create(
-                            userid=group.founder,
-                            onlinerelation='audience',
-                            otherperson=self.id
-                        )
-                else:
-                    speaker_ids = list(set(group.speakers + [group.founder]))
-                    for speaker_id in speaker_ids:
-                        if speaker_id == self.parentid.id:
-                            continue
-                        Circle.objects.create(
-                            userid=self.id,
-                            onlinerelation='multiplespeakers',
-                            otherperson=speaker_id
-                        )
-                        Circle.objects.create(
-                            userid=speaker_id,
-                            onlinerelation='shared_audience',
-                            otherperson=self.id
-                        )
-                if self.id not in group.members:
-                    group.members.append(self.id)
-                    group.save(update_fields=['members'])
-            except Group.DoesNotExist:
+            return pair('online_initiator', parent_id, 'online_initiate')
+        if self.event_choice == 'private' and self.event_id:
+            return pair('agent', parent_id, 'members') + pair('speaker', self.event_id, 'audience')
+        if self.event_choice == 'group' and self.event_id:
+            circles = pair('groupagent', parent_id, 'groupmembers')
+            group = groups.get(self.event_id)
+            if group is None:
                 logger.error(f"Group with ID {self.event_id} not found")
-        else:
-            Circle.objects.create(
-                userid=self.id,
-                onlinerelation='initiator',
-                otherperson=self.parentid.id
-            )
-            Circle.objects.create(
-                userid=self.parentid.id,
-                onlinerelation='initiate',
-                otherperson=self.id
-            )
+            elif group.speakers is None:
+                if group.founder and group.founder != parent_id:
+                    circles += pair('speaker', group.founder, 'audience')
+            else:
+                for speaker_id in set(group.speakers + [group.founder]):
+                    if speaker_id == parent_id:
+                        continue
+                    circles += pair('multiplespeakers', speaker_id, 'shared_audience')
+            return circles
+        return pair('initiator', parent_id, 'initiate')
 
     def __str__(self):
         return self.name
@@ -6,9 +6,12 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
 
+from backend.read_cache import cached_view
+
 from users.models import Petitioner, UserTree, Circle, Milestone, ProfileCache
 from event.models import Group
 from activity_reports.models import UserMonthlyActivity
+from activity_reports.services.activity_calendar import activity_calendar
 
 from .serializers import (
     UserSerializer,
@@ -23,6 +26,14 @@ from .serializers import (
 
 class UserProfileAPIView(APIView):
 
+    # ProfileCache regenerates once a day, so the day is part of the key.
+    # Profile edits and new milestones invalidate the user's scope (users/signals.py).
+    @cached_view(
+        'profile',
+        key=lambda request, user_id: (timezone.localdate(),),
+        scope=lambda request, user_id: user_id,
+        timeout=60 * 60
+    )
     def get(self, request, user_id):
         user = get_object_or_404(Petitioner, id=user_id)
         today = timezone.now().date()
@@ -106,97 +117,27 @@ class UserProfileAPIView(APIView):
     # ADVANCED STREAK SYSTEM (your complete logic)
     # ----------------------------------------------------------
 
+    STREAK_LOOKBACK_DAYS = 365
+
     def calculate_activity_streaks(self, user_id, join_date):
         today = timezone.now().date()
         join_date = min(join_date, today)
 
-        streak_data = {
-            "current_streak": 0,
-            "last_10_days": 0,
-            "last_30_days": 0,
-            "last_100_days": 0,
-            "total_active_days": 0,
+        # Every range below comes from the same calendar, loaded with one query
+        user_calendar = activity_calendar.calendar(
+            user_id, min(join_date, today - timedelta(days=self.STREAK_LOOKBACK_DAYS - 1)), today
+        )
+
+        return {
+            "current_streak": user_calendar.streak(today, limit=self.STREAK_LOOKBACK_DAYS),
+            "last_10_days": user_calendar.count(max(today - timedelta(days=9), join_date), today),
+            "last_30_days": user_calendar.count(max(today - timedelta(days=29), join_date), today),
+            "last_100_days": user_calendar.count(max(today - timedelta(days=99), join_date), today),
+            "total_active_days": user_calendar.count(join_date, today),
             "join_date": join_date.isoformat(),  # Fixed: Convert to ISO string
             "days_since_join": (today - join_date).days,
         }
 
-        streak_data["current_streak"] = self._calculate_current_streak(user_id, today)
-
-        # last 10 days
-        ten_days_ago = max(today - timedelta(days=9), join_date)
-        streak_data["last_10_days"] = self._count_active_days_in_range(user_id, ten_days_ago, today)
-
-        # last 30 days
-        thirty_days_ago = max(today - timedelta(days=29), join_date)
-        streak_data["last_30_days"] = self._count_active_days_in_range(user_id, thirty_days_ago, today)
-
-        # last 100 days
-        hundred_days_ago = max(today - timedelta(days=99), join_date)
-        streak_data["last_100_days"] = self._count_active_days_in_range(user_id, hundred_days_ago, today)
-
-        # total active days since join
-        streak_data["total_active_days"] = self._count_active_days_in_range(user_id, join_date, today)
-
-        return streak_data
-
-    def _calculate_current_streak(self, user_id, today):
-        streak = 0
-        current_date = today
-
-        for _ in range(365):  # max lookback
-            activity = UserMonthlyActivity.objects.filter(
-                user_id=user_id,
-                year=current_date.year,
-                month=current_date.month,
-                active_days__contains=[current_date.day]
-            ).exists()
-
-            if not activity:
-                break
-
-            streak += 1
-            current_date -= timedelta(days=1)
-
-        return streak
-
-    def _count_active_days_in_range(self, user_id, start_date, end_date):
-        if start_date > end_date:
-            return 0
-
-        # Positions of months to inspect
-        months_to_check = set()
-        temp_date = start_date
-        
-        # Use first day of month to safely iterate through months
-        current_month_start = start_date.replace(day=1)
-        end_month_start = end_date.replace(day=1)
-        
-        while current_month_start <= end_month_start:
-            months_to_check.add((current_month_start.year, current_month_start.month))
-            # Move to next month safely
-            if current_month_start.month == 12:
-                current_month_start = current_month_start.replace(year=current_month_start.year + 1, month=1, day=1)
-            else:
-                current_month_start = current_month_start.replace(month=current_month_start.month + 1, day=1)
-
-        # load monthly records
-        monthly_map = {}
-        for year, month in months_to_check:
-            rec = UserMonthlyActivity.objects.filter(user_id=user_id, year=year, month=month).first()
-            if rec:
-                monthly_map[(year, month)] = set(rec.active_days or [])
-
-        # count days
-        count = 0
-        day_cursor = start_date
-        while day_cursor <= end_date:
-            key = (day_cursor.year, day_cursor.month)
-            if key in monthly_map and day_cursor.day in monthly_map[key]:
-                count += 1
-            day_cursor += timedelta(days=1)
-
-        return count
-
     # ----------------------------------------------------------
     # PROFILE DESCRIPTION (uses streak_data)
     # ----------------------------------------------------------
@@ -0,0 +1,170 @@
+import logging
+
+from django.db.models import Q
+
+from backend.redis_connection import get_redis_client
+from users.models.Circle import Circle
+
+logger = logging.getLogger(__name__)
+
+
+class AudienceIndex:
+    """
+    Materialised circle membership per user, kept as Redis sets.
+
+    ``circle:out:{user}`` holds the ``otherperson`` of every Circle row owned
+    by the user (who sees their posts) and ``circle:in:{user}`` the owners of
+    rows pointing at the user. Sets are filled from the database on first
+    read, then kept current by the Circle post_save/post_delete signals, and
+    expire after ``TTL_SECONDS`` so any drift heals itself. When Redis is
+    unreachable every call falls back to the Circle table.
+    """
+
+    OUT_KEY = 'circle:out:{}'
+    IN_KEY = 'circle:in:{}'
+    # Marks a loaded set so users with no circle are cached too
+    SENTINEL = '*'
+    TTL_SECONDS = 60 * 60 * 24
+
+    # Adds only to sets that are already loaded; a missing set is rebuilt from the DB on read
+    _ADD_IF_LOADED = """
+        for i, key in ipairs(KEYS) do
+            if redis.call('EXISTS', key) == 1 then
+                redis.call('SADD', key, ARGV[i])
+            end
+        end
+        return 1
+    """
+
+    def __init__(self, redis_client=None):
+        self._redis = redis_client
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    def members(self, user_id):
+        """IDs in the user's circle (Circle.userid == user_id)"""
+        return self.members_of_many([user_id]).get(user_id, set())
+
+    def members_of_many(self, user_ids):
+        """Map each user ID to the IDs in their circle, one round trip for all of them"""
+        return self._read_sets(self.OUT_KEY, 'userid', 'otherperson', user_ids)
+
+    def audience(self, *user_ids):
+        """Union of the given users and everyone in their circles"""
+        user_ids = {uid for uid in user_ids if uid is not None}
+        result = set(user_ids)
+        for member_ids in self.members_of_many(user_ids).values():
+            result |= member_ids
+        return result
+
+    def contacts(self, user_id):
+        """Everyone linked to the user by a Circle row in either direction"""
+        outgoing = self._read_sets(self.OUT_KEY, 'userid', 'otherperson', [user_id])
+        incoming = self._read_sets(self.IN_KEY, 'otherperson', 'userid', [user_id])
+        contacts = outgoing.get(user_id, set()) | incoming.get(user_id, set())
+        contacts.discard(user_id)
+        return contacts
+
+    def add_edge(self, userid, otherperson):
+        if userid is None or otherperson is None:
+            return
+        try:
+            self.redis.eval(
+                self._ADD_IF_LOADED, 2,
+                self.OUT_KEY.format(userid), self.IN_KEY.format(otherperson),
+                otherperson, userid
+            )
+        except Exception as e:
+            logger.warning(f"[AUDIENCE INDEX] Could not add edge {userid}->{otherperson}: {e}")
+
+    def add_edges(self, edges):
+        """``add_edge`` for many (userid, otherperson) pairs in one script call"""
+        keys, members = [], []
+        for userid, otherperson in edges:
+            if userid is None or otherperson is None:
+                continue
+            keys += [self.OUT_KEY.format(userid), self.IN_KEY.format(otherperson)]
+            members += [otherperson, userid]
+        if not keys:
+            return
+        try:
+            self.redis.eval(self._ADD_IF_LOADED, len(keys), *keys, *members)
+        except Exception as e:
+            logger.warning(f"[AUDIENCE INDEX] Could not add {len(edges)} edges: {e}")
+
+    def remove_edge(self, userid, otherperson):
+        if userid is None or otherperson is None:
+            return
+        # Another Circle row may still link the pair (different relation), so reload both users
+        self.invalidate(userid, otherperson)
+
+    def invalidate(self, *user_ids):
+        keys = []
+        for user_id in user_ids:
+            keys += [self.OUT_KEY.format(user_id), self.IN_KEY.format(user_id)]
+        try:
+            if keys:
+                self.redis.delete(*keys)
+        except Exception as e:
+            logger.warning(f"[AUDIENCE INDEX] Could not invalidate {user_ids}: {e}")
+
+    def invalidate_all(self):
+        try:
+            for pattern in ('circle:out:*', 'circle:in:*'):
+                for key in self.redis.scan_iter(match=pattern, count=1000):
+                    self.redis.delete(key)
+        except Exception as e:
+            logger.warning(f"[AUDIENCE INDEX] Could not invalidate circle sets: {e}")
+
+    def _read_sets(self, key_template, owner_field, member_field, user_ids):
+        user_ids = [uid for uid in dict.fromkeys(user_ids) if uid is not None]
+        if not user_ids:
+            return {}
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.smembers(key_template.format(user_id))
+            cached = pipe.execute()
+        except Exception as e:
+            logger.warning(f"[AUDIENCE INDEX] Redis unavailable, reading circles from DB: {e}")
+            return self._load_from_db(owner_field, member_field, user_ids)
+
+        result = {}
+        missing = []
+        for user_id, raw_members in zip(user_ids, cached):
+            if raw_members:
+                result[user_id] = {int(m) for m in raw_members if m != self.SENTINEL}
+            else:
+                missing.append(user_id)
+
+        if missing:
+            loaded = self._load_from_db(owner_field, member_field, missing)
+            result.update(loaded)
+            try:
+                pipe = self.redis.pipeline()
+                for user_id in missing:
+                    key = key_template.format(user_id)
+                    pipe.sadd(key, self.SENTINEL, *loaded[user_id])
+                    pipe.expire(key, self.TTL_SECONDS)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"[AUDIENCE INDEX] Could not cache circles: {e}")
+        return result
+
+    @staticmethod
+    def _load_from_db(owner_field, member_field, user_ids):
+        result = {user_id: set() for user_id in user_ids}
+        rows = Circle.objects.filter(
+            Q(**{f"{owner_field}__in": user_ids}) & Q(**{f"{member_field}__isnull": False})
+        ).values_list(owner_field, member_field)
+        for owner, member in rows:
+            result[owner].add(member)
+        return result
+
+
+audience_index = AudienceIndex()
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from django.utils import timezone
+
+from backend.redis_connection import get_redis_client
+from users.models.petitioners import Petitioner
+from users.services.audience_index import audience_index
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceService:
+    """
+    Who is connected right now, kept in Redis instead of Petitioner rows.
+
+    Every open WebSocket of a user holds a lease: a member of the sorted set
+    ``presence:{user}`` scored with the time it expires. Consumers renew
+    their lease every ``HEARTBEAT_SECONDS``; a lease that is not renewed for
+    ``TTL_SECONDS`` (its worker crashed) stops counting. A user is online
+    while they hold an unexpired lease, so every tab counts and closing one
+    of several leaves the user online.
+
+    What the user's contacts were last told is the ``presence:announced``
+    set. Coming online is announced at once, going offline only after
+    ``DEBOUNCE_SECONDS`` without a new lease, so a page reload or a flapping
+    connection announces nothing. ``sweep`` announces the users whose leases
+    all expired. Announcements are mirrored to ``Petitioner.is_online`` for
+    the queries that join on it, and lookups fall back to that column when
+    Redis is unreachable.
+    """
+
+    KEY = 'presence:{}'
+    ANNOUNCED_KEY = 'presence:announced'
+    TTL_SECONDS = 90
+    HEARTBEAT_SECONDS = 30
+    DEBOUNCE_SECONDS = 5
+
+    # Drops expired leases, adds or removes one and returns the live lease count before and after
+    _LEASE = """
+        local now = tonumber(ARGV[1])
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+        local before = redis.call('ZCARD', KEYS[1])
+        if ARGV[2] == 'add' then
+            redis.call('ZADD', KEYS[1], now + tonumber(ARGV[4]), ARGV[3])
+            redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+        else
+            redis.call('ZREM', KEYS[1], ARGV[3])
+        end
+        return {before, redis.call('ZCARD', KEYS[1])}
+    """
+
+    def __init__(self, redis_client=None, channel_layer=None):
+        self._redis = redis_client
+        self.channel_layer = channel_layer
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_client()
+        return self._redis
+
+    # -----------------------------
+    # Leases
+    # -----------------------------
+
+    def connect(self, user_id, connection_id):
+        """Take a lease for the connection; True if it is the user's only live one"""
+        before, after = self._lease(user_id, connection_id, 'add')
+        return before == 0 and after > 0
+
+    def heartbeat(self, user_id, connection_id):
+        """Renew the connection's lease; True if the user had no live lease left (it had expired)"""
+        return self.connect(user_id, connection_id)
+
+    def disconnect(self, user_id, connection_id):
+        """Release the connection's lease; True if the user has no live lease left"""
+        before, after = self._lease(user_id, connection_id, 'remove')
+        return before > 0 and after == 0
+
+    def _lease(self, user_id, connection_id, op):
+        try:
+            before, after = self.redis.eval(
+                self._LEASE, 1, self.KEY.format(user_id),
+                time.time(), op, connection_id, self.TTL_SECONDS
+            )
+            return int(before), int(after)
+        except Exception as e:
+            logger.warning(f"[PRESENCE] Lease {op} for user {user_id} failed: {e}")
+            # Without Redis the column is the only record
+            online = op == 'add'
+            Petitioner.objects.filter(id=user_id).update(is_online=online)
+            return (0, 1) if online else (1, 0)
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+
+    def is_online(self, user_id):
+        return user_id in self.online_among([user_id])
+
+    def online_among(self, user_ids):
+        """The subset of ``user_ids`` that is online, in one round trip"""
+        user_ids = list({uid for uid in user_ids if uid is not None})
+        if not user_ids:
+            return set()
+        now = time.time()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.zcount(self.KEY.format(user_id), f"({now}", '+inf')
+            counts = pipe.execute()
+        except Exception as e:
+            logger.warning(f"[PRESENCE] Lookup of {len(user_ids)} users failed, using is_online: {e}")
+            return set(Petitioner.objects.filter(id__in=user_ids, is_online=True).values_list('id', flat=True))
+        return {user_id for user_id, count in zip(user_ids, counts) if count}
+
+    # -----------------------------
+    # Announcements
+    # -----------------------------
+
+    def announce(self, user_id, online):
+        """
+        Record that contacts are told the user is ``online``; True if that
+        changes what they were last told (the caller then broadcasts)
+        """
+        try:
+            if online:
+                changed = self.redis.sadd(self.ANNOUNCED_KEY, user_id)
+            else:
+                changed = self.redis.srem(self.ANNOUNCED_KEY, user_id)
+        except Exception as e:
+            logger.warning(f"[PRESENCE] Announcing user {user_id} failed: {e}")
+            changed = True
+        if changed:
+            Petitioner.objects.filter(id=user_id).update(is_online=online)
+        return bool(changed)
+
+    async def came_online(self, user_id):
+        if await sync_to_async(self.announce)(user_id, True):
+            await self.broadcast(user_id, True)
+
+    async def went_offline(self, user_id):
+        """Announce the user offline unless they reconnect within ``DEBOUNCE_SECONDS``"""
+        await asyncio.sleep(self.DEBOUNCE_SECONDS)
+        if await sync_to_async(self.is_online)(user_id):
+            return
+        if await sync_to_async(self.announce)(user_id, False):
+            await self.broadcast(user_id, False)
+
+    def sweep(self):
+        """Announce offline every announced user whose leases all expired; returns their IDs"""
+        try:
+            announced = [int(user_id) for user_id in self.redis.smembers(self.ANNOUNCED_KEY)]
+        except Exception as e:
+            logger.warning(f"[PRESENCE] Sweep failed: {e}")
+            return []
+        online = self.online_among(announced)
+        gone = [user_id for user_id in announced if user_id not in online and self.announce(user_id, False)]
+        for user_id in gone:
+            async_to_sync(self.broadcast)(user_id, False)
+        return gone
+
+    async def broadcast(self, user_id, online):
+        """Tell every contact of the user about their status"""
+        try:
+            contact_ids = await sync_to_async(audience_index.contacts)(int(user_id))
+            channel_layer = self.channel_layer or get_channel_layer()
+            message = {
+                "type": "notification_message",
+                "category": "connection_status",
+                "user_id": str(user_id),
+                "online": online,
+                "timestamp": timezone.now().isoformat(),
+            }
+            await asyncio.gather(*(
+                channel_layer.group_send(f"notifications_{other_id}", message)
+                for other_id in contact_ids
+            ))
+        except Exception as e:
+            logger.error(f"[PRESENCE] Broadcasting status of user {user_id} failed: {e}")
+
+
+presence = PresenceService()
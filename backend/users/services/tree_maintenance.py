@@ -0,0 +1,238 @@
+import logging
+
+from django.db import connection, transaction
+
+from backend.read_cache import read_cache
+from event.models.groups import Group
+from users.models.Circle import Circle
+from users.models.usertree import UserTree
+from users.services.audience_index import audience_index
+
+logger = logging.getLogger(__name__)
+
+
+class TreeMaintenanceEngine:
+    """
+    Applies the counter and depth changes caused by new UserTree nodes.
+
+    childcount (parent) and influence (grandparent) are bumped with a single
+    ``UPDATE ... RETURNING`` per counter, so concurrent signups under the same
+    initiator never lose an increment and milestone checks see the exact value
+    their own increment produced. Ancestor depths are raised by one recursive
+    CTE that stops at the first ancestor already deep enough, instead of one
+    ``Max('depth')`` aggregate and save per level.
+
+    ``apply_insert`` handles a node saved through ``UserTree.save()``;
+    ``bulk_insert`` creates a batch of nodes with ``bulk_create`` and applies
+    the aggregated changes for the whole batch in a handful of statements.
+    """
+
+    TABLE = 'userschema.usertree'
+
+    def apply_insert(self, node, create_milestones=True):
+        """Update parent, grandparent and ancestor depths for a freshly inserted node"""
+        parent = node.parentid
+        if parent is None:
+            return
+
+        childcounts = self._increment('childcount', {parent.id: 1})
+        parent.childcount = childcounts.get(parent.id, parent.childcount)
+
+        grandparent_id = parent.parentid_id
+        if grandparent_id is not None:
+            influences = self._increment('influence', {grandparent_id: 1})
+            # Keep an already loaded grandparent instance in sync
+            if UserTree.parentid.is_cached(parent):
+                parent.parentid.influence = influences.get(grandparent_id, parent.parentid.influence)
+        else:
+            influences = {}
+
+        self._propagate_depth([node.id])
+
+        if create_milestones:
+            self._create_milestones(
+                {parent.id: (parent.childcount - 1, parent.childcount)},
+                {gid: (value - 1, value) for gid, value in influences.items()},
+                known_nodes={parent.id: parent}
+            )
+
+    def bulk_insert(self, nodes, batch_size=5000, create_circles=True, create_milestones=True):
+        """
+        Insert many UserTree nodes at once (batch imports, seeding).
+
+        Nodes may reference parents that are earlier in the same list or
+        already in the database. Heights are filled in here; counters, depths
+        and milestones are applied per batch with set-based statements.
+        Circle relations are bulk-created per batch (``create_circles``).
+        Returns the number of nodes inserted.
+        """
+        nodes = list(nodes)
+        if not nodes:
+            return 0
+
+        heights = {}
+        parent_of = {}
+        missing_parent_ids = set()
+        for node in nodes:
+            parent_of[node.id] = node.parentid_id
+        batch_ids = set(parent_of)
+        for parent_id in set(parent_of.values()):
+            if parent_id is not None and parent_id not in batch_ids:
+                missing_parent_ids.add(parent_id)
+
+        for node_id, parent_id, height in UserTree.objects.filter(
+            id__in=missing_parent_ids
+        ).values_list('id', 'parentid_id', 'height'):
+            parent_of[node_id] = parent_id
+            heights[node_id] = height or 0
+
+        for node in nodes:
+            node.height = heights[node.parentid_id] + 1 if node.parentid_id is not None else 0
+            node.depth = 0
+            heights[node.id] = node.height
+
+        inserted = 0
+        for start in range(0, len(nodes), batch_size):
+            chunk = nodes[start:start + batch_size]
+            with transaction.atomic():
+                UserTree.objects.bulk_create(chunk)
+
+                childcount_deltas = {}
+                influence_deltas = {}
+                for node in chunk:
+                    if node.parentid_id is None:
+                        continue
+                    childcount_deltas[node.parentid_id] = childcount_deltas.get(node.parentid_id, 0) + 1
+                    grandparent_id = parent_of.get(node.parentid_id)
+                    if grandparent_id is not None:
+                        influence_deltas[grandparent_id] = influence_deltas.get(grandparent_id, 0) + 1
+
+                childcounts = self._increment('childcount', childcount_deltas)
+                influences = self._increment('influence', influence_deltas)
+                self._propagate_depth([node.id for node in chunk])
+
+                if create_circles:
+                    self.create_circles(chunk)
+
+                if create_milestones:
+                    self._create_milestones(
+                        {uid: (value - childcount_deltas[uid], value) for uid, value in childcounts.items()},
+                        {uid: (value - influence_deltas[uid], value) for uid, value in influences.items()}
+                    )
+            inserted += len(chunk)
+        return inserted
+
+    def create_circles(self, nodes):
+        """
+        Bulk-create the initiator/event Circle rows of new nodes, add them to
+        their groups' members once per group and, after commit, to the
+        audience index and timeline caches that the Circle signals would
+        otherwise update row by row. Returns the number of circles created.
+        """
+        nodes = [node for node in nodes if node.parentid_id is not None]
+        if not nodes:
+            return 0
+
+        group_ids = {node.event_id for node in nodes if node.event_choice == 'group' and node.event_id}
+        groups = Group.objects.in_bulk(group_ids) if group_ids else {}
+
+        circles = []
+        for node in nodes:
+            circles += node.build_initiator_circles(groups)
+            group = groups.get(node.event_id) if node.event_choice == 'group' else None
+            if group is not None and node.id not in group.members:
+                group.members.append(node.id)
+        Circle.objects.bulk_create(circles, batch_size=1000)
+        if groups:
+            Group.objects.bulk_update(groups.values(), ['members'])
+
+        edges = [(circle.userid, circle.otherperson) for circle in circles]
+        owners = {circle.userid for circle in circles}
+
+        def refresh_indexes():
+            audience_index.add_edges(edges)
+            for owner in owners:
+                read_cache.invalidate('timeline', owner)
+
+        transaction.on_commit(refresh_indexes)
+        return len(circles)
+
+    def _increment(self, field, deltas):
+        """
+        Atomically add ``deltas`` ({user_id: amount}) to ``field`` in one
+        statement. Returns {user_id: new_value}.
+        """
+        if not deltas:
+            return {}
+        ids = list(deltas)
+        sql = f"""
+            UPDATE {self.TABLE} AS t
+            SET {field} = COALESCE(t.{field}, 0) + d.amount
+            FROM unnest(%(ids)s::bigint[], %(amounts)s::int[]) AS d(id, amount)
+            WHERE t.id = d.id
+            RETURNING t.id, t.{field}
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'ids': ids, 'amounts': [deltas[uid] for uid in ids]})
+            return dict(cursor.fetchall())
+
+    def _propagate_depth(self, node_ids):
+        """
+        Raise ancestor depths so each ancestor is at least as deep as its
+        distance to the new nodes. The walk stops at ancestors that already
+        satisfy this, since everything above them does too.
+        """
+        if not node_ids:
+            return 0
+        sql = f"""
+            WITH RECURSIVE up (id, dist) AS (
+                SELECT n.parentid_id, 1
+                FROM {self.TABLE} n
+                WHERE n.id = ANY(%(node_ids)s::bigint[]) AND n.parentid_id IS NOT NULL
+                UNION
+                SELECT t.parentid_id, up.dist + 1
+                FROM up
+                JOIN {self.TABLE} t ON t.id = up.id
+                WHERE t.parentid_id IS NOT NULL AND COALESCE(t.depth, 0) < up.dist
+            ),
+            required AS (
+                SELECT id, max(dist) AS depth FROM up GROUP BY id
+            )
+            UPDATE {self.TABLE} AS t
+            SET depth = required.depth
+            FROM required
+            WHERE t.id = required.id AND COALESCE(t.depth, 0) < required.depth
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'node_ids': list(node_ids)})
+            return cursor.rowcount
+
+    def _create_milestones(self, childcount_changes, influence_changes, known_nodes=None):
+        """
+        Create initiation/influence milestones for every threshold crossed by
+        a counter change. Changes are {user_id: (old_value, new_value)}.
+        """
+        crossed = []
+        for changes, milestones, milestone_type in (
+            (childcount_changes, UserTree.INITIATION_MILESTONES, 'initiation'),
+            (influence_changes, UserTree.INFLUENCE_MILESTONES, 'influence'),
+        ):
+            for user_id, (old_value, new_value) in changes.items():
+                for level, (title, text) in milestones.items():
+                    if old_value < level <= new_value:
+                        crossed.append((user_id, title, text, milestone_type, level))
+        if not crossed:
+            return
+
+        known_nodes = dict(known_nodes or {})
+        missing = {user_id for user_id, *_ in crossed} - set(known_nodes)
+        if missing:
+            known_nodes.update(UserTree.objects.in_bulk(missing))
+
+        for user_id, title, text, milestone_type, level in crossed:
+            node = known_nodes.get(user_id)
+            if node is not None:
+                node.create_milestone(title, text, milestone_type, level)
+
+
+tree_engine = TreeMaintenanceEngine()
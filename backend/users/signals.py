@@ -1,10 +1,13 @@
 # users/signals.py
 import logging
 from django.db.models.signals import post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-from users.models import Petitioner
+from users.models import Petitioner, Circle, Milestone
+from users.services.audience_index import audience_index
+from backend.read_cache import read_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,4 +26,38 @@ def update_petitioner_count(sender, instance, **kwargs):
             }
         )
     except Exception as e:
-        logger.error(f"[Signal Error] {e}")
\ No newline at end of file
+        logger.error(f"[Signal Error] {e}")
+
+
+@receiver(post_save, sender=Petitioner)
+@receiver(post_delete, sender=Petitioner)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    read_cache.invalidate_on_commit('profile', instance.id)
+
+
+@receiver(post_save, sender=Milestone)
+def invalidate_cached_profile_milestones(sender, instance, created, **kwargs):
+    if created:
+        read_cache.invalidate_on_commit('profile', instance.user_id)
+
+
+@receiver(post_save, sender=Circle)
+@receiver(post_delete, sender=Circle)
+def invalidate_cached_timeline(sender, instance, **kwargs):
+    read_cache.invalidate_on_commit('timeline', instance.userid)
+
+
+@receiver(post_save, sender=Circle)
+def add_circle_to_audience_index(sender, instance, created, **kwargs):
+    # Covers UserTree.create_initiator_circle_relation and the connection flows
+    if created:
+        transaction.on_commit(
+            lambda: audience_index.add_edge(instance.userid, instance.otherperson)
+        )
+
+
+@receiver(post_delete, sender=Circle)
+def remove_circle_from_audience_index(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: audience_index.remove_edge(instance.userid, instance.otherperson)
+    )
@@ -10,7 +10,9 @@ from django.conf import settings
 from faker import Faker
 from celery import shared_task
 from geographies.models.geos import Village
+from geographies.services.population import population_counter
 from users.models import Petitioner, UserTree
+from users.services.presence import presence
 from event.models.groups import Group
 
 from .models import Milestone
@@ -76,10 +78,8 @@ def create_live_user():
     
     village = random.choice(villages)
     
-    # Lock and update village population
-    village = Village.objects.select_for_update().get(id=village.id)
-    village.online_population = (village.online_population or 0) + 1
-    village.save()
+    # Atomic increment, only users of the same village wait on each other
+    village.online_population = population_counter.allocate_village_number(village.id)
     
     # Generate unique ID: last 9 digits of village ID + population (5 digits)
     village_id_str = str(village.id)[-9:].zfill(9)
@@ -254,4 +254,11 @@ def populate_milestones_sequence():
     
     except Exception as e:
         logger.error(f"Error creating milestone sequence: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+
+@shared_task
+def sweep_presence():
+    """Announce offline the users whose presence leases expired without a disconnect (crashed workers)"""
+    gone = presence.sweep()
+    return f"Announced {len(gone)} stale users offline"
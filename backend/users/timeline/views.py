@@ -11,6 +11,7 @@ from ..models.Circle import Circle
 from .serializers import ProfileSerializer, ExtendedProfileSerializer
 from users.login.authentication import CookieJWTAuthentication
 from rest_framework.permissions import IsAuthenticated
+from backend.read_cache import cached_view
 
 
 class CustomPagination(PageNumberPagination):
@@ -25,6 +26,12 @@ class TimelineHeadView(APIView):
 
     pagination_class = CustomPagination
 
+    @cached_view(
+        'timeline',
+        key=lambda request, user_id: ('head', request.query_params.get('page', 1), request.query_params.get('page_size')),
+        scope=lambda request, user_id: user_id or request.user.id,
+        timeout=60
+    )
     def get(self, request, user_id):
         if user_id ==0:
             user_id = request.user.id
@@ -106,6 +113,8 @@ class TimelineHeadView(APIView):
 class TimelineTailView(APIView):
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
+
+    @cached_view('timeline', key=lambda request, user_id: ('tail',), scope=lambda request, user_id: user_id, timeout=60)
     def get(self, request, user_id):
         try:
             profile = get_object_or_404(UserTree, id=user_id)
@@ -218,7 +218,7 @@ const BlogDetailPage: React.FC = () => {
             className={`BlogDetailPage-comment-action ${comment.has_liked ? "BlogDetailPage-active" : ""}`}
             onClick={() => handleLikeComment(comment.id)}
           >
-            ❤️ ({comment.likes ? comment.likes.length : 0})
+            ❤️ ({comment.likes || 0})
           </button>
           <button
             type="button"
@@ -526,7 +526,7 @@ const BlogDetailPage: React.FC = () => {
             }`}
             onClick={handleLike}
           >
-            ❤️ Like ({blog.footer.likes.length})
+            ❤️ Like ({blog.footer.likes})
           </button>
           <button
             type="button"
@@ -535,7 +535,7 @@ const BlogDetailPage: React.FC = () => {
             }`}
             onClick={handleShare}
           >
-            🔄 {blog.footer.has_shared ? "Unshare" : "Share"} ({blog.footer.shares.length})
+            🔄 {blog.footer.has_shared ? "Unshare" : "Share"} ({blog.footer.shares})
           </button>
         </div>
       </div>
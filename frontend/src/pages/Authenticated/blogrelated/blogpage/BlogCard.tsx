@@ -246,14 +246,14 @@ const BlogCard: React.FC<BlogCardProps> = ({
           className={`reaction-btn btn-like ${blog.footer.has_liked ? 'active' : ''}`}
           onClick={(e) => onLikeClick(blog.id, e)}
         >
-          <i className="far fa-heart"></i> Like ({blog.footer.likes.length})
+          <i className="far fa-heart"></i> Like ({blog.footer.likes})
         </button>
         
         <button 
           className={`reaction-btn btn-share ${blog.footer.has_shared ? 'active' : ''}`}
           onClick={(e) => onShareClick(blog.id, e)}
         >
-          <i className="far fa-share-square"></i> {blog.footer.has_shared ? 'Unshare' : 'Share'} ({blog.footer.shares.length})
+          <i className="far fa-share-square"></i> {blog.footer.has_shared ? 'Unshare' : 'Share'} ({blog.footer.shares})
         </button>
         
         <span 
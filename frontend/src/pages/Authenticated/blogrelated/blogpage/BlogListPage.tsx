@@ -1,7 +1,7 @@
 import React, { useEffect, useRef, useState } from "react";
 import { useDispatch, useSelector } from "react-redux";
 import { useNavigate } from "react-router-dom";
-import { fetchBlogs, likeBlog, shareBlog } from "./blogThunks";
+import { fetchBlogs, fetchMoreBlogs, likeBlog, shareBlog } from "./blogThunks";
 import BlogCard from "./BlogCard";
 import { Blog, BlogsState } from "./blogTypes";
 import { AppDispatch, RootState } from "../../../../store";
@@ -64,6 +64,7 @@ export default function BlogListPage() {
 
   const loading = typedBlogState.loading;
   const error = typedBlogState.error;
+  const loadingMore = typedBlogState.loadingMore || false;
 
   // State to track if we're restoring scroll position
   const [isRestoringScroll, setIsRestoringScroll] = useState(true);
@@ -143,11 +144,17 @@ export default function BlogListPage() {
     }
   }, [loading, blogs.length, isRestoringScroll, scrollPosition]);
 
-  // Handle scroll events to save position periodically
+  // Handle scroll events to save position periodically and load the next page near the bottom
   useEffect(() => {
     const handleScroll = () => {
       // Throttle scroll saving to improve performance
       saveScrollPosition();
+
+      const container = containerRef.current;
+      if (container && container.scrollHeight - container.scrollTop - container.clientHeight < 400) {
+        // The thunk skips the request while a page is in flight or the feed is exhausted
+        dispatch(fetchMoreBlogs(blogType));
+      }
     };
 
     const container = containerRef.current;
@@ -157,7 +164,8 @@ export default function BlogListPage() {
         container.removeEventListener('scroll', handleScroll);
       };
     }
-  }, []);
+    // The container only renders once the first page is in; attach to it then
+  }, [dispatch, mainFetchDone]);
 
   // Clear scroll position when component mounts initially for fresh load
   useEffect(() => {
@@ -257,6 +265,10 @@ export default function BlogListPage() {
         </ul>
       )}
 
+      {loadingMore && (
+        <div className="blog-list-page-loading-more">Loading more blogs...</div>
+      )}
+
       {/* Fixed button in bottom right corner */}
       <button 
         onClick={() => {
@@ -113,6 +113,45 @@ const blogSlice = createSlice({
       state.mainFetchDone[action.payload.blogType] = true;
     },
     
+    // Append the next feed page, skipping blogs already in the list (e.g. pushed live)
+    appendBlogs: (
+      state,
+      action: PayloadAction<{ blogType: string; blogs: Blog[] }>
+    ) => {
+      const { blogType, blogs } = action.payload;
+      if (!state.blogs[blogType]) {
+        state.blogs[blogType] = {
+          blogs: [],
+          loading: false,
+          error: null,
+        };
+      }
+      const existingIds = new Set(state.blogs[blogType].blogs.map((blog: Blog) => blog.id));
+      state.blogs[blogType].blogs.push(
+        ...blogs.filter((blog: Blog) => !existingIds.has(blog.id))
+      );
+    },
+
+    setPagination: (
+      state,
+      action: PayloadAction<{ blogType: string; nextCursor: string | null; hasMore: boolean }>
+    ) => {
+      const { blogType, nextCursor, hasMore } = action.payload;
+      if (state.blogs[blogType]) {
+        state.blogs[blogType].nextCursor = nextCursor;
+        state.blogs[blogType].hasMore = hasMore;
+      }
+    },
+
+    setLoadingMore: (
+      state,
+      action: PayloadAction<{ blogType: string; loadingMore: boolean }>
+    ) => {
+      if (state.blogs[action.payload.blogType]) {
+        state.blogs[action.payload.blogType].loadingMore = action.payload.loadingMore;
+      }
+    },
+    
     setError: (
       state,
       action: PayloadAction<{ blogType: string; error: string }>
@@ -533,6 +572,9 @@ export const {
   clearRefreshFlag,
   setLoading,
   setBlogs,
+  appendBlogs,
+  setPagination,
+  setLoadingMore,
   setError,
   updateBlog,
   addBlog,
@@ -12,6 +12,9 @@ import {
 import {
   setLoading,
   setBlogs,
+  appendBlogs,
+  setPagination,
+  setLoadingMore,
   setError,
   updateBlog,
   addComment,
@@ -62,6 +65,11 @@ export const fetchBlogs = createAsyncThunk<
     console.log('fetchBlogs normalized blogsArray:', blogsArray);
 
     dispatch(setBlogs({ blogType, blogs: blogsArray }));
+    dispatch(setPagination({
+      blogType,
+      nextCursor: response.data?.next_cursor ?? null,
+      hasMore: Boolean(response.data?.has_more),
+    }));
     dispatch(setLoading({ blogType, loading: false }));
   } catch (err: any) {
     console.error("fetchBlogs error:", err);
@@ -70,6 +78,40 @@ export const fetchBlogs = createAsyncThunk<
   }
 });
 
+/**
+ * fetchMoreBlogs
+ * - loads the next keyset page of the feed after the stored cursor
+ * - no-op while a page is loading or when the feed is exhausted
+ */
+export const fetchMoreBlogs = createAsyncThunk<
+  void,
+  string,
+  { state: RootState }
+>("blogs/fetchMoreBlogs", async (blogType: string, { dispatch, getState }) => {
+  const blogState = getState().blog.blogs[blogType];
+  if (!blogState || blogState.loadingMore || !blogState.hasMore || !blogState.nextCursor) {
+    return;
+  }
+
+  dispatch(setLoadingMore({ blogType, loadingMore: true }));
+  try {
+    const response = await api.get("/api/blog/circle-blogs/", {
+      params: { cursor: blogState.nextCursor },
+    });
+    dispatch(appendBlogs({ blogType, blogs: extractBlogsArray(response.data) }));
+    dispatch(setPagination({
+      blogType,
+      nextCursor: response.data?.next_cursor ?? null,
+      hasMore: Boolean(response.data?.has_more),
+    }));
+  } catch (err: any) {
+    // Keep the cursor so the next scroll retries the same page
+    console.error("fetchMoreBlogs error:", err);
+  } finally {
+    dispatch(setLoadingMore({ blogType, loadingMore: false }));
+  }
+});
+
 /**
  * fetchBlog (single blog)
  * - fetch a single blog and either add it to the list or update existing
@@ -164,7 +206,7 @@ export const likeBlog = createAsyncThunk<
           updates: {
             footer: {
               ...currentBlog.footer,
-              likes: added ? [...currentBlog.footer.likes, 0] : currentBlog.footer.likes.slice(0, -1),
+              likes: added ? currentBlog.footer.likes + 1 : Math.max(currentBlog.footer.likes - 1, 0),
               has_liked: added,
             },
           },
@@ -202,7 +244,7 @@ export const shareBlog = createAsyncThunk<
           updates: {
             footer: {
               ...currentBlog.footer,
-              shares: added ? [...currentBlog.footer.shares, 0] : currentBlog.footer.shares.slice(0, -1),
+              shares: added ? currentBlog.footer.shares + 1 : Math.max(currentBlog.footer.shares - 1, 0),
               has_shared: added,
             },
           },
@@ -310,7 +352,7 @@ export const likeComment = createAsyncThunk<
       const comment = findComment(currentBlog.comments);
       if (comment) {
         const hasAdded = response.data?.action === "added";
-        const newLikes = hasAdded ? [...comment.likes, 0] : comment.likes.slice(0, -1);
+        const newLikes = hasAdded ? comment.likes + 1 : Math.max(comment.likes - 1, 0);
         dispatch(
           updateComment({
             blogType,
@@ -10,8 +10,8 @@ export interface Comment {
   id: string;
   user: User;
   text: string;
-  likes: number[];
-  dislikes: number[];
+  likes: number;
+  dislikes: number;
   created_at: string;
   replies: Comment[];
   // Add these new properties
@@ -71,10 +71,10 @@ export interface BlogBody {
 }
 
 export interface BlogFooter {
-  likes: number[];
-  relevant_count: number[];
-  irrelevant_count: number[];
-  shares: number[];
+  likes: number;
+  relevant_count: number;
+  irrelevant_count: number;
+  shares: number;
   comments: string[];
   has_liked: boolean;
   has_shared: boolean;
@@ -103,6 +103,10 @@ export interface BlogsState {
   blogs: Blog[] | any; // Allow any type since your normalizeBlogs handles different shapes
   loading: boolean;
   error: string | null;
+  // Keyset paging of the circle feed: pass nextCursor back as ?cursor=
+  nextCursor?: string | null;
+  hasMore?: boolean;
+  loadingMore?: boolean;
 }
 
 export interface BlogsSliceState {
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import api from "../../../../api";
+import ReportMembersList from "../reportview/ReportMembersList";
 import "./ActivityReportViewPage.css";
 
 type ReportType = "daily" | "weekly" | "monthly";
@@ -232,20 +233,28 @@ const ActivityReportViewPage: React.FC = () => {
 
             {showDistribution && renderDistribution()}
 
-            <div className="activity-report-children-grid">
-              {Object.entries(report.children_data).map(([id, child]) => (
-                <div
-                  key={id}
-                  className={`activity-report-child-card ${child.active_users > 0 ? "active" : "inactive"} ${
-                    child.active_users > 0 && child.report_id ? "clickable" : ""
-                  }`}
-                  onClick={() => child.active_users > 0 && child.report_id && handleChildClick(child)}
-                >
-                  <div className="activity-report-child-name">{child.name}</div>
-                  <div className="activity-report-child-count">{child.active_users}</div>
-                </div>
-              ))}
-            </div>
+            {report.level === "village" && period && reportId ? (
+              <ReportMembersList
+                endpoint="/api/activity_reports/activity-report/members/"
+                period={period}
+                reportId={reportId}
+              />
+            ) : (
+              <div className="activity-report-children-grid">
+                {Object.entries(report.children_data).map(([id, child]) => (
+                  <div
+                    key={id}
+                    className={`activity-report-child-card ${child.active_users > 0 ? "active" : "inactive"} ${
+                      child.active_users > 0 && child.report_id ? "clickable" : ""
+                    }`}
+                    onClick={() => child.active_users > 0 && child.report_id && handleChildClick(child)}
+                  >
+                    <div className="activity-report-child-name">{child.name}</div>
+                    <div className="activity-report-child-count">{child.active_users}</div>
+                  </div>
+                ))}
+              </div>
+            )}
           </>
         )}
       </div>
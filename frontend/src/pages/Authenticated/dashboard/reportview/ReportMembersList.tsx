@@ -0,0 +1,112 @@
+import React, { useState, useEffect, useCallback } from "react";
+import api from "../../../../api";
+import "./ReportMembersList.css";
+
+interface ReportMember {
+  id: string;
+  name: string;
+  gender: string;
+  age: number;
+  active_days?: number;
+}
+
+interface MembersPage {
+  count: number;
+  page: number;
+  page_size: number;
+  has_next: boolean;
+  results: ReportMember[];
+}
+
+interface ReportMembersListProps {
+  // Members endpoint of the report family, e.g. /api/reports/reports/view/members/
+  endpoint: string;
+  period: string;
+  reportId: string;
+  pageSize?: number;
+}
+
+// Users of a village report, fetched page by page instead of shipped with the report
+const ReportMembersList: React.FC<ReportMembersListProps> = ({
+  endpoint,
+  period,
+  reportId,
+  pageSize = 50,
+}) => {
+  const [members, setMembers] = useState<ReportMember[]>([]);
+  const [count, setCount] = useState(0);
+  const [page, setPage] = useState(0);
+  const [hasNext, setHasNext] = useState(false);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState("");
+
+  const loadPage = useCallback(
+    async (nextPage: number) => {
+      try {
+        setLoading(true);
+        setError("");
+        const response = await api.get<MembersPage>(endpoint, {
+          params: { type: period, report_id: reportId, page: nextPage, page_size: pageSize },
+        });
+        setMembers((prev) =>
+          nextPage === 1 ? response.data.results : [...prev, ...response.data.results]
+        );
+        setCount(response.data.count);
+        setPage(response.data.page);
+        setHasNext(response.data.has_next);
+      } catch (err) {
+        console.error("❌ Failed to load report members:", err);
+        setError("Failed to load users.");
+      } finally {
+        setLoading(false);
+      }
+    },
+    [endpoint, period, reportId, pageSize]
+  );
+
+  useEffect(() => {
+    setMembers([]);
+    loadPage(1);
+  }, [loadPage]);
+
+  return (
+    <div className="report-members">
+      <div className="report-members-grid">
+        {members.map((member) => (
+          <div key={member.id} className="report-members-card">
+            <div className="report-members-name">{member.name}</div>
+            <div className="report-members-details">
+              {[member.gender, member.age ? `${member.age} yrs` : null]
+                .filter(Boolean)
+                .join(" · ")}
+            </div>
+            {member.active_days !== undefined && member.active_days !== null && (
+              <div className="report-members-active-days">
+                {member.active_days} {member.active_days === 1 ? "day" : "days"} active
+              </div>
+            )}
+          </div>
+        ))}
+      </div>
+
+      {error && <div className="report-members-error">{error}</div>}
+
+      <div className="report-members-footer">
+        <span className="report-members-count">
+          Showing {members.length} of {count}
+        </span>
+        {hasNext && (
+          <button
+            className="report-members-load-more"
+            onClick={() => loadPage(page + 1)}
+            disabled={loading}
+          >
+            {loading ? "Loading..." : "Load more"}
+          </button>
+        )}
+      </div>
+    </div>
+  );
+};
+
+export default ReportMembersList;
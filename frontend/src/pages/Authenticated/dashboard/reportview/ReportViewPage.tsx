@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import api from "../../../../api";
+import ReportMembersList from "./ReportMembersList";
 import "./ReportViewPage.css";
 
 type ReportType = "daily" | "weekly" | "monthly";
@@ -252,31 +253,39 @@ const ReportViewPage = () => {
               {report.level.toUpperCase()} LEVEL
             </div>
 
-            <div className="report-view-children-grid">
-              {Object.entries(report.children_data).map(([id, child]) => {
-                console.log(`📍 Child Rendered: ${child.name}`, child);
-                return (
-                  <div
-                    key={id}
-                    className={`report-view-child-card ${
-                      child.new_users > 0 ? "active" : "inactive"
-                    } ${
-                      child.new_users > 0 && child.report_id ? "clickable" : ""
-                    }`}
-                    onClick={() =>
-                      child.new_users > 0 &&
-                      child.report_id &&
-                      handleChildClick(child)
-                    }
-                  >
-                    <div className="report-view-child-name">{child.name}</div>
-                    <div className="report-view-child-count">
-                      {child.new_users}
+            {report.level === "village" && period && reportId ? (
+              <ReportMembersList
+                endpoint="/api/reports/reports/view/members/"
+                period={period}
+                reportId={reportId}
+              />
+            ) : (
+              <div className="report-view-children-grid">
+                {Object.entries(report.children_data).map(([id, child]) => {
+                  console.log(`📍 Child Rendered: ${child.name}`, child);
+                  return (
+                    <div
+                      key={id}
+                      className={`report-view-child-card ${
+                        child.new_users > 0 ? "active" : "inactive"
+                      } ${
+                        child.new_users > 0 && child.report_id ? "clickable" : ""
+                      }`}
+                      onClick={() =>
+                        child.new_users > 0 &&
+                        child.report_id &&
+                        handleChildClick(child)
+                      }
+                    >
+                      <div className="report-view-child-name">{child.name}</div>
+                      <div className="report-view-child-count">
+                        {child.new_users}
+                      </div>
                     </div>
-                  </div>
-                );
-              })}
-            </div>
+                  );
+                })}
+              </div>
+            )}
           </>
         )}
       </div>
@@ -115,7 +115,7 @@ export const handleBlogUnshared: MessageHandler = (data, dispatch, getState) =>
           updates: {
             footer: {
               ...targetBlog.footer,
-              shares: Array.from({ length: shares_count || 0 }, (_, i) => i + 1)
+              shares: shares_count || 0
             }
           }
         }));
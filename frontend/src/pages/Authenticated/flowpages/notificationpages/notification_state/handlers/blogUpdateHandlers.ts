@@ -4,14 +4,37 @@ import { RootState } from '../../../../../../store';
 import { updateBlog } from '../../../../blogrelated/blogpage/blogSlice';
 import { MessageHandler } from './handlerRegistry';
 
-// Blog update handler (for likes/shares) - FIXED
+// Footer reaction fields are counts: take the event's authoritative count
+// when it has one, otherwise step the current count by the action.
+const reactionCount = (
+  current: any,
+  count: number | undefined,
+  action: string
+): number => {
+  if (typeof count === 'number') {
+    return Math.max(count, 0);
+  }
+  const currentCount = typeof current === 'number' ? current : 0;
+  if (action === 'added') {
+    return currentCount + 1;
+  }
+  if (action === 'removed') {
+    return Math.max(currentCount - 1, 0);
+  }
+  return currentCount;
+};
+
+// Blog update handler (for likes/shares)
 export const handleBlogUpdateMessage: MessageHandler = (data, dispatch, getState) => {
-  const { blog_id, update_type, action, user_id, shares_count } = data;
+  // Like updates are coalesced count refreshes without action or user_id
+  const { blog_id, update_type, action, user_id, count, shares_count } = data;
   
   const currentUserId = parseInt(localStorage.getItem('user_id') || '0', 10);
+  const hasCount = typeof count === 'number' || typeof shares_count === 'number';
   
-  // Don't process if this is our own action
-  if (parseInt(user_id) === currentUserId) {
+  // Our own action is already applied locally; an event with a count is still
+  // applied because coalesced events carry other users' reactions too
+  if (parseInt(user_id) === currentUserId && !hasCount) {
     console.log('Ignoring own blog update action');
     return;
   }
@@ -34,80 +57,31 @@ export const handleBlogUpdateMessage: MessageHandler = (data, dispatch, getState
   console.log('Updating blog:', blog_id, 'update_type:', update_type, 'action:', action);
   
   const prevFooter = blog.footer || {
-    likes: [] as number[],
-    shares: [] as number[],
-    relevant_count: [] as number[],
-    irrelevant_count: [] as number[],
+    likes: 0,
+    shares: 0,
+    relevant_count: 0,
+    irrelevant_count: 0,
     comments: [] as string[],
     has_liked: false,
     has_shared: false,
   };
-  
   // Handle different update types
-  if (update_type === 'like') {
-    const updatedLikes = Array.isArray(prevFooter.likes) ? [...prevFooter.likes] : [];
-    const actingUserId = typeof user_id === 'string' ? parseInt(user_id, 10) || user_id : user_id;
-    
-    if (action === 'added') {
-      if (!updatedLikes.some((id) => String(id) === String(actingUserId))) {
-        updatedLikes.push(actingUserId as any);
-      }
-    } else if (action === 'removed') {
-      const idx = updatedLikes.findIndex((id) => String(id) === String(actingUserId));
-      if (idx !== -1) {
-        updatedLikes.splice(idx, 1);
-      }
-    }
-    
-    const footerUpdates = {
-      ...prevFooter,
-      likes: updatedLikes,
-    };
-    
-    dispatch(updateBlog({
-      blogType,
-      id: String(blog_id),
-      updates: {
-        footer: footerUpdates,
-      },
-    }));
-    
-    console.log('Updated likes for blog:', blog_id, 'new likes:', updatedLikes);
-    
-  } else if (update_type === 'share') {
-    // Handle share updates
-    const updatedShares = Array.isArray(prevFooter.shares) ? [...prevFooter.shares] : [];
-    const actingUserId = typeof user_id === 'string' ? parseInt(user_id, 10) || user_id : user_id;
-    
-    if (action === 'added') {
-      if (!updatedShares.some((id) => String(id) === String(actingUserId))) {
-        updatedShares.push(actingUserId as any);
-      }
-    } else if (action === 'removed') {
-      const idx = updatedShares.findIndex((id) => String(id) === String(actingUserId));
-      if (idx !== -1) {
-        updatedShares.splice(idx, 1);
-      }
-    }
-    
-    const footerUpdates = {
-      ...prevFooter,
-      shares: updatedShares,
-    };
-    
-    // If shares_count is provided, use it (more reliable)
-    if (shares_count !== undefined) {
-      footerUpdates.shares = Array.from({ length: shares_count }, (_, i) => i + 1);
-    }
+  if (update_type === 'like' || update_type === 'share') {
+    const field = update_type === 'like' ? 'likes' : 'shares';
+    const eventCount = update_type === 'share' && typeof count !== 'number' ? shares_count : count;
+    const updatedCount = reactionCount(prevFooter[field], eventCount, action);
     
     dispatch(updateBlog({
       blogType,
       id: String(blog_id),
       updates: {
-        footer: footerUpdates,
+        footer: {
+          ...prevFooter,
+          [field]: updatedCount,
+        },
       },
     }));
     
-    console.log('Updated shares for blog:', blog_id, 'new shares:', updatedShares, 'shares_count:', shares_count);
+    console.log(`Updated ${field} for blog:`, blog_id, 'count:', updatedCount);
   }
-};
\ No newline at end of file
+};
@@ -108,12 +108,20 @@ export const handleChatSystemMessage: MessageHandler = (data, dispatch, getState
 
     case 'message_delivered':
     case 'delivered_update':
+    case 'message_delivered_update':
     case 'message_read':
     case 'read_update':
     case 'message_read_update':
       dispatch(updateMessage({ conversationId, messageId, changes: { status } }));
       break;
 
+    // One receipt for many messages of the conversation
+    case 'messages_status':
+      (data.message_ids || []).forEach((id: string) =>
+        dispatch(updateMessage({ conversationId, messageId: id, changes: { status } }))
+      );
+      break;
+
     case 'message_sent':
       dispatch(updateMessage({
         conversationId,
@@ -82,12 +82,11 @@ interface CommentUpdateData {
   user_id: number;
 }
 
+// Coalesced count refresh: no actor or direction, only the latest total
 interface CommentLikeUpdateData {
   blog_id: string;
   comment_id: string;
-  action: string;
   likes_count: number;
-  user_id: number;
 }
 
 interface ReplyUpdateData {
@@ -133,19 +132,17 @@ export const handleCommentUpdateMessage: MessageHandler = (data, dispatch, getSt
 
 // Comment like update handler
 export const handleCommentLikeUpdateMessage: MessageHandler = (data, dispatch, getState) => {
-  const { blog_id, comment_id, action, likes_count, user_id } = data as CommentLikeUpdateData;
-  
-  if (user_id === blogUtils.getCurrentUserId()) return;
+  const { blog_id, comment_id, likes_count } = data as CommentLikeUpdateData;
   
   const { blogType, blog } = blogUtils.findBlogById(getState(), blog_id);
   if (!blogType || !blog) return;
   
+  // has_liked is the viewer's own state, set by their own like action
   const updatedComments = commentTreeUtils.updateCommentInTree(
     blog.comments, 
     comment_id, 
     { 
-      likes: Array(likes_count).fill(0),
-      has_liked: action === 'added'
+      likes: likes_count
     }
   );
   
@@ -15,6 +15,22 @@ const initialState: NotificationsState = {
   nextId: 1,
 };
 
+export const MAX_NOTIFICATIONS = 50;
+
+// Update mutable fields of an existing notification from a newer copy
+const refreshNotification = (
+  existing: Notification,
+  newNotification: Omit<Notification, 'id'>
+) => {
+  existing.notification_message = newNotification.notification_message;
+  existing.notification_data = newNotification.notification_data;
+  existing.notification_number = newNotification.notification_number;
+  existing.notification_freshness = newNotification.notification_freshness;
+  if ('created_at' in newNotification && newNotification.created_at !== undefined) {
+    (existing as any).created_at = newNotification.created_at;
+  }
+};
+
 const notificationsSlice = createSlice({
   name: "notifications",
   initialState,
@@ -30,14 +46,7 @@ const notificationsSlice = createSlice({
       
       if (existingIndex !== -1) {
         // Update mutable fields of the existing notification
-        const existing = state.notifications[existingIndex];
-        existing.notification_message = newNotification.notification_message;
-        existing.notification_data = newNotification.notification_data;
-        existing.notification_number = newNotification.notification_number;
-        existing.notification_freshness = newNotification.notification_freshness;
-        if ('created_at' in newNotification && newNotification.created_at !== undefined) {
-          (existing as any).created_at = newNotification.created_at;
-        }
+        refreshNotification(state.notifications[existingIndex], newNotification);
       } else {
         // Add new notification
         const notification = {
@@ -49,11 +58,36 @@ const notificationsSlice = createSlice({
         state.nextId += 1;
         
         // Keep only the latest 50 notifications
-        if (state.notifications.length > 50) {
+        if (state.notifications.length > MAX_NOTIFICATIONS) {
           state.notifications.pop();
         }
       }
     },
+    // One page of the pending inbox sent on connect, newest first. The first
+    // page goes on top of the list, later (older) pages below it.
+    mergeInboxPage: (
+      state,
+      action: PayloadAction<{ notifications: Omit<Notification, 'id'>[]; offset: number }>
+    ) => {
+      const added: Notification[] = [];
+      action.payload.notifications.forEach((newNotification) => {
+        const existing = state.notifications.find(n =>
+          n.notification_number === newNotification.notification_number &&
+          n.notification_type === newNotification.notification_type
+        );
+        if (existing) {
+          refreshNotification(existing, newNotification);
+        } else {
+          added.push({ ...newNotification, id: state.nextId } as Notification);
+          state.nextId += 1;
+        }
+      });
+
+      state.notifications = action.payload.offset === 0
+        ? [...added, ...state.notifications]
+        : [...state.notifications, ...added];
+      state.notifications = state.notifications.slice(0, MAX_NOTIFICATIONS);
+    },
     removeNotification: (state, action: PayloadAction<number>) => {
       state.notifications = state.notifications.filter(
         notification => notification.id !== action.payload
@@ -79,7 +113,8 @@ const notificationsSlice = createSlice({
     },
     setSocket: (state, action: PayloadAction<WebSocket | null>) => {
       state.socket = action.payload;
-      state.isConnected = action.payload !== null;
+      // A socket is stored while still connecting; onopen flips this with setConnected
+      state.isConnected = action.payload?.readyState === WebSocket.OPEN;
     },
     setConnected: (state, action: PayloadAction<boolean>) => {
       state.isConnected = action.payload;
@@ -99,6 +134,7 @@ const notificationsSlice = createSlice({
 
 export const { 
   addNotification, 
+  mergeInboxPage,
   setSocket, 
   setConnected,
   removeNotification,
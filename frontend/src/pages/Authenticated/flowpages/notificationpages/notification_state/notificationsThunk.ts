@@ -3,11 +3,14 @@ import { Dispatch } from '@reduxjs/toolkit';
 import { AppDispatch, RootState } from '../../../../../store';
 import {
   addNotification,
+  mergeInboxPage,
   removeNotificationByDetails,
   setConnected,
   setSocket,
+  MAX_NOTIFICATIONS,
 } from './notificationsSlice';
 import { fetchUserMilestones } from '../../../milestone/milestonesSlice';
+import { applyActivityDelta } from '../../../heartbeat/heartbeatNetwork/heartbeatNetworkSlice';
 import { getWsUrl } from '../../../../Unauthenticated/config';
 
 // Import handler registry and handlers
@@ -155,6 +158,26 @@ export const connectWebSocket =
             return;
           }
 
+          // === Missed Blog Replay (one page per message) ===
+          if (data.type === 'blog_replay') {
+            console.log(`Blog replay received: ${data.entries.length} entries`);
+            data.entries.forEach((entry: any) => {
+              const entryData = entry.type === 'blog_modified'
+                ? { ...entry, blog_type: 'circle' }
+                : entry;
+              handleWebSocketMessage(entryData, dispatch, getState, handlerRegistry);
+            });
+            // Ask for the next page, or acknowledge the last one
+            if (socket.readyState === WebSocket.OPEN) {
+              socket.send(JSON.stringify(
+                data.has_more
+                  ? { category: 'blog_update', action: 'replay_blogs', after_seq: data.next_seq }
+                  : { category: 'blog_update', action: 'ack_replay', seq: data.next_seq }
+              ));
+            }
+            return;
+          }
+
           // === Blog Share Handling ===
           if (data.type === "blog_shared") {
             console.log('Blog share received:', data);
@@ -202,6 +225,28 @@ export const connectWebSocket =
             return;
           }
 
+          // === Pending Notifications Inbox (one page per message) ===
+          if (data.type === 'notification_inbox') {
+            console.log(`Notification inbox received: ${data.notifications.length} of ${data.total}`);
+            dispatch(mergeInboxPage({ notifications: data.notifications, offset: data.offset }));
+            // Older pages only while the list has room; the rest stays pending on the server
+            const hasRoom = getState().notifications.notifications.length < MAX_NOTIFICATIONS;
+            if (data.has_more && hasRoom && socket.readyState === WebSocket.OPEN) {
+              socket.send(JSON.stringify({
+                category: 'notification_inbox',
+                action: 'next_page',
+                offset: data.next_offset,
+              }));
+            }
+            return;
+          }
+
+          // === Circle Activity (heartbeat network page) ===
+          if (data.type === 'circle_activity') {
+            dispatch(applyActivityDelta({ date: data.date, updates: data.updates }));
+            return;
+          }
+
           // === Milestone Notification Handling ===
           if (data?.notification?.notification_type === 'Milestone_Notification') {
             console.log('Milestone Notification received:', data.notification);
@@ -15,25 +15,20 @@ interface NetworkUser {
   activity_history: Array<{ date: string; active: boolean }>;
 }
 
-interface ActivityUpdate {
-  user_id: number;
-  is_active_today: boolean;
-  streak_count: number;
-}
-
 const HeartbeatNetworkPage: React.FC = () => {
   const dispatch = useDispatch<AppDispatch>();
   const [selectedUser, setSelectedUser] = useState<NetworkUser | null>(null);
   const [imageErrors, setImageErrors] = useState<Set<number>>(new Set());
-  const [isInitialLoad, setIsInitialLoad] = useState<boolean>(true);
-  
   const { 
     networkUsers, 
     currentUserId, 
     today, 
+    version,
     status, 
     error 
   } = useSelector((state: RootState) => state.heartbeatNetwork);
+  const socket = useSelector((state: RootState) => state.notifications.socket);
+  const isConnected = useSelector((state: RootState) => state.notifications.isConnected);
 
   // Remove duplicates from networkUsers (additional safety)
   const uniqueNetworkUsers = React.useMemo(() => {
@@ -47,33 +42,40 @@ const HeartbeatNetworkPage: React.FC = () => {
     });
   }, [networkUsers]);
 
-  // Get current state for backend check
-  const getCurrentState = () => {
-    const activeUsers = uniqueNetworkUsers.filter(user => user.is_active_today);
-    const inactiveUsers = uniqueNetworkUsers.filter(user => !user.is_active_today);
-    
-    return {
-      activeIds: activeUsers.map(user => user.id).join(','),
-      inactiveIds: inactiveUsers.map(user => user.id).join(',')
-    };
+  const loadNetwork = () => {
+    if (version) {
+      // We have a snapshot - the server answers no_changes while it still matches
+      dispatch(refreshNetworkActivity({ version }));
+    } else {
+      dispatch(fetchNetworkActivity());
+    }
   };
 
-  // Fetch data every time component mounts
+  // Live activity is pushed over the notifications socket while the page is open.
+  // (Re)subscribing also catches up on whatever was missed, e.g. across a reconnect.
+  // The socket is stored while still connecting, so this runs again once it opens.
   useEffect(() => {
-    if (isInitialLoad) {
-      // First load - fetch all data without parameters
-      dispatch(fetchNetworkActivity());
-      setIsInitialLoad(false);
-    } else {
-      // Subsequent loads - send current state to check for updates
-      const { activeIds, inactiveIds } = getCurrentState();
-      dispatch(refreshNetworkActivity({ activeIds, inactiveIds }));
+    if (isConnected && socket?.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ category: 'circle_activity', action: 'subscribe' }));
     }
-  }, [dispatch, isInitialLoad]);
+    loadNetwork();
+
+    return () => {
+      if (socket?.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({ category: 'circle_activity', action: 'unsubscribe' }));
+      }
+    };
+  }, [dispatch, socket, isConnected]);
 
   // Auto-select user when data loads
   useEffect(() => {
-    if (uniqueNetworkUsers.length > 0 && !selectedUser) {
+    if (selectedUser) {
+      // Keep the detail view in step with pushed activity
+      const current = uniqueNetworkUsers.find(user => user.id === selectedUser.id);
+      if (current && current !== selectedUser) {
+        setSelectedUser(current);
+      }
+    } else if (uniqueNetworkUsers.length > 0) {
       const activeUsers = uniqueNetworkUsers.filter(user => user.is_active_today);
       if (activeUsers.length > 0) {
         setSelectedUser(activeUsers[0]);
@@ -92,8 +94,7 @@ const HeartbeatNetworkPage: React.FC = () => {
   };
 
   const handleManualRefresh = () => {
-    const { activeIds, inactiveIds } = getCurrentState();
-    dispatch(refreshNetworkActivity({ activeIds, inactiveIds }));
+    dispatch(refreshNetworkActivity({ version }));
   };
 
   const getStatusColor = (isActive: boolean) => {
@@ -151,14 +152,7 @@ const HeartbeatNetworkPage: React.FC = () => {
           <h3>Error Loading Network</h3>
           <p>{error}</p>
           <button 
-            onClick={() => {
-              if (isInitialLoad) {
-                dispatch(fetchNetworkActivity());
-              } else {
-                const { activeIds, inactiveIds } = getCurrentState();
-                dispatch(refreshNetworkActivity({ activeIds, inactiveIds }));
-              }
-            }}
+            onClick={loadNetwork}
             className="retry-button"
           >
             Try Again
@@ -26,6 +26,7 @@ export interface HeartbeatNetworkState {
   networkUsers: NetworkUser[];
   currentUserId: number | null;
   today: string | null;
+  version: string | null;
   status: 'idle' | 'loading' | 'refreshing' | 'succeeded' | 'failed';
   error: string | null;
 }
@@ -34,19 +35,24 @@ interface NetworkActivityResponse {
   network_users: NetworkUser[];
   current_user_id: number;
   today: string;
-  update_type: 'full' | 'activity_updates' | 'no_changes';
-  activity_updates?: ActivityUpdate[];
+  update_type: 'full' | 'no_changes';
+  version: string;
 }
 
 interface RefreshNetworkActivityParams {
-  activeIds: string;
-  inactiveIds: string;
+  version: string | null;
+}
+
+interface ActivityDelta {
+  date: string;
+  updates: ActivityUpdate[];
 }
 
 export const initialState: HeartbeatNetworkState = {
   networkUsers: [],
   currentUserId: null,
   today: null,
+  version: null,
   status: 'idle',
   error: null,
 };
@@ -80,15 +86,12 @@ export const refreshNetworkActivity = createAsyncThunk<
   { rejectValue: string }
 >(
   'heartbeatNetwork/refreshNetworkActivity',
-  async ({ activeIds, inactiveIds }, { rejectWithValue }) => {
+  async ({ version }, { rejectWithValue }) => {
     try {
       const response = await api.get(
         `/api/activity_reports/heartbeat/network/`,
         {
-          params: {
-            active_ids: activeIds,
-            inactive_ids: inactiveIds
-          }
+          params: version ? { version } : {}
         }
       );
       return response.data as NetworkActivityResponse;
@@ -111,9 +114,25 @@ const heartbeatNetworkSlice = createSlice({
       state.networkUsers = [];
       state.currentUserId = null;
       state.today = null;
+      state.version = null;
       state.status = 'idle';
       state.error = null;
     },
+    // Pushed over the notifications socket when contacts become active
+    applyActivityDelta: (state, action: PayloadAction<ActivityDelta>) => {
+      const { date, updates } = action.payload;
+      if (state.today !== date) return;
+      updates.forEach(update => {
+        const user = state.networkUsers.find(u => u.id === update.user_id);
+        if (!user) return;
+        user.is_active_today = update.is_active_today;
+        user.streak_count = update.streak_count;
+        const entry = user.activity_history.find(item => item.date === date);
+        if (entry) entry.active = update.is_active_today;
+      });
+      // The snapshot no longer matches the server's version
+      state.version = null;
+    },
     resetNetworkStatus: (state) => {
       state.status = 'idle';
       state.error = null;
@@ -131,6 +150,7 @@ const heartbeatNetworkSlice = createSlice({
         state.networkUsers = action.payload.network_users;
         state.currentUserId = action.payload.current_user_id;
         state.today = action.payload.today;
+        state.version = action.payload.version;
         state.error = null;
       })
       .addCase(fetchNetworkActivity.rejected, (state, action) => {
@@ -147,22 +167,14 @@ const heartbeatNetworkSlice = createSlice({
         state.status = 'succeeded';
         
         if (action.payload.update_type === 'full') {
-          // Replace all data (new users detected)
+          // Replace all data (snapshot changed since our version)
           state.networkUsers = action.payload.network_users;
-        } else if (action.payload.update_type === 'activity_updates' && action.payload.activity_updates) {
-          // Update activity status for existing users
-          action.payload.activity_updates.forEach(update => {
-            const user = state.networkUsers.find(u => u.id === update.user_id);
-            if (user) {
-              user.is_active_today = update.is_active_today;
-              user.streak_count = update.streak_count;
-            }
-          });
         }
         // For 'no_changes', do nothing
         
         state.currentUserId = action.payload.current_user_id;
         state.today = action.payload.today;
+        state.version = action.payload.version;
         state.error = null;
       })
       .addCase(refreshNetworkActivity.rejected, (state, action) => {
@@ -172,5 +184,5 @@ const heartbeatNetworkSlice = createSlice({
   },
 });
 
-export const { clearNetworkData, resetNetworkStatus } = heartbeatNetworkSlice.actions;
+export const { clearNetworkData, applyActivityDelta, resetNetworkStatus } = heartbeatNetworkSlice.actions;
 export default heartbeatNetworkSlice.reducer;
\ No newline at end of file
@@ -8,6 +8,7 @@ import {
 } from '../../../../store';
 import {
   initializeRoom,
+  fetchOlderMessages,
   markMessagesRead,
   addOptimisticMessage,
   updateMessage,
@@ -153,10 +154,11 @@ const ChatPage: React.FC = () => {
     };
   }, [handleMarkAsRead]);
 
-  // Autoscroll on new messages
+  // Autoscroll on new messages (not when older ones are prepended)
+  const lastMessageId = messages.length ? messages[messages.length - 1].id : null;
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages]);
+  }, [lastMessageId]);
 
   // Resend functionality for failed/sending messages
   const handleResendMessage = (message: Message) => {
@@ -297,6 +299,17 @@ const ChatPage: React.FC = () => {
           </Box>
         ) : (
           <>
+            {room?.hasMore && (
+              <Box className="load-older">
+                <button
+                  type="button"
+                  onClick={() => conversationId && dispatch(fetchOlderMessages(conversationId))}
+                  disabled={room.olderStatus === 'loading'}
+                >
+                  {room.olderStatus === 'loading' ? 'Loading…' : 'Load earlier messages'}
+                </button>
+              </Box>
+            )}
             {messages.map((message) => (
               <Box
                 key={message.id}
@@ -13,6 +13,13 @@ export interface Message {
   is_own: boolean;
 }
 
+// One keyset page of history, oldest first; next_cursor fetches the older page
+export interface MessagePage {
+  results: Message[];
+  next_cursor: string | null;
+  has_more: boolean;
+}
+
 export interface UserProfile {
   id: string;
   name: string;
@@ -33,6 +40,9 @@ export interface ChatRoomState {
   sendError: string | null;
   lastReadTime: string | null;
   initialized: boolean;
+  nextCursor: string | null;
+  hasMore: boolean;
+  olderStatus: 'idle' | 'loading' | 'failed';
 }
 
 export interface ChatState {
@@ -80,6 +90,9 @@ export function loadChatState(): ChatState | undefined {
         error: null,
         sendStatus: 'idle',
         sendError: null,
+        nextCursor: room.nextCursor ?? null,
+        hasMore: room.hasMore ?? false,
+        olderStatus: 'idle',
       };
       return acc;
     }, {} as Record<string, ChatRoomState>);
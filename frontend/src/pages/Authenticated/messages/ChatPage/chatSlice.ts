@@ -6,6 +6,7 @@ import {
   ChatRoomState, 
   ChatState, 
   Message, 
+  MessagePage,
   ConversationDetail 
 } from './Chatpagetypes';
 
@@ -18,6 +19,9 @@ const initialRoomState: ChatRoomState = {
   sendError: null,
   lastReadTime: null,
   initialized: false,
+  nextCursor: null,
+  hasMore: false,
+  olderStatus: 'idle',
 };
 
 const initialState: ChatState = {
@@ -51,12 +55,12 @@ export const fetchConversation = createAsyncThunk(
   }
 );
 
-// Async thunk to fetch messages of a conversation
+// Async thunk to fetch the latest page of messages of a conversation
 export const fetchMessages = createAsyncThunk(
   'chat/fetchMessages',
   async (conversationId: string, { rejectWithValue }) => {
     try {
-      const response = await api.get<Message[]>(`/api/chat/chat/${conversationId}/messages/`);
+      const response = await api.get<MessagePage>(`/api/chat/chat/${conversationId}/messages/`);
       return { conversationId, data: response.data };
     } catch (error: any) {
       return rejectWithValue({ 
@@ -67,6 +71,26 @@ export const fetchMessages = createAsyncThunk(
   }
 );
 
+// Async thunk to fetch the page of messages before the oldest loaded one
+export const fetchOlderMessages = createAsyncThunk(
+  'chat/fetchOlderMessages',
+  async (conversationId: string, { rejectWithValue, getState }) => {
+    const state = getState() as RootState;
+    const cursor = state.chat.rooms[conversationId]?.nextCursor;
+    try {
+      const response = await api.get<MessagePage>(`/api/chat/chat/${conversationId}/messages/`, {
+        params: { cursor },
+      });
+      return { conversationId, data: response.data };
+    } catch (error: any) {
+      return rejectWithValue({
+        conversationId,
+        error: error.response?.data?.error || 'Failed to fetch messages'
+      });
+    }
+  }
+);
+
 // Async thunk to initialize a room by fetching conversation and messages
 export const initializeRoom = createAsyncThunk(
   'chat/initializeRoom',
@@ -269,7 +293,9 @@ const chatSlice = createSlice({
         const { conversationId, data } = action.payload;
         const room = getRoomState(state, conversationId);
         room.status = 'succeeded';
-        room.messages = data;
+        room.messages = data.results;
+        room.nextCursor = data.next_cursor;
+        room.hasMore = data.has_more;
         room.initialized = true;
         if (!room.lastReadTime) {
           room.lastReadTime = new Date().toISOString();
@@ -281,6 +307,24 @@ const chatSlice = createSlice({
         room.status = 'failed';
         room.error = payload.error;
       })
+      .addCase(fetchOlderMessages.pending, (state, action) => {
+        const room = getRoomState(state, action.meta.arg);
+        room.olderStatus = 'loading';
+      })
+      .addCase(fetchOlderMessages.fulfilled, (state, action) => {
+        const { conversationId, data } = action.payload;
+        const room = getRoomState(state, conversationId);
+        const loaded = new Set(room.messages.map(m => m.id));
+        room.messages = [...data.results.filter(m => !loaded.has(m.id)), ...room.messages];
+        room.nextCursor = data.next_cursor;
+        room.hasMore = data.has_more;
+        room.olderStatus = 'idle';
+      })
+      .addCase(fetchOlderMessages.rejected, (state, action) => {
+        const payload = action.payload as { conversationId: string; error: string };
+        const room = getRoomState(state, payload.conversationId);
+        room.olderStatus = 'failed';
+      })
       .addCase(sendNewMessage.pending, (state, action) => {
         const { conversationId } = action.meta.arg;
         const room = getRoomState(state, conversationId);
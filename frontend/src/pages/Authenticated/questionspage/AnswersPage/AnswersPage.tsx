@@ -2,7 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useDispatch, useSelector } from 'react-redux';
 import type { AppDispatch, RootState } from "../../../../store";
-import { fetchQuestionAnswers } from './answersSlice';
+import { fetchQuestionAnswers, fetchMoreAnswers } from './answersSlice';
 import BlogCard from '../../blogrelated/blogpage/BlogCard';
 import './AnswersPage.css';
 
@@ -25,7 +25,7 @@ const AnswersPage: React.FC = () => {
   const { questionId } = useParams<{ questionId: string }>();
   const navigate = useNavigate();
   const dispatch = useDispatch<AppDispatch>();
-  const { question, answers, status, error } = useSelector((state: RootState) => state.answers);
+  const { question, answers, status, error, hasMore, loadingMore } = useSelector((state: RootState) => state.answers);
   const [currentPage, setCurrentPage] = useState(1);
 
   useEffect(() => {
@@ -135,6 +135,15 @@ const AnswersPage: React.FC = () => {
               />
             ))
           )}
+          {hasMore && (
+            <button
+              className="load-more-answers-btn"
+              onClick={() => dispatch(fetchMoreAnswers())}
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Loading...' : 'Load more answers'}
+            </button>
+          )}
         </div>
       </div>
     </div>
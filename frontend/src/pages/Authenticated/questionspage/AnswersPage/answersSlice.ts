@@ -51,10 +51,10 @@ interface BlogBody {
 }
 
 interface BlogFooter {
-  likes: number[];
-  relevant_count: number[];
-  irrelevant_count: number[];
-  shares: number[];
+  likes: number;
+  relevant_count: number;
+  irrelevant_count: number;
+  shares: number;
   comments: string[];
   has_liked: boolean;
   has_shared: boolean;
@@ -68,8 +68,8 @@ interface Comment {
     profile_pic: string | null;
   };
   text: string;
-  likes: number[];
-  dislikes: number[];
+  likes: number;
+  dislikes: number;
   created_at: string;
   replies: Comment[];
 }
@@ -93,6 +93,17 @@ interface AnswersState {
   answers: Answer[];
   status: 'idle' | 'loading' | 'succeeded' | 'failed';
   error: string | null;
+  // Keyset paging: pass nextCursor back as ?cursor= for the next page
+  questionId: string | null;
+  nextCursor: string | null;
+  hasMore: boolean;
+  loadingMore: boolean;
+}
+
+interface AnswersPageData {
+  answers: Answer[];
+  nextCursor: string | null;
+  hasMore: boolean;
 }
 
 const initialState: AnswersState = {
@@ -100,6 +111,10 @@ const initialState: AnswersState = {
   answers: [],
   status: 'idle',
   error: null,
+  questionId: null,
+  nextCursor: null,
+  hasMore: false,
+  loadingMore: false,
 };
 
 // Utility to map milestone.photo_id from string|null to number|null
@@ -131,24 +146,58 @@ function transformAnswers(answers: any[]): Answer[] {
   });
 }
 
+// One page of the keyset-paginated answers ({ results, next_cursor, has_more })
+async function requestAnswersPage(questionId: string, cursor?: string | null): Promise<AnswersPageData> {
+  const response = await api.get(`api/blog_related/question_answers/${questionId}/`, {
+    params: cursor ? { cursor } : undefined,
+  });
+  console.log('Raw response data:', response.data);
+  const answersRaw = (response.data.results ?? response.data) as Answer[];
+  return {
+    answers: transformAnswers(answersRaw),
+    nextCursor: response.data.next_cursor ?? null,
+    hasMore: Boolean(response.data.has_more),
+  };
+}
+
 // Adjusted thunk: backend returns array of answers without question wrapping
 export const fetchQuestionAnswers = createAsyncThunk<
-  Answer[], // Return list of answers only
+  AnswersPageData, // First page of answers only
   string
 >('answers/fetchQuestionAnswers', async (questionId: string, { rejectWithValue }) => {
   try {
     console.log('Fetching answers for question ID:', questionId);
-    const response = await api.get(`api/blog_related/question_answers/${questionId}/`);
-    console.log('Raw response data:', response.data);
-    const answersRaw = response.data as Answer[];
-    const answersTransformed = transformAnswers(answersRaw);
-    console.log('Transformed answers data:', answersTransformed);
-    return answersTransformed;
+    const page = await requestAnswersPage(questionId);
+    console.log('Transformed answers data:', page.answers);
+    return page;
   } catch (err: any) {
     return rejectWithValue(err.response?.data || 'Failed to fetch answers');
   }
 });
 
+// Next page after the stored cursor; skipped while one is loading or none is left
+export const fetchMoreAnswers = createAsyncThunk<
+  AnswersPageData,
+  void,
+  { state: { answers: AnswersState } }
+>(
+  'answers/fetchMoreAnswers',
+  async (_, { getState, rejectWithValue }) => {
+    const { questionId, nextCursor } = getState().answers;
+    try {
+      return await requestAnswersPage(questionId as string, nextCursor);
+    } catch (err: any) {
+      return rejectWithValue(err.response?.data || 'Failed to fetch more answers');
+    }
+  },
+  {
+    condition: (_, { getState }) => {
+      const { questionId, nextCursor, hasMore, loadingMore } = getState().answers;
+      return Boolean(questionId && nextCursor && hasMore && !loadingMore);
+    },
+  }
+);
+
 const answersSlice = createSlice({
   name: 'answers',
   initialState,
@@ -157,19 +206,38 @@ const answersSlice = createSlice({
   },
   extraReducers: (builder) => {
     builder
-      .addCase(fetchQuestionAnswers.pending, (state) => {
+      .addCase(fetchQuestionAnswers.pending, (state, action) => {
         state.status = 'loading';
         state.error = null;
+        state.questionId = action.meta.arg;
+        state.nextCursor = null;
+        state.hasMore = false;
       })
       .addCase(fetchQuestionAnswers.fulfilled, (state, action) => {
         state.status = 'succeeded';
         // question info not part of response, keep it null or fetch separately
         state.question = null;
-        state.answers = action.payload;
+        state.answers = action.payload.answers;
+        state.nextCursor = action.payload.nextCursor;
+        state.hasMore = action.payload.hasMore;
       })
       .addCase(fetchQuestionAnswers.rejected, (state, action) => {
         state.status = 'failed';
         state.error = action.payload as string;
+      })
+      .addCase(fetchMoreAnswers.pending, (state) => {
+        state.loadingMore = true;
+      })
+      .addCase(fetchMoreAnswers.fulfilled, (state, action) => {
+        state.loadingMore = false;
+        const existingIds = new Set(state.answers.map((answer) => answer.id));
+        state.answers.push(...action.payload.answers.filter((answer) => !existingIds.has(answer.id)));
+        state.nextCursor = action.payload.nextCursor;
+        state.hasMore = action.payload.hasMore;
+      })
+      .addCase(fetchMoreAnswers.rejected, (state) => {
+        // Keep the cursor so "Load more" retries the same page
+        state.loadingMore = false;
       });
   },
 });